@@ -0,0 +1,178 @@
+"""
+Tests des sauvegardes incrémentales (data.backup) : découpage en blocs
+selon le contenu, réutilisation des blocs, politique de rétention,
+suppression des blocs orphelins et restauration par le DataManager.
+
+Lancement: python -m pytest Tests/test_backup.py (ou python Tests/test_backup.py)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.backup import BackupStore
+from data.data_manager import DataManager
+
+
+def _small_chunks(root: Path) -> BackupStore:
+    """Magasin à petits blocs (frontière une ligne sur 16 au-delà de 256 octets)"""
+    store = BackupStore(root)
+    store.MIN_CHUNK_SIZE = 256
+    store.MAX_CHUNK_SIZE = 4096
+    store.BOUNDARY_MASK = 0xF
+    return store
+
+
+def _lines(count: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [json.dumps({'id': i, 'nom': f'passager {rng.random()}'}) + '\n' for i in range(count)]
+
+
+def _objects(store: BackupStore) -> set:
+    return {path.parent.name + path.name for path in store.objects_dir.glob('*/*')}
+
+
+def _set_created_at(store: BackupStore, name: str, created_at: str):
+    path = store.manifests_dir / f'{name}.json'
+    manifest = json.loads(path.read_text(encoding='utf-8'))
+    manifest['created_at'] = created_at
+    path.write_text(json.dumps(manifest), encoding='utf-8')
+
+
+def test_chunk_boundaries_follow_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _small_chunks(Path(tmp) / 'backups')
+        path = Path(tmp) / 'data.jsonl'
+        lines = _lines(2000)
+        path.write_text(''.join(lines), encoding='utf-8')
+
+        chunks = list(store._iter_chunks(path))
+        assert b''.join(chunks) == path.read_bytes()
+        assert len(chunks) > 10
+        assert all(store.MIN_CHUNK_SIZE <= len(chunk) <= store.MAX_CHUNK_SIZE for chunk in chunks[:-1])
+        assert all(chunk.endswith(b'\n') for chunk in chunks)
+
+        # Une ligne insérée ne modifie que le bloc qui la contient
+        lines.insert(1000, '{"id": "nouveau"}\n')
+        path.write_text(''.join(lines), encoding='utf-8')
+        changed = set(store._iter_chunks(path)) - set(chunks)
+        assert 1 <= len(changed) <= 2, len(changed)
+
+
+def test_unchanged_files_reuse_chunks():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _small_chunks(Path(tmp) / 'backups')
+        source = Path(tmp) / 'data'
+        source.mkdir()
+        (source / 'a.jsonl').write_text(''.join(_lines(500)), encoding='utf-8')
+        (source / 'b.json').write_text('{"b": 1}', encoding='utf-8')
+
+        store.create({'': source}, name='first')
+        objects = _objects(store)
+        store.create({'': source}, name='second')
+        assert _objects(store) == objects
+        first, second = store.load_manifest('first'), store.load_manifest('second')
+        assert first['files'] == second['files']
+
+        (source / 'b.json').write_text('{"b": 2}', encoding='utf-8')
+        store.create({'': source}, name='third')
+        assert len(_objects(store) - objects) == 1
+
+
+def test_prune_keeps_retention_and_collects_orphans():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _small_chunks(Path(tmp) / 'backups')
+        source = Path(tmp) / 'data'
+        source.mkdir()
+        dates = {'b1': '2031-01-01T10:00:00', 'b2': '2031-03-04T09:00:00',
+                 'b3': '2031-03-05T10:00:00', 'b4': '2031-03-05T11:00:00'}
+        contents = {}
+        for name in dates:
+            # Un fichier propre à chaque sauvegarde, un fichier commun
+            (source / 'commun.json').write_text('{"commun": true}', encoding='utf-8')
+            for old in source.glob('propre_*'):
+                old.unlink()
+            (source / f'propre_{name}.json').write_text(json.dumps({'nom': name}), encoding='utf-8')
+            store.create({'': source}, name=name)
+            _set_created_at(store, name, dates[name])
+            contents[name] = set(store.load_manifest(name)['files']['propre_%s.json' % name]['chunks'])
+        assert store.list_backups() == ['b1', 'b2', 'b3', 'b4']
+
+        # Plus récente de chacun des deux derniers jours: b4 (b3 est du même jour) et b2
+        removed = store.prune({'daily': 2})
+        assert removed == ['b3', 'b1']
+        assert store.list_backups() == ['b2', 'b4']
+        objects = _objects(store)
+        assert not (contents['b1'] | contents['b3']) & objects
+        assert (contents['b2'] | contents['b4']) <= objects
+
+        # Les sauvegardes conservées restent restaurables
+        target = Path(tmp) / 'restored'
+        assert store.restore('b2', target) == 2
+        assert json.loads((target / 'propre_b2.json').read_text(encoding='utf-8')) == {'nom': 'b2'}
+
+        # Aucune sauvegarde supprimée: pas de ramasse-miettes
+        assert store.prune({'last': 5}) == []
+        assert _objects(store) == objects
+
+
+def _data_files(data_dir: str) -> dict:
+    """Contenu des fichiers de données (hors sauvegardes, cache et versions .bak)"""
+    files = {}
+    for path in Path(data_dir).rglob('*'):
+        relative = path.relative_to(data_dir).as_posix()
+        if (not path.is_file() or relative.split('/')[0] in ('backups', 'cache')
+                or '.bak' in path.name or path.name == '.lock'):
+            continue
+        files[relative] = path.read_bytes()
+    return files
+
+
+def test_restore_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        assert manager.add_flight({'numero_vol': 'OLD1', 'aeroport_depart': 'CDG', 'aeroport_arrivee': 'NCE',
+                                   'heure_depart': '2020-01-10T08:00:00', 'statut': 'termine'})
+        manager.storage.close()
+        manager = DataManager(data_dir=tmp, storage='partitioned')
+        assert manager.add_passenger({'id_passager': 'P1', 'nom': 'Martin', 'prenom': 'Alice',
+                                      'adresse': '1 rue de la Paix'})
+        assert manager.backup_all_data()
+        first = manager.list_backups()[-1]
+        _set_created_at(manager.backups, first, '2020-01-01T10:00:00')
+        snapshot = _data_files(tmp)
+
+        # Modifications: nouveau mois de vols (nouvelle partition), passager modifié
+        assert manager.add_flight({'numero_vol': 'AF100', 'aeroport_depart': 'CDG', 'aeroport_arrivee': 'NCE',
+                                   'heure_depart': '2031-05-04T08:00:00', 'statut': 'programme'})
+        assert manager.update_passenger('P1', {'nom': 'Durand'})
+        assert manager.backup_all_data()
+        assert manager.add_passenger({'id_passager': 'P2', 'nom': 'Petit', 'prenom': 'Léa',
+                                      'adresse': '2 rue Haute'})
+        assert manager.backup_all_data()
+        assert 'flights/2031-05.json' in _data_files(tmp)
+
+        # Rétention: la première sauvegarde reste (autre semaine), pas l'intermédiaire
+        assert len(manager.backups.prune({'weekly': 2})) == 1
+        assert manager.list_backups()[0] == first and len(manager.list_backups()) == 2
+
+        assert manager.restore_backup(first)
+        assert _data_files(tmp) == snapshot
+        assert manager.get_flight_by_id('AF100') is None
+        assert manager.get_passenger_by_id('P1')['nom'] == 'Martin'
+        assert manager.get_passenger_by_id('P2') is None
+        assert manager.get_flight_by_id('OLD1') is not None
+        manager.storage.close()
+
+
+if __name__ == "__main__":
+    test_chunk_boundaries_follow_content()
+    test_unchanged_files_reuse_chunks()
+    test_prune_keeps_retention_and_collects_orphans()
+    test_restore_round_trip()
+    print("Tous les tests de sauvegarde sont passés !")
@@ -0,0 +1,104 @@
+"""
+Tests de la détection des doubles affectations (data.conflicts) : bornes
+des créneaux, chevauchements, identifiants d'équipage, et comparaison du
+balayage avec une vérification de toutes les paires.
+
+Lancement: python -m pytest Tests/test_conflicts.py (ou python Tests/test_conflicts.py)
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.conflicts import ScheduleIndex, crew_id, flight_resources, parse_window
+
+
+def _window(flight: dict):
+    return parse_window(flight.get('heure_depart'), flight.get('heure_arrivee_prevue'))
+
+
+def _flight(number: str, departure: str, arrival: str, aircraft: str = 'A1', **crew) -> dict:
+    return {'numero_vol': number, 'heure_depart': f'2031-05-04T{departure}:00',
+            'heure_arrivee_prevue': f'2031-05-04T{arrival}:00', 'avion_utilise': aircraft, **crew}
+
+
+def _pairs(conflicts) -> list:
+    return [(c['resource'], c['flights'][0]['numero_vol'], c['flights'][1]['numero_vol']) for c in conflicts]
+
+
+def test_departure_at_arrival_is_not_a_conflict():
+    index = ScheduleIndex([_flight('F1', '08:00', '10:00'), _flight('F2', '10:00', '12:00')], _window)
+    assert index.find_all_conflicts() == []
+    assert index.conflicts_for(_flight('F3', '10:00', '11:00')) == [
+        {'resource': ('avion', 'A1'), 'flight': index.slots(('avion', 'A1'))[1][2]}]
+    assert index.conflicts_for(_flight('F3', '07:00', '08:00')) == []
+    assert index.conflicts_for(_flight('F3', '12:00', '13:00')) == []
+
+
+def test_overlapping_flights():
+    flights = [_flight('F1', '08:00', '12:00'), _flight('F2', '09:00', '10:00'),
+               _flight('F3', '11:00', '13:00'), _flight('F4', '09:30', '09:45', aircraft='A2')]
+    index = ScheduleIndex(flights, _window)
+    assert _pairs(index.find_all_conflicts()) == [(('avion', 'A1'), 'F1', 'F2'), (('avion', 'A1'), 'F1', 'F3')]
+
+    found = [c['flight']['numero_vol'] for c in index.conflicts_for(_flight('F5', '09:50', '11:30'))]
+    assert found == ['F1', 'F2', 'F3']
+    # Le vol lui-même (ou son numéro d'origine) n'est pas signalé
+    assert [c['flight']['numero_vol'] for c in index.conflicts_for(flights[1])] == ['F1']
+    assert index.conflicts_for(_flight('NEW', '09:00', '10:00'), ignore='F2') == [
+        {'resource': ('avion', 'A1'), 'flight': flights[0]}]
+    # Horaires invalides: vol ignoré
+    assert index.conflicts_for(_flight('F6', '10:00', '09:00')) == []
+
+
+def test_crew_labels():
+    assert crew_id('Alice Martin (ID: 73da0f05)') == '73da0f05'
+    assert crew_id('  73da0f05 ') == '73da0f05'
+    assert crew_id('') is None and crew_id(None) is None
+
+    first = _flight('F1', '08:00', '10:00', aircraft=None, pilote='Alice Martin (ID: P1)',
+                    personnel_navigant=['Bob Durand (ID: C1)', 'Bob Durand (ID: C1)'])
+    second = _flight('F2', '09:00', '11:00', aircraft='A2', copilote='A. Martin (ID: P1)')
+    assert flight_resources(first) == [('equipage', 'P1'), ('equipage', 'C1')]
+    index = ScheduleIndex([first, second], _window)
+    assert _pairs(index.find_all_conflicts()) == [(('equipage', 'P1'), 'F1', 'F2')]
+
+
+def test_sweep_matches_all_pairs():
+    random.seed(7)
+    start = datetime(2031, 5, 4)
+    flights = []
+    for i in range(400):
+        departure = start + timedelta(minutes=random.randrange(0, 3 * 24 * 60))
+        arrival = departure + timedelta(minutes=random.randrange(30, 600))
+        flights.append({'numero_vol': f'F{i}', 'avion_utilise': f'A{random.randrange(12)}',
+                        'heure_depart': departure.isoformat(), 'heure_arrivee_prevue': arrival.isoformat()})
+
+    expected = set()
+    for a in flights:
+        for b in flights:
+            wa, wb = _window(a), _window(b)
+            if a is not b and a['avion_utilise'] == b['avion_utilise'] and wa[0] < wb[1] and wb[0] < wa[1]:
+                expected.add(frozenset((a['numero_vol'], b['numero_vol'])))
+
+    index = ScheduleIndex(flights, _window)
+    conflicts = index.find_all_conflicts()
+    found = {frozenset(flight['numero_vol'] for flight in c['flights']) for c in conflicts}
+    assert found == expected and len(conflicts) == len(expected)
+    # Paires dans l'ordre des départs
+    assert all(_window(first)[0] <= _window(second)[0] for first, second in (c['flights'] for c in conflicts))
+    for flight in flights:
+        others = {c['flight']['numero_vol'] for c in index.conflicts_for(flight)}
+        assert others == {number for pair in expected if flight['numero_vol'] in pair
+                          for number in pair if number != flight['numero_vol']}
+
+
+if __name__ == "__main__":
+    test_departure_at_arrival_is_not_a_conflict()
+    test_overlapping_flights()
+    test_crew_labels()
+    test_sweep_matches_all_pairs()
+    print("Tous les tests de conflits sont passés !")
@@ -0,0 +1,771 @@
+"""
+Tests des transactions du DataManager: validation, annulation sur
+exception, reprise d'une validation interrompue (.transaction.json) et
+écritures concurrentes de deux instances sur le même répertoire ;
+affectation des avions aux vols (plan_assignments), plans de cabine et
+import en masse.
+
+Lancement: python -m pytest Tests/test_data_manager.py (ou python Tests/test_data_manager.py)
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.data_manager import ConcurrentModificationError, DataManager
+from data.storage import JsonStorage
+
+
+def _passenger(passenger_id: str, nom: str = 'Martin') -> dict:
+    return {'id_passager': passenger_id, 'nom': nom, 'prenom': 'Alice', 'adresse': '1 rue de la Paix'}
+
+
+def _flight(number: str) -> dict:
+    return {'numero_vol': number, 'aeroport_depart': 'CDG', 'aeroport_arrivee': 'NCE',
+            'heure_depart': '2031-05-04T08:00:00', 'heure_arrivee_prevue': '2031-05-04T09:30:00',
+            'statut': 'programme'}
+
+
+def _reservation(reservation_id: str, passenger_id: str, number: str) -> dict:
+    return {'id_reservation': reservation_id, 'passager_id': passenger_id, 'vol_numero': number,
+            'statut': 'active', 'date_creation': '2031-04-01T10:00:00'}
+
+
+def _on_disk(data_dir: str, file_key: str) -> list:
+    with open(Path(data_dir) / f'{file_key}.json', 'r', encoding='utf-8') as f:
+        return json.load(f)[file_key]
+
+
+def test_transaction_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.add_flight(_flight('AF100'))
+        events = []
+        manager.subscribe(events.append)
+
+        with manager.transaction():
+            manager.add_passenger(_passenger('P1'))
+            manager.add_reservation(_reservation('R1', 'P1', 'AF100'))
+            # Rien n'est écrit ni notifié avant la validation
+            assert _on_disk(tmp, 'passengers') == []
+            assert _on_disk(tmp, 'reservations') == []
+            assert events == []
+
+        assert [p['id_passager'] for p in _on_disk(tmp, 'passengers')] == ['P1']
+        assert [r['id_reservation'] for r in _on_disk(tmp, 'reservations')] == ['R1']
+        assert {(event.collection, event.op) for event in events} == {('passengers', 'insert'),
+                                                                       ('reservations', 'insert')}
+        assert not Path(tmp, JsonStorage.INTENT_FILENAME).exists()
+
+        reopened = DataManager(data_dir=tmp)
+        assert reopened.get_reservation_by_id('R1')['passager_id'] == 'P1'
+
+
+def test_transaction_rollback_on_exception():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.add_passenger(_passenger('P1'))
+        manager.add_flight(_flight('AF100'))
+        events = []
+        manager.subscribe(events.append)
+
+        try:
+            with manager.transaction():
+                manager.update_passenger('P1', {'nom': 'Durand'})
+                manager.add_passenger(_passenger('P2'))
+                manager.update_flight('AF100', {'statut': 'annule'})
+                raise ValueError("échec métier")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("L'exception du bloc doit être propagée")
+
+        # Mémoire et disque reviennent à l'état d'avant la transaction
+        assert manager.get_passenger_by_id('P1')['nom'] == 'Martin'
+        assert manager.get_passenger_by_id('P2') is None
+        assert manager.get_flight_by_id('AF100')['statut'] == 'programme'
+        assert [p['nom'] for p in _on_disk(tmp, 'passengers')] == ['Martin']
+        assert _on_disk(tmp, 'flights')[0]['statut'] == 'programme'
+        assert all(event.op == 'reload' for event in events), "Seuls des rechargements sont notifiés"
+
+        # Le gestionnaire reste utilisable après l'annulation
+        with manager.transaction():
+            manager.add_passenger(_passenger('P3'))
+        assert [p['id_passager'] for p in _on_disk(tmp, 'passengers')] == ['P1', 'P3']
+
+
+def test_nested_transaction_joins_outer():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        try:
+            with manager.transaction():
+                manager.add_passenger(_passenger('P1'))
+                with manager.transaction():
+                    manager.add_passenger(_passenger('P2'))
+                raise RuntimeError("annulation de la transaction englobante")
+        except RuntimeError:
+            pass
+        assert manager.get_passengers() == []
+        assert _on_disk(tmp, 'passengers') == []
+
+
+def _interrupted_commit(tmp: str) -> JsonStorage:
+    """Prépare une validation multi-collections puis s'arrête après l'écriture de l'intention"""
+    manager = DataManager(data_dir=tmp)
+    manager.add_passenger(_passenger('P1'))
+    storage = manager.storage
+
+    passengers = {'passengers': [_passenger('P1', 'Durand'), _passenger('P2')]}
+    flights = {'flights': [_flight('AF100')]}
+    steps = storage._prepare('passengers', passengers) + storage._prepare('flights', flights)
+    storage._write_intent({'steps': steps})
+    return storage
+
+
+def test_recover_interrupted_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = _interrupted_commit(tmp)
+        assert storage.intent_path.exists()
+        assert [p['nom'] for p in _on_disk(tmp, 'passengers')] == ['Martin']
+
+        # Redémarrage: l'intention est rejouée en entier
+        reopened = DataManager(data_dir=tmp)
+        assert not storage.intent_path.exists()
+        assert not list(Path(tmp).glob('.*.tmp'))
+        assert reopened.get_passenger_by_id('P1')['nom'] == 'Durand'
+        assert reopened.get_passenger_by_id('P2') is not None
+        assert reopened.get_flight_by_id('AF100') is not None
+
+
+def test_recover_partially_applied_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = _interrupted_commit(tmp)
+        # Arrêt après le premier renommage
+        intent = json.loads(storage.intent_path.read_text(encoding='utf-8'))
+        storage._apply_step(*intent['steps'][0])
+
+        reopened = DataManager(data_dir=tmp)
+        assert not storage.intent_path.exists()
+        assert [p['id_passager'] for p in reopened.get_passengers()] == ['P1', 'P2']
+        assert reopened.get_flight_by_id('AF100') is not None
+
+
+def test_incomplete_intent_discarded():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.add_passenger(_passenger('P1'))
+        # Intention tronquée: la validation n'avait pas commencé
+        manager.storage.intent_path.write_text('{"steps": [["passengers", ', encoding='utf-8')
+
+        reopened = DataManager(data_dir=tmp)
+        assert not manager.storage.intent_path.exists()
+        assert [p['nom'] for p in reopened.get_passengers()] == ['Martin']
+
+
+def test_recover_interrupted_journal_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp, storage='journal')
+        storage = manager.storage
+        passengers = {'passengers': [_passenger('P1')]}
+        entries = {'passengers': [storage._entry('passengers', 'insert', None, _passenger('P1'), passengers)]}
+        storage._write_intent({'steps': [], 'entries': entries})
+
+        reopened = DataManager(data_dir=tmp, storage='journal')
+        assert not storage.intent_path.exists()
+        assert [p['id_passager'] for p in reopened.get_passengers()] == ['P1']
+
+
+ENGINES = ('json', 'journal', 'partitioned', 'sqlite')
+
+
+def _two_managers(tmp: str, engine: str):
+    first = DataManager(data_dir=tmp, storage=engine)
+    first.add_passenger(_passenger('P1'))
+    second = DataManager(data_dir=tmp, storage=engine)
+    assert [p['id_passager'] for p in second.get_passengers()] == ['P1']
+    return first, second
+
+
+def _close(*managers):
+    for manager in managers:
+        manager.storage.close()
+
+
+def test_concurrent_writes_rebased():
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = _two_managers(tmp, engine)
+            events = []
+            second.subscribe(events.append, ['passengers'])
+
+            with second.transaction():
+                second.update_passenger('P1', {'nom': 'Durand'})
+                second.add_passenger(_passenger('P3'))
+                # L'autre instance écrit pendant la transaction
+                assert first.add_passenger(_passenger('P2'))
+
+            # Modifications rejouées sur la version de l'autre instance
+            assert sorted(p['id_passager'] for p in second.get_passengers()) == ['P1', 'P2', 'P3'], engine
+            assert second.get_passenger_by_id('P2') is not None, engine
+            assert ('passengers', 'reload') in {(e.collection, e.op) for e in events}, engine
+
+            third = DataManager(data_dir=tmp, storage=engine)
+            assert sorted(p['id_passager'] for p in third.get_passengers()) == ['P1', 'P2', 'P3'], engine
+            assert third.get_passenger_by_id('P1')['nom'] == 'Durand', engine
+            assert sorted(p['id_passager'] for p in first.get_passengers()) == ['P1', 'P2', 'P3'], engine
+            _close(first, second, third)
+
+
+def test_conflicting_insert_raises():
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = _two_managers(tmp, engine)
+
+            try:
+                with second.transaction():
+                    second.add_passenger(_passenger('P2', 'Bernard'))
+                    assert first.add_passenger(_passenger('P2', 'Durand'))
+            except ConcurrentModificationError as e:
+                assert e.file_keys == ['passengers'], engine
+            else:
+                raise AssertionError(f"Clé ajoutée par les deux instances acceptée ({engine})")
+
+            # Transaction annulée: la version de l'autre instance est conservée
+            assert second.get_passenger_by_id('P2')['nom'] == 'Durand', engine
+            third = DataManager(data_dir=tmp, storage=engine)
+            assert third.get_passenger_by_id('P2')['nom'] == 'Durand', engine
+            _close(first, second, third)
+
+
+def test_update_of_deleted_record_refused():
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = _two_managers(tmp, 'json')
+        try:
+            with second.transaction():
+                second.update_passenger('P1', {'nom': 'Durand'})
+                assert first.delete_passenger('P1')
+        except ConcurrentModificationError:
+            pass
+        else:
+            raise AssertionError("Modification d'un enregistrement supprimé acceptée")
+        assert second.get_passenger_by_id('P1') is None
+        assert _on_disk(tmp, 'passengers') == []
+
+
+def test_stale_document_write_refused():
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = _two_managers(tmp, 'json')
+        with second.batch():
+            # Document complet: aucune opération à rejouer
+            data = second.load_data('passengers')
+            data['passengers'].append(_passenger('P3'))
+            second.save_data('passengers', data)
+            assert first.add_passenger(_passenger('P2'))
+
+        assert [p['id_passager'] for p in _on_disk(tmp, 'passengers')] == ['P1', 'P2']
+        assert [p['id_passager'] for p in second.get_passengers()] == ['P1', 'P2']
+
+
+def _fleet_manager(tmp: str) -> DataManager:
+    """Deux aéroports, deux avions (A1 à Paris, A2 à Nice) et un vol en cours de A1"""
+    manager = DataManager(data_dir=tmp)
+    manager.save_data('airports', {'airports': [
+        {'code_iata': 'CDG', 'nom': 'Charles de Gaulle', 'coordonnees': {'latitude': 49.0097, 'longitude': 2.5479}},
+        {'code_iata': 'NCE', 'nom': "Nice Côte d'Azur", 'coordonnees': {'latitude': 43.6584, 'longitude': 7.2159}},
+    ]})
+    for num_id, coordinates in (('A1', (49.0097, 2.5479)), ('A2', (43.6584, 7.2159))):
+        manager.add_aircraft({'num_id': num_id, 'capacite': 180, 'autonomie': 6000.0, 'etat': 'operationnel',
+                              'localisation': {'latitude': coordinates[0], 'longitude': coordinates[1]}})
+    manager.add_flight(_scheduled('F0', 'CDG', 'NCE', '08:00', '16:00', 'en_vol', 'A1'))
+    return manager
+
+
+def _scheduled(number: str, origin: str, destination: str, departure: str, arrival: str,
+               statut: str = 'programme', aircraft: str = None) -> dict:
+    return {'numero_vol': number, 'aeroport_depart': origin, 'aeroport_arrivee': destination,
+            'heure_depart': f'2031-05-04T{departure}:00', 'heure_arrivee_prevue': f'2031-05-04T{arrival}:00',
+            'statut': statut, 'avion_utilise': aircraft}
+
+
+def test_plan_assignments_respects_committed_flights():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _fleet_manager(tmp)
+        manager.add_flight(_scheduled('F1', 'CDG', 'NCE', '09:00', '10:00'))
+        manager.add_flight(_scheduled('F2', 'NCE', 'CDG', '17:00', '18:00'))
+
+        result = manager.plan_assignments(apply=True)
+        # A1 est en vol sur F0 jusqu'à 16h: F1 n'a pas d'avion à Paris
+        assert 'F1' in result['unassigned'], result
+        assert manager.get_flight_by_id('F1')['avion_utilise'] is None
+        # A2 (à Nice) ou A1 (arrivé à Nice par F0) assure le retour
+        assert result['assignments'].get('F2') in ('A1', 'A2'), result
+        assert manager.get_flight_by_id('F2')['autonomie_suffisante'] is True
+        assert manager.find_all_conflicts() == []
+
+
+def test_plan_assignments_chains_before_committed_flight():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _fleet_manager(tmp)
+        manager.update_aircraft('A2', {'etat': 'en_maintenance'})
+        # A1 doit repartir de Paris à 20h: un aller-retour ne le ramène pas à temps
+        manager.add_flight(_scheduled('F3', 'CDG', 'NCE', '20:00', '21:30', aircraft='A1'))
+        manager.add_flight(_scheduled('F2', 'NCE', 'CDG', '16:45', '18:00'))
+        manager.add_flight(_scheduled('F4', 'NCE', 'CDG', '19:00', '20:30'))
+
+        result = manager.plan_assignments(apply=True)
+        assert result['assignments'] == {'F2': 'A1'}, result
+        assert 'F4' in result['unassigned'], result
+        assert manager.get_flight_by_id('F3')['avion_utilise'] == 'A1'
+        assert manager.find_all_conflicts() == []
+
+
+def test_plan_assignments_keeps_existing_aircraft():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _fleet_manager(tmp)
+        manager.add_flight(_scheduled('F5', 'NCE', 'CDG', '17:00', '18:00', aircraft='A2'))
+
+        result = manager.plan_assignments(apply=True)
+        assert 'F5' not in result['assignments'], result
+        assert manager.get_flight_by_id('F5')['avion_utilise'] == 'A2'
+
+        # Réaffectation demandée: le vol redevient candidat
+        result = manager.plan_assignments(reassign=True)
+        assert result['assignments'].get('F5') in ('A1', 'A2'), result
+
+
+def _seated_manager(tmp: str, engine: str = 'json'):
+    """Un avion de 180 sièges affecté au vol AF100 ; compte les constructions de plans"""
+    manager = DataManager(data_dir=tmp, storage=engine)
+    manager.add_aircraft({'num_id': 'A1', 'capacite': 180, 'autonomie': 6000.0, 'etat': 'operationnel'})
+    manager.add_flight({**_flight('AF100'), 'avion_utilise': 'A1'})
+    builds = []
+    build = manager._seat_maps._build
+    manager._seat_maps._build = lambda number: builds.append(number) or build(number)
+    return manager, builds
+
+
+def test_auto_assign_seats_builds_map_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager, builds = _seated_manager(tmp)
+        with manager.transaction():
+            for i in range(20):
+                manager.add_reservation(_reservation(f'R{i}', f'P{i}', 'AF100'))
+
+        assigned = manager.auto_assign_seats('AF100')
+        assert len(assigned) == 20 and len(set(assigned.values())) == 20
+        assert builds == ['AF100'], f"Plan construit {len(builds)} fois"
+        assert manager.seat_map('AF100').taken == 20
+        assert DataManager(data_dir=tmp).seat_map('AF100').taken == 20
+
+
+def test_seat_map_follows_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager, builds = _seated_manager(tmp)
+        manager.add_flight({**_flight('AF200'), 'avion_utilise': 'A1'})
+        assert manager.seat_map('AF100').free == 180
+
+        # Réservations: siège pris, déplacé puis libéré sans reconstruction
+        manager.add_reservation({**_reservation('R1', 'P1', 'AF100'), 'siege_assigne': '1A'})
+        assert not manager.seat_map('AF100').is_free('1A')
+        manager.update_reservation('R1', {'siege_assigne': '2C'})
+        assert manager.seat_map('AF100').is_free('1A') and not manager.seat_map('AF100').is_free('2C')
+        manager.update_reservation('R1', {'statut': 'annulee'})
+        assert manager.seat_map('AF100').taken == 0
+        manager.add_reservation({**_reservation('R2', 'P2', 'AF100'), 'siege_assigne': '3D'})
+        manager.delete_reservation('R2')
+        assert manager.seat_map('AF100').taken == 0
+        assert builds == ['AF100']
+
+        # Capacité de l'avion modifiée: plans de ses vols reconstruits
+        manager.seat_map('AF200')
+        manager.update_aircraft('A1', {'capacite': 60})
+        assert manager.seat_map('AF100').capacity == 60 and manager.seat_map('AF200').capacity == 60
+        assert builds == ['AF100', 'AF200', 'AF100', 'AF200']
+
+        # Avion retiré d'un vol: seul son plan est oublié
+        manager.update_flight('AF200', {'avion_utilise': None})
+        assert manager.seat_map('AF200') is None
+        assert manager.seat_map('AF100').capacity == 60
+        assert builds == ['AF100', 'AF200', 'AF100', 'AF200', 'AF200']
+
+
+def test_seat_map_loads_only_needed_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.add_aircraft({'num_id': 'A1', 'capacite': 180, 'autonomie': 6000.0, 'etat': 'operationnel'})
+        manager.add_flight({**_flight('AF001'), 'heure_depart': '2024-01-10T08:00:00',
+                            'heure_arrivee_prevue': '2024-01-10T09:30:00', 'avion_utilise': 'A1',
+                            'statut': 'termine'})
+        manager.update_flight('AF001', {'created_at': '2023-12-01T00:00:00'})
+        manager.add_flight({**_flight('AF100'), 'avion_utilise': 'A1'})
+        # Réservations closes anciennes: partitions non chargées à la réouverture
+        for reservation_id, month, statut in (('R1', '2023-12', 'terminee'), ('R2', '2022-03', 'annulee')):
+            reservation = {**_reservation(reservation_id, 'P1', 'AF001'), 'siege_assigne': '1A',
+                           'statut': statut, 'date_creation': f'{month}-15T10:00:00'}
+            assert manager.add_reservation(reservation)
+        manager.storage.close()
+
+        manager = DataManager(data_dir=tmp, storage='partitioned')
+        storage = manager.storage
+        assert storage.cold_partitions('reservations') == ['2022-03', '2023-12']
+
+        # Vol à venir: aucune partition chargée
+        assert manager.seat_map('AF100').taken == 0
+        assert storage.cold_partitions('reservations') == ['2022-03', '2023-12']
+
+        # Vol passé: seules les partitions entre sa création et son départ
+        assert not manager.seat_map('AF001').is_free('1A')
+        assert storage.cold_partitions('reservations') == ['2022-03']
+        storage.close()
+
+
+def test_bulk_add_refuses_keys_of_unloaded_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        assert manager.add_flight({**_flight('OLD1'), 'heure_depart': '2020-01-10T08:00:00', 'statut': 'termine'})
+        manager.storage.close()
+        manager = DataManager(data_dir=tmp, storage='partitioned')
+        assert manager.storage.cold_partitions('flights') == ['2020-01']
+
+        # Même numéro, autre date: le vol historique ne doit pas être remplacé
+        report = manager.bulk_add('flights', [_flight('OLD1'), _flight('AF200')])
+        assert (report['added'], report['duplicates']) == (1, 1), report
+        assert manager.get_flight_by_id('OLD1')['heure_depart'].startswith('2020-01')
+        manager.storage.close()
+        reopened = DataManager(data_dir=tmp, storage='partitioned')
+        assert reopened.get_flight_by_id('OLD1')['statut'] == 'termine'
+        reopened.storage.close()
+
+
+def test_bulk_add_checks_seats():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager, _ = _seated_manager(tmp)
+        manager.add_passenger(_passenger('P1'))
+        manager.add_reservation({**_reservation('R0', 'P1', 'AF100'), 'siege_assigne': '1A'})
+
+        rows = [{**_reservation(f'R{i}', 'P1', 'AF100'), 'siege_assigne': seat}
+                for i, seat in enumerate(['1A', '2B', '2B', '99Z'], 1)]
+        report = manager.bulk_add('reservations', rows)
+        assert (report['added'], report['invalid']) == (1, 3), report
+        assert manager.get_reservation_by_id('R2')['siege_assigne'] == '2B'
+        assert manager.seat_map('AF100').taken == 2
+
+
+def test_bulk_add_reports_write_failure():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+
+        def failing_save(file_key, data):
+            raise OSError("disque plein")
+        manager.storage.save = failing_save
+
+        report = manager.bulk_add('passengers', [_passenger('P1'), _passenger('P2')])
+        assert (report['added'], report['failed']) == (0, 2), report
+        assert manager.get_passenger_by_id('P1') is None
+        assert _on_disk(tmp, 'passengers') == []
+
+
+def test_integrity_check_streams_references():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        assert manager.add_passenger(_passenger('P1'))
+        assert manager.add_flight({**_flight('OLD1'), 'heure_depart': '2020-01-10T08:00:00', 'statut': 'termine'})
+        assert manager.add_flight({**_flight('AF100'), 'avion_utilise': 'GHOST'})
+        manager.save_data('reservations', {'reservations': [
+            _reservation('R1', 'P1', 'OLD1'), _reservation('R2', 'P9', 'AF100'), _reservation('R3', 'P1', 'NOPE')]})
+        manager.storage.close()
+
+        # Les vols anciens restent dans une partition non chargée
+        manager = DataManager(data_dir=tmp, storage='partitioned')
+        cold = manager.storage.cold_partitions('flights')
+        assert '2020-01' in cold
+        report = manager.validate_data_integrity()
+        assert report['valid'], report
+        assert sorted(report['warnings']) == [
+            "Réservation R2 référence un passager inexistant: P9",
+            "Réservation R3 référence un vol inexistant: NOPE",
+            "Vol AF100 référence un avion inexistant: GHOST"
+        ], report['warnings']
+        assert manager.storage.cold_partitions('flights') == cold
+        manager.storage.close()
+
+
+def _count_writes(manager: DataManager) -> list:
+    """Relève les collections écrites par chaque validation du moteur"""
+    writes = []
+    save, commit = manager.storage.save, manager.storage.commit
+
+    def counted_save(file_key, data):
+        writes.append([file_key])
+        save(file_key, data)
+
+    def counted_commit(changes):
+        writes.append(sorted(changes))
+        commit(changes)
+    manager.storage.save, manager.storage.commit = counted_save, counted_commit
+    return writes
+
+
+def test_batch_writes_each_collection_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.load_data('passengers')
+        manager.load_data('flights')
+        writes = _count_writes(manager)
+
+        with manager.batch():
+            assert manager.add_passenger(_passenger('P1'))
+            with manager.batch():
+                assert manager.add_passenger(_passenger('P2'))
+                assert manager.add_flight(_flight('AF100'))
+            # Bloc interne terminé: rien n'est encore écrit
+            assert writes == [] and manager.has_pending_writes()
+            assert manager.update_passenger('P1', {'nom': 'Durand'})
+            assert _on_disk(tmp, 'passengers') == []
+
+        assert writes == [['flights', 'passengers']]
+        assert not manager.has_pending_writes()
+        assert [p['nom'] for p in _on_disk(tmp, 'passengers')] == ['Durand', 'Martin']
+
+        # Exception dans le bloc: les modifications faites sont tout de même écrites
+        try:
+            with manager.batch():
+                assert manager.add_passenger(_passenger('P3'))
+                raise RuntimeError("interruption")
+        except RuntimeError:
+            pass
+        assert len(_on_disk(tmp, 'passengers')) == 3
+
+
+def test_write_delay_coalesces_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        DataManager(data_dir=tmp)  # Fichiers initiaux écrits sans délai
+        scheduled = []
+        manager = DataManager(data_dir=tmp, write_delay=5.0,
+                              scheduler=lambda delay, callback: scheduled.append((delay, callback)))
+        manager.load_data('passengers')
+        writes = _count_writes(manager)
+
+        for i in range(3):
+            assert manager.add_passenger(_passenger(f'P{i}'))
+        assert [delay for delay, _ in scheduled] == [5.0], "Une écriture planifiée par modification"
+        assert writes == [] and _on_disk(tmp, 'passengers') == []
+        assert manager.get_passenger_by_id('P2') is not None
+
+        scheduled.pop()[1]()
+        assert writes == [['passengers']]
+        assert len(_on_disk(tmp, 'passengers')) == 3
+
+        # Fenêtre échue pendant un bloc batch(): écriture à la sortie du bloc
+        with manager.batch():
+            assert manager.add_passenger(_passenger('P3'))
+            assert scheduled == []
+        assert writes == [['passengers'], ['passengers']]
+        assert manager.add_passenger(_passenger('P4'))
+        with manager.batch():
+            scheduled.pop()[1]()
+            assert len(writes) == 2
+        assert len(writes) == 3 and len(_on_disk(tmp, 'passengers')) == 5
+
+
+def test_flush_stops_after_refused_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        DataManager(data_dir=tmp)
+        manager = DataManager(data_dir=tmp, write_delay=5.0, scheduler=lambda delay, callback: None)
+        assert manager.add_passenger(_passenger('P1'))
+        assert manager.add_flight(_flight('AF100'))
+        commit = manager._commit_changes
+        attempts = []
+
+        # Refus sans collection désignée: pas de nouvel essai, modifications conservées
+        def refuse(queue):
+            attempts.append(sorted(queue))
+            raise ConcurrentModificationError([])
+        manager._commit_changes = refuse
+        assert manager.flush() is False
+        assert attempts == [['flights', 'passengers']]
+        assert manager.has_pending_writes()
+
+        # Collection refusée: abandonnée, les autres sont écrites au second essai
+        def refuse_passengers(queue):
+            attempts.append(sorted(queue))
+            if 'passengers' in queue:
+                raise ConcurrentModificationError(['passengers'])
+            commit(queue)
+        attempts.clear()
+        manager._commit_changes = refuse_passengers
+        assert manager.flush() is False
+        assert attempts == [['flights', 'passengers'], ['flights']]
+        assert not manager.has_pending_writes()
+        assert [f['numero_vol'] for f in _on_disk(tmp, 'flights')] == ['AF100']
+
+
+def _assert_indexes_consistent(manager: DataManager, file_key: str):
+    """Index primaire, index secondaires et ordres de tri égaux à une reconstruction complète"""
+    items = manager._get_items(file_key)
+    key_field = manager.PRIMARY_KEYS[file_key]
+    index = manager._get_index(file_key)
+    assert index == {item[key_field]: item for item in items}, file_key
+    assert all(index[item[key_field]] is item for item in items)
+
+    secondary = manager._get_secondary_indexes(file_key)
+    for field in manager.SECONDARY_INDEXES.get(file_key, []):
+        expected = {}
+        for item in items:
+            value = manager._index_value(item, field)
+            if value is not None:
+                expected.setdefault(value, set()).add(id(item))
+        assert {value: set(bucket) for value, bucket in secondary[field].items()} == expected, (file_key, field)
+
+    for field in manager.SORT_ORDERS.get(file_key, []):
+        order = manager._get_sort_order(file_key, field)
+        assert sorted(map(id, order._records)) == sorted(map(id, items)), (file_key, field)
+        assert order._keys == sorted(order._keys)
+
+
+def test_indexes_follow_primary_key_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        for number in ('AF100', 'AF200'):
+            assert manager.add_flight(_flight(number))
+        for i, number in enumerate(('AF100', 'AF100', 'AF200')):
+            assert manager.add_reservation(_reservation(f'R{i}', f'P{i}', number))
+        for file_key in ('flights', 'reservations'):
+            _assert_indexes_consistent(manager, file_key)
+
+        # Clé primaire et champs indexés modifiés ensemble
+        assert manager.update_flight('AF100', {'numero_vol': 'AF101', 'aeroport_depart': 'LYS',
+                                               'heure_depart': '2031-05-06T07:00:00'})
+        assert manager.get_flight_by_id('AF100') is None
+        assert manager.get_flight_by_id('AF101')['aeroport_depart'] == 'LYS'
+        assert [f['numero_vol'] for f in manager.find_by('flights', 'date_depart', '2031-05-06')] == ['AF101']
+        assert [f['numero_vol'] for f in manager.find_by('flights', 'aeroport_depart', 'CDG')] == ['AF200']
+        assert manager.update_reservation('R1', {'id_reservation': 'R9', 'vol_numero': 'AF200',
+                                                 'statut': 'annulee'})
+        assert manager.get_reservation_by_id('R1') is None
+        assert sorted(r['id_reservation'] for r in manager.find_by('reservations', 'vol_numero', 'AF200')) == ['R2', 'R9']
+        assert [r['id_reservation'] for r in manager.find_by('reservations', 'statut', 'annulee')] == ['R9']
+        for file_key in ('flights', 'reservations'):
+            _assert_indexes_consistent(manager, file_key)
+
+        # Nouvelle clé déjà utilisée: modification refusée, index inchangés
+        assert not manager.update_flight('AF200', {'numero_vol': 'AF101', 'statut': 'annule'})
+        assert not manager.update_reservation('R0', {'id_reservation': 'R2', 'passager_id': 'P7'})
+        assert manager.get_flight_by_id('AF200')['statut'] == 'programme'
+        assert manager.find_by('flights', 'statut', 'annule') == []
+        assert manager.find_by('reservations', 'passager_id', 'P7') == []
+        assert manager.get_reservation_by_id('R2')['passager_id'] == 'P2'
+        for file_key in ('flights', 'reservations'):
+            _assert_indexes_consistent(manager, file_key)
+
+
+def test_indexes_follow_delete():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        for number in ('AF100', 'AF200', 'AF300'):
+            assert manager.add_flight(_flight(number))
+        for i in range(4):
+            assert manager.add_reservation(_reservation(f'R{i}', 'P1', 'AF100'))
+        for file_key in ('flights', 'reservations'):
+            _assert_indexes_consistent(manager, file_key)
+
+        assert manager.delete_flight('AF200')
+        assert manager.delete_reservation('R1')
+        assert manager.delete_reservation('R3')
+        assert not manager.delete_reservation('R3')
+        assert manager.get_flight_by_id('AF200') is None
+        assert sorted(f['numero_vol'] for f in manager.find_by('flights', 'date_depart', '2031-05-04')) == ['AF100', 'AF300']
+        assert sorted(r['id_reservation'] for r in manager.find_by('reservations', 'passager_id', 'P1')) == ['R0', 'R2']
+        for file_key in ('flights', 'reservations'):
+            _assert_indexes_consistent(manager, file_key)
+
+        # Dernier enregistrement d'une valeur retiré: valeur absente de l'index
+        assert manager.delete_reservation('R0') and manager.delete_reservation('R2')
+        assert 'P1' not in manager.index_values('reservations', 'passager_id')
+        assert 'AF100' not in manager.index_values('reservations', 'vol_numero')
+        _assert_indexes_consistent(manager, 'reservations')
+
+
+def test_indexes_rebuilt_after_clear_cache_and_reload():
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = _two_managers(tmp, engine)
+            first.add_aircraft({'num_id': 'A1', 'capacite': 180, 'autonomie': 6000.0, 'etat': 'operationnel'})
+            assert first.add_flight({**_flight('AF100'), 'avion_utilise': 'A1'})
+            assert first.add_reservation({**_reservation('R1', 'P1', 'AF100'), 'siege_assigne': '1A'})
+            # Index et plans de cabine construits avant les modifications de l'autre instance
+            for file_key in ('flights', 'reservations', 'passengers'):
+                _assert_indexes_consistent(first, file_key)
+            assert not first.seat_map('AF100').is_free('1A')
+
+            assert second.update_flight('AF100', {'numero_vol': 'AF101', 'statut': 'annule'})
+            assert second.update_reservation('R1', {'vol_numero': 'AF101', 'siege_assigne': '2C'})
+            assert second.add_flight(_flight('AF100'))
+            assert second.update_passenger('P1', {'nom': 'Durand'})
+
+            # Documents modifiés sur disque: index reconstruits à la relecture
+            assert first.get_flight_by_id('AF101')['statut'] == 'annule', engine
+            assert [r['id_reservation'] for r in first.find_by('reservations', 'vol_numero', 'AF101')] == ['R1'], engine
+            assert first.find_by('reservations', 'vol_numero', 'AF100') == [], engine
+            assert first.seat_map('AF100') is None, engine
+            assert first.seat_map('AF101').is_free('1A') and not first.seat_map('AF101').is_free('2C'), engine
+            for file_key in ('flights', 'reservations', 'passengers'):
+                _assert_indexes_consistent(first, file_key)
+
+            # Cache vidé: tout est reconstruit depuis le disque
+            assert second.update_reservation('R1', {'siege_assigne': '3D'})
+            first.clear_cache()
+            assert first.seat_map('AF101').is_free('2C') and not first.seat_map('AF101').is_free('3D'), engine
+            assert first.get_passenger_by_id('P1')['nom'] == 'Durand', engine
+            assert [r['id_reservation'] for r in first.find_by('reservations', 'passager_id', 'P1')] == ['R1'], engine
+            for file_key in ('flights', 'reservations', 'passengers'):
+                _assert_indexes_consistent(first, file_key)
+
+            # Transaction annulée: index de la version relue
+            try:
+                with first.transaction():
+                    assert first.update_flight('AF100', {'numero_vol': 'AF102'})
+                    assert first.delete_reservation('R1')
+                    raise RuntimeError("annulation")
+            except RuntimeError:
+                pass
+            assert first.get_flight_by_id('AF102') is None and first.get_flight_by_id('AF100') is not None, engine
+            assert first.get_reservation_by_id('R1') is not None, engine
+            for file_key in ('flights', 'reservations'):
+                _assert_indexes_consistent(first, file_key)
+            _close(first, second)
+
+
+if __name__ == "__main__":
+    test_transaction_commit()
+    test_transaction_rollback_on_exception()
+    test_nested_transaction_joins_outer()
+    test_recover_interrupted_commit()
+    test_recover_partially_applied_commit()
+    test_incomplete_intent_discarded()
+    test_recover_interrupted_journal_commit()
+    test_concurrent_writes_rebased()
+    test_conflicting_insert_raises()
+    test_update_of_deleted_record_refused()
+    test_stale_document_write_refused()
+    test_plan_assignments_respects_committed_flights()
+    test_plan_assignments_chains_before_committed_flight()
+    test_plan_assignments_keeps_existing_aircraft()
+    test_auto_assign_seats_builds_map_once()
+    test_seat_map_follows_changes()
+    test_seat_map_loads_only_needed_partitions()
+    test_bulk_add_refuses_keys_of_unloaded_partitions()
+    test_bulk_add_checks_seats()
+    test_bulk_add_reports_write_failure()
+    test_integrity_check_streams_references()
+    test_batch_writes_each_collection_once()
+    test_write_delay_coalesces_writes()
+    test_flush_stops_after_refused_collections()
+    test_indexes_follow_primary_key_change()
+    test_indexes_follow_delete()
+    test_indexes_rebuilt_after_clear_cache_and_reload()
+    print("Tous les tests du DataManager sont passés !")
@@ -0,0 +1,197 @@
+"""
+Tests de la matrice des distances entre aéroports (Core.distances) :
+calcul en Python pur et vectorisé avec NumPy (si installé), ajout
+d'aéroports, sérialisation et cache disque ; recherche par grille
+(AirportGrid) comparée à un parcours complet, près de l'antiméridien et
+des pôles.
+
+Lancement: python -m pytest Tests/test_distances.py (ou python Tests/test_distances.py)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import Core.distances as distances
+from Core.distances import AirportGrid, RouteDistances, haversine_km
+from data.data_manager import DataManager
+from data.route_cache import sync_route_distances
+
+
+def _points(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    return {f'A{i:02d}': (rng.uniform(-90, 90), rng.uniform(-180, 180)) for i in range(count)}
+
+
+def _assert_matches_haversine(matrix: RouteDistances, points: dict):
+    for code_a, (lat1, lon1) in points.items():
+        for code_b, (lat2, lon2) in points.items():
+            assert abs(matrix.distance(code_a, code_b) - haversine_km(lat1, lon1, lat2, lon2)) < 1e-6
+
+
+def _pure_python(build):
+    """Exécute build() sur le chemin sans NumPy"""
+    available = distances.NUMPY_AVAILABLE
+    distances.NUMPY_AVAILABLE = False
+    try:
+        return build()
+    finally:
+        distances.NUMPY_AVAILABLE = available
+
+
+def test_pure_python_matrix():
+    points = _points(12)
+    first, added = dict(list(points.items())[:8]), dict(list(points.items())[8:])
+
+    def build():
+        matrix = RouteDistances(first)
+        assert matrix.add_airports(added) == 4
+        assert matrix.add_airports(first) == 0
+        return matrix, RouteDistances.from_bytes(matrix.to_bytes())
+
+    matrix, copy = _pure_python(build)
+    assert isinstance(matrix._matrix, list)
+    _assert_matches_haversine(matrix, points)
+    _assert_matches_haversine(copy, points)
+    assert matrix.distance('A00', 'XXX') is None
+
+
+def test_numpy_matrix_matches_pure_python():
+    if not distances.NUMPY_AVAILABLE:
+        print("⚠️ NumPy non installé: test du calcul vectorisé ignoré")
+        return
+    points = _points(12)
+    first, added = dict(list(points.items())[:8]), dict(list(points.items())[8:])
+
+    matrix = RouteDistances(first)
+    assert matrix.add_airports(added) == 4
+    _assert_matches_haversine(matrix, points)
+
+    # Format sérialisé identique sur les deux chemins
+    reference = _pure_python(lambda: RouteDistances(points))
+    assert matrix.to_bytes() == reference.to_bytes()
+    copy = _pure_python(lambda: RouteDistances.from_bytes(matrix.to_bytes()))
+    _assert_matches_haversine(copy, points)
+
+
+def test_cache_reused_and_extended():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_dir = Path(temp_dir) / 'cache'
+        points = _points(6)
+        matrix = sync_route_distances(None, points, cache_dir)
+        assert len(list(cache_dir.glob('distances-*.bin'))) == 1
+
+        # Relecture depuis le cache
+        reloaded = sync_route_distances(None, points, cache_dir)
+        assert reloaded is not matrix and reloaded.codes == matrix.codes
+        _assert_matches_haversine(reloaded, points)
+
+        # Aéroport ajouté: matrice complétée, ancien cache remplacé
+        extended = dict(points, ZZZ=(10.0, 20.0))
+        assert sync_route_distances(matrix, extended, cache_dir) is matrix
+        _assert_matches_haversine(matrix, extended)
+        assert len(list(cache_dir.glob('distances-*.bin'))) == 1
+        assert not list(cache_dir.glob('.*.tmp'))
+
+
+def _edge_points(seed: int = 13) -> dict:
+    """Aéroports regroupés près de l'antiméridien et des pôles, plus quelques autres"""
+    rng = random.Random(seed)
+    points = {}
+    for i in range(20):
+        points[f'E{i:02d}'] = (rng.uniform(-60, 60), rng.choice([-1, 1]) * rng.uniform(178.5, 180))
+        points[f'N{i:02d}'] = (rng.uniform(88, 90), rng.uniform(-180, 180))
+        points[f'S{i:02d}'] = (rng.uniform(-90, -87.5), rng.uniform(-180, 180))
+        points[f'W{i:02d}'] = (rng.uniform(-80, 80), rng.uniform(-180, 180))
+    points['POL'] = (90.0, 0.0)
+    points['MER'] = (0.0, -180.0)
+    return points
+
+
+def _edge_queries(seed: int = 17) -> list:
+    rng = random.Random(seed)
+    queries = [(0.0, 180.0), (0.0, -180.0), (10.0, 179.99), (-10.0, -179.99), (90.0, 123.0),
+               (-90.0, 0.0), (89.99, -180.0), (-89.5, 179.5), (45.0, 0.0)]
+    for _ in range(150):
+        queries.append((rng.uniform(-60, 60), rng.choice([-1, 1]) * rng.uniform(177, 180)))
+        queries.append((rng.choice([-1, 1]) * rng.uniform(85, 90), rng.uniform(-180, 180)))
+    return queries
+
+
+def _brute_force(points: dict, latitude: float, longitude: float) -> list:
+    return sorted((haversine_km(latitude, longitude, *point), code) for code, point in points.items())
+
+
+def test_grid_nearest_near_antimeridian_and_poles():
+    points = _edge_points()
+    grid = AirportGrid(points)
+    for latitude, longitude in _edge_queries():
+        expected = _brute_force(points, latitude, longitude)
+        distance, code = grid.nearest(latitude, longitude)
+        assert abs(distance - expected[0][0]) < 1e-9, (latitude, longitude, code, expected[0])
+
+        # Rayon traversant l'antiméridien ou couvrant un pôle
+        for radius in (50, 300, 1500):
+            found = grid.within(latitude, longitude, radius)
+            assert [c for _, c in found] == [c for d, c in expected if d <= radius], (latitude, longitude, radius)
+
+    # Même aéroport vu des deux côtés de l'antiméridien
+    grid = AirportGrid({'EST': (-17.75, 179.9), 'OUE': (-17.75, 170.0)})
+    assert grid.nearest(-17.75, -179.9)[1] == 'EST'
+    assert grid.nearest(89.9, -90.0, max_km=None) is not None
+    assert AirportGrid({}).nearest(0.0, 0.0) is None
+
+
+def test_grid_nearest_max_km():
+    points = _edge_points()
+    grid = AirportGrid(points)
+    for latitude, longitude in _edge_queries()[:120]:
+        best = _brute_force(points, latitude, longitude)[0][0]
+        for max_km in (DataManager.AIRPORT_MATCH_KM, 100, best, best - 0.01):
+            found = grid.nearest(latitude, longitude, max_km=max_km)
+            if best <= max_km:
+                assert found is not None and abs(found[0] - best) < 1e-9, (latitude, longitude, max_km)
+            else:
+                assert found is None, (latitude, longitude, max_km, found)
+
+
+def test_nearest_airport_match_radius():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        airports = [{'code_iata': 'TVU', 'coordonnees': {'latitude': -16.69, 'longitude': 179.88}},
+                    {'code_iata': 'SUV', 'coordonnees': {'latitude': -18.04, 'longitude': 178.56}},
+                    {'code_iata': 'LYR', 'coordonnees': {'latitude': 78.25, 'longitude': 15.47}},
+                    {'code_iata': 'XXX', 'coordonnees': {'latitude': 'inconnue', 'longitude': 0}}]
+        with open(Path(temp_dir) / 'airports.json', 'w', encoding='utf-8') as f:
+            json.dump({'airports': airports}, f)
+        manager = DataManager(data_dir=temp_dir)
+        match_km = manager.AIRPORT_MATCH_KM
+
+        # Position à l'est de l'antiméridien, à moins de AIRPORT_MATCH_KM de TVU
+        close = {'latitude': -16.69, 'longitude': -179.995}
+        assert haversine_km(-16.69, -179.995, -16.69, 179.88) < match_km
+        assert manager.nearest_airport(close, match_km)['code_iata'] == 'TVU'
+
+        # Au-delà du rayon: aucun aéroport reconnu, sauf sans limite
+        far = {'latitude': -16.69, 'longitude': -179.7}
+        assert haversine_km(-16.69, -179.7, -16.69, 179.88) > match_km
+        assert manager.nearest_airport(far, match_km) is None
+        assert manager.nearest_airport(far)['code_iata'] == 'TVU'
+        assert manager.nearest_airport({'latitude': 89.0, 'longitude': -160.0})['code_iata'] == 'LYR'
+        assert manager.nearest_airport({'latitude': 'nord', 'longitude': 0}) is None
+        assert [a['code_iata'] for a in manager.airports_within(close, 250)] == ['TVU', 'SUV']
+        manager.storage.close()
+
+
+if __name__ == "__main__":
+    test_pure_python_matrix()
+    test_numpy_matrix_matches_pure_python()
+    test_cache_reused_and_extended()
+    test_grid_nearest_near_antimeridian_and_poles()
+    test_grid_nearest_max_km()
+    test_nearest_airport_match_radius()
+    print("Tous les tests de distances sont passés !")
@@ -0,0 +1,243 @@
+"""
+Tests des notifications de modifications du DataManager (subscribe,
+_emit, _coalesce_events) et de leur report sur les tableaux
+(interfaces.tabs.tree_sync), avec un tableau simulé sans Tk.
+
+Lancement: python -m pytest Tests/test_events.py (ou python Tests/test_events.py)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.data_manager import ChangeEvent, DataManager
+from interfaces.tabs.tree_sync import apply_row_change, bind_tree_to_changes
+
+
+def _passenger(passenger_id: str, nom: str = 'Martin') -> dict:
+    return {'id_passager': passenger_id, 'nom': nom, 'prenom': 'Alice', 'adresse': '1 rue de la Paix'}
+
+
+def _flight(number: str) -> dict:
+    return {'numero_vol': number, 'aeroport_depart': 'CDG', 'aeroport_arrivee': 'NCE',
+            'heure_depart': '2031-05-04T08:00:00', 'heure_arrivee_prevue': '2031-05-04T09:30:00',
+            'statut': 'programme'}
+
+
+def _ops(events: list) -> list:
+    return [(event.collection, event.op, event.key) for event in events]
+
+
+class FakeTree:
+    """Tableau simulé: lignes ordonnées (iid, valeurs) et tâches after_idle"""
+
+    def __init__(self):
+        self.rows = []
+        self.idle = {}
+        self.bindings = []
+        self._auto = 0
+
+    def exists(self, iid):
+        return any(row[0] == iid for row in self.rows)
+
+    def index(self, iid):
+        return [row[0] for row in self.rows].index(iid)
+
+    def delete(self, iid):
+        del self.rows[self.index(iid)]
+
+    def item(self, iid, values):
+        self.rows[self.index(iid)] = (iid, tuple(values))
+
+    def insert(self, parent, position, iid=None, values=()):
+        if iid is None:
+            self._auto += 1
+            iid = f'I{self._auto:03d}'
+        assert not self.exists(iid)
+        position = len(self.rows) if position == 'end' else position
+        self.rows.insert(position, (iid, tuple(values)))
+        return iid
+
+    def after_idle(self, callback):
+        self._auto += 1
+        self.idle[self._auto] = callback
+        return self._auto
+
+    def after_cancel(self, task):
+        self.idle.pop(task, None)
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings.append((sequence, callback))
+
+    def run_idle(self):
+        tasks, self.idle = self.idle, {}
+        for callback in tasks.values():
+            callback()
+
+
+def _row_values(passenger: dict) -> tuple:
+    return (passenger.get('id_passager'), passenger.get('nom'))
+
+
+def test_subscribers_receive_filtered_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        passengers, everything, failures = [], [], []
+        manager.subscribe(passengers.append, ['passengers'])
+        manager.subscribe(everything.append)
+
+        def failing(event):
+            failures.append(event)
+            raise RuntimeError("abonné en erreur")
+        manager.subscribe(failing, ['passengers'])
+
+        assert manager.add_passenger(_passenger('P1'))
+        assert manager.update_passenger('P1', {'nom': 'Durand'})
+        assert manager.add_flight(_flight('AF100'))
+        assert manager.delete_passenger('P1')
+
+        assert _ops(passengers) == [('passengers', 'insert', 'P1'), ('passengers', 'update', 'P1'),
+                                    ('passengers', 'delete', 'P1')]
+        assert _ops(everything) == _ops(passengers)[:2] + [('flights', 'insert', 'AF100')] + _ops(passengers)[2:]
+        assert len(failures) == 3, "Une erreur d'abonné a interrompu les notifications"
+        update = passengers[1]
+        assert (update.old['nom'], update.new['nom']) == ('Martin', 'Durand')
+        assert passengers[2].old['nom'] == 'Durand' and passengers[2].new is None
+
+        manager.unsubscribe(everything.append)
+        manager.unsubscribe(passengers.append)
+        manager.unsubscribe(lambda event: None)
+        assert manager.add_passenger(_passenger('P2'))
+        assert len(passengers) == 3 and len(everything) == 4
+        assert len(failures) == 4
+
+
+def test_transaction_events_sent_on_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        received = []
+        manager.subscribe(received.append, ['passengers'])
+
+        with manager.transaction():
+            assert manager.add_passenger(_passenger('P1'))
+            assert manager.update_passenger('P1', {'nom': 'Durand'})
+            assert received == [], "Événement notifié avant la validation"
+        assert _ops(received) == [('passengers', 'insert', 'P1'), ('passengers', 'update', 'P1')]
+
+        # Transaction annulée: aucune modification notifiée, collection relue
+        received.clear()
+        try:
+            with manager.transaction():
+                assert manager.add_passenger(_passenger('P2'))
+                raise RuntimeError("annulation")
+        except RuntimeError:
+            pass
+        assert _ops(received) == [('passengers', 'reload', None)]
+        assert manager.get_passenger_by_id('P2') is None
+
+
+def test_coalesce_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        manager.MAX_ROW_EVENTS = 3
+
+        few = [ChangeEvent('flights', 'insert', 'F1'), ChangeEvent('passengers', 'update', 'P1')]
+        assert manager._coalesce_events(few) == few
+
+        # Trop de modifications d'une collection: un seul 'reload' à la place de la première
+        many = [ChangeEvent('flights', 'insert', 'F1'), ChangeEvent('passengers', 'insert', 'P0')]
+        many += [ChangeEvent('passengers', 'insert', f'P{i}') for i in range(1, 5)]
+        many.append(ChangeEvent('flights', 'delete', 'F1'))
+        assert _ops(manager._coalesce_events(many)) == [('flights', 'insert', 'F1'),
+                                                        ('passengers', 'reload', None),
+                                                        ('flights', 'delete', 'F1')]
+
+        # Collection relue: ses autres modifications sont incluses dans le 'reload'
+        reloaded = [ChangeEvent('passengers', 'update', 'P1'), ChangeEvent('flights', 'update', 'F1'),
+                    ChangeEvent('passengers', 'reload'), ChangeEvent('passengers', 'delete', 'P1')]
+        assert _ops(manager._coalesce_events(reloaded)) == [('passengers', 'reload', None),
+                                                            ('flights', 'update', 'F1')]
+
+        # Une transaction volumineuse n'envoie qu'un 'reload' aux abonnés
+        received = []
+        manager.subscribe(received.append)
+        with manager.transaction():
+            for i in range(5):
+                assert manager.add_passenger(_passenger(f'P{i}'))
+        assert _ops(received) == [('passengers', 'reload', None)]
+
+
+def test_apply_row_change():
+    tree = FakeTree()
+    for key in ('P1', 'P2', 'P3'):
+        apply_row_change(tree, ChangeEvent('passengers', 'insert', key, new=_passenger(key)),
+                         'id_passager', _row_values)
+    assert [row[0] for row in tree.rows] == ['P1', 'P2', 'P3']
+
+    update = ChangeEvent('passengers', 'update', 'P2', new=_passenger('P2', 'Durand'))
+    assert apply_row_change(tree, update, 'id_passager', _row_values)
+    assert tree.rows[1] == ('P2', ('P2', 'Durand'))
+
+    # Clé primaire modifiée: ligne recréée à la même position
+    renamed = ChangeEvent('passengers', 'update', 'P2', new=_passenger('P9', 'Durand'))
+    assert apply_row_change(tree, renamed, 'id_passager', _row_values)
+    assert tree.rows == [('P1', ('P1', 'Martin')), ('P9', ('P9', 'Durand')), ('P3', ('P3', 'Martin'))]
+
+    assert apply_row_change(tree, ChangeEvent('passengers', 'delete', 'P1'), 'id_passager', _row_values)
+    assert apply_row_change(tree, ChangeEvent('passengers', 'delete', 'absent'), 'id_passager', _row_values)
+    assert [row[0] for row in tree.rows] == ['P9', 'P3']
+
+    # Ligne non identifiable par sa clé: rafraîchissement complet demandé
+    rows = list(tree.rows)
+    clash = ChangeEvent('passengers', 'update', 'P9', new=_passenger('P3'))
+    missing = ChangeEvent('passengers', 'insert', None, new={'nom': 'Sans clé'})
+    empty = ChangeEvent('passengers', 'update', 'P3', new=_passenger(''))
+    for event in (clash, missing, empty):
+        assert apply_row_change(tree, event, 'id_passager', _row_values) is False, event
+    assert tree.rows == rows
+
+
+def test_tree_refreshed_once_when_row_not_identifiable():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp)
+        tree = FakeTree()
+        refreshes = []
+
+        def refresh():
+            refreshes.append(len(manager.get_passengers()))
+            tree.rows = []
+            for passenger in manager.get_passengers():
+                tree.insert('', 'end', iid=passenger['id_passager'], values=_row_values(passenger))
+
+        on_change = bind_tree_to_changes(
+            tree, manager, ['passengers'],
+            lambda event: apply_row_change(tree, event, 'id_passager', _row_values), refresh)
+
+        assert manager.add_passenger(_passenger('P1'))
+        assert manager.add_passenger(_passenger('P2'))
+        assert [row[0] for row in tree.rows] == ['P1', 'P2'] and not tree.idle
+
+        # Ligne déjà présente sous la nouvelle clé (tableau désynchronisé)
+        tree.insert('', 'end', iid='P3', values=('P3', 'Fantôme'))
+        assert manager.update_passenger('P1', {'id_passager': 'P3'})
+        assert manager.delete_passenger('P2')
+        assert len(tree.idle) == 1, "Rafraîchissement non demandé ou demandé plusieurs fois"
+        tree.run_idle()
+        assert refreshes == [1]
+        assert tree.rows == [('P3', ('P3', 'Martin'))]
+
+        # Destruction du tableau: désabonnement
+        destroy = [callback for sequence, callback in tree.bindings if sequence == '<Destroy>'][0]
+        destroy(type('Event', (), {'widget': tree})())
+        assert on_change not in [callback for callback, _ in manager._subscribers]
+
+
+if __name__ == "__main__":
+    test_subscribers_receive_filtered_events()
+    test_transaction_events_sent_on_commit()
+    test_coalesce_events()
+    test_apply_row_change()
+    test_tree_refreshed_once_when_row_not_identifiable()
+    print("Tous les tests de notifications sont passés !")
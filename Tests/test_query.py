@@ -0,0 +1,260 @@
+"""
+Tests des requêtes (data.query) : choix de l'index, ordres de tri
+maintenus (SortedIndex), pagination de get_page et fenêtres horaires de
+flights_between, comparés à un simple filtrage / tri des mêmes
+enregistrements (intervalles vides et bornes de page compris).
+
+Lancement: python -m pytest Tests/test_query.py (ou python Tests/test_query.py)
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.data_manager import DataManager
+from data.query import SortedIndex, compile_predicates, normalize_where, plan_query, sort_records
+
+NAMES = ['Martin', 'Bernard', 'Dubois', 'Durand', 'Petit', 'Moreau', None]
+FIRST_NAMES = ['Alice', 'Louis', 'Léa', 'Hugo']
+AIRPORTS = ['CDG', 'NCE', 'LYS', 'TLS']
+
+
+def _passengers(count: int, rng: random.Random) -> list:
+    passengers = []
+    for i in range(count):
+        passenger = {'id_passager': f'P{i:03d}', 'prenom': rng.choice(FIRST_NAMES), 'adresse': 'x',
+                     'age': rng.randint(1, 90)}
+        name = rng.choice(NAMES)
+        if name is not None:
+            passenger['nom'] = name
+        passengers.append(passenger)
+    return passengers
+
+
+def _flights(count: int, rng: random.Random) -> list:
+    flights = []
+    start = datetime(2031, 5, 1)
+    for i in range(count):
+        departure = start + timedelta(minutes=rng.randrange(0, 6 * 24 * 60, 5))
+        arrival = departure + timedelta(minutes=rng.randrange(60, 300, 5))
+        origin, destination = rng.sample(AIRPORTS, 2)
+        flight = {'numero_vol': f'F{i:03d}', 'aeroport_depart': origin, 'aeroport_arrivee': destination,
+                  'heure_depart': departure.isoformat(), 'heure_arrivee_prevue': arrival.isoformat(),
+                  'statut': rng.choice(['programme', 'termine', 'annule'])}
+        if i % 17 == 0:
+            # Séparateur espace et minutes seules: normalisés par l'ordre maintenu
+            flight['heure_depart'] = departure.strftime('%Y-%m-%d %H:%M')
+        if i % 23 == 0:
+            del flight['heure_arrivee_prevue']
+        flights.append(flight)
+    return flights
+
+
+def _manager(tmp: str, seed: int = 11) -> DataManager:
+    rng = random.Random(seed)
+    manager = DataManager(data_dir=tmp)
+    for file_key, records in (('passengers', _passengers(150, rng)), ('flights', _flights(200, rng))):
+        report = manager.add_records(file_key, records)
+        assert len(report['added']) == len(records), report
+    return manager
+
+
+def _ids(records: list, key: str) -> list:
+    return [record[key] for record in records]
+
+
+def _assert_same_order(result: list, expected: list, key: str, field: str):
+    """Même ensemble d'enregistrements et même suite de valeurs triées (ex æquo dans tout ordre)"""
+    assert sorted(_ids(result, key)) == sorted(_ids(expected, key))
+    assert [record.get(field) for record in result] == [record.get(field) for record in expected]
+
+
+def test_plan_query_picks_most_selective_index():
+    calls = []
+
+    def lookup(size):
+        def run(op, value):
+            calls.append((op, value))
+            return None if op == 'range' else [{}] * size
+        return run
+
+    predicates = normalize_where([('statut', 'eq', 'active'), ('vol_numero', 'in', ['A', 'B']),
+                                  ('nom', 'contains', 'x'), ('date', 'range', ('a', 'b'))])
+    candidates, remaining = plan_query(predicates, {'statut': lookup(50), 'vol_numero': lookup(2),
+                                                    'date': lookup(1)})
+    assert len(candidates) == 2
+    assert remaining == [predicates[0], predicates[2], predicates[3]]
+    assert ('range', ('a', 'b')) in calls
+
+    # Aucun index utilisable: parcours complet avec tous les prédicats
+    candidates, remaining = plan_query(predicates[2:3], {'statut': lookup(50)})
+    assert candidates is None and remaining == predicates[2:3]
+
+
+def test_query_matches_plain_filter():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        flights = manager.get_flights()
+        passengers = manager.get_passengers()
+        cases = [
+            ('flights', {'aeroport_depart': 'CDG'}),
+            ('flights', [('statut', 'in', ['programme', 'annule']), ('aeroport_arrivee', 'eq', 'NCE')]),
+            ('flights', [('date_depart', 'range', ('2031-05-02', '2031-05-03'))]),
+            ('flights', [('date_depart', 'range', ('2031-06-01', None))]),
+            ('flights', [('numero_vol', 'in', ['F001', 'F150', 'absent'])]),
+            ('passengers', [('nom', 'prefix', 'D'), ('age', 'range', (18, 65))]),
+            ('passengers', [(('nom', 'prenom'), 'contains', 'LO')]),
+            ('passengers', [lambda record: record['age'] % 2 == 0]),
+        ]
+        for file_key, where in cases:
+            computed = manager._computed_fields(file_key)
+            test = compile_predicates(normalize_where(where), computed)
+            records = flights if file_key == 'flights' else passengers
+            key = manager.PRIMARY_KEYS[file_key]
+            expected = [record for record in records if test(record)]
+            assert sorted(_ids(manager.query(file_key, where), key)) == sorted(_ids(expected, key)), where
+
+            # Tri, découpe et projection
+            order = ['-age', 'id_passager'] if file_key == 'passengers' else ['heure_arrivee_prevue', 'numero_vol']
+            ordered = sort_records(list(expected), order)
+            for offset, limit in ((0, 5), (3, 4), (len(ordered) - 1, 10), (len(ordered), 3), (0, 0)):
+                result = manager.query(file_key, where, order_by=order, offset=offset, limit=limit, fields=[key])
+                assert result == [{key: record[key]} for record in ordered[offset:offset + limit]], (where, offset)
+
+
+def test_sorted_index_matches_sort():
+    rng = random.Random(5)
+    records = [{'id': i, 'v': rng.choice([None, 1, 2, 3, 5, 8, 13])} for i in range(300)]
+    index = SortedIndex('v', records)
+
+    # Ajouts et retraits (valeur modifiée: retrait avec l'ancienne valeur)
+    for record in rng.sample(records, 60):
+        index.remove(record)
+        record['v'] = rng.choice([None, 0, 4, 21])
+        index.add(record)
+    removed = rng.sample(records, 40)
+    for record in removed:
+        index.remove(record)
+    live = [record for record in records if record not in removed]
+    index.remove({'id': 'absent', 'v': 4})
+    assert len(index) == len(live)
+
+    for descending, field in ((False, 'v'), (True, '-v')):
+        expected = sort_records(list(live), field)
+        _assert_same_order(list(index.iterate(descending)), expected, 'id', 'v')
+        size = len(expected)
+        present = sum(1 for record in live if record['v'] is not None)
+        for offset, limit in ((0, 10), (present - 1, 2), (present, 5), (size - 1, 10), (size, 10),
+                              (size + 5, 10), (0, 0), (0, None), (7, None)):
+            # Page: valeurs attendues à chaque rang (les ex æquo peuvent être répartis autrement)
+            page = index.page(offset, limit, descending)
+            stop = size if limit is None else offset + limit
+            assert [record['v'] for record in page] == [record['v'] for record in expected[offset:stop]]
+
+    for low, high in ((2, 8), (4, 4), (6, 7), (9, 1), (100, 200), (-5, -1), (0, 21)):
+        expected = sort_records([record for record in live if record['v'] is not None
+                                 and low <= record['v'] <= high], 'v')
+        _assert_same_order(index.between(low, high), expected, 'id', 'v')
+
+
+def _walk_pages(manager: DataManager, file_key: str, limit: int, sort_key, filters) -> list:
+    """Parcourt toutes les pages d'une requête, et une page au-delà de la fin"""
+    items, offset = [], 0
+    while True:
+        page = manager.get_page(file_key, offset=offset, limit=limit, sort_key=sort_key, filters=filters)
+        assert len(page['items']) <= limit
+        if not page['items']:
+            assert offset >= page['total']
+            return items, page['total']
+        items.extend(page['items'])
+        offset += limit
+
+
+def test_get_page_matches_plain_sort():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        cases = [
+            ('passengers', 'nom', None),
+            ('passengers', '-nom', None),
+            ('passengers', 'nom', [('prenom', 'eq', 'Alice')]),
+            ('passengers', '-age', [('nom', 'in', ['Martin', 'Petit'])]),
+            ('passengers', None, [('age', 'range', (90, 99))]),
+            ('flights', '-heure_depart', {'aeroport_depart': 'CDG'}),
+            ('flights', 'heure_arrivee_prevue', [('statut', 'eq', 'inconnu')]),
+        ]
+
+        def check():
+            for file_key, sort_key, filters in cases:
+                key = manager.PRIMARY_KEYS[file_key]
+                records = manager.get_passengers() if file_key == 'passengers' else manager.get_flights()
+                test = compile_predicates(normalize_where(filters), manager._computed_fields(file_key))
+                expected = [record for record in records if test is None or test(record)]
+                if sort_key:
+                    expected = sort_records(expected, sort_key)
+                field = (sort_key or key).lstrip('-')
+                for limit in (1, 7, len(expected) or 1, len(expected) + 5):
+                    items, total = _walk_pages(manager, file_key, limit, sort_key, filters)
+                    assert total == len(expected), (sort_key, filters)
+                    assert len(set(_ids(items, key))) == len(items)
+                    _assert_same_order(items, expected, key, field)
+
+        check()
+        # L'ordre maintenu suit les modifications
+        assert manager.update_passenger('P010', {'nom': 'Aubert'})
+        assert manager.update_passenger('P011', {'nom': None})
+        assert manager.delete_passenger('P012')
+        assert manager.update_flight('F005', {'heure_depart': '2031-04-30T06:00:00'})
+        check()
+
+
+def test_flights_between_matches_filter():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        windows = [('2031-05-02', '2031-05-02'), ('2031-05-02T10:00', '2031-05-03T09:30'),
+                   ('2031-05-01', '2031-05-31'), ('2031-05-04T12:00:00', '2031-05-04T12:00:00'),
+                   ('2031-05-03', '2031-05-02'), ('2031-06-01', '2031-06-30'),
+                   (datetime(2031, 5, 5, 8), datetime(2031, 5, 5, 20))]
+
+        def check():
+            flights = manager.get_flights()
+            for start, end in windows:
+                low, high = manager._time_key(start), manager._time_key(end, end=True)
+                for arrivals in (False, True):
+                    field = 'heure_arrivee_prevue' if arrivals else 'heure_depart'
+                    airport_field = 'aeroport_arrivee' if arrivals else 'aeroport_depart'
+                    for airport in (None, 'CDG', 'XXX'):
+                        expected = [flight for flight in flights
+                                    if low <= (manager._time_key(flight.get(field)) or '') <= high
+                                    and airport in (None, flight.get(airport_field))]
+                        expected.sort(key=lambda flight: manager._time_key(flight[field]))
+                        result = manager.flights_between(start, end, airport, arrivals)
+                        assert sorted(_ids(result, 'numero_vol')) == sorted(_ids(expected, 'numero_vol')), \
+                            (start, end, airport, arrivals)
+                        assert ([manager._time_key(flight[field]) for flight in result]
+                                == [manager._time_key(flight[field]) for flight in expected])
+
+        check()
+        assert manager.update_flight('F003', {'heure_depart': '2031-05-02T10:00:00', 'aeroport_depart': 'CDG'})
+        assert manager.update_flight('F004', {'heure_arrivee_prevue': '2031-05-03 09:30'})
+        assert manager.delete_flight('F007')
+        check()
+
+        try:
+            manager.flights_between('demain', '2031-05-02')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Fenêtre invalide acceptée")
+
+
+if __name__ == "__main__":
+    test_plan_query_picks_most_selective_index()
+    test_query_matches_plain_filter()
+    test_sorted_index_matches_sort()
+    test_get_page_matches_plain_sort()
+    test_flights_between_matches_filter()
+    print("Tous les tests de requêtes sont passés !")
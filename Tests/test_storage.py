@@ -0,0 +1,406 @@
+"""
+Tests des moteurs de stockage (écriture atomique, versions précédentes,
+journal, rejeu, compaction, partitions chargées à la demande) et des
+écritures via DataManager sur chaque moteur.
+
+Lancement: python -m pytest Tests/test_storage.py (ou python Tests/test_storage.py)
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from data.data_manager import DataManager
+from data.storage import JsonStorage, JournaledJsonStorage, iter_json_array
+
+
+ENGINES = ('json', 'journal', 'partitioned', 'sqlite')
+
+
+def _json_storage(data_dir: Path, backup_depth=None) -> JsonStorage:
+    files = {key: data_dir / f'{key}.json' for key in DataManager.FILE_KEYS}
+    return JsonStorage(files, DataManager.LIST_KEYS, DataManager.PRIMARY_KEYS, backup_depth=backup_depth)
+
+
+def _journal_storage(data_dir: Path, compact_threshold=None) -> JournaledJsonStorage:
+    files = {key: data_dir / f'{key}.json' for key in DataManager.FILE_KEYS}
+    return JournaledJsonStorage(files, DataManager.LIST_KEYS, DataManager.PRIMARY_KEYS,
+                                compact_threshold=compact_threshold, sync=False)
+
+
+def _passenger(passenger_id: str, nom: str = 'Martin') -> dict:
+    return {'id_passager': passenger_id, 'nom': nom, 'prenom': 'Alice', 'adresse': '1 rue de la Paix'}
+
+
+def test_journal_replay_after_reopen():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _journal_storage(data_dir)
+        data = {'passengers': [_passenger('P1'), _passenger('P2')]}
+        storage.save('passengers', data)
+
+        storage.insert('passengers', _passenger('P3'), data)
+        storage.update('passengers', 'P1', _passenger('P1', 'Durand'), data)
+        storage.delete('passengers', 'P2', data)
+        # Renommage d'une clé primaire: 'put' sous l'ancienne clé
+        storage.update('passengers', 'P3', _passenger('P4'), data)
+
+        journal = storage.journal_path('passengers')
+        assert journal.exists(), "Les opérations doivent être écrites dans le journal"
+        assert len(journal.read_text(encoding='utf-8').splitlines()) == 4
+
+        reopened = _journal_storage(data_dir).load('passengers')
+        passengers = {p['id_passager']: p for p in reopened['passengers']}
+        assert set(passengers) == {'P1', 'P4'}, "Le rejeu doit appliquer put et del"
+        assert passengers['P1']['nom'] == 'Durand'
+
+
+def test_journal_replay_is_idempotent():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _journal_storage(data_dir)
+        data = {'passengers': [_passenger('P1')]}
+        storage.save('passengers', data)
+        storage.update('passengers', 'P1', _passenger('P1', 'Durand'), data)
+        storage.delete('passengers', 'P1', data)
+        storage.insert('passengers', _passenger('P1', 'Bernard'), data)
+
+        # Journal déjà intégré à l'instantané (arrêt avant sa suppression)
+        journal = storage.journal_path('passengers')
+        entries = journal.read_text(encoding='utf-8')
+        storage.save('passengers', {'passengers': [_passenger('P1', 'Bernard')]})
+        journal.write_text(entries, encoding='utf-8')
+
+        reopened = _journal_storage(data_dir).load('passengers')
+        assert reopened['passengers'] == [_passenger('P1', 'Bernard')]
+
+
+def test_journal_truncated_line_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _journal_storage(data_dir)
+        data = {'passengers': []}
+        storage.save('passengers', data)
+        storage.insert('passengers', _passenger('P1'), data)
+        with open(storage.journal_path('passengers'), 'a', encoding='utf-8') as f:
+            f.write('{"op":"put","id":"P2","rec":{"id_pa')
+
+        reopened = _journal_storage(data_dir).load('passengers')
+        assert [p['id_passager'] for p in reopened['passengers']] == ['P1']
+
+
+def test_journal_compaction_threshold():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _journal_storage(data_dir, compact_threshold=600)
+        data = {'passengers': []}
+        storage.save('passengers', data)
+        journal = storage.journal_path('passengers')
+
+        # Sous le seuil: le journal grossit, l'instantané ne change pas
+        record = _passenger('P1')
+        data['passengers'].append(record)
+        storage.insert('passengers', record, data)
+        size = journal.stat().st_size
+        assert 0 < size < 600
+        assert storage.load('passengers')['passengers'] == [record]
+        assert JsonStorage.load(storage, 'passengers')['passengers'] == []
+
+        # Au-delà du seuil: le journal est replié dans l'instantané puis supprimé
+        count = 1
+        while journal.exists():
+            count += 1
+            record = _passenger(f'P{count}')
+            data['passengers'].append(record)
+            storage.insert('passengers', record, data)
+            assert count < 50, "La compaction doit se déclencher au seuil"
+        assert (count - 1) * size < 600 <= count * size
+
+        snapshot = JsonStorage.load(storage, 'passengers')
+        assert len(snapshot['passengers']) == count
+        assert storage.load('passengers') == snapshot
+
+
+def test_journal_commit_compacts_over_threshold():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _journal_storage(data_dir, compact_threshold=300)
+        passengers = {'passengers': []}
+        reservations = {'reservations': []}
+        storage.save('passengers', passengers)
+        storage.save('reservations', reservations)
+
+        records = [_passenger(f'P{i}') for i in range(5)]
+        passengers['passengers'].extend(records)
+        reservation = {'id_reservation': 'R1', 'passager_id': 'P0', 'vol_numero': 'AF1'}
+        reservations['reservations'].append(reservation)
+        storage.commit({
+            'passengers': (passengers, [('insert', r['id_passager'], r) for r in records]),
+            'reservations': (reservations, [('insert', 'R1', reservation)]),
+        })
+
+        assert not storage.journal_path('passengers').exists(), "Journal au-delà du seuil compacté"
+        assert storage.journal_path('reservations').exists(), "Journal sous le seuil conservé"
+        assert not storage.intent_path.exists()
+
+        reopened = _journal_storage(data_dir)
+        assert len(reopened.load('passengers')['passengers']) == 5
+        assert reopened.load('reservations')['reservations'] == [reservation]
+
+
+def test_atomic_write_leaves_no_partial_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        storage = _json_storage(data_dir)
+        storage.save('passengers', {'passengers': [_passenger('P1')]})
+        before = storage.files['passengers'].read_bytes()
+
+        # Échec pendant l'écriture du fichier temporaire (valeur non sérialisable)
+        try:
+            storage.save('passengers', {'passengers': [_passenger('P1'), {'id_passager': object()}]})
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("L'écriture d'une valeur non sérialisable doit échouer")
+
+        assert storage.files['passengers'].read_bytes() == before, "Le fichier principal doit rester intact"
+        assert not list(data_dir.glob('.passengers.json.*.tmp')), "Le fichier temporaire doit être supprimé"
+        assert not storage.backup_paths('passengers')[0].exists(), "Aucune rotation sans remplacement"
+
+
+def test_backup_rotation():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = _json_storage(Path(tmp), backup_depth=3)
+        for version in range(1, 6):
+            storage.save('passengers', {'passengers': [], 'version': version})
+
+        assert storage.load('passengers')['version'] == 5
+        backups = storage.backup_paths('passengers')
+        assert [path.name for path in backups] == ['passengers.json.bak', 'passengers.json.bak.2',
+                                                   'passengers.json.bak.3']
+        versions = [json.loads(path.read_text(encoding='utf-8'))['version'] for path in backups]
+        assert versions == [4, 3, 2], "Les versions précédentes doivent être décalées, la plus récente en .bak"
+        assert not Path(tmp, 'passengers.json.bak.4').exists(), "Au plus backup_depth versions conservées"
+
+
+def test_recover_truncated_file_from_newest_backup():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = _json_storage(Path(tmp))
+        for version in range(1, 4):
+            storage.save('passengers', {'passengers': [], 'version': version})
+
+        # Écriture tronquée par un arrêt brutal
+        primary = storage.files['passengers']
+        text = primary.read_text(encoding='utf-8')
+        primary.write_text(text[:text.rindex('"version"')], encoding='utf-8')
+        Path(tmp, '.passengers.json.abc123.tmp').write_text('{"passen', encoding='utf-8')
+
+        assert storage.recover('passengers')
+        assert storage.load('passengers')['version'] == 2, "Restauration depuis la version la plus récente"
+        assert storage.backup_paths('passengers')[0].exists(), "La version de secours est conservée"
+        assert not list(Path(tmp).glob('.passengers.json.*.tmp'))
+        assert not storage.recover('passengers'), "Un fichier valide n'est pas restauré"
+
+
+def test_recover_skips_corrupted_backup():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = _json_storage(Path(tmp))
+        for version in range(1, 4):
+            storage.save('passengers', {'passengers': [], 'version': version})
+
+        storage.files['passengers'].write_text('', encoding='utf-8')
+        storage.backup_paths('passengers')[0].write_text('{"passengers": [', encoding='utf-8')
+
+        assert storage.recover('passengers')
+        assert storage.load('passengers')['version'] == 1
+
+
+def test_data_manager_falls_back_to_backup():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp, storage='json')
+        manager.add_passenger(_passenger('P1'))
+        manager.add_passenger(_passenger('P2'))
+        primary = Path(tmp, 'passengers.json')
+
+        # Fichier tronqué: restauré à l'ouverture
+        primary.write_text(primary.read_text(encoding='utf-8')[:-30], encoding='utf-8')
+        reopened = DataManager(data_dir=tmp, storage='json')
+        assert [p['id_passager'] for p in reopened.get_passengers()] == ['P1']
+
+        # Fichier corrompu mais bien terminé: relu depuis la sauvegarde au chargement
+        primary.write_text('{"passengers": [}', encoding='utf-8')
+        reopened = DataManager(data_dir=tmp, storage='json')
+        assert [p['id_passager'] for p in reopened.get_passengers()] == ['P1']
+
+
+def _round_trip(engine: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp, storage=engine)
+        assert manager.add_passenger(_passenger('P1'))
+        assert manager.add_passenger(_passenger('P2'))
+        assert manager.update_passenger('P1', {'nom': 'Durand'})
+        assert manager.delete_passenger('P2')
+        assert manager.add_flight({'numero_vol': 'AF100', 'aeroport_depart': 'CDG',
+                                   'aeroport_arrivee': 'NCE', 'heure_depart': '2031-05-04T08:00:00',
+                                   'statut': 'programme'})
+        manager.storage.close()
+
+        reopened = DataManager(data_dir=tmp, storage=engine)
+        try:
+            assert [p['id_passager'] for p in reopened.get_passengers()] == ['P1'], engine
+            assert reopened.get_passenger_by_id('P1')['nom'] == 'Durand', engine
+            assert reopened.get_flight_by_id('AF100')['aeroport_arrivee'] == 'NCE', engine
+        finally:
+            reopened.storage.close()
+
+
+def test_engines_round_trip():
+    for engine in ENGINES:
+        _round_trip(engine)
+
+
+def test_engines_row_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp, storage='journal')
+        manager.add_passenger(_passenger('P1'))
+        # Une ligne de journal, instantané inchangé
+        assert manager.storage.journal_path('passengers').exists()
+        assert Path(tmp, 'passengers.json').read_text(encoding='utf-8').count('P1') == 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(data_dir=tmp, storage='partitioned')
+        manager.add_flight({'numero_vol': 'AF100', 'aeroport_depart': 'CDG',
+                            'aeroport_arrivee': 'NCE', 'heure_depart': '2031-05-04T08:00:00'})
+        assert manager.storage.partition_path('flights', '2031-05').exists()
+
+
+def _old_flight(number: str, month: str) -> dict:
+    return {'numero_vol': number, 'aeroport_depart': 'CDG', 'aeroport_arrivee': 'NCE',
+            'heure_depart': f'{month}-10T08:00:00', 'statut': 'termine'}
+
+
+def _partitioned_history(tmp: str) -> DataManager:
+    """Vols clos de trois mois anciens, migrés en partitions non chargées"""
+    manager = DataManager(data_dir=tmp)
+    for number, month in (('OLD1', '2020-01'), ('OLD2', '2020-02'), ('OLD3', '2020-03')):
+        assert manager.add_flight(_old_flight(number, month))
+    manager.storage.close()
+    manager = DataManager(data_dir=tmp, storage='partitioned')
+    assert manager.storage.cold_partitions('flights') == ['2020-01', '2020-02', '2020-03']
+    return manager
+
+
+def test_lookup_loads_only_key_partition():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _partitioned_history(tmp)
+        storage = manager.storage
+
+        assert manager.get_flight_by_id('OLD2')['heure_depart'].startswith('2020-02')
+        assert storage.cold_partitions('flights') == ['2020-01', '2020-03']
+
+        # Clé inconnue (vérification d'unicité d'un ajout): rien n'est chargé
+        assert manager.get_flight_by_id('NEW') is None
+        assert manager.add_flight(_old_flight('NEW', '2031-05'))
+        assert not manager.add_flight(_old_flight('OLD3', '2031-05')), "Clé d'une partition non chargée acceptée"
+        assert storage.cold_partitions('flights') == ['2020-01']
+        storage.close()
+
+        # Fichier de clés absent: la partition est parcourue à la place
+        storage.keys_path('flights', '2020-01').unlink()
+        reopened = DataManager(data_dir=tmp, storage='partitioned')
+        assert reopened.get_flight_by_id('OLD1') is not None
+        assert reopened.storage.cold_partitions('flights') == ['2020-02', '2020-03']
+        reopened.storage.close()
+
+
+def test_reload_keeps_partitions_loaded_on_demand():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = _partitioned_history(tmp)
+        second = DataManager(data_dir=tmp, storage='partitioned')
+        assert second.get_flight_by_id('OLD2') is not None
+
+        # Écriture concurrente pendant une transaction: rejeu (rebase)
+        with second.transaction():
+            second.add_flight(_old_flight('MINE', '2031-05'))
+            assert first.add_flight(_old_flight('THEIRS', '2031-05'))
+        numbers = {flight['numero_vol'] for flight in second.get_flights()}
+        assert {'OLD2', 'MINE', 'THEIRS'} <= numbers, numbers
+        assert second.get_flight_by_id('OLD2') is not None
+        assert second.storage.cold_partitions('flights') == ['2020-01', '2020-03']
+
+        # Modification hors transaction: rechargement complet
+        assert first.add_flight(_old_flight('LATER', '2031-06'))
+        numbers = {flight['numero_vol'] for flight in second.get_flights()}
+        assert {'OLD2', 'LATER'} <= numbers, numbers
+        assert second.storage.cold_partitions('flights') == ['2020-01', '2020-03']
+        first.storage.close()
+        second.storage.close()
+
+
+def _streamed(path: Path, list_key: str, chunk_size: int) -> list:
+    return list(iter_json_array(path, list_key, chunk_size))
+
+
+def test_stream_reader_strings_and_escapes():
+    document = {
+        'meta': {'note': 'a]}[{,"passengers": [', 'list': [1, {'x': ']'}], 'n': 1.5e3},
+        'passengers': [
+            {'nom': 'Dupont, "le grand"', 'ville': 'Orl\u00e9ans \\ \u2708', 'vide': ''},
+            [[], {}, [{'a': [1, 2, {'b': '}]'}]}]],
+            -12.25, 0, True, None, 'fin'
+        ],
+        'after': {'passengers': ['ignoré']}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'doc.json'
+        for indent in (None, 2):
+            path.write_text(json.dumps(document, indent=indent, ensure_ascii=indent is None), encoding='utf-8')
+            for chunk_size in (1, 2, 3, 7, 64 * 1024):
+                assert _streamed(path, 'passengers', chunk_size) == document['passengers'], chunk_size
+
+        # Tableau racine, tableau vide, clé absente
+        path.write_text('[{"a": "\\\\"}, "]"]', encoding='utf-8')
+        assert _streamed(path, 'passengers', 2) == [{'a': '\\'}, ']']
+        path.write_text('{"passengers": [ ]}', encoding='utf-8')
+        assert _streamed(path, 'passengers', 1) == []
+        path.write_text('{"autre": [1, 2]}', encoding='utf-8')
+        assert _streamed(path, 'passengers', 1) == []
+
+
+def test_stream_reader_truncated_input():
+    text = json.dumps({'meta': {'v': '"x"'}, 'passengers': [{'nom': 'a\\b', 'age': 123}, [1, 2], 'z']})
+    end = text.rindex(']')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'doc.json'
+        for cut in range(end):
+            path.write_text(text[:cut], encoding='utf-8')
+            for chunk_size in (3, 64 * 1024):
+                try:
+                    _streamed(path, 'passengers', chunk_size)
+                except ValueError:
+                    continue
+                raise AssertionError(f"Document tronqué accepté: {text[:cut]!r}")
+
+
+if __name__ == "__main__":
+    test_atomic_write_leaves_no_partial_file()
+    test_backup_rotation()
+    test_recover_truncated_file_from_newest_backup()
+    test_recover_skips_corrupted_backup()
+    test_data_manager_falls_back_to_backup()
+    test_journal_replay_after_reopen()
+    test_journal_replay_is_idempotent()
+    test_journal_truncated_line_ignored()
+    test_journal_compaction_threshold()
+    test_journal_commit_compacts_over_threshold()
+    test_engines_round_trip()
+    test_engines_row_writes()
+    test_lookup_loads_only_key_partition()
+    test_reload_keeps_partitions_loaded_on_demand()
+    test_stream_reader_strings_and_escapes()
+    test_stream_reader_truncated_input()
+    print("Tous les tests de stockage sont passés !")
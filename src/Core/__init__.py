@@ -10,6 +10,15 @@ from .enums import (
 # Import des classes d'aviation
 from .aviation import Coordonnees, Avion, Aeroport, PisteAtterrissage
 
+# Import des distances entre aéroports
+from .distances import RouteDistances, AirportGrid
+
+# Import de l'affectation des avions aux vols
+from .assignment import assign_fleet, FlightSlot, Tail
+
+# Import du plan de cabine
+from .seating import SeatMap
+
 # Import des classes de gestion
 from .gestion import Compagnie, GestionRetard
 
@@ -34,6 +43,16 @@ __all__ = [
     # Classes d'aviation
     'Coordonnees', 'Avion', 'Aeroport', 'PisteAtterrissage',
     
+    # Distances entre aéroports
+    'RouteDistances',
+    'AirportGrid',
+    
+    # Affectation des avions aux vols
+    'assign_fleet', 'FlightSlot', 'Tail',
+    
+    # Plan de cabine
+    'SeatMap',
+    
     # Classes de gestion
     'Compagnie', 'GestionRetard',
     
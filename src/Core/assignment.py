@@ -0,0 +1,215 @@
+"""
+Affectation des avions aux vols (tail assignment).
+
+Les règles de compatibilité et de score sont celles de
+Vol.choisir_avion : avion opérationnel, autonomie supérieure à la
+distance majorée de AUTONOMY_MARGIN, capacité suffisante, capacité et
+autonomie proches du besoin.
+
+assign_fleet affecte tout un programme en un seul balayage des vols par
+heure de départ : chaque avion est rangé dans la réserve de l'aéroport où
+il se trouve, puis, après un vol, dans celle de l'aéroport d'arrivée dès
+la fin de sa rotation. Un vol ne considère que les avions disponibles à
+son aéroport de départ ; un avion ne reçoit donc jamais deux vols qui se
+chevauchent, et ses vols s'enchaînent géographiquement.
+
+Les vols déjà attribués à un avion (en vol, terminés, ou dont l'avion a
+déjà été choisi) sont imposés : l'avion quitte sa réserve à leur départ
+pour rejoindre leur aéroport d'arrivée, et ne reçoit avant eux qu'un vol
+qui le ramène à temps à leur aéroport de départ.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+# Marge d'autonomie exigée par rapport à la distance du vol
+AUTONOMY_MARGIN = 1.2
+
+# Temps minimal au sol entre l'arrivée d'un avion et son départ suivant
+TURNAROUND = timedelta(minutes=45)
+
+# Avion absent des réserves (en rotation)
+_BUSY = object()
+
+
+def number_or_none(value: Any) -> Optional[float]:
+    """Valeur numérique d'un champ, None si absente ou invalide"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def range_sufficient(distance: float, autonomy: Optional[float]) -> bool:
+    """Vérifie l'autonomie d'un avion pour un vol, marge comprise (None: non contrôlée)"""
+    return autonomy is None or distance * AUTONOMY_MARGIN <= autonomy
+
+
+def aircraft_fits(distance: float, passengers: int, capacity: Optional[float],
+                  autonomy: Optional[float]) -> bool:
+    """
+    Vérifie qu'un avion peut assurer un vol (une valeur None n'est pas contrôlée).
+
+    Args:
+        distance (float): Distance du vol en km
+        passengers (int): Nombre de passagers
+        capacity (float): Capacité de l'avion
+        autonomy (float): Autonomie de l'avion en km
+    """
+    if not range_sufficient(distance, autonomy):
+        return False
+    if capacity is not None and passengers > capacity:
+        return False
+    return True
+
+
+def aircraft_score(distance: float, passengers: int, capacity: Optional[float],
+                   autonomy: Optional[float]) -> int:
+    """Score d'un avion compatible : capacité et autonomie proches du besoin"""
+    score = 0
+    if capacity is not None:
+        # Pénalise les avions trop grands ou trop petits
+        ratio_capacite = passengers / capacity if capacity > 0 else 0
+        if 0.6 <= ratio_capacite <= 1.0:
+            score += 100
+        elif 0.3 <= ratio_capacite < 0.6:
+            score += 50
+        else:
+            score += 10
+
+    if autonomy is not None:
+        # Favorise autonomie suffisante mais pas excessive
+        ratio_autonomie = distance / autonomy if autonomy > 0 else 1
+        if 0.3 <= ratio_autonomie <= 0.7:
+            score += 50
+        elif ratio_autonomie < 0.3:
+            score += 20  # Trop d'autonomie = moins économique
+        else:
+            score += 10
+    return score
+
+
+class FlightSlot(NamedTuple):
+    """Vol à affecter"""
+    key: str
+    origin: str
+    destination: str
+    departure: datetime
+    arrival: datetime
+    distance: float
+    passengers: int
+
+
+class Tail(NamedTuple):
+    """Avion opérationnel ; airport None si sa position est inconnue"""
+    key: str
+    airport: Optional[str]
+    capacity: Optional[float]
+    autonomy: Optional[float]
+
+
+def assign_fleet(flights: List[FlightSlot], fleet: List[Tail], turnaround: timedelta = TURNAROUND,
+                 committed: Optional[Dict[str, List[FlightSlot]]] = None
+                 ) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Affecte un avion à chaque vol d'un programme.
+
+    Les vols sont traités par heure de départ ; chacun reçoit, parmi les
+    avions disponibles à son aéroport de départ (ou de position inconnue
+    et encore inutilisés), l'avion compatible de meilleur score, à score
+    égal le plus petit puis celui qui attend depuis le plus longtemps.
+    Coût: O(V log V + V × avions disponibles à l'aéroport).
+
+    Args:
+        flights (List): Vols à affecter
+        fleet (List): Avions opérationnels
+        turnaround (timedelta): Temps minimal au sol entre deux vols
+        committed (Dict): Vols imposés de chaque avion {avion: [vols]}
+
+    Returns:
+        Tuple: ({vol: avion}, {vol: motif de non-affectation})
+    """
+    tails = {tail.key: tail for tail in fleet}
+
+    # Avions disponibles par aéroport: {avion: disponible depuis}, et
+    # réserve où se trouve chaque avion disponible
+    idle = {}
+    pool_of = {}
+    for tail in fleet:
+        idle.setdefault(tail.airport, {})[tail.key] = datetime.min
+        pool_of[tail.key] = tail.airport
+
+    # Vols imposés par avion, par heure de départ, et rang du prochain
+    fixed = {key: sorted(slots, key=lambda slot: (slot.departure, slot.key))
+             for key, slots in (committed or {}).items() if key in tails}
+    upcoming = dict.fromkeys(fixed, 0)
+
+    # Avions en rotation: (disponible à, ordre, avion, aéroport, génération) ;
+    # un vol imposé remplace la rotation en cours de son avion
+    returning = []
+    generation = dict.fromkeys(tails, 0)
+    sequence = 0
+
+    def dispatch(key: str, slot: FlightSlot):
+        nonlocal sequence
+        airport = pool_of.pop(key, _BUSY)
+        if airport is not _BUSY:
+            del idle[airport][key]
+        generation[key] += 1
+        sequence += 1
+        heapq.heappush(returning, (slot.arrival + turnaround, sequence, key, slot.destination, generation[key]))
+
+    def reaches_next(key: str, flight: FlightSlot) -> bool:
+        """L'avion peut assurer le vol puis son prochain vol imposé"""
+        slots = fixed.get(key)
+        if not slots or upcoming[key] >= len(slots):
+            return True
+        following = slots[upcoming[key]]
+        return (flight.arrival + turnaround <= following.departure
+                and flight.destination == following.origin)
+
+    # Vols imposés avant les vols à affecter partant à la même heure
+    events = [(slot.departure, 0, slot.key, key, slot) for key, slots in fixed.items() for slot in slots]
+    events.extend((slot.departure, 1, slot.key, None, slot) for slot in flights)
+    events.sort(key=lambda event: event[:3])
+
+    assignments = {}
+    unassigned = {}
+    for departure, _, _, fixed_key, flight in events:
+        # Les avions dont la rotation est terminée rejoignent leur aéroport
+        while returning and returning[0][0] <= departure:
+            ready, _, key, airport, current = heapq.heappop(returning)
+            if current == generation[key]:
+                idle.setdefault(airport, {})[key] = ready
+                pool_of[key] = airport
+
+        if fixed_key is not None:
+            dispatch(fixed_key, flight)
+            upcoming[fixed_key] += 1
+            continue
+
+        best = None
+        for pool in (idle.get(flight.origin), idle.get(None)):
+            for key, since in (pool or {}).items():
+                tail = tails[key]
+                if not aircraft_fits(flight.distance, flight.passengers, tail.capacity, tail.autonomy):
+                    continue
+                if not reaches_next(key, flight):
+                    continue
+                rank = (-aircraft_score(flight.distance, flight.passengers, tail.capacity, tail.autonomy),
+                        tail.capacity if tail.capacity is not None else float('inf'),
+                        since, key)
+                if best is None or rank < best[0]:
+                    best = (rank, key)
+
+        if best is None:
+            unassigned[flight.key] = "Aucun avion compatible disponible"
+            continue
+
+        key = best[1]
+        assignments[flight.key] = key
+        dispatch(key, flight)
+
+    return assignments, unassigned
@@ -1,6 +1,6 @@
 from datetime import datetime
-from math import radians, sin, cos, asin, sqrt
 from .enums import StatutVol,EtatAvion,StatutPiste,TypePersonnel
+from .distances import haversine_km
 
 class Coordonnees:
     """Classe pour gérer les coordonnées géographiques (longitude, latitude)"""
@@ -37,18 +37,7 @@ class Coordonnees:
             float: Distance en kilomètres
         """
 
-        R = 6371  # Rayon de la Terre en km
-        
-        lat1, lon1 = radians(self.latitude), radians(self.longitude)
-        lat2, lon2 = radians(autre.latitude), radians(autre.longitude)
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        distance = R * 2 * asin(sqrt(a))
-        
-        return distance
+        return haversine_km(self.latitude, self.longitude, autre.latitude, autre.longitude)
 
 class Avion:
     """Classe représentant un avion avec ses caractéristiques essentielles"""
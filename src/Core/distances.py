@@ -0,0 +1,297 @@
+"""
+Distances orthodromiques entre aéroports (formule de Haversine).
+
+RouteDistances calcule en une seule passe la matrice N×N des distances
+entre aéroports — vectorisée avec NumPy s'il est installé, en Python pur
+sinon — puis répond à distance(code_a, code_b) en O(1). L'ajout
+d'aéroports ne calcule que les nouvelles lignes et colonnes.
+
+AirportGrid range les aéroports dans une grille de cellules
+latitude/longitude : l'aéroport le plus proche d'une position, ou ceux
+situés dans un rayon, ne sont cherchés que dans les cellules voisines.
+"""
+
+import json
+import sys
+from array import array
+from math import radians, degrees, sin, cos, asin, sqrt, floor, pi
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+EARTH_RADIUS_KM = 6371
+
+# Les distances sérialisées sont des flottants 64 bits petit-boutistes
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Distance en km entre deux points (degrés décimaux).
+
+    Returns:
+        float: Distance orthodromique en kilomètres
+    """
+    lat1, lon1, lat2, lon2 = radians(lat1), radians(lon1), radians(lat2), radians(lon2)
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * asin(sqrt(min(a, 1.0)))
+
+
+def haversine_matrix(points_a: List[Tuple[float, float]], points_b: List[Tuple[float, float]]):
+    """
+    Distances entre chaque point de points_a et chaque point de points_b.
+
+    Args:
+        points_a (List): Points (latitude, longitude) des lignes
+        points_b (List): Points (latitude, longitude) des colonnes
+
+    Returns:
+        Matrice len(points_a) × len(points_b) : ndarray avec NumPy, liste
+        de lignes array('d') sinon
+    """
+    if NUMPY_AVAILABLE:
+        a = np.radians(np.asarray(points_a, dtype=float).reshape(-1, 2))
+        b = np.radians(np.asarray(points_b, dtype=float).reshape(-1, 2))
+        lat1, lon1 = a[:, 0:1], a[:, 1:2]
+        lat2, lon2 = b[:, 0], b[:, 1]
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    return [array('d', (haversine_km(lat1, lon1, lat2, lon2) for lat2, lon2 in points_b))
+            for lat1, lon1 in points_a]
+
+
+def airport_points(airports: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
+    """Position (latitude, longitude) de chaque aéroport ayant des coordonnées valides"""
+    points = {}
+    for airport in airports:
+        coordinates = airport.get('coordonnees') or {}
+        try:
+            points[airport['code_iata']] = (float(coordinates['latitude']),
+                                            float(coordinates['longitude']))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return points
+
+
+class RouteDistances:
+    """Matrice des distances entre aéroports, indexée par code IATA"""
+
+    def __init__(self, points: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            points (Dict): Position (latitude, longitude) de chaque code IATA
+        """
+        self.codes = []
+        self.points = {}
+        self._positions = {}
+        self._matrix = haversine_matrix([], [])
+        if points:
+            self.rebuild(points)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._positions
+
+    def rebuild(self, points: Dict[str, Tuple[float, float]]):
+        """Recalcule toute la matrice (une passe vectorisée)"""
+        self.codes = list(points)
+        self.points = {code: tuple(points[code]) for code in self.codes}
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+        coordinates = [self.points[code] for code in self.codes]
+        self._matrix = haversine_matrix(coordinates, coordinates)
+
+    def add_airports(self, points: Dict[str, Tuple[float, float]]) -> int:
+        """
+        Ajoute des aéroports en ne calculant que leurs distances.
+
+        Args:
+            points (Dict): Position des aéroports (les codes connus sont ignorés)
+
+        Returns:
+            int: Nombre d'aéroports ajoutés
+        """
+        new_codes = [code for code in points if code not in self._positions]
+        if not new_codes:
+            return 0
+
+        old_count = len(self.codes)
+        new_points = [tuple(points[code]) for code in new_codes]
+        for code, point in zip(new_codes, new_points):
+            self._positions[code] = len(self.codes)
+            self.codes.append(code)
+            self.points[code] = point
+
+        # Nouvelles lignes (distances vers tous les aéroports) ; la matrice
+        # étant symétrique, les nouvelles colonnes en sont la transposée
+        rows = haversine_matrix(new_points, [self.points[code] for code in self.codes])
+        if NUMPY_AVAILABLE:
+            total = len(self.codes)
+            matrix = np.empty((total, total))
+            matrix[:old_count, :old_count] = self._matrix
+            matrix[old_count:, :] = rows
+            matrix[:old_count, old_count:] = rows[:, :old_count].T
+            self._matrix = matrix
+        else:
+            for i in range(old_count):
+                self._matrix[i].extend(row[i] for row in rows)
+            self._matrix.extend(rows)
+        return len(new_codes)
+
+    def distance(self, code_a: str, code_b: str) -> Optional[float]:
+        """
+        Distance en km entre deux aéroports (O(1)).
+
+        Returns:
+            float: Distance, None si l'un des codes est inconnu
+        """
+        i = self._positions.get(code_a)
+        j = self._positions.get(code_b)
+        if i is None or j is None:
+            return None
+        return float(self._matrix[i][j])
+
+    def to_bytes(self) -> bytes:
+        """Sérialise les codes, positions et distances (voir from_bytes)"""
+        header = json.dumps({'codes': self.codes, 'points': [self.points[code] for code in self.codes]})
+        if NUMPY_AVAILABLE:
+            body = np.ascontiguousarray(self._matrix, dtype='<f8').tobytes()
+        else:
+            values = array('d')
+            for row in self._matrix:
+                values.extend(row)
+            if _BIG_ENDIAN:
+                values.byteswap()
+            body = values.tobytes()
+        return header.encode('utf-8') + b'\n' + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'RouteDistances':
+        """
+        Reconstruit une matrice sérialisée par to_bytes.
+
+        Raises:
+            ValueError: Si les données sont incomplètes ou corrompues
+        """
+        header, _, body = data.partition(b'\n')
+        meta = json.loads(header.decode('utf-8'))
+        codes = meta['codes']
+        count = len(codes)
+        if len(body) != count * count * 8 or len(meta['points']) != count:
+            raise ValueError("Matrice de distances incomplète")
+
+        distances = cls()
+        distances.codes = list(codes)
+        distances.points = {code: tuple(point) for code, point in zip(codes, meta['points'])}
+        distances._positions = {code: i for i, code in enumerate(codes)}
+        if NUMPY_AVAILABLE:
+            distances._matrix = np.frombuffer(body, dtype='<f8').reshape(count, count).copy()
+        else:
+            values = array('d')
+            values.frombytes(body)
+            if _BIG_ENDIAN:
+                values.byteswap()
+            distances._matrix = [values[i * count:(i + 1) * count] for i in range(count)]
+        return distances
+
+
+class AirportGrid:
+    """Index spatial des aéroports (grille de cellules de CELL_DEGREES degrés)"""
+
+    CELL_DEGREES = 1.0
+
+    def __init__(self, points: Dict[str, Tuple[float, float]]):
+        """
+        Args:
+            points (Dict): Position (latitude, longitude) de chaque code IATA
+        """
+        self.points = {code: tuple(point) for code, point in points.items()}
+        self._rows = int(round(180 / self.CELL_DEGREES))
+        self._columns = int(round(360 / self.CELL_DEGREES))
+        self._cells = {}
+        for code, (latitude, longitude) in self.points.items():
+            self._cells.setdefault(self._cell(latitude, longitude), []).append(code)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _row(self, latitude: float) -> int:
+        return min(max(int(floor((latitude + 90) / self.CELL_DEGREES)), 0), self._rows - 1)
+
+    def _column(self, longitude: float) -> int:
+        return int(floor((longitude + 180) / self.CELL_DEGREES)) % self._columns
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return self._row(latitude), self._column(longitude)
+
+    def _cells_around(self, latitude: float, longitude: float, radius_km: float):
+        """Cellules occupées pouvant contenir un point situé à moins de radius_km"""
+        angle = radius_km / EARTH_RADIUS_KM
+        if angle < 0:
+            return []
+        if angle >= pi / 2:
+            return list(self._cells)
+
+        # Boîte englobante de la calotte sphérique (toutes longitudes près des pôles)
+        delta_latitude = degrees(angle)
+        south, north = latitude - delta_latitude, latitude + delta_latitude
+        rows = range(self._row(south), self._row(north) + 1)
+        if south <= -90 or north >= 90 or sin(angle) >= cos(radians(latitude)):
+            columns = range(self._columns)
+        else:
+            delta_longitude = degrees(asin(sin(angle) / cos(radians(latitude))))
+            first = int(floor((longitude - delta_longitude + 180) / self.CELL_DEGREES))
+            last = int(floor((longitude + delta_longitude + 180) / self.CELL_DEGREES))
+            columns = [column % self._columns for column in range(first, min(last, first + self._columns - 1) + 1)]
+
+        if len(rows) * len(columns) > len(self._cells):
+            return [cell for cell in self._cells if cell[0] in rows]
+        return [(row, column) for row in rows for column in columns if (row, column) in self._cells]
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, str]]:
+        """
+        Aéroports situés à moins de radius_km d'une position.
+
+        Returns:
+            List: Couples (distance en km, code IATA), du plus proche au plus lointain
+        """
+        found = []
+        for cell in self._cells_around(latitude, longitude, radius_km):
+            for code in self._cells[cell]:
+                distance = haversine_km(latitude, longitude, *self.points[code])
+                if distance <= radius_km:
+                    found.append((distance, code))
+        found.sort()
+        return found
+
+    def nearest(self, latitude: float, longitude: float,
+                max_km: Optional[float] = None) -> Optional[Tuple[float, str]]:
+        """
+        Aéroport le plus proche d'une position.
+
+        Le rayon de recherche double à partir de la taille d'une cellule
+        jusqu'à trouver un aéroport : tout aéroport plus proche se trouve
+        alors dans ce rayon.
+
+        Returns:
+            Tuple: (distance en km, code IATA), None si aucun aéroport à moins de max_km
+        """
+        if not self.points:
+            return None
+        limit = pi * EARTH_RADIUS_KM if max_km is None else max_km
+        radius = min(self.CELL_DEGREES * radians(1) * EARTH_RADIUS_KM, limit)
+        while True:
+            found = self.within(latitude, longitude, radius)
+            if found:
+                return found[0]
+            if radius >= limit:
+                return None
+            radius = min(radius * 2, limit)
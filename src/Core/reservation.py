@@ -130,6 +130,7 @@ class Reservation:
         # Changement d'état sans perte d'information
         self.statut = StatutReservation.ANNULEE
         self.checkin_effectue = False
+        self._liberer_siege_vol()
         self.siege_assigne = None
         
         # Retrait des listes actives
@@ -165,6 +166,7 @@ class Reservation:
         
         # Retrait de l'ancien vol
         self._retirer_des_listes()
+        self._liberer_siege_vol()
         
         # Mise à jour vers nouveau vol
         ancien_vol = self._numero_vol()
@@ -262,12 +264,19 @@ class Reservation:
             self.notification(f"Format de siège invalide : '{siege}'. Attendu : ex. '12A'")
             return False
         
+        if siege_clean == self.siege_assigne:
+            return True
+        
         # Vérification disponibilité (si possible)
         if hasattr(self.vol, 'est_siege_disponible'):
             if not self.vol.est_siege_disponible(siege_clean):
                 self.notification(f"Siège {siege_clean} non disponible.")
                 return False
         
+        if hasattr(self.vol, 'occuper_siege'):
+            self.vol.occuper_siege(siege_clean)
+        self._liberer_siege_vol()
+        
         ancien_siege = self.siege_assigne
         self.siege_assigne = siege_clean
         
@@ -290,10 +299,16 @@ class Reservation:
             return False
         
         ancien_siege = self.siege_assigne
+        self._liberer_siege_vol()
         self.siege_assigne = None
         self.notification(f"Siège {ancien_siege} libéré.")
         return True
     
+    def _liberer_siege_vol(self):
+        """Rend le siège assigné au plan de cabine du vol"""
+        if self.siege_assigne and hasattr(self.vol, 'liberer_siege'):
+            self.vol.liberer_siege(self.siege_assigne)
+    
     def marquer_terminee(self):
         """Marque la réservation comme terminée"""
         if self.statut == StatutReservation.TERMINEE:
@@ -0,0 +1,287 @@
+"""
+Plan de cabine et occupation des sièges d'un vol.
+
+Les sièges sont numérotés rangée par rangée ("12A") selon une
+configuration de cabine (lettres d'une rangée, allées marquées par un
+espace) choisie d'après la capacité de l'avion. Leur occupation est un
+bitmap (un bit par siège) : is_free, take et release sont en O(1).
+
+auto_assign place un groupe sur des sièges voisins : d'abord côte à
+côte entre deux allées, puis sur une même rangée, puis sur des sièges
+consécutifs de rangées successives, au plus près de l'avant.
+
+SeatMapCache garde les plans de cabine construits et y reporte chaque
+réservation ajoutée, modifiée ou supprimée (take/release), au lieu de
+les reconstruire ; seul le plan d'un vol dont l'avion change est oublié.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Configurations de cabine: (capacité maximale, lettres d'une rangée)
+CABIN_LAYOUTS = (
+    (100, 'AB CD'),
+    (260, 'ABC DEF'),
+    (None, 'ABC DEFG HJK'),
+)
+
+
+def cabin_layout(capacity: int) -> str:
+    """Configuration de cabine d'un avion de capacité donnée"""
+    for maximum, layout in CABIN_LAYOUTS:
+        if maximum is None or capacity <= maximum:
+            return layout
+
+
+class SeatMap:
+    """
+    Occupation des sièges d'un vol.
+
+    Args:
+        capacity (int): Nombre de sièges (la dernière rangée peut être incomplète)
+        layout (str): Lettres d'une rangée, allées marquées par un espace
+            (ex: 'ABC DEF') ; déduite de la capacité si None
+    """
+
+    def __init__(self, capacity: int, layout: Optional[str] = None):
+        self.capacity = max(int(capacity), 0)
+        self.layout = layout or cabin_layout(self.capacity)
+        self.letters = self.layout.replace(' ', '')
+        self.width = len(self.letters)
+        self.rows = -(-self.capacity // self.width)
+
+        # Blocs de sièges entre deux allées: (première colonne, colonne de fin exclue)
+        self._sections = []
+        column = 0
+        for block in self.layout.split():
+            self._sections.append((column, column + len(block)))
+            column += len(block)
+        self._columns = {letter: i for i, letter in enumerate(self.letters)}
+
+        self._bits = bytearray((self.capacity + 7) // 8)
+        self._row_taken = [0] * self.rows
+        self.taken = 0
+
+    def __len__(self):
+        return self.capacity
+
+    @property
+    def free(self) -> int:
+        """Nombre de sièges libres"""
+        return self.capacity - self.taken
+
+    def index_of(self, seat: str) -> Optional[int]:
+        """Position d'un siège ("12A") dans le bitmap, None s'il n'existe pas"""
+        if not isinstance(seat, str):
+            return None
+        seat = seat.strip().upper()
+        column = self._columns.get(seat[-1:])
+        if column is None or not seat[:-1].isdigit() or int(seat[:-1]) < 1:
+            return None
+        index = (int(seat[:-1]) - 1) * self.width + column
+        return index if index < self.capacity else None
+
+    def label(self, index: int) -> str:
+        """Numéro du siège à une position du bitmap"""
+        return f"{index // self.width + 1}{self.letters[index % self.width]}"
+
+    def _is_set(self, index: int) -> bool:
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def _set(self, index: int, taken: bool):
+        if taken:
+            self._bits[index >> 3] |= 1 << (index & 7)
+            self._row_taken[index // self.width] += 1
+            self.taken += 1
+        else:
+            self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+            self._row_taken[index // self.width] -= 1
+            self.taken -= 1
+
+    def is_free(self, seat: str) -> bool:
+        """Vérifie qu'un siège existe et est libre"""
+        index = self.index_of(seat)
+        return index is not None and not self._is_set(index)
+
+    def take(self, seat: str) -> bool:
+        """
+        Occupe un siège.
+
+        Returns:
+            bool: False si le siège n'existe pas ou est déjà occupé
+        """
+        index = self.index_of(seat)
+        if index is None or self._is_set(index):
+            return False
+        self._set(index, True)
+        return True
+
+    def release(self, seat: str) -> bool:
+        """
+        Libère un siège.
+
+        Returns:
+            bool: False si le siège n'existe pas ou était libre
+        """
+        index = self.index_of(seat)
+        if index is None or not self._is_set(index):
+            return False
+        self._set(index, False)
+        return True
+
+    def free_seats(self) -> Iterator[str]:
+        """Sièges libres, de l'avant vers l'arrière (rangées pleines ignorées)"""
+        for row in range(self.rows):
+            if self._row_taken[row] == self._row_length(row):
+                continue
+            start = row * self.width
+            for index in range(start, start + self._row_length(row)):
+                if not self._is_set(index):
+                    yield self.label(index)
+
+    def _row_length(self, row: int) -> int:
+        return min(self.width, self.capacity - row * self.width)
+
+    def _find_run(self, count: int, segments) -> Optional[int]:
+        """Première suite de count sièges libres dans un segment de rangée"""
+        for row in range(self.rows):
+            length = self._row_length(row)
+            if length - self._row_taken[row] < count:
+                continue
+            start = row * self.width
+            for first, end in segments:
+                run = 0
+                for column in range(first, min(end, length)):
+                    run = 0 if self._is_set(start + column) else run + 1
+                    if run == count:
+                        return start + column - count + 1
+        return None
+
+    def _find_block(self, count: int) -> Optional[int]:
+        """
+        Première suite de count sièges libres consécutifs, sur plusieurs
+        rangées, commençant de préférence en début de rangée.
+        """
+        for row in range(self.rows):
+            start = row * self.width
+            if start + count <= self.capacity and not any(map(self._is_set, range(start, start + count))):
+                return start
+
+        run = 0
+        for index in range(self.capacity):
+            run = 0 if self._is_set(index) else run + 1
+            if run == count:
+                return index - count + 1
+        return None
+
+    def find_seats(self, count: int, together: bool = True) -> List[str]:
+        """
+        Choisit count sièges libres sans les occuper.
+
+        Args:
+            count (int): Nombre de sièges
+            together (bool): Place le groupe sur des sièges voisins (à
+                défaut, sur les premiers sièges libres)
+
+        Returns:
+            List: Sièges choisis, liste vide s'il ne reste pas assez de sièges
+        """
+        return [self.label(index) for index in self._find_indexes(count, together)]
+
+    def auto_assign(self, count: int, together: bool = True) -> List[str]:
+        """
+        Occupe count sièges en une fois (voir find_seats).
+
+        Returns:
+            List: Sièges occupés, liste vide s'il ne reste pas assez de sièges
+        """
+        indexes = self._find_indexes(count, together)
+        for index in indexes:
+            self._set(index, True)
+        return [self.label(index) for index in indexes]
+
+    def _find_indexes(self, count: int, together: bool) -> List[int]:
+        """Positions des count sièges choisis pour un groupe"""
+        if count <= 0 or count > self.free:
+            return []
+
+        first = None
+        if together:
+            first = self._find_run(count, self._sections)
+            if first is None and count <= self.width:
+                first = self._find_run(count, [(0, self.width)])
+            if first is None:
+                first = self._find_block(count)
+
+        if first is not None:
+            return list(range(first, first + count))
+        indexes = []
+        for seat in self.free_seats():
+            indexes.append(self.index_of(seat))
+            if len(indexes) == count:
+                break
+        return indexes
+
+
+class SeatMapCache:
+    """
+    Plans de cabine des vols, construits à la demande puis tenus à jour.
+
+    Args:
+        build: Fonction build(numero_vol) -> SeatMap ou None (vol, avion ou
+            capacité inconnu), appelée pour un vol absent du cache
+        released_statuses: Statuts de réservation qui libèrent le siège
+    """
+
+    def __init__(self, build: Callable[[str], Optional[SeatMap]], released_statuses: Iterable[str]):
+        self._build = build
+        self._released = set(released_statuses)
+        self._maps: Dict[str, Optional[SeatMap]] = {}
+
+    def __len__(self):
+        return len(self._maps)
+
+    def get(self, flight_number: str) -> Optional[SeatMap]:
+        """Plan de cabine d'un vol, construit au premier accès"""
+        if flight_number not in self._maps:
+            self._maps[flight_number] = self._build(flight_number)
+        return self._maps[flight_number]
+
+    def holding(self, reservation: Optional[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        """(vol, siège) occupé par une réservation, None si elle n'occupe aucun siège"""
+        if not reservation or not reservation.get('siege_assigne'):
+            return None
+        if reservation.get('statut') in self._released:
+            return None
+        return reservation.get('vol_numero'), reservation['siege_assigne']
+
+    def reservation_changed(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        """
+        Reporte l'ajout (old None), la modification ou la suppression (new
+        None) d'une réservation sur les plans en cache. Un plan qui ne
+        correspond plus aux réservations (siège déjà libre ou déjà occupé)
+        est oublié, pour être reconstruit.
+        """
+        before, after = self.holding(old), self.holding(new)
+        if before == after:
+            return
+        if before is not None:
+            self._apply(before, taken=False)
+        if after is not None:
+            self._apply(after, taken=True)
+
+    def _apply(self, holding: Tuple[str, str], taken: bool):
+        flight_number, seat = holding
+        seat_map = self._maps.get(flight_number)
+        if seat_map is None:
+            return
+        if not (seat_map.take(seat) if taken else seat_map.release(seat)):
+            del self._maps[flight_number]
+
+    def discard(self, flight_number: str):
+        """Oublie le plan d'un vol (avion ou capacité modifié)"""
+        self._maps.pop(flight_number, None)
+
+    def clear(self):
+        """Oublie tous les plans"""
+        self._maps.clear()
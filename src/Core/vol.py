@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 from .enums import StatutVol
+from .assignment import aircraft_fits, aircraft_score
+from .seating import SeatMap
 from typing import List, Optional, Dict, Any, Set
 import uuid
 
@@ -8,7 +10,7 @@ class Vol:
     
     def __init__(self, numero_vol, aeroport_depart, aeroport_arrivee, 
                  avion_utilise, heure_depart, heure_arrivee_prevue,
-                 passagers=None, personnel=None):
+                 passagers=None, personnel=None, distances=None):
         """
         Initialise un vol.
         
@@ -21,6 +23,7 @@ class Vol:
             heure_arrivee_prevue (datetime): Heure d'arrivée prévue
             passagers (list, optional): Liste des passagers
             personnel (list, optional): Équipage du vol
+            distances (RouteDistances, optional): Matrice des distances entre aéroports
         """
         # Validation basique
         if not numero_vol:
@@ -44,11 +47,13 @@ class Vol:
         self.personnel = list(personnel) if personnel else []
         self.retards = []
         self.meteo_actuelle = None
+        self.distances = distances
         
         # Propriétés calculées/cachées
         self._distance = None
         self._piste_depart = None
         self._piste_arrivee = None
+        self._plan_sieges = None
         
         print(f"[VOL] Vol {self.numero_vol} créé: {self._code_depart()} → {self._code_arrivee()}")
     
@@ -80,6 +85,15 @@ class Vol:
         if self._distance is not None:
             return self._distance
         
+        # Matrice des distances fournie (lecture O(1) par codes IATA)
+        distances = self.distances
+        if (distances is not None and hasattr(self.aeroport_depart, 'code_iata') and
+                hasattr(self.aeroport_arrivee, 'code_iata')):
+            self._distance = distances.distance(self.aeroport_depart.code_iata,
+                                                self.aeroport_arrivee.code_iata)
+            if self._distance is not None:
+                return self._distance
+        
         # Utilise la méthode de Coordonnees si disponible
         if (hasattr(self.aeroport_depart, 'coordonnees') and 
             hasattr(self.aeroport_arrivee, 'coordonnees') and
@@ -270,6 +284,34 @@ class Vol:
             return True
         return False
     
+    def plan_sieges(self):
+        """
+        Plan de cabine du vol, construit d'après la capacité de l'avion.
+        
+        Returns:
+            SeatMap: Occupation des sièges, None si la capacité est inconnue
+        """
+        if self._plan_sieges is None:
+            capacite = getattr(self.avion_utilise, 'capacite', None)
+            if capacite:
+                self._plan_sieges = SeatMap(capacite)
+        return self._plan_sieges
+    
+    def est_siege_disponible(self, siege):
+        """Vérifie qu'un siège existe et est libre (toujours vrai sans plan de cabine)"""
+        plan = self.plan_sieges()
+        return plan is None or plan.is_free(siege)
+    
+    def occuper_siege(self, siege):
+        """Occupe un siège ; False s'il est inexistant ou déjà occupé"""
+        plan = self.plan_sieges()
+        return plan is None or plan.take(siege)
+    
+    def liberer_siege(self, siege):
+        """Libère un siège occupé"""
+        plan = self.plan_sieges()
+        return plan is not None and plan.release(siege)
+    
     def ajouter_personnel(self, membre):
         """
         Ajoute un membre du personnel au vol.
@@ -377,39 +419,14 @@ class Vol:
                 if hasattr(avion.etat, 'est_operationnel') and not avion.etat.est_operationnel():
                     continue
             
-            # Vérification autonomie (avec marge)
-            if hasattr(avion, 'autonomie'):
-                if distance * 1.2 > avion.autonomie:
-                    continue
-            
-            # Vérification capacité
-            if hasattr(avion, 'capacite'):
-                if nb_passagers > avion.capacite:
-                    continue
-            
-            # Calcul score (favorise capacité proche du besoin)
-            score = 0
-            if hasattr(avion, 'capacite'):
-                # Pénalise les avions trop grands ou trop petits
-                ratio_capacite = nb_passagers / avion.capacite if avion.capacite > 0 else 0
-                if 0.6 <= ratio_capacite <= 1.0:
-                    score += 100
-                elif 0.3 <= ratio_capacite < 0.6:
-                    score += 50
-                else:
-                    score += 10
-            
-            if hasattr(avion, 'autonomie'):
-                # Favorise autonomie suffisante mais pas excessive
-                ratio_autonomie = distance / avion.autonomie if avion.autonomie > 0 else 1
-                if 0.3 <= ratio_autonomie <= 0.7:
-                    score += 50
-                elif ratio_autonomie < 0.3:
-                    score += 20  # Trop d'autonomie = moins économique
-                else:
-                    score += 10
+            # Autonomie (avec marge) et capacité, puis score (mêmes règles
+            # que l'affectation de toute la flotte, voir Core.assignment)
+            capacite = getattr(avion, 'capacite', None)
+            autonomie = getattr(avion, 'autonomie', None)
+            if not aircraft_fits(distance, nb_passagers, capacite, autonomie):
+                continue
             
-            avions_compatibles.append((avion, score))
+            avions_compatibles.append((avion, aircraft_score(distance, nb_passagers, capacite, autonomie)))
         
         if not avions_compatibles:
             return None
@@ -0,0 +1,242 @@
+"""
+Archives compressées des enregistrements clos.
+
+Les vols et réservations clos anciens sont retirés des collections de
+travail et ajoutés à des fichiers JSONL compressés (gzip ou lzma), un par
+collection et par mois : `archive/flights/2024-03.jsonl.gz`. Un index
+(`archive/index.json`) associe chaque clé primaire archivée à son mois,
+ce qui permet de retrouver un enregistrement sans décompresser toute
+l'archive.
+
+select_closed choisit les enregistrements à archiver ; add_records les
+range dans les archives de leurs mois respectifs.
+"""
+
+import gzip
+import json
+import lzma
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Iterable
+
+
+class Archive:
+    """Stockage en ajout seul des enregistrements archivés"""
+
+    INDEX_FILENAME = 'index.json'
+
+    # Module de compression et extension de fichier par format
+    COMPRESSIONS = {
+        'gzip': (gzip, '.jsonl.gz'),
+        'lzma': (lzma, '.jsonl.xz')
+    }
+
+    def __init__(self, archive_dir: Path, compression: str = 'gzip'):
+        """
+        Args:
+            archive_dir (Path): Répertoire des archives
+            compression (str): 'gzip' ou 'lzma' (format des nouveaux fichiers)
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Compression inconnue: {compression}")
+        self.archive_dir = Path(archive_dir)
+        self.compression = compression
+        # Index {collection: {clé primaire: fichier}}, chargé à la demande
+        self._index = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.archive_dir / self.INDEX_FILENAME
+
+    def _get_index(self) -> Dict[str, Dict[str, str]]:
+        if self._index is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {}
+        return self._index
+
+    def contains(self, file_key: str, record_id: Any) -> bool:
+        """Indique si un enregistrement est archivé"""
+        return str(record_id) in self._get_index().get(file_key, {})
+
+    def count(self, file_key: str) -> int:
+        """Nombre d'enregistrements archivés d'une collection"""
+        return len(self._get_index().get(file_key, {}))
+
+    def add(self, file_key: str, month: str, records: List[Dict[str, Any]], key_field: str) -> int:
+        """
+        Ajoute des enregistrements à l'archive d'un mois.
+
+        Les enregistrements déjà archivés (reprise après un arrêt entre
+        l'archivage et l'écriture de la collection) sont ignorés. Le fichier
+        du mois est réécrit dans un fichier temporaire puis renommé, avant
+        la mise à jour de l'index : un arrêt brutal ne laisse jamais de
+        fichier compressé tronqué.
+
+        Args:
+            file_key (str): Collection d'origine
+            month (str): Mois de l'archive (AAAA-MM)
+            records (List): Enregistrements à archiver
+            key_field (str): Clé primaire de la collection
+
+        Returns:
+            int: Nombre d'enregistrements ajoutés
+        """
+        entries = self._get_index().setdefault(file_key, {})
+        new_records = [record for record in records
+                       if str(record.get(key_field)) not in entries]
+        if not new_records:
+            return 0
+
+        module, suffix = self.COMPRESSIONS[self.compression]
+        file_name = self._file_name(file_key, month) or f'{month}{suffix}'
+        if not file_name.endswith(suffix):
+            # Un mois déjà archivé conserve son format
+            module = gzip if file_name.endswith('.gz') else lzma
+        path = self.archive_dir / file_key / file_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{file_name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with module.open(raw, 'wt', encoding='utf-8') as f:
+                    # Lignes déjà archivées recopiées sans être décodées
+                    if path.exists():
+                        with module.open(path, 'rt', encoding='utf-8') as existing:
+                            for line in existing:
+                                f.write(line)
+                    for record in new_records:
+                        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temp_name, path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+
+        for record in new_records:
+            entries[str(record.get(key_field))] = file_name
+        self._write_index()
+        return len(new_records)
+
+    def add_records(self, file_key: str, records: List[Dict[str, Any]], date_field: str,
+                    key_field: str) -> int:
+        """
+        Ajoute des enregistrements aux archives de leurs mois (date_field,
+        chaîne ISO) ; voir add.
+
+        Returns:
+            int: Nombre d'enregistrements ajoutés
+        """
+        by_month = {}
+        for record in records:
+            by_month.setdefault(record[date_field][:7], []).append(record)
+        return sum(self.add(file_key, month, month_records, key_field)
+                   for month, month_records in sorted(by_month.items()))
+
+    def get(self, file_key: str, record_id: Any, key_field: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne un enregistrement archivé.
+
+        Seul le fichier du mois indiqué par l'index est décompressé.
+
+        Returns:
+            Dict: Enregistrement, None s'il n'est pas archivé
+        """
+        file_name = self._get_index().get(file_key, {}).get(str(record_id))
+        if file_name is None:
+            return None
+        found = None
+        for record in self._read_file(self.archive_dir / file_key / file_name):
+            if str(record.get(key_field)) == str(record_id):
+                # Dernière occurrence en cas de doublon
+                found = record
+        return found
+
+    def iter_records(self, file_key: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les enregistrements archivés d'une collection, mois par mois.
+
+        Args:
+            file_key (str): Collection
+            start (str): Date ISO de début (incluse), None pour sans limite
+            end (str): Date ISO de fin (incluse), None pour sans limite
+        """
+        directory = self.archive_dir / file_key
+        if not directory.exists():
+            return
+        for path in sorted(directory.iterdir()):
+            month = path.name[:7]
+            if not path.name.endswith(('.gz', '.xz')):
+                continue
+            if (start is None or month >= start[:7]) and (end is None or month <= end[:7]):
+                yield from self._read_file(path)
+
+    def _file_name(self, file_key: str, month: str) -> Optional[str]:
+        """Fichier existant de l'archive d'un mois, quel que soit son format"""
+        for _, suffix in self.COMPRESSIONS.values():
+            if (self.archive_dir / file_key / f'{month}{suffix}').exists():
+                return f'{month}{suffix}'
+        return None
+
+    @staticmethod
+    def _read_file(path: Path) -> Iterator[Dict[str, Any]]:
+        module = gzip if path.name.endswith('.gz') else lzma
+        try:
+            with module.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except (EOFError, OSError, lzma.LZMAError) as e:
+            print(f"⚠️ Lecture incomplète de l'archive {path.name}: {e}")
+
+    def _write_index(self):
+        """Remplace atomiquement l'index de l'archive"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=str(self.archive_dir),
+                                         prefix=f'.{self.INDEX_FILENAME}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_name, self.index_path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+
+
+def select_closed(records: Iterable[Dict[str, Any]], statuses: Iterable[str], date_field: str,
+                  cutoff: str, key_field: Optional[str] = None,
+                  keep: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+    """
+    Enregistrements clos à archiver.
+
+    Args:
+        records: Enregistrements de la collection
+        statuses: Statuts clos
+        date_field (str): Champ date (chaîne ISO) comparé à cutoff
+        cutoff (str): Date ISO: seuls les enregistrements antérieurs sont retenus
+        key_field (str): Clé primaire, pour keep
+        keep: Clés primaires à conserver (ex: vols encore référencés)
+
+    Returns:
+        List: Enregistrements retenus, dans l'ordre de la collection
+    """
+    statuses = set(statuses)
+    keep = set(keep)
+    selected = []
+    for record in records:
+        value = record.get(date_field)
+        if record.get('statut') not in statuses or not isinstance(value, str) or not value:
+            continue
+        if value >= cutoff or (key_field is not None and record.get(key_field) in keep):
+            continue
+        selected.append(record)
+    return selected
@@ -0,0 +1,277 @@
+"""
+Sauvegardes incrémentales à stockage adressé par contenu.
+
+Chaque fichier sauvegardé est découpé en blocs dont les frontières
+dépendent du contenu (fin d'une ligne dont l'empreinte CRC32 vérifie un
+masque) : une modification locale ne change que le ou les blocs
+concernés. Les blocs sont compressés (zlib) et rangés une seule fois
+sous leur empreinte SHA-256 dans `backups/objects/` ; une sauvegarde
+n'est qu'un petit manifeste JSON (`backups/manifests/<nom>.json`) listant
+les blocs de chaque fichier. Une politique de rétention (horaire,
+quotidienne, hebdomadaire) supprime les anciens manifestes, puis les blocs
+qui ne sont plus référencés.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional, Iterator
+
+from .storage import write_atomic
+
+
+class BackupStore:
+    """Magasin de blocs et manifestes des sauvegardes"""
+
+    # Découpage: taille minimale / maximale d'un bloc et masque de frontière
+    # (une ligne sur 4096 en moyenne termine un bloc au-delà du minimum)
+    MIN_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 4 * 1024 * 1024
+    BOUNDARY_MASK = 0xFFF
+
+    # Sauvegardes conservées: les N plus récentes ('last'), puis la plus
+    # récente de chacune des N dernières heures / journées / semaines
+    RETENTION = {'last': 10, 'hourly': 24, 'daily': 7, 'weekly': 4}
+
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, root: Path):
+        """
+        Args:
+            root (Path): Répertoire des sauvegardes
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'manifests'
+
+    def create(self, sources: Dict[str, Path], name: Optional[str] = None) -> str:
+        """
+        Crée une sauvegarde.
+
+        Args:
+            sources (Dict): {préfixe dans la sauvegarde: répertoire} ; les
+                fichiers sont parcourus récursivement (préfixe '' pour la racine)
+            name (str): Nom de la sauvegarde (défaut: backup_<horodatage>)
+
+        Returns:
+            str: Nom de la sauvegarde créée
+        """
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+
+        # Fichiers inchangés depuis la dernière sauvegarde: blocs réutilisés
+        previous = {}
+        latest = self.list_backups()[-1:]
+        if latest:
+            previous = {entry['hash']: entry for entry in self.load_manifest(latest[0])['files'].values()}
+
+        files = {}
+        new_chunks = stored_bytes = 0
+        for prefix, directory in sources.items():
+            for path in sorted(Path(directory).rglob('*')):
+                if not path.is_file() or path.name.endswith('.tmp'):
+                    continue
+                relative = path.relative_to(directory).as_posix()
+                relative = f'{prefix}/{relative}' if prefix else relative
+
+                file_hash = _hash_file(path)
+                if file_hash in previous:
+                    files[relative] = previous[file_hash]
+                    continue
+
+                chunks = []
+                for chunk in self._iter_chunks(path):
+                    chunk_hash = hashlib.sha256(chunk).hexdigest()
+                    size = self._store_object(chunk_hash, chunk)
+                    if size:
+                        new_chunks += 1
+                        stored_bytes += size
+                    chunks.append(chunk_hash)
+                files[relative] = {'hash': file_hash, 'size': path.stat().st_size, 'chunks': chunks}
+
+        if name is None:
+            name = datetime.now().strftime('backup_%Y%m%d_%H%M%S')
+            suffix = 1
+            while (self.manifests_dir / f'{name}.json').exists():
+                suffix += 1
+                name = datetime.now().strftime('backup_%Y%m%d_%H%M%S') + f'_{suffix}'
+
+        manifest = {'name': name, 'created_at': datetime.now().isoformat(), 'files': files}
+        write_atomic(self.manifests_dir / f'{name}.json',
+                      json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        print(f"✓ Sauvegarde {name}: {len(files)} fichier(s), {new_chunks} nouveau(x) bloc(s) "
+              f"({stored_bytes / 1024:.0f} Ko compressés)")
+        return name
+
+    def list_backups(self) -> List[str]:
+        """Noms des sauvegardes, de la plus ancienne à la plus récente"""
+        if not self.manifests_dir.exists():
+            return []
+        manifests = []
+        for path in self.manifests_dir.glob('*.json'):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    created_at = json.load(f).get('created_at', '')
+            except (OSError, ValueError):
+                continue
+            manifests.append((created_at, path.stem))
+        return [name for _, name in sorted(manifests)]
+
+    def load_manifest(self, name: str) -> Dict[str, Any]:
+        with open(self.manifests_dir / f'{name}.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def restore(self, name: str, target_dir: Path, exact_dirs: Iterable[str] = ()) -> int:
+        """
+        Restaure les fichiers d'une sauvegarde dans un répertoire.
+
+        Chaque fichier est reconstitué dans un fichier temporaire, vérifié
+        (empreinte) puis renommé sur sa destination. Les fichiers absents
+        de la sauvegarde ne sont pas touchés, sauf dans les sous-répertoires
+        exact_dirs : une fois tous les fichiers restaurés, ceux qui n'y
+        figurent pas dans la sauvegarde (créés après elle) sont supprimés.
+
+        Args:
+            name (str): Nom de la sauvegarde (manifeste)
+            target_dir (Path): Répertoire de destination
+            exact_dirs (Iterable): Sous-répertoires de target_dir remis
+                exactement dans l'état de la sauvegarde
+
+        Returns:
+            int: Nombre de fichiers restaurés
+        """
+        manifest = self.load_manifest(name)
+        target_dir = Path(target_dir)
+        for relative, entry in manifest['files'].items():
+            path = target_dir / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256()
+            fd, temp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk_hash in entry['chunks']:
+                        chunk = self._load_object(chunk_hash)
+                        digest.update(chunk)
+                        f.write(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if digest.hexdigest() != entry['hash']:
+                    raise ValueError(f"Sauvegarde {name} corrompue: {relative}")
+                os.replace(temp_name, path)
+            except BaseException:
+                if os.path.exists(temp_name):
+                    os.unlink(temp_name)
+                raise
+
+        removed = 0
+        for directory in exact_dirs:
+            for path in sorted((target_dir / directory).rglob('*')):
+                if path.is_file() and path.relative_to(target_dir).as_posix() not in manifest['files']:
+                    path.unlink()
+                    removed += 1
+        if removed:
+            print(f"✓ {removed} fichier(s) absent(s) de la sauvegarde {name} supprimé(s)")
+        print(f"✓ Sauvegarde {name} restaurée: {len(manifest['files'])} fichier(s) dans {target_dir}")
+        return len(manifest['files'])
+
+    def prune(self, retention: Optional[Dict[str, int]] = None) -> List[str]:
+        """
+        Applique la politique de rétention puis supprime les blocs orphelins.
+
+        Les N sauvegardes les plus récentes sont conservées ('last'), ainsi
+        que, pour chaque période (heure, jour, semaine ISO), la plus récente
+        des N dernières périodes ; la sauvegarde la plus récente l'est
+        toujours.
+
+        Args:
+            retention (Dict): {'last': N, 'hourly': N, 'daily': N, 'weekly': N}
+                (défaut: RETENTION)
+
+        Returns:
+            List: Sauvegardes supprimées
+        """
+        retention = self.RETENTION if retention is None else retention
+        periods = {
+            'last': lambda date: date.isoformat(),
+            'hourly': lambda date: date.strftime('%Y-%m-%d %H'),
+            'daily': lambda date: date.strftime('%Y-%m-%d'),
+            'weekly': lambda date: '%04d-W%02d' % date.isocalendar()[:2]
+        }
+
+        backups = []
+        for name in reversed(self.list_backups()):
+            created_at = datetime.fromisoformat(self.load_manifest(name)['created_at'])
+            backups.append((name, created_at))
+
+        keep = {backups[0][0]} if backups else set()
+        for period, count in retention.items():
+            seen = []
+            for name, created_at in backups:
+                key = periods[period](created_at)
+                if key in seen:
+                    continue
+                if len(seen) >= count:
+                    break
+                seen.append(key)
+                keep.add(name)
+
+        removed = [name for name, _ in backups if name not in keep]
+        for name in removed:
+            (self.manifests_dir / f'{name}.json').unlink()
+        if removed:
+            self._collect_garbage()
+            print(f"✓ {len(removed)} ancienne(s) sauvegarde(s) supprimée(s)")
+        return removed
+
+    def _collect_garbage(self):
+        """Supprime les blocs qui ne sont référencés par aucun manifeste"""
+        referenced = set()
+        for name in self.list_backups():
+            for entry in self.load_manifest(name)['files'].values():
+                referenced.update(entry['chunks'])
+        for path in self.objects_dir.glob('*/*'):
+            if path.parent.name + path.name not in referenced:
+                path.unlink()
+
+    def _iter_chunks(self, path: Path) -> Iterator[bytes]:
+        """Découpe un fichier en blocs aux frontières définies par le contenu"""
+        buffer = bytearray()
+        with open(path, 'rb') as f:
+            for line in f:
+                buffer += line
+                if len(buffer) >= self.MAX_CHUNK_SIZE or (
+                        len(buffer) >= self.MIN_CHUNK_SIZE
+                        and zlib.crc32(line) & self.BOUNDARY_MASK == 0):
+                    yield bytes(buffer)
+                    buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def _object_path(self, chunk_hash: str) -> Path:
+        return self.objects_dir / chunk_hash[:2] / chunk_hash[2:]
+
+    def _store_object(self, chunk_hash: str, chunk: bytes) -> int:
+        """Range un bloc compressé s'il n'existe pas ; retourne la taille écrite"""
+        path = self._object_path(chunk_hash)
+        if path.exists():
+            return 0
+        path.parent.mkdir(exist_ok=True)
+        data = zlib.compress(chunk, self.COMPRESSION_LEVEL)
+        write_atomic(path, data)
+        return len(data)
+
+    def _load_object(self, chunk_hash: str) -> bytes:
+        with open(self._object_path(chunk_hash), 'rb') as f:
+            return zlib.decompress(f.read())
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
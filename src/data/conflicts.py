@@ -0,0 +1,155 @@
+"""
+Détection des doubles affectations (avion ou équipage sur des vols qui se
+chevauchent).
+
+ScheduleIndex range les créneaux (départ, arrivée prévue) des vols par
+ressource — l'avion utilisé et chaque membre d'équipage — triés par
+heure de départ. Deux créneaux [a, b) et [c, d) se chevauchent si
+a < d et c < b ; un vol partant à l'heure d'arrivée d'un autre n'est pas
+en conflit.
+
+- conflicts_for(vol): recherche par dichotomie des créneaux de chaque
+  ressource du vol ; seuls sont examinés les créneaux partis au plus
+  tard à l'arrivée du vol et au plus tôt une durée maximale avant son
+  départ (O(log n + k)).
+- find_all_conflicts(): balayage de chaque ressource par heure de départ ;
+  les créneaux en cours sont gardés dans l'ordre des départs, un tas de
+  leurs arrivées permettant de retirer ceux qui sont terminés
+  (O(n log n + k) pour k paires).
+"""
+
+import heapq
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+Window = Tuple[datetime, datetime]
+Resource = Tuple[str, str]
+
+
+def crew_id(member: Any) -> Optional[str]:
+    """
+    Identifiant d'un membre d'équipage tel qu'enregistré dans un vol
+    ("Prénom Nom (ID: 73da0f05)"), le libellé lui-même à défaut.
+    """
+    if not isinstance(member, str) or not member.strip():
+        return None
+    if ' (ID: ' in member:
+        return member.split(' (ID: ')[1].replace(')', '').strip()
+    return member.strip()
+
+
+def flight_resources(flight: Dict[str, Any]) -> List[Resource]:
+    """Ressources mobilisées par un vol: ('avion', num_id) et ('equipage', id)"""
+    resources = []
+    if flight.get('avion_utilise'):
+        resources.append(('avion', flight['avion_utilise']))
+
+    crew = [flight.get('pilote'), flight.get('copilote')] + list(flight.get('personnel_navigant') or [])
+    for member in dict.fromkeys(filter(None, map(crew_id, crew))):
+        resources.append(('equipage', member))
+    return resources
+
+
+class ScheduleIndex:
+    """
+    Créneaux des vols par ressource.
+
+    Args:
+        flights: Vols indexés
+        window_of: Fonction window_of(vol) -> (départ, arrivée) ou None
+            (vol ignoré: horaires absents ou invalides)
+        key_field: Champ identifiant un vol
+    """
+
+    def __init__(self, flights: Iterable[Dict[str, Any]],
+                 window_of: Callable[[Dict[str, Any]], Optional[Window]],
+                 key_field: str = 'numero_vol'):
+        self._window_of = window_of
+        self._key_field = key_field
+        slots = {}
+        for flight in flights:
+            window = window_of(flight)
+            if window is None:
+                continue
+            for resource in flight_resources(flight):
+                slots.setdefault(resource, []).append((window[0], window[1], flight))
+
+        # Par ressource: créneaux triés par départ, départs (dichotomie)
+        # et plus longue durée (borne de la recherche en arrière)
+        self._slots = {}
+        self._starts = {}
+        self._longest = {}
+        for resource, entries in slots.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._slots[resource] = entries
+            self._starts[resource] = [start for start, _, _ in entries]
+            self._longest[resource] = max(end - start for start, end, _ in entries)
+
+    def slots(self, resource: Resource) -> List[Tuple[datetime, datetime, Dict[str, Any]]]:
+        """Créneaux (départ, arrivée, vol) d'une ressource, par heure de départ"""
+        return list(self._slots.get(resource, ()))
+
+    def conflicts_for(self, flight: Dict[str, Any], ignore: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Vols partageant une ressource avec un vol sur un créneau qui chevauche le sien.
+
+        Args:
+            flight (Dict): Vol à vérifier (enregistré ou non)
+            ignore (str): Numéro d'un vol à ne pas signaler (le vol lui-même
+                avant modification) ; le numéro du vol est toujours ignoré
+
+        Returns:
+            List: {'resource': (type, identifiant), 'flight': vol en conflit}
+        """
+        window = self._window_of(flight)
+        if window is None:
+            return []
+        start, end = window
+        skipped = {flight.get(self._key_field), ignore}
+
+        conflicts = []
+        for resource in flight_resources(flight):
+            entries = self._slots.get(resource)
+            if not entries:
+                continue
+            starts = self._starts[resource]
+            first = bisect_left(starts, start - self._longest[resource])
+            last = bisect_left(starts, end)
+            for other_start, other_end, other in entries[first:last]:
+                if other_end > start and other.get(self._key_field) not in skipped:
+                    conflicts.append({'resource': resource, 'flight': other})
+        return conflicts
+
+    def find_all_conflicts(self) -> List[Dict[str, Any]]:
+        """
+        Toutes les paires de vols en conflit sur une même ressource.
+
+        Returns:
+            List: {'resource': (type, identifiant), 'flights': (vol partant
+            le premier, vol suivant)}, par ressource puis par heure de départ
+        """
+        conflicts = []
+        for resource, entries in self._slots.items():
+            # Créneaux en cours dans l'ordre des départs ({rang: vol}) et
+            # tas de leurs arrivées ((arrivée, rang)) pour les retirer
+            active = {}
+            arrivals = []
+            for position, (start, end, flight) in enumerate(entries):
+                while arrivals and arrivals[0][0] <= start:
+                    del active[heapq.heappop(arrivals)[1]]
+                for other in active.values():
+                    conflicts.append({'resource': resource, 'flights': (other, flight)})
+                active[position] = flight
+                heapq.heappush(arrivals, (end, position))
+        return conflicts
+
+
+def parse_window(departure: Optional[str], arrival: Optional[str]) -> Optional[Window]:
+    """Créneau (départ, arrivée) de deux horaires ISO, None si invalide ou vide"""
+    try:
+        window = (datetime.fromisoformat(departure), datetime.fromisoformat(arrival))
+    except (TypeError, ValueError):
+        return None
+    return window if window[1] > window[0] else None
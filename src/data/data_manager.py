@@ -1,37 +1,278 @@
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    # Pas de verrou consultatif hors POSIX (Windows)
+    fcntl = None
+
+from .storage import (StorageEngine, JsonStorage, JournaledJsonStorage, PartitionedJsonStorage,
+                      SQLiteStorage, migrate_json_to_sqlite)
+from .archive import Archive, select_closed
+from .backup import BackupStore
+from Core.assignment import number_or_none
+from Core.distances import RouteDistances, AirportGrid, airport_points
+from Core.seating import SeatMap, SeatMapCache
+from .query import SortedIndex, normalize_where, plan_query, run_query, run_page
+from .conflicts import ScheduleIndex, parse_window
+from .importer import bulk_add
+from .route_cache import sync_route_distances
+from .planning import plan_assignments
+
+
+class ConcurrentModificationError(RuntimeError):
+    """Collection modifiée par un autre processus depuis son chargement"""
+    
+    def __init__(self, file_keys: List[str]):
+        self.file_keys = file_keys
+        super().__init__(f"Modifié par une autre instance: {', '.join(file_keys)}")
+
+
+class ChangeEvent:
+    """
+    Modification d'une collection notifiée aux abonnés du DataManager.
+    
+    Attributes:
+        collection (str): Collection modifiée
+        op (str): 'insert', 'update', 'delete' ou 'reload' (collection
+            remplacée ou relue: document complet écrit, modification par un
+            autre processus, annulation, restauration)
+        key: Clé primaire de l'enregistrement (avant modification pour
+            'update'), None pour 'reload'
+        old (Dict): Copie de l'enregistrement avant modification ('update',
+            'delete')
+        new (Dict): Enregistrement ajouté ou modifié ('insert', 'update')
+    """
+    
+    __slots__ = ('collection', 'op', 'key', 'old', 'new')
+    
+    def __init__(self, collection: str, op: str, key: Any = None,
+                 old: Optional[Dict[str, Any]] = None, new: Optional[Dict[str, Any]] = None):
+        self.collection = collection
+        self.op = op
+        self.key = key
+        self.old = old
+        self.new = new
+    
+    def __repr__(self):
+        return f"ChangeEvent({self.collection!r}, {self.op!r}, {self.key!r})"
+
+
 class DataManager:
     """Gestionnaire centralisé pour toutes les données JSON de l'application"""
     
-    def __init__(self, data_dir="data"):
+    # Clé de liste de chaque collection dans son fichier
+    LIST_KEYS = {
+        'aircraft': 'aircraft',
+        'personnel': 'personnel',
+        'flights': 'flights',
+        'passengers': 'passengers',
+        'reservations': 'reservations',
+        'airports': 'airports',
+        'aircraft_models': 'aircraft_models'
+    }
+    
+    # Clé primaire de chaque collection indexée
+    PRIMARY_KEYS = {
+        'airports': 'code_iata',
+        'aircraft': 'num_id',
+        'personnel': 'id_employe',
+        'flights': 'numero_vol',
+        'passengers': 'id_passager',
+        'reservations': 'id_reservation'
+    }
+    
+    # Index secondaires (multi-valeurs) maintenus par collection ;
+    # 'date_depart' est la partie date de 'heure_depart'. La taille des
+    # groupes 'statut' / 'etat' sert de compteur pour les statistiques.
+    SECONDARY_INDEXES = {
+        'reservations': ['vol_numero', 'passager_id', 'statut'],
+        'flights': ['avion_utilise', 'aeroport_depart', 'aeroport_arrivee', 'date_depart', 'statut'],
+        'aircraft': ['etat']
+    }
+    
+    # Ordres de tri maintenus par collection (pagination sans tri, voir
+    # get_page) ; un tuple de champs donne un ordre composite, par exemple
+    # les départs de chaque aéroport par heure (voir flights_between)
+    SORT_ORDERS = {
+        'flights': ['heure_depart', 'heure_arrivee_prevue',
+                    ('aeroport_depart', 'heure_depart'),
+                    ('aeroport_arrivee', 'heure_arrivee_prevue')],
+        'passengers': ['nom'],
+        'personnel': ['nom'],
+        'reservations': ['date_creation']
+    }
+    
+    # Taille de page par défaut de get_page
+    PAGE_SIZE = 100
+    
+    # Champs horaires, triés sous forme ISO normalisée 'AAAA-MM-JJTHH:MM:SS'
+    TIME_FIELDS = ('heure_depart', 'heure_arrivee_prevue')
+    
+    # Import en masse: champs obligatoires, valeurs par défaut et taille des lots
+    BULK_REQUIRED_FIELDS = {
+        'passengers': ['nom', 'prenom', 'adresse'],
+        'flights': ['numero_vol', 'aeroport_depart', 'aeroport_arrivee', 'heure_depart'],
+        'reservations': ['passager_id', 'vol_numero']
+    }
+    BULK_DEFAULTS = {
+        'flights': {'statut': 'programme'},
+        'reservations': {'statut': 'active', 'checkin_effectue': False}
+    }
+    BULK_CHUNK_SIZE = 5000
+    
+    # Délai minimal (secondes) entre deux écritures des statistiques dans company.json
+    STATS_CHECKPOINT_INTERVAL = 300
+    
+    # Archivage des enregistrements clos: statuts clos, champ date,
+    # âge minimal (jours) et format de compression des archives
+    CLOSED_STATUSES = PartitionedJsonStorage.CLOSED_STATUSES
+    ARCHIVE_DATE_FIELDS = PartitionedJsonStorage.PARTITION_FIELDS
+    ARCHIVE_AFTER_DAYS = 90
+    ARCHIVE_COMPRESSION = 'gzip'
+    
+    # Collections gérées (un document par collection)
+    FILE_KEYS = [
+        'airports', 'aircraft_models', 'aircraft', 'personnel',
+        'flights', 'passengers', 'reservations', 'company'
+    ]
+    
+    # Base utilisée par le moteur SQLite
+    SQLITE_FILENAME = 'aviation.db'
+    
+    # Verrou partagé par les instances utilisant le même répertoire de données
+    LOCK_FILENAME = '.lock'
+    
+    # Cache disque de la matrice des distances entre aéroports
+    DISTANCES_CACHE_DIR = 'cache'
+    
+    # Distance maximale (km) entre un avion et l'aéroport où il est
+    # considéré stationné
+    AIRPORT_MATCH_KM = 15
+    
+    # Statuts des vols dont l'avion peut encore être choisi (plan_assignments)
+    ASSIGNABLE_STATUSES = ('programme', 'en_attente', 'retarde')
+    
+    # Statuts des vols ne mobilisant plus d'avion ni d'équipage
+    RELEASED_STATUSES = ('annule',)
+    
+    # Statuts des réservations dont le siège est libéré
+    SEAT_RELEASED_STATUSES = ('annulee', 'expiree')
+    
+    # Collections dont dépendent les plans de cabine (voir seat_map)
+    SEAT_MAP_SOURCES = ('reservations', 'flights', 'aircraft')
+    
+    # Au-delà de ce nombre de modifications d'une collection validées
+    # ensemble (transaction, import en masse), un seul événement 'reload'
+    # est émis
+    MAX_ROW_EVENTS = 500
+    
+    def __init__(self, data_dir="data", storage="json", backup_depth=None,
+                 write_delay=0.0, scheduler=None):
         """
         Initialise le gestionnaire de données.
         
         Args:
             data_dir (str): Répertoire des fichiers de données
+            storage: Moteur de stockage ('json', 'journal', 'partitioned', 'sqlite'
+                ou instance de StorageEngine)
+            backup_depth (int): Nombre de versions précédentes conservées par
+                fichier JSON (défaut: JsonStorage.BACKUP_DEPTH)
+            write_delay (float): Fenêtre (secondes) pendant laquelle les écritures
+                sont regroupées ; 0 pour écrire immédiatement
+            scheduler: Fonction scheduler(délai, callback) planifiant l'écriture
+                différée (défaut: threading.Timer)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
         # Fichiers de données
-        self.files = {
-            'airports': self.data_dir / 'airports.json',
-            'aircraft_models': self.data_dir / 'aircraft_models.json',
-            'aircraft': self.data_dir / 'aircraft.json',
-            'personnel': self.data_dir / 'personnel.json',
-            'flights': self.data_dir / 'flights.json',
-            'passengers': self.data_dir / 'passengers.json',
-            'reservations': self.data_dir / 'reservations.json',
-            'company': self.data_dir / 'company.json'
-        }
+        self.files = {key: self.data_dir / f'{key}.json' for key in self.FILE_KEYS}
+        
+        # Verrou des écritures: entre threads (RLock) puis entre processus (fcntl)
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        
+        with self._file_lock():
+            # Moteur de stockage
+            self.backup_depth = backup_depth
+            self._storage_spec = storage
+            self.storage = self._create_storage(storage)
+            
+            # Restaurer les fichiers endommagés par un arrêt brutal
+            self._recover_files()
         
         # Cache des données
         self._cache = {}
         
+        # Index primaires {collection: {clé: enregistrement}}, construits à la demande
+        self._indexes = {}
+        
+        # Index secondaires {collection: {champ: {valeur: {id(enr.): enregistrement}}}}
+        self._secondary_indexes = {}
+        
+        # Ordres de tri {collection: {champ: SortedIndex}}, construits à la demande
+        self._sort_orders = {}
+        
+        # Version de chaque collection et signature (mtime/taille) du stockage
+        # au moment du chargement ou de la dernière écriture
+        self._versions = {}
+        self._signatures = {}
+        
+        # Écritures différées: {collection: None (document complet) ou
+        # liste d'opérations (op, clé, enregistrement)}
+        self.write_delay = write_delay
+        self._scheduler = scheduler or self._timer_scheduler
+        self._pending = {}
+        self._batch_depth = 0
+        self._flush_scheduled = False
+        
+        # Transaction en cours: modifications en attente de validation (même
+        # format que les écritures différées) et collections lues
+        self._transaction = None
+        self._transaction_reads = set()
+        self._transaction_events = []
+        
+        # Abonnés aux modifications: [(callback, collections ou None)]
+        self._subscribers = []
+        
+        # Archives compressées des vols et réservations clos
+        self.archive = Archive(self.data_dir / 'archive', self.ARCHIVE_COMPRESSION)
+        
+        # Sauvegardes incrémentales (blocs adressés par contenu)
+        self.backups = BackupStore(self.data_dir / 'backups')
+        
+        # Dernière écriture des statistiques dans company.json
+        self._last_stats_checkpoint = time.monotonic()
+        
+        # Matrice des distances entre aéroports et version des aéroports
+        # à partir de laquelle elle a été calculée (voir route_distances)
+        self._route_distances = None
+        self._route_distances_version = None
+        
+        # Index spatial des aéroports et version des aéroports indexée
+        self._airport_grid = None
+        self._airport_grid_version = None
+        
+        # Créneaux des vols par avion et par membre d'équipage, et version
+        # des vols indexée (voir flight_schedule)
+        self._flight_schedule = None
+        self._flight_schedule_version = None
+        
+        # Plans de cabine par vol, tenus à jour à chaque modification des
+        # réservations, vols et avions (voir seat_map)
+        self._seat_maps = SeatMapCache(self._build_seat_map, self.SEAT_RELEASED_STATUSES)
+        
         # Initialiser les fichiers vides si nécessaire
         self._initialize_files()
     
@@ -56,14 +297,86 @@ class DataManager:
         }
         
         for file_key, default_data in default_structures.items():
-            file_path = self.files[file_key]
-            if not file_path.exists():
+            if not self.storage.exists(file_key):
                 self.save_data(file_key, default_data)
-                print(f"✓ Fichier {file_path.name} créé")
+                print(f"✓ Fichier {self.storage.location(file_key)} créé")
+    
+    def _create_storage(self, storage) -> StorageEngine:
+        """
+        Instancie le moteur de stockage demandé.
+        
+        À la première ouverture d'une base SQLite vide, les fichiers JSON
+        existants du répertoire de données y sont importés.
+        """
+        if isinstance(storage, StorageEngine):
+            return storage
+        
+        json_storage = JsonStorage(self.files, self.LIST_KEYS, self.PRIMARY_KEYS,
+                                   backup_depth=self.backup_depth)
+        if storage == 'json':
+            return json_storage
+        
+        if storage == 'journal':
+            # Les fichiers JSON existants servent d'instantanés initiaux
+            return JournaledJsonStorage(self.files, self.LIST_KEYS, self.PRIMARY_KEYS,
+                                        backup_depth=self.backup_depth)
+        
+        if storage == 'partitioned':
+            # Vols et réservations répartis par mois (migration automatique)
+            return PartitionedJsonStorage(self.files, self.LIST_KEYS, self.PRIMARY_KEYS,
+                                          backup_depth=self.backup_depth)
+        
+        if storage == 'sqlite':
+            sqlite_storage = SQLiteStorage(self.data_dir / self.SQLITE_FILENAME,
+                                           self.LIST_KEYS, self.PRIMARY_KEYS)
+            if sqlite_storage.is_empty() and any(path.exists() for path in self.files.values()):
+                print("🔄 Migration des fichiers JSON vers SQLite...")
+                migrate_json_to_sqlite(json_storage, sqlite_storage)
+            return sqlite_storage
+        
+        raise ValueError(f"Moteur de stockage inconnu: {storage}")
+    
+    def _recover_files(self):
+        """
+        Contrôle rapide des documents au démarrage : une transaction
+        interrompue est d'abord rejouée, puis un document absent ou tronqué
+        est remplacé par sa version précédente valide la plus récente.
+        """
+        try:
+            self.storage.recover_transaction()
+        except OSError as e:
+            print(f"⚠️ Reprise de la dernière transaction impossible: {e}")
+        
+        for file_key in self.files:
+            try:
+                self.storage.recover(file_key)
+            except OSError as e:
+                print(f"⚠️ Récupération de {file_key} impossible: {e}")
+    
+    @contextmanager
+    def _file_lock(self):
+        """
+        Verrou exclusif des écritures, partagé entre les instances de
+        l'application utilisant le même répertoire de données (fcntl.flock
+        sur LOCK_FILENAME). Réentrant dans un même processus.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_file = open(self.data_dir / self.LOCK_FILENAME, 'a')
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
     
     def load_data(self, file_key: str, use_cache: bool = True) -> Dict[str, Any]:
         """
-        Charge les données depuis un fichier JSON.
+        Charge les données d'une collection depuis le moteur de stockage.
         
         Args:
             file_key (str): Clé du fichier à charger
@@ -72,24 +385,33 @@ class DataManager:
         Returns:
             Dict: Données chargées
         """
+        if self._transaction is not None:
+            # Document potentiellement modifié sur place: restauré en cas d'annulation
+            self._transaction_reads.add(file_key)
+        
+        stale = False
         if use_cache and file_key in self._cache:
-            return self._cache[file_key]
+            if self._is_cache_fresh(file_key):
+                return self._cache[file_key]
+            print(f"🔄 {self.storage.location(file_key)} modifié hors application, rechargement")
+            stale = True
         
-        file_path = self.files.get(file_key)
-        if not file_path:
+        if file_key not in self.files:
             print(f"⚠️ Fichier {file_key} non configuré")
             return {}
             
-        if not file_path.exists():
-            print(f"⚠️ Fichier {file_path.name} non trouvé, création d'un fichier vide")
+        if not self.storage.exists(file_key):
+            print(f"⚠️ Fichier {self.storage.location(file_key)} non trouvé, création d'un fichier vide")
             # Créer un fichier vide avec la structure appropriée
             empty_data = self._get_empty_structure(file_key)
             self.save_data(file_key, empty_data)
             return empty_data
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Signature relevée avant lecture: une écriture concurrente
+            # provoquera un nouveau rechargement
+            signature = self.storage.signature(file_key)
+            data = self._load_document(file_key)
             
             # Vérifier que c'est bien un dictionnaire
             if not isinstance(data, dict):
@@ -101,16 +423,59 @@ class DataManager:
                 else:
                     data = {}
             
-            self._cache[file_key] = data
+            self._set_cache(file_key, data)
+            self._mark_version(file_key, signature)
+            if stale:
+                self._emit(ChangeEvent(file_key, 'reload'))
             return data
             
         except json.JSONDecodeError as e:
             print(f"❌ Erreur JSON dans {file_key}: {e}")
+            # Relecture depuis la dernière version valide si elle existe
+            if self.storage.recover(file_key, deep=True):
+                return self.load_data(file_key, use_cache=False)
             return {}
         except Exception as e:
             print(f"❌ Erreur lors du chargement de {file_key}: {e}")
             return {}
     
+    def _is_cache_fresh(self, file_key: str) -> bool:
+        """
+        Le cache reste valide tant que le stockage n'a pas été modifié par un
+        autre programme (mtime/taille du fichier) ; les écritures en attente
+        l'emportent sur le disque.
+        """
+        return (file_key in self._pending
+                or (self._transaction is not None and file_key in self._transaction)
+                or self.storage.signature(file_key) == self._signatures.get(file_key))
+    
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les enregistrements d'une collection un par un.
+        
+        Si la collection est en cache (et à jour), ses enregistrements sont
+        parcourus directement ; sinon ils sont lus au fil de l'eau depuis le
+        stockage, sans charger ni mettre en cache le document complet.
+        
+        Args:
+            file_key (str): Collection à parcourir
+            
+        Yields:
+            Dict: Enregistrements dans l'ordre de la collection
+        """
+        if file_key in self._cache and self._is_cache_fresh(file_key):
+            yield from self._get_items(file_key)
+        elif self.storage.exists(file_key):
+            yield from self.storage.iter_records(file_key)
+    
+    def iter_passengers(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt les passagers un par un (mémoire bornée)"""
+        return self.iter_records('passengers')
+    
+    def iter_reservations(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt les réservations une par une (mémoire bornée)"""
+        return self.iter_records('reservations')
+    
     def _get_empty_structure(self, file_key: str) -> Dict[str, Any]:
         """Retourne la structure vide appropriée pour un type de fichier"""
         structures = {
@@ -133,45 +498,1001 @@ class DataManager:
         """Retourne le nom de clé approprié pour une liste"""
         return file_key if file_key.endswith('s') else f"{file_key}s"
     
-    def save_data(self, file_key: str, data: Dict[str, Any]) -> bool:
+    def save_data(self, file_key: str, data: Dict[str, Any]) -> bool:
+        """
+        Sauvegarde les données dans un fichier JSON.
+        
+        Le document pouvant avoir été modifié librement par l'appelant,
+        l'index primaire de la collection est reconstruit au prochain accès.
+        
+        Args:
+            file_key (str): Clé du fichier à sauvegarder
+            data (Dict): Données à sauvegarder
+            
+        Returns:
+            bool: True si réussi
+        """
+        success = self._write_data(file_key, data)
+        if success:
+            self._drop_indexes(file_key)
+        return success
+    
+    def _write_data(self, file_key: str, data: Dict[str, Any]) -> bool:
+        """Écrit un document complet sans toucher aux index"""
+        if file_key not in self.files:
+            print(f"❌ Fichier {file_key} non configuré")
+            return False
+        
+        try:
+            # Ajout timestamp de modification
+            if isinstance(data, dict):
+                data['last_modified'] = datetime.now().isoformat()
+                self._merge_cold_partitions(file_key, data)
+            
+            with self._lock:
+                # Mise à jour cache (l'index reste valide si le document n'a pas changé)
+                if self._cache.get(file_key) is not data:
+                    self._set_cache(file_key, data)
+                
+                # Sauvegarde (ou report au prochain flush / à la validation)
+                queue = self._write_queue()
+                if queue is not None:
+                    self._enqueue(queue, file_key)
+                else:
+                    self._commit_changes({file_key: None})
+                self._bump_version(file_key)
+            
+            if queue is self._pending:
+                self._schedule_flush()
+            self._emit(ChangeEvent(file_key, 'reload'))
+            return True
+            
+        except ConcurrentModificationError as e:
+            self._discard_cache(file_key)
+            print(f"❌ Sauvegarde {file_key} refusée: {e}")
+            return False
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde {file_key}: {e}")
+            return False
+    
+    def _write_change(self, file_key: str, op: str, record_id: Any,
+                      record: Optional[Dict[str, Any]] = None,
+                      old: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Persiste la modification d'un seul enregistrement et la notifie aux
+        abonnés.
+        
+        Les moteurs ligne à ligne (SQLite, journal) n'écrivent que
+        l'enregistrement concerné ; le moteur JSON réécrit le document complet.
+        
+        Args:
+            file_key (str): Collection modifiée
+            op (str): 'insert', 'update' ou 'delete'
+            record_id: Clé primaire (avant modification pour 'update')
+            record (Dict): Enregistrement ajouté ou modifié
+            old (Dict): Enregistrement avant modification ('update', 'delete')
+            
+        Returns:
+            bool: True si réussi
+        """
+        if op not in ('insert', 'update', 'delete'):
+            raise ValueError(f"Opération inconnue: {op}")
+        
+        data = self.load_data(file_key)
+        try:
+            data['last_modified'] = datetime.now().isoformat()
+            
+            # Enregistrement daté dans une partition non chargée
+            if record is not None:
+                month = self.storage.partition_of(file_key, record)
+                if month is not None and month in self.storage.cold_partitions(file_key, month, month):
+                    self.load_partitions(file_key, month, month)
+            
+            with self._lock:
+                queue = self._write_queue()
+                if queue is not None:
+                    self._enqueue(queue, file_key, (op, record_id, record))
+                else:
+                    self._commit_changes({file_key: [(op, record_id, record)]})
+                self._bump_version(file_key)
+            
+            if queue is self._pending:
+                self._schedule_flush()
+            self._emit(ChangeEvent(file_key, op, record_id, old, record))
+            return True
+            
+        except ConcurrentModificationError as e:
+            self._discard_cache(file_key)
+            print(f"❌ Sauvegarde {file_key} refusée: {e}")
+            return False
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde {file_key}: {e}")
+            return False
+    
+    def _merge_cold_partitions(self, file_key: str, data: Dict[str, Any]):
+        """
+        Avant l'écriture d'un document complet, charge dans ce document les
+        partitions non chargées qui recevraient ses enregistrements.
+        """
+        cold = set(self.storage.cold_partitions(file_key))
+        if not cold:
+            return
+        items = data.get(self.LIST_KEYS[file_key], [])
+        months = {self.storage.partition_of(file_key, item) for item in items} & cold
+        if months:
+            self._merge_records(file_key, items, self.storage.load_partitions(file_key, sorted(months)))
+    
+    def _load_document(self, file_key: str) -> Any:
+        """
+        Lit une collection depuis le moteur de stockage, avec les partitions
+        chargées à la demande avant la relecture (qui ne rétablit que les
+        partitions chargées par défaut).
+        """
+        months = self.storage.loaded_partitions(file_key)
+        data = self.storage.load(file_key)
+        cold = [month for month in months if month not in self.storage.loaded_partitions(file_key)]
+        if cold and isinstance(data, dict):
+            items = data.setdefault(self.LIST_KEYS[file_key], [])
+            self._merge_records(file_key, items, self.storage.load_partitions(file_key, cold))
+        return data
+    
+    def _merge_records(self, file_key: str, items: List[Dict[str, Any]],
+                       records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ajoute à une liste les enregistrements dont la clé primaire n'y est
+        pas déjà (la version en mémoire l'emporte) et retourne les ajoutés.
+        """
+        key_field = self.PRIMARY_KEYS[file_key]
+        known = {item.get(key_field) for item in items}
+        added = [record for record in records if record.get(key_field) not in known]
+        items.extend(added)
+        return added
+    
+    def load_partitions(self, file_key: str, start: Optional[str] = None,
+                        end: Optional[str] = None) -> int:
+        """
+        Charge dans le cache les partitions mensuelles non encore chargées
+        d'une collection (moteur 'partitioned') recouvrant une période.
+        
+        Args:
+            file_key (str): Collection ('flights', 'reservations')
+            start (str): Date ISO de début (incluse), None pour sans limite
+            end (str): Date ISO de fin (incluse), None pour sans limite
+            
+        Returns:
+            int: Nombre d'enregistrements ajoutés au cache
+        """
+        with self._lock:
+            if not self.storage.cold_partitions(file_key, start, end):
+                return 0
+            # Document à jour avant d'y ajouter l'historique
+            items = self._get_items(file_key)
+            months = self.storage.cold_partitions(file_key, start, end)
+            added = self._merge_records(file_key, items, self.storage.load_partitions(file_key, months))
+            
+            # Index maintenus s'ils sont construits
+            index = self._indexes.get(file_key)
+            secondary = self._secondary_indexes.get(file_key)
+            key_field = self.PRIMARY_KEYS[file_key]
+            for record in added:
+                if index is not None and record.get(key_field) is not None:
+                    index.setdefault(record.get(key_field), record)
+                if secondary is not None:
+                    self._index_record(secondary, record)
+                self._sort_record(file_key, record)
+                self._seat_maps_changed(file_key, None, record)
+            
+            self._versions[file_key] = self._versions.get(file_key, 0) + 1
+        
+        print(f"✓ {len(added)} enregistrement(s) chargé(s) depuis {len(months)} "
+              f"partition(s) de {self.storage.location(file_key)}")
+        return len(added)
+    
+    def _apply_change(self, file_key: str, op: str, record_id: Any,
+                      record: Optional[Dict[str, Any]], data: Dict[str, Any]):
+        """Transmet une opération sur un enregistrement au moteur de stockage"""
+        if op == 'insert':
+            self.storage.insert(file_key, record, data)
+        elif op == 'update':
+            self.storage.update(file_key, record_id, record, data)
+        else:
+            self.storage.delete(file_key, record_id, data)
+    
+    def _write_queue(self) -> Optional[Dict[str, Any]]:
+        """
+        Retourne la file d'attente des écritures: transaction en cours,
+        écritures différées, ou None pour écrire immédiatement.
+        """
+        if self._transaction is not None:
+            return self._transaction
+        if self._batch_depth > 0 or self.write_delay > 0:
+            return self._pending
+        return None
+    
+    def _enqueue(self, queue: Dict[str, Any], file_key: str, change: Optional[tuple] = None):
+        """
+        Ajoute une modification à une file d'attente.
+        
+        Args:
+            queue (Dict): File d'attente ({collection: None ou liste d'opérations})
+            file_key (str): Collection modifiée
+            change (tuple): Opération (op, clé, enregistrement), None pour le
+                document complet
+        """
+        # Les opérations sont conservées même pour le moteur JSON: elles
+        # permettent de rejouer les modifications en cas d'écriture concurrente
+        if change is None:
+            queue[file_key] = None
+        elif queue.get(file_key, []) is not None:
+            queue.setdefault(file_key, []).append(change)
+    
+    @staticmethod
+    def _timer_scheduler(delay: float, callback):
+        """Planificateur par défaut: minuterie en arrière-plan"""
+        timer = threading.Timer(delay, callback)
+        timer.daemon = True
+        timer.start()
+    
+    def _schedule_flush(self):
+        """Planifie l'écriture des collections modifiées à la fin de la fenêtre"""
+        with self._lock:
+            if self._batch_depth > 0 or self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._scheduler(self.write_delay, self._scheduled_flush)
+    
+    def _scheduled_flush(self):
+        with self._lock:
+            self._flush_scheduled = False
+            # Un bloc batch() en cours écrira à sa sortie
+            if self._batch_depth == 0:
+                self.flush()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Regroupe les écritures d'un bloc: chaque collection modifiée n'est
+        écrite qu'une fois, à la sortie du bloc le plus externe.
+        
+        Exemple:
+            with data_manager.batch():
+                data_manager.save_data('flights', flights)
+                data_manager.save_data('reservations', reservations)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Écrit immédiatement toutes les modifications en attente.
+        
+        Returns:
+            bool: True si toutes les collections ont été écrites
+        """
+        with self._lock:
+            written = True
+            # Chaque nouvel essai suit le retrait d'au moins une collection:
+            # au plus un essai par collection en attente
+            for _ in range(len(self._pending)):
+                try:
+                    self._commit_changes(self._pending)
+                except ConcurrentModificationError as e:
+                    # Modifications perdues: la version de l'autre instance est rechargée
+                    refused = [file_key for file_key in e.file_keys if file_key in self._pending]
+                    for file_key in refused:
+                        self._pending.pop(file_key)
+                        self._discard_cache(file_key)
+                    print(f"❌ Sauvegarde refusée: {e}")
+                    written = False
+                    if refused and self._pending:
+                        continue
+                    return False
+                except Exception as e:
+                    print(f"❌ Erreur sauvegarde {', '.join(self._pending)}: {e}")
+                    return False
+                
+                self._pending.clear()
+                break
+            return written
+    
+    def _commit_changes(self, queue: Dict[str, Any]):
+        """
+        Écrit une file d'attente en une seule validation du moteur de stockage.
+        
+        Sous le verrou inter-processus, chaque collection est d'abord
+        comparée à la version sur laquelle reposent les modifications
+        (concurrence optimiste, voir _resolve_conflicts).
+        
+        Raises:
+            ConcurrentModificationError: Si une collection modifiée par un
+                autre processus ne peut pas être fusionnée
+        """
+        with self._file_lock():
+            self._resolve_conflicts(queue)
+            
+            changes = {file_key: (self._cache.get(file_key), ops if self.storage.row_writes else None)
+                       for file_key, ops in queue.items()}
+            if len(changes) == 1:
+                # Une seule collection: pas besoin de fichier d'intention
+                file_key, (data, ops) = next(iter(changes.items()))
+                if ops is None:
+                    self.storage.save(file_key, data)
+                else:
+                    for op, record_id, record in ops:
+                        self._apply_change(file_key, op, record_id, record, data)
+            else:
+                self.storage.commit(changes)
+            
+            for file_key in changes:
+                self._signatures[file_key] = self.storage.signature(file_key)
+                print(f"✓ Données sauvegardées: {self.storage.location(file_key)}")
+    
+    def _resolve_conflicts(self, queue: Dict[str, Any]):
+        """
+        Vérifie qu'aucune collection à écrire n'a été modifiée sur disque par
+        un autre processus depuis son chargement (signature inode/mtime/taille
+        ou version SQLite). Une collection modifiée dont les changements
+        sont connus enregistrement par enregistrement est rechargée et les
+        opérations y sont rejouées ; sinon l'écriture est refusée.
+        """
+        conflicts = []
+        for file_key, ops in queue.items():
+            expected = self._signatures.get(file_key)
+            if expected is None or self.storage.signature(file_key) == expected:
+                continue
+            if ops is None or file_key not in self.PRIMARY_KEYS or not self._rebase(file_key, ops):
+                conflicts.append(file_key)
+        if conflicts:
+            raise ConcurrentModificationError(conflicts)
+    
+    def _rebase(self, file_key: str, ops: List[tuple]) -> bool:
+        """
+        Rejoue des opérations sur la version courante d'une collection.
+        
+        Returns:
+            bool: False si une opération est incompatible (clé ajoutée des
+            deux côtés, enregistrement modifié supprimé par l'autre processus)
+        """
+        signature = self.storage.signature(file_key)
+        data = self._load_document(file_key)
+        items = data.setdefault(self.LIST_KEYS[file_key], [])
+        key_field = self.PRIMARY_KEYS[file_key]
+        positions = {}
+        for position, item in enumerate(items):
+            positions.setdefault(item.get(key_field), position)
+        
+        for op, record_id, record in ops:
+            if op == 'insert':
+                key = record.get(key_field)
+                if key in positions:
+                    return False
+                positions[key] = len(items)
+                items.append(record)
+                continue
+            
+            position = positions.pop(record_id, None)
+            if position is None:
+                if op == 'update':
+                    return False
+                continue
+            if op == 'update':
+                items[position] = record
+                positions[record.get(key_field)] = position
+            else:
+                items[position] = None
+        
+        data[self.LIST_KEYS[file_key]] = [item for item in items if item is not None]
+        data['last_modified'] = self._cache.get(file_key, {}).get('last_modified', data.get('last_modified'))
+        self._set_cache(file_key, data)
+        self._signatures[file_key] = signature
+        print(f"🔄 {self.storage.location(file_key)} modifié par une autre instance, "
+              f"{len(ops)} modification(s) fusionnée(s)")
+        self._emit(ChangeEvent(file_key, 'reload'))
+        return True
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Regroupe les modifications de plusieurs collections en une transaction.
+        
+        Les écritures du bloc sont conservées en mémoire puis validées en une
+        seule opération atomique du moteur de stockage. Si le bloc lève une
+        exception (ou si la validation échoue), les collections lues ou
+        modifiées dans le bloc sont rechargées depuis le stockage et
+        l'exception est propagée. Une transaction imbriquée est rattachée à
+        la transaction englobante.
+        
+        Exemple:
+            with data_manager.transaction():
+                data_manager.update_flight(numero, {'statut': 'annule'})
+                data_manager.update_reservation(id_reservation, {'statut': 'annulee'})
+        """
+        with self._lock:
+            nested = self._transaction is not None
+            if not nested:
+                # Le stockage doit refléter l'état d'avant la transaction
+                self.flush()
+                self._transaction = {}
+                self._transaction_reads = set()
+                self._transaction_events = []
+        
+        if nested:
+            yield self
+            return
+        
+        try:
+            yield self
+            with self._lock:
+                self._commit_changes(self._transaction)
+                self._transaction = None
+                self._transaction_reads = set()
+                events, self._transaction_events = self._transaction_events, []
+        except BaseException:
+            self._rollback()
+            raise
+        
+        # Modifications notifiées une fois validées
+        self._dispatch(self._coalesce_events(events))
+    
+    def _rollback(self):
+        """Annule la transaction en cours en rechargeant les collections concernées"""
+        with self._lock:
+            touched = set(self._transaction or {}) | self._transaction_reads
+            self._transaction = None
+            self._transaction_reads = set()
+            self._transaction_events = []
+            for file_key in touched:
+                self._discard_cache(file_key)
+        print(f"🔄 Transaction annulée ({', '.join(sorted(touched)) or 'aucune modification'})")
+    
+    def _discard_cache(self, file_key: str):
+        """Oublie le document en cache: il sera relu au prochain accès"""
+        self._cache.pop(file_key, None)
+        self._drop_indexes(file_key)
+        self._signatures.pop(file_key, None)
+        self._bump_version(file_key)
+        self._emit(ChangeEvent(file_key, 'reload'))
+    
+    def subscribe(self, callback, collections: Optional[List[str]] = None):
+        """
+        Abonne une fonction aux modifications des collections.
+        
+        La fonction reçoit un ChangeEvent après chaque modification (à la
+        validation pour une transaction) ; une erreur de l'abonné est
+        affichée sans interrompre l'écriture ni les autres abonnés.
+        
+        Exemple:
+            data_manager.subscribe(lambda event: print(event.op, event.key), ['flights'])
+        
+        Args:
+            callback: Fonction callback(event)
+            collections (List): Collections suivies (défaut: toutes)
+            
+        Returns:
+            La fonction abonnée (pour unsubscribe)
+        """
+        with self._lock:
+            self._subscribers.append((callback, set(collections) if collections is not None else None))
+        return callback
+    
+    def unsubscribe(self, callback):
+        """Désabonne une fonction (sans effet si elle n'est pas abonnée)"""
+        with self._lock:
+            self._subscribers = [(subscriber, collections) for subscriber, collections in self._subscribers
+                                 if subscriber != callback]
+    
+    def _emit(self, event: ChangeEvent):
+        """Notifie une modification, ou la réserve jusqu'à la validation de la transaction"""
+        with self._lock:
+            if self._transaction is not None:
+                self._transaction_events.append(event)
+                return
+        self._dispatch([event])
+    
+    def _coalesce_events(self, events: List[ChangeEvent]) -> List[ChangeEvent]:
+        """
+        Remplace les modifications d'une collection par un seul événement
+        'reload' si elle a été relue ou si elles sont trop nombreuses.
+        """
+        counts = {}
+        for event in events:
+            counts[event.collection] = counts.get(event.collection, 0) + 1
+        reloaded = {event.collection for event in events if event.op == 'reload'}
+        reloaded.update(collection for collection, count in counts.items()
+                        if count > self.MAX_ROW_EVENTS)
+        
+        coalesced = []
+        for event in events:
+            if event.collection not in reloaded:
+                coalesced.append(event)
+            elif counts.pop(event.collection, None) is not None:
+                coalesced.append(ChangeEvent(event.collection, 'reload'))
+        return coalesced
+    
+    def _dispatch(self, events: List[ChangeEvent]):
+        """Transmet des événements aux abonnés concernés"""
+        if not events or not self._subscribers:
+            return
+        subscribers = list(self._subscribers)
+        for event in events:
+            for callback, collections in subscribers:
+                if collections is not None and event.collection not in collections:
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️ Erreur abonné {getattr(callback, '__name__', callback)} "
+                          f"({event.collection}): {e}")
+    
+    def poll_changes(self) -> List[str]:
+        """
+        Détecte les collections modifiées par un autre processus.
+        
+        Contrôle peu coûteux (signature inode/mtime/taille de chaque
+        collection en cache) : seules les collections modifiées sont
+        retirées du cache, puis relues au prochain accès.
+        
+        Returns:
+            List: Collections modifiées depuis leur chargement
+        """
+        changed = []
+        with self._lock:
+            for file_key in list(self._cache):
+                if not self._is_cache_fresh(file_key):
+                    self._discard_cache(file_key)
+                    changed.append(file_key)
+        return changed
+    
+    def has_pending_writes(self) -> bool:
+        """Indique si des modifications attendent d'être écrites"""
+        return bool(self._pending) or bool(self._transaction)
+    
+    def _bump_version(self, file_key: str):
+        """Incrémente la version d'une collection (document modifié en mémoire)"""
+        self._versions[file_key] = self._versions.get(file_key, 0) + 1
+    
+    def _mark_version(self, file_key: str, signature: Any = None):
+        """
+        Incrémente la version d'une collection et mémorise la signature du
+        stockage correspondant au document en cache.
+        
+        Args:
+            file_key (str): Collection chargée ou écrite
+            signature: Signature relevée avant le chargement (par défaut: actuelle)
+        """
+        self._versions[file_key] = self._versions.get(file_key, 0) + 1
+        self._signatures[file_key] = (signature if signature is not None
+                                      else self.storage.signature(file_key))
+    
+    def get_version(self, file_key: str) -> int:
+        """
+        Retourne le numéro de version d'une collection.
+        
+        Le numéro change à chaque écriture ou rechargement : un appelant peut
+        le comparer à celui de son dernier rafraîchissement.
+        """
+        self.load_data(file_key)
+        return self._versions.get(file_key, 0)
+    
+    def _set_cache(self, file_key: str, data: Dict[str, Any]):
+        """Remplace le document en cache et invalide son index"""
+        self._cache[file_key] = data
+        self._drop_indexes(file_key)
+    
+    def _get_items(self, file_key: str) -> List[Dict[str, Any]]:
+        """Retourne la liste (modifiable) des enregistrements d'une collection"""
+        data = self.load_data(file_key)
+        return data.setdefault(self.LIST_KEYS[file_key], [])
+    
+    def _get_index(self, file_key: str) -> Dict[Any, Dict[str, Any]]:
+        """
+        Retourne l'index primaire d'une collection, en le construisant si besoin.
+        
+        Args:
+            file_key (str): Collection indexée
+            
+        Returns:
+            Dict: Enregistrements indexés par clé primaire
+        """
+        # Recharge le document (et invalide l'index) s'il a changé sur disque
+        self.load_data(file_key)
+        index = self._indexes.get(file_key)
+        if index is None:
+            key_field = self.PRIMARY_KEYS[file_key]
+            index = {}
+            for item in self._get_items(file_key):
+                key = item.get(key_field)
+                if key is not None:
+                    index.setdefault(key, item)
+            # Ne conserver l'index que s'il correspond au document en cache
+            if file_key in self._cache:
+                self._indexes[file_key] = index
+        return index
+    
+    def _drop_indexes(self, file_key: str):
+        """Invalide les index primaire et secondaires d'une collection (et les plans de cabine qui en dépendent)"""
+        self._indexes.pop(file_key, None)
+        self._secondary_indexes.pop(file_key, None)
+        self._sort_orders.pop(file_key, None)
+        if file_key in self.SEAT_MAP_SOURCES:
+            self._seat_maps.clear()
+    
+    def _get_secondary_indexes(self, file_key: str, refresh: bool = True) -> Dict[str, Dict[Any, Dict[int, Dict[str, Any]]]]:
+        """
+        Retourne les index secondaires d'une collection, construits si besoin.
+        
+        Args:
+            file_key (str): Collection indexée
+            refresh (bool): Vérifier d'abord que le document en cache est à jour
+            
+        Returns:
+            Dict: {champ: {valeur: {id(enregistrement): enregistrement}}}
+        """
+        if refresh or file_key not in self._cache:
+            self.load_data(file_key)
+        indexes = self._secondary_indexes.get(file_key)
+        if indexes is None:
+            indexes = {field: {} for field in self.SECONDARY_INDEXES.get(file_key, [])}
+            for item in self._get_items(file_key):
+                self._index_record(indexes, item)
+            if file_key in self._cache:
+                self._secondary_indexes[file_key] = indexes
+        return indexes
+    
+    @staticmethod
+    def _index_value(record: Dict[str, Any], field: str) -> Any:
+        """Valeur indexée d'un enregistrement pour un champ"""
+        if field == 'date_depart':
+            departure = record.get('heure_depart')
+            return departure[:10] if isinstance(departure, str) and departure else None
+        return record.get(field)
+    
+    def _index_record(self, indexes: Dict[str, Dict], record: Dict[str, Any]):
+        """Ajoute un enregistrement aux index secondaires"""
+        for field, index in indexes.items():
+            value = self._index_value(record, field)
+            if value is not None:
+                index.setdefault(value, {})[id(record)] = record
+    
+    def _unindex_record(self, indexes: Dict[str, Dict], record: Dict[str, Any]):
+        """Retire un enregistrement des index secondaires"""
+        for field, index in indexes.items():
+            value = self._index_value(record, field)
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(id(record), None)
+                if not bucket:
+                    del index[value]
+    
+    def find_by(self, file_key: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retourne les enregistrements d'une collection ayant une valeur donnée
+        pour un champ indexé (voir SECONDARY_INDEXES).
+        
+        Args:
+            file_key (str): Collection ('flights', 'reservations')
+            field (str): Champ indexé (ex: 'vol_numero', 'avion_utilise', 'date_depart')
+            value: Valeur recherchée
+            
+        Returns:
+            List: Enregistrements correspondants, dans l'ordre de la collection
+            
+        Raises:
+            KeyError: Si le champ n'est pas indexé
+        """
+        if field == 'date_depart' and isinstance(value, str):
+            # Jour éventuellement situé dans une partition non chargée
+            self.load_partitions(file_key, value, value)
+        index = self._get_secondary_indexes(file_key)[field]
+        return list(index.get(value, {}).values())
+    
+    def index_values(self, file_key: str, field: str) -> List[Any]:
+        """Retourne les valeurs distinctes d'un champ indexé"""
+        return list(self._get_secondary_indexes(file_key)[field])
+    
+    def _get_sort_order(self, file_key: str, field: str) -> Optional[SortedIndex]:
+        """
+        Retourne l'ordre de tri maintenu d'une collection sur un champ,
+        construit si besoin (None si le champ n'a pas d'ordre maintenu ou
+        si ses valeurs ne sont pas comparables).
+        """
+        if field not in self.SORT_ORDERS.get(file_key, []):
+            return None
+        self.load_data(file_key)
+        order = self._sort_orders.get(file_key, {}).get(field)
+        if order is None:
+            try:
+                order = SortedIndex(field, self._get_items(file_key), self._sort_value_getter(field))
+            except TypeError:
+                return None
+            if file_key in self._cache:
+                self._sort_orders.setdefault(file_key, {})[field] = order
+        return order
+    
+    def _sort_value_getter(self, field: Any):
+        """Valeur triée d'un ordre (horaires normalisés, tuple pour un ordre composite)"""
+        fields = field if isinstance(field, tuple) else (field,)
+        
+        def value_of(record):
+            values = []
+            for name in fields:
+                value = record.get(name)
+                if name in self.TIME_FIELDS:
+                    value = self._time_key(value)
+                if value is None:
+                    return None
+                values.append(value)
+            return tuple(values) if isinstance(field, tuple) else values[0]
+        return value_of
+    
+    @staticmethod
+    def _time_key(value: Any, end: bool = False) -> Optional[str]:
+        """
+        Normalise un horaire (datetime ou chaîne ISO, séparateur 'T' ou
+        espace) en 'AAAA-MM-JJTHH:MM:SS'. Une borne de fin sans heure ou
+        sans secondes couvre toute la journée ou la minute.
+        """
+        if isinstance(value, datetime):
+            value = value.isoformat(timespec='seconds')
+        if not isinstance(value, str) or len(value) < 10:
+            return None
+        day, clock = value[:10], value[11:19]
+        if not clock:
+            clock = '23:59:59' if end else '00:00:00'
+        elif len(clock) == 5:
+            clock += ':59' if end else ':00'
+        return f"{day}T{clock}"
+    
+    def flights_between(self, start: Any, end: Any, airport: Optional[str] = None,
+                        arrivals: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retourne les vols partant (ou arrivant) dans une fenêtre horaire,
+        par ordre chronologique.
+        
+        La recherche se fait par dichotomie dans un ordre maintenu par
+        heure (et par aéroport si airport est donné) : O(log n + k), sans
+        analyser l'horaire de chaque vol.
+        
+        Args:
+            start: Début de la fenêtre (datetime ou chaîne ISO, inclus)
+            end: Fin de la fenêtre (datetime ou chaîne ISO, incluse ; une
+                date seule couvre toute la journée)
+            airport (str): Code IATA de l'aéroport de départ (d'arrivée
+                si arrivals), tous les aéroports si None
+            arrivals (bool): Fenêtre sur l'heure d'arrivée prévue
+            
+        Returns:
+            List: Vols de la fenêtre
+        """
+        low, high = self._time_key(start), self._time_key(end, end=True)
+        if low is None or high is None:
+            raise ValueError(f"Fenêtre horaire invalide: {start!r} - {end!r}")
+        
+        # Partitions mensuelles (par heure de départ) recouvrant la fenêtre ;
+        # un vol arrivant dans la fenêtre a pu partir la veille
+        first_day = low[:10]
+        if arrivals:
+            first_day = (datetime.fromisoformat(first_day) - timedelta(days=1)).date().isoformat()
+        self.load_partitions('flights', first_day, high[:10])
+        
+        time_field = 'heure_arrivee_prevue' if arrivals else 'heure_depart'
+        airport_field = 'aeroport_arrivee' if arrivals else 'aeroport_depart'
+        order = self._get_sort_order('flights', time_field if airport is None else (airport_field, time_field))
+        if order is None:
+            # Valeurs non comparables: parcours complet
+            flights = [flight for flight in self._get_items('flights')
+                       if low <= (self._time_key(flight.get(time_field)) or '') <= high
+                       and (airport is None or flight.get(airport_field) == airport)]
+            return sorted(flights, key=lambda flight: self._time_key(flight.get(time_field)))
+        if airport is None:
+            return order.between(low, high)
+        return order.between((airport, low), (airport, high))
+    
+    def plan_assignments(self, start: Any = None, end: Any = None, apply: bool = False,
+                         reassign: bool = False) -> Dict[str, Any]:
+        """
+        Affecte un avion à chaque vol programmé sans avion, pour tout le
+        programme en une passe (voir data.planning.plan_assignments).
+        
+        Les règles sont celles de Vol.choisir_avion (état opérationnel,
+        autonomie avec marge, capacité pour les réservations actives) ; un
+        avion n'enchaîne que des vols qui ne se chevauchent pas, ni entre
+        eux ni avec les vols qui lui sont déjà affectés.
+        
+        Args:
+            start: Début de la période (heure de départ), None pour sans limite
+            end: Fin de la période (incluse), None pour sans limite
+            apply (bool): Enregistre les avions choisis dans les vols (une transaction)
+            reassign (bool): Réaffecte aussi les vols programmés ayant déjà un avion
+            
+        Returns:
+            Dict: {'assignments': {numero_vol: num_id}, 'unassigned': {numero_vol: motif}}
+        """
+        return plan_assignments(self, start, end, apply, reassign)
+    
+    def flight_schedule(self) -> ScheduleIndex:
+        """
+        Retourne l'index des créneaux des vols par avion et par membre
+        d'équipage, reconstruit (O(n log n)) quand les vols ont changé.
+        """
+        version = self.get_version('flights')
+        if self._flight_schedule is None or self._flight_schedule_version != version:
+            flights = [flight for flight in self._get_items('flights')
+                       if flight.get('statut') not in self.RELEASED_STATUSES]
+            self._flight_schedule = ScheduleIndex(flights, self.flight_window)
+            self._flight_schedule_version = version
+        return self._flight_schedule
+    
+    def conflicts_for(self, flight: Dict[str, Any], ignore: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Sauvegarde les données dans un fichier JSON.
+        Retourne les vols qui mobilisent le même avion ou un même membre
+        d'équipage qu'un vol, sur un créneau qui chevauche le sien.
         
         Args:
-            file_key (str): Clé du fichier à sauvegarder
-            data (Dict): Données à sauvegarder
+            flight (Dict): Vol à vérifier (enregistré ou en cours de saisie)
+            ignore (str): Numéro d'origine d'un vol en cours de modification
             
         Returns:
-            bool: True si réussi
+            List: {'resource': ('avion' | 'equipage', identifiant), 'flight': vol en conflit}
         """
-        file_path = self.files.get(file_key)
-        if not file_path:
-            print(f"❌ Fichier {file_key} non configuré")
-            return False
+        window = self.flight_window(flight)
+        if window is None or flight.get('statut') in self.RELEASED_STATUSES:
+            return []
+        # Partitions des vols ayant pu partir avant et chevaucher ce créneau
+        self.load_partitions('flights', (window[0] - timedelta(days=1)).date().isoformat(),
+                             window[1].date().isoformat())
+        return self.flight_schedule().conflicts_for(flight, ignore)
+    
+    def find_all_conflicts(self) -> List[Dict[str, Any]]:
+        """
+        Retourne toutes les doubles affectations du programme (balayage
+        O(n log n + k) par avion et par membre d'équipage, k paires).
         
-        try:
-            # Backup du fichier existant
-            if file_path.exists():
-                backup_path = file_path.with_suffix('.json.bak')
-                file_path.replace(backup_path)
-            
-            # Ajout timestamp de modification
-            if isinstance(data, dict):
-                data['last_modified'] = datetime.now().isoformat()
-            
-            # Sauvegarde
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            # Mise à jour cache
-            self._cache[file_key] = data
-            
-            print(f"✓ Données sauvegardées: {file_path.name}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur sauvegarde {file_key}: {e}")
+        Returns:
+            List: {'resource': ('avion' | 'equipage', identifiant), 'flights': (vol, vol)}
+        """
+        self.load_partitions('flights')
+        return self.flight_schedule().find_all_conflicts()
+    
+    def flight_window(self, flight: Dict[str, Any]):
+        """Créneau (départ, arrivée prévue) d'un vol, None si ses horaires sont invalides"""
+        return parse_window(self._time_key(flight.get('heure_depart')),
+                            self._time_key(flight.get('heure_arrivee_prevue')))
+    
+    def _sort_record(self, file_key: str, record: Dict[str, Any]):
+        """Insère un enregistrement dans les ordres de tri construits"""
+        orders = self._sort_orders.get(file_key, {})
+        for field, order in list(orders.items()):
+            try:
+                order.add(record)
+            except TypeError:
+                # Valeur non comparable: l'ordre sera reconstruit (ou abandonné)
+                del orders[field]
+    
+    def _unsort_record(self, file_key: str, record: Dict[str, Any]):
+        """Retire un enregistrement des ordres de tri construits"""
+        orders = self._sort_orders.get(file_key, {})
+        for field, order in list(orders.items()):
+            try:
+                order.remove(record)
+            except TypeError:
+                del orders[field]
+    
+    def _get_by_id(self, file_key: str, record_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Recherche O(1) d'un enregistrement par clé primaire.
+        
+        Une clé absente des partitions chargées est cherchée dans l'index
+        des clés des partitions non chargées (moteur 'partitioned') : seule
+        la partition qui la contient est alors chargée.
+        """
+        record = self._get_index(file_key).get(record_id)
+        if record is None and record_id is not None:
+            month = self.storage.partition_of_key(file_key, record_id)
+            if month is not None and self.load_partitions(file_key, month, month):
+                record = self._get_index(file_key).get(record_id)
+        return record
+    
+    def _add_record(self, file_key: str, record: Dict[str, Any]) -> bool:
+        """
+        Ajoute un enregistrement en maintenant l'index primaire.
+        
+        Returns:
+            bool: False si la clé primaire existe déjà
+        """
+        index = self._get_index(file_key)
+        key = record.get(self.PRIMARY_KEYS[file_key])
+        if key in index:
             return False
+        
+        self._get_items(file_key).append(record)
+        index[key] = record
+        self._index_record(self._get_secondary_indexes(file_key), record)
+        self._sort_record(file_key, record)
+        self._seat_maps_changed(file_key, None, record)
+        return True
+    
+    def _update_record(self, file_key: str, record_id: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Met à jour un enregistrement sur place en maintenant l'index primaire.
+        
+        Returns:
+            Dict: Enregistrement mis à jour, None si introuvable ou si la
+            nouvelle clé primaire est déjà utilisée
+        """
+        record = self._get_by_id(file_key, record_id)
+        if record is None:
+            return None
+        index = self._get_index(file_key)
+        
+        key_field = self.PRIMARY_KEYS[file_key]
+        new_id = changes.get(key_field, record_id)
+        if new_id != record_id:
+            if new_id in index:
+                return None
+            del index[record_id]
+            index[new_id] = record
+        
+        secondary = self._get_secondary_indexes(file_key)
+        previous = dict(record) if self._seat_maps and file_key in self.SEAT_MAP_SOURCES else None
+        self._unindex_record(secondary, record)
+        self._unsort_record(file_key, record)
+        record.update(changes)
+        self._index_record(secondary, record)
+        self._sort_record(file_key, record)
+        if previous is not None:
+            self._seat_maps_changed(file_key, previous, record)
+        return record
+    
+    def _delete_record(self, file_key: str, record_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Supprime un enregistrement en maintenant l'index primaire.
+        
+        Returns:
+            Dict: Enregistrement supprimé, None si introuvable
+        """
+        record = self._get_by_id(file_key, record_id)
+        if record is not None:
+            del self._get_index(file_key)[record_id]
+            self._unindex_record(self._get_secondary_indexes(file_key), record)
+            self._unsort_record(file_key, record)
+            self._get_items(file_key).remove(record)
+            self._seat_maps_changed(file_key, record, None)
+        return record
+    
+    def _seat_maps_changed(self, file_key: str, old: Optional[Dict[str, Any]],
+                           new: Optional[Dict[str, Any]]):
+        """
+        Reporte l'ajout (old None), la modification ou la suppression (new
+        None) d'un enregistrement sur les plans de cabine en cache : siège
+        pris ou libéré pour une réservation, plan oublié pour un vol dont
+        l'avion change ou pour les vols d'un avion dont la capacité change.
+        """
+        if not self._seat_maps or file_key not in self.SEAT_MAP_SOURCES:
+            return
+        if file_key == 'reservations':
+            self._seat_maps.reservation_changed(old, new)
+            return
+        
+        fields = ('numero_vol', 'avion_utilise') if file_key == 'flights' else ('num_id', 'capacite')
+        if old is not None and new is not None and all(old.get(f) == new.get(f) for f in fields):
+            return
+        for record in (old, new):
+            if record is None:
+                continue
+            if file_key == 'flights':
+                self._seat_maps.discard(record.get('numero_vol'))
+            else:
+                for flight in self.find_by('flights', 'avion_utilise', record.get('num_id')):
+                    self._seat_maps.discard(flight.get('numero_vol'))
     
     def get_airports(self) -> List[Dict[str, Any]]:
         """Retourne la liste des aéroports"""
@@ -188,6 +1509,84 @@ class DataManager:
             print(f"❌ Erreur chargement airports: {e}")
             return []
     
+    def get_airport_by_code(self, code_iata: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'aéroport de code IATA donné (recherche indexée)"""
+        return self._get_by_id('airports', code_iata)
+    
+    def route_distances(self) -> RouteDistances:
+        """
+        Retourne la matrice des distances entre aéroports, à jour avec la
+        collection 'airports' (à transmettre à Vol via son argument distances).
+        
+        La matrice est lue depuis le cache disque (clé: empreinte des
+        positions des aéroports) ou calculée en une passe vectorisée ; des
+        aéroports ajoutés ne sont calculés que pour leurs propres distances.
+        """
+        version = self.get_version('airports')
+        if self._route_distances is None or self._route_distances_version != version:
+            self._route_distances = sync_route_distances(self._route_distances,
+                                                         airport_points(self.get_airports()),
+                                                         self.data_dir / self.DISTANCES_CACHE_DIR)
+            self._route_distances_version = version
+        return self._route_distances
+    
+    def distance(self, code_a: str, code_b: str) -> Optional[float]:
+        """
+        Distance en km entre deux aéroports (lecture O(1) dans la matrice).
+        
+        Returns:
+            float: Distance, None si l'un des codes IATA est inconnu
+        """
+        return self.route_distances().distance(code_a, code_b)
+    
+    def airport_grid(self) -> AirportGrid:
+        """Retourne l'index spatial des aéroports, à jour avec la collection 'airports'"""
+        version = self.get_version('airports')
+        if self._airport_grid is None or self._airport_grid_version != version:
+            self._airport_grid = AirportGrid(airport_points(self.get_airports()))
+            self._airport_grid_version = version
+        return self._airport_grid
+    
+    def nearest_airport(self, coordinates, max_km: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'aéroport le plus proche d'une position.
+        
+        Args:
+            coordinates: Dictionnaire {'latitude', 'longitude'} ou objet
+                ayant ces attributs (Coordonnees)
+            max_km (float): Distance maximale, None pour aucune limite
+            
+        Returns:
+            Dict: Aéroport, None si aucun aéroport dans le rayon ou position invalide
+        """
+        position = self._position_of(coordinates)
+        if position is None:
+            return None
+        found = self.airport_grid().nearest(*position, max_km=max_km)
+        return self.get_airport_by_code(found[1]) if found else None
+    
+    def airports_within(self, coordinates, radius_km: float) -> List[Dict[str, Any]]:
+        """
+        Retourne les aéroports situés à moins de radius_km d'une position,
+        du plus proche au plus lointain.
+        """
+        position = self._position_of(coordinates)
+        if position is None:
+            return []
+        airports = (self.get_airport_by_code(code)
+                    for _, code in self.airport_grid().within(*position, radius_km))
+        return [airport for airport in airports if airport]
+    
+    @staticmethod
+    def _position_of(coordinates) -> Optional[tuple]:
+        """(latitude, longitude) d'un dictionnaire ou d'un objet Coordonnees"""
+        try:
+            if isinstance(coordinates, dict):
+                return float(coordinates['latitude']), float(coordinates['longitude'])
+            return float(coordinates.latitude), float(coordinates.longitude)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+    
     def get_aircraft_models(self) -> List[Dict[str, Any]]:
         """Retourne la liste des modèles d'avions"""
         try:
@@ -208,25 +1607,24 @@ class DataManager:
         data = self.load_data('aircraft')
         return data.get('aircraft', [])
     
+    def get_aircraft_by_id(self, aircraft_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'avion d'identifiant donné (recherche indexée)"""
+        return self._get_by_id('aircraft', aircraft_id)
+    
     def add_aircraft(self, aircraft_data: Dict[str, Any]) -> bool:
         """CORRECTION: Ajoute un avion avec rafraîchissement forcé"""
         try:
-            data = self.load_data('aircraft', use_cache=False)  # Force rechargement
-            aircraft_list = data.get('aircraft', [])
-            
-            # Vérification unicité ID
+            # Vérification unicité ID (index primaire)
             aircraft_id = aircraft_data.get('num_id')
-            if any(a.get('num_id') == aircraft_id for a in aircraft_list):
+            if self.get_aircraft_by_id(aircraft_id) is not None:
                 print(f"❌ Avion {aircraft_id} existe déjà")
                 return False
             
             aircraft_data['created_at'] = datetime.now().isoformat()
-            aircraft_list.append(aircraft_data)
-            data['aircraft'] = aircraft_list
+            self._add_record('aircraft', aircraft_data)
             
-            success = self.save_data('aircraft', data)
+            success = self._write_change('aircraft', 'insert', aircraft_id, aircraft_data)
             if success:
-                self.clear_cache()  # AJOUT: Force le rafraîchissement
                 print(f"✓ Avion {aircraft_id} ajouté")
             return success
             
@@ -236,15 +1634,15 @@ class DataManager:
     
     def update_aircraft(self, aircraft_id: str, aircraft_data: Dict[str, Any]) -> bool:
         """Met à jour un avion existant"""
-        data = self.load_data('aircraft')
-        aircraft_list = data.get('aircraft', [])
-        
-        for i, aircraft in enumerate(aircraft_list):
-            if aircraft.get('num_id') == aircraft_id:
-                aircraft_data['updated_at'] = datetime.now().isoformat()
-                aircraft_list[i] = {**aircraft, **aircraft_data}
-                data['aircraft'] = aircraft_list
-                return self.save_data('aircraft', data)
+        existing = self.get_aircraft_by_id(aircraft_id)
+        if existing is not None:
+            old = dict(existing)
+            aircraft_data['updated_at'] = datetime.now().isoformat()
+            record = self._update_record('aircraft', aircraft_id, aircraft_data)
+            if record is None:
+                print(f"❌ Avion {aircraft_data.get('num_id')} existe déjà")
+                return False
+            return self._write_change('aircraft', 'update', aircraft_id, record, old)
         
         print(f"❌ Avion {aircraft_id} non trouvé")
         return False
@@ -252,18 +1650,10 @@ class DataManager:
     def delete_aircraft(self, aircraft_id: str) -> bool:
         """CORRECTION: Supprime un avion de la flotte"""
         try:
-            data = self.load_data('aircraft', use_cache=False)  # Force rechargement
-            aircraft_list = data.get('aircraft', [])
-            
-            original_length = len(aircraft_list)
-            # CORRECTION: Filtrage correct
-            updated_aircraft = [a for a in aircraft_list if a.get('num_id') != aircraft_id]
-            
-            if len(updated_aircraft) < original_length:
-                data['aircraft'] = updated_aircraft
-                success = self.save_data('aircraft', data)
+            record = self._delete_record('aircraft', aircraft_id)
+            if record is not None:
+                success = self._write_change('aircraft', 'delete', aircraft_id, old=record)
                 if success:
-                    self.clear_cache()  # AJOUT: Vider le cache après suppression
                     print(f"✓ Avion {aircraft_id} supprimé")
                     return True
             
@@ -277,22 +1667,17 @@ class DataManager:
     def add_personnel(self, personnel_data: Dict[str, Any]) -> bool:
         """CORRECTION: Ajoute un personnel avec rafraîchissement forcé"""
         try:
-            data = self.load_data('personnel', use_cache=False)
-            personnel_list = data.get('personnel', [])
-            
-            # Vérification unicité ID
+            # Vérification unicité ID (index primaire)
             personnel_id = personnel_data.get('id_employe')
-            if any(p.get('id_employe') == personnel_id for p in personnel_list):
+            if self.get_personnel_by_id(personnel_id) is not None:
                 print(f"❌ Personnel {personnel_id} existe déjà")
                 return False
             
             personnel_data['created_at'] = datetime.now().isoformat()
-            personnel_list.append(personnel_data)
-            data['personnel'] = personnel_list
+            self._add_record('personnel', personnel_data)
             
-            success = self.save_data('personnel', data)
+            success = self._write_change('personnel', 'insert', personnel_id, personnel_data)
             if success:
-                self.clear_cache()
                 print(f"✓ Personnel {personnel_id} ajouté")
             return success
             
@@ -305,17 +1690,21 @@ class DataManager:
         data = self.load_data('personnel')
         return data.get('personnel', [])
     
+    def get_personnel_by_id(self, personnel_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne le membre du personnel d'identifiant donné (recherche indexée)"""
+        return self._get_by_id('personnel', personnel_id)
+    
     def update_personnel(self, personnel_id: str, personnel_data: Dict[str, Any]) -> bool:
         """Met à jour un membre du personnel existant"""
-        data = self.load_data('personnel')
-        personnel_list = data.get('personnel', [])
-        
-        for i, person in enumerate(personnel_list):
-            if person.get('id_employe') == personnel_id:
-                personnel_data['updated_at'] = datetime.now().isoformat()
-                personnel_list[i] = {**person, **personnel_data}
-                data['personnel'] = personnel_list
-                return self.save_data('personnel', data)
+        existing = self.get_personnel_by_id(personnel_id)
+        if existing is not None:
+            old = dict(existing)
+            personnel_data['updated_at'] = datetime.now().isoformat()
+            record = self._update_record('personnel', personnel_id, personnel_data)
+            if record is None:
+                print(f"❌ Personnel {personnel_data.get('id_employe')} existe déjà")
+                return False
+            return self._write_change('personnel', 'update', personnel_id, record, old)
         
         print(f"❌ Personnel {personnel_id} non trouvé")
         return False
@@ -323,18 +1712,10 @@ class DataManager:
     def delete_personnel(self, personnel_id: str) -> bool:
         """CORRECTION: Supprime un membre du personnel"""
         try:
-            data = self.load_data('personnel', use_cache=False)  # Force rechargement
-            personnel_list = data.get('personnel', [])
-            
-            original_length = len(personnel_list)
-            # CORRECTION: Filtrage correct
-            updated_personnel = [p for p in personnel_list if p.get('id_employe') != personnel_id]
-            
-            if len(updated_personnel) < original_length:
-                data['personnel'] = updated_personnel
-                success = self.save_data('personnel', data)
+            record = self._delete_record('personnel', personnel_id)
+            if record is not None:
+                success = self._write_change('personnel', 'delete', personnel_id, old=record)
                 if success:
-                    self.clear_cache()  # AJOUT: Vider le cache après suppression
                     print(f"✓ Personnel {personnel_id} supprimé")
                     return True
             
@@ -350,25 +1731,24 @@ class DataManager:
         data = self.load_data('flights')
         return data.get('flights', [])
     
+    def get_flight_by_id(self, flight_number: str) -> Optional[Dict[str, Any]]:
+        """Retourne le vol de numéro donné (recherche indexée)"""
+        return self._get_by_id('flights', flight_number)
+    
     def add_flight(self, flight_data: Dict[str, Any]) -> bool:
         """CORRECTION: Ajoute un vol avec rafraîchissement forcé"""
         try:
-            data = self.load_data('flights', use_cache=False)  # Force rechargement
-            flights_list = data.get('flights', [])
-            
-            # Vérification unicité numéro vol
+            # Vérification unicité numéro vol (index primaire)
             flight_number = flight_data.get('numero_vol')
-            if any(f.get('numero_vol') == flight_number for f in flights_list):
+            if self.get_flight_by_id(flight_number) is not None:
                 print(f"❌ Vol {flight_number} existe déjà")
                 return False
             
             flight_data['created_at'] = datetime.now().isoformat()
-            flights_list.append(flight_data)
-            data['flights'] = flights_list
+            self._add_record('flights', flight_data)
             
-            success = self.save_data('flights', data)
+            success = self._write_change('flights', 'insert', flight_number, flight_data)
             if success:
-                self.clear_cache()  # AJOUT: Force le rafraîchissement
                 print(f"✓ Vol {flight_number} ajouté")
             return success
             
@@ -381,25 +1761,24 @@ class DataManager:
         data = self.load_data('passengers')
         return data.get('passengers', [])
     
+    def get_passenger_by_id(self, passenger_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne le passager d'identifiant donné (recherche indexée)"""
+        return self._get_by_id('passengers', passenger_id)
+    
     def add_passenger(self, passenger_data: Dict[str, Any]) -> bool:
         """CORRECTION: Ajoute un passager avec rafraîchissement forcé"""
         try:
-            data = self.load_data('passengers', use_cache=False)
-            passengers_list = data.get('passengers', [])
-            
-            # Vérification unicité ID
+            # Vérification unicité ID (index primaire)
             passenger_id = passenger_data.get('id_passager')
-            if any(p.get('id_passager') == passenger_id for p in passengers_list):
+            if self.get_passenger_by_id(passenger_id) is not None:
                 print(f"❌ Passager {passenger_id} existe déjà")
                 return False
             
             passenger_data['created_at'] = datetime.now().isoformat()
-            passengers_list.append(passenger_data)
-            data['passengers'] = passengers_list
+            self._add_record('passengers', passenger_data)
             
-            success = self.save_data('passengers', data)
+            success = self._write_change('passengers', 'insert', passenger_id, passenger_data)
             if success:
-                self.clear_cache()
                 print(f"✓ Passager {passenger_id} ajouté")
             return success
             
@@ -409,15 +1788,15 @@ class DataManager:
         
     def update_passenger(self, passenger_id: str, passenger_data: Dict[str, Any]) -> bool:
         """Met à jour un passager existant"""
-        data = self.load_data('passengers')
-        passengers_list = data.get('passengers', [])
-        
-        for i, passenger in enumerate(passengers_list):
-            if passenger.get('id_passager') == passenger_id:
-                passenger_data['updated_at'] = datetime.now().isoformat()
-                passengers_list[i] = {**passenger, **passenger_data}
-                data['passengers'] = passengers_list
-                return self.save_data('passengers', data)
+        existing = self.get_passenger_by_id(passenger_id)
+        if existing is not None:
+            old = dict(existing)
+            passenger_data['updated_at'] = datetime.now().isoformat()
+            record = self._update_record('passengers', passenger_id, passenger_data)
+            if record is None:
+                print(f"❌ Passager {passenger_data.get('id_passager')} existe déjà")
+                return False
+            return self._write_change('passengers', 'update', passenger_id, record, old)
         
         print(f"❌ Passager {passenger_id} non trouvé")
         return False
@@ -425,17 +1804,10 @@ class DataManager:
     def delete_passenger(self, passenger_id: str) -> bool:
         """AJOUT: Supprime un passager (méthode manquante)"""
         try:
-            data = self.load_data('passengers', use_cache=False)
-            passengers_list = data.get('passengers', [])
-            
-            original_length = len(passengers_list)
-            updated_passengers = [p for p in passengers_list if p.get('id_passager') != passenger_id]
-            
-            if len(updated_passengers) < original_length:
-                data['passengers'] = updated_passengers
-                success = self.save_data('passengers', data)
+            record = self._delete_record('passengers', passenger_id)
+            if record is not None:
+                success = self._write_change('passengers', 'delete', passenger_id, old=record)
                 if success:
-                    self.clear_cache()
                     print(f"✓ Passager {passenger_id} supprimé")
                     return True
             
@@ -448,15 +1820,15 @@ class DataManager:
         
     def update_flight(self, flight_number: str, flight_data: Dict[str, Any]) -> bool:
         """Met à jour un vol existant"""
-        data = self.load_data('flights')
-        flights_list = data.get('flights', [])
-        
-        for i, flight in enumerate(flights_list):
-            if flight.get('numero_vol') == flight_number:
-                flight_data['updated_at'] = datetime.now().isoformat()
-                flights_list[i] = {**flight, **flight_data}
-                data['flights'] = flights_list
-                return self.save_data('flights', data)
+        existing = self.get_flight_by_id(flight_number)
+        if existing is not None:
+            old = dict(existing)
+            flight_data['updated_at'] = datetime.now().isoformat()
+            record = self._update_record('flights', flight_number, flight_data)
+            if record is None:
+                print(f"❌ Vol {flight_data.get('numero_vol')} existe déjà")
+                return False
+            return self._write_change('flights', 'update', flight_number, record, old)
         
         print(f"❌ Vol {flight_number} non trouvé")
         return False
@@ -464,18 +1836,10 @@ class DataManager:
     def delete_flight(self, flight_number: str) -> bool:
         """CORRECTION: Supprime un vol"""
         try:
-            data = self.load_data('flights', use_cache=False)  # Force rechargement
-            flights_list = data.get('flights', [])
-            
-            original_length = len(flights_list)
-            # CORRECTION: Filtrage correct
-            updated_flights = [f for f in flights_list if f.get('numero_vol') != flight_number]
-            
-            if len(updated_flights) < original_length:
-                data['flights'] = updated_flights
-                success = self.save_data('flights', data)
+            record = self._delete_record('flights', flight_number)
+            if record is not None:
+                success = self._write_change('flights', 'delete', flight_number, old=record)
                 if success:
-                    self.clear_cache()  # AJOUT: Vider le cache après suppression
                     print(f"✓ Vol {flight_number} supprimé")
                     return True
             
@@ -491,37 +1855,35 @@ class DataManager:
         data = self.load_data('reservations')
         return data.get('reservations', [])
     
+    def get_reservation_by_id(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne la réservation d'identifiant donné (recherche indexée)"""
+        return self._get_by_id('reservations', reservation_id)
+    
     def add_reservation(self, reservation_data: Dict[str, Any]) -> bool:
         """Ajoute une réservation"""
-        data = self.load_data('reservations')
-        reservations_list = data.get('reservations', [])
-        
-        # Vérification unicité ID
+        # Vérification unicité ID (index primaire)
         reservation_id = reservation_data.get('id_reservation')
-        if any(r.get('id_reservation') == reservation_id for r in reservations_list):
+        if self.get_reservation_by_id(reservation_id) is not None:
             print(f"❌ Réservation {reservation_id} existe déjà")
             return False
         
+        seat_error = self._seat_error(reservation_data)
+        if seat_error:
+            print(f"❌ {seat_error}")
+            return False
+        
         reservation_data['created_at'] = datetime.now().isoformat()
-        reservations_list.append(reservation_data)
-        data['reservations'] = reservations_list
+        self._add_record('reservations', reservation_data)
         
-        return self.save_data('reservations', data)
+        return self._write_change('reservations', 'insert', reservation_id, reservation_data)
     
     def delete_reservation(self, reservation_id: str) -> bool:
         """AJOUT: Supprime une réservation (méthode manquante)"""
         try:
-            data = self.load_data('reservations', use_cache=False)
-            reservations_list = data.get('reservations', [])
-            
-            original_length = len(reservations_list)
-            updated_reservations = [r for r in reservations_list if r.get('id_reservation') != reservation_id]
-            
-            if len(updated_reservations) < original_length:
-                data['reservations'] = updated_reservations
-                success = self.save_data('reservations', data)
+            record = self._delete_record('reservations', reservation_id)
+            if record is not None:
+                success = self._write_change('reservations', 'delete', reservation_id, old=record)
                 if success:
-                    self.clear_cache()
                     print(f"✓ Réservation {reservation_id} supprimée")
                     return True
             
@@ -534,19 +1896,131 @@ class DataManager:
     
     def update_reservation(self, reservation_id: str, reservation_data: Dict[str, Any]) -> bool:
         """Met à jour une réservation existante"""
-        data = self.load_data('reservations')
-        reservations_list = data.get('reservations', [])
-        
-        for i, reservation in enumerate(reservations_list):
-            if reservation.get('id_reservation') == reservation_id:
-                reservation_data['updated_at'] = datetime.now().isoformat()
-                reservations_list[i] = {**reservation, **reservation_data}
-                data['reservations'] = reservations_list
-                return self.save_data('reservations', data)
+        existing = self.get_reservation_by_id(reservation_id)
+        if existing is not None:
+            old = dict(existing)
+            seat_error = self._seat_error({**old, **reservation_data}, old)
+            if seat_error:
+                print(f"❌ {seat_error}")
+                return False
+            reservation_data['updated_at'] = datetime.now().isoformat()
+            record = self._update_record('reservations', reservation_id, reservation_data)
+            if record is None:
+                print(f"❌ Réservation {reservation_data.get('id_reservation')} existe déjà")
+                return False
+            return self._write_change('reservations', 'update', reservation_id, record, old)
         
         print(f"❌ Réservation {reservation_id} non trouvée")
         return False
     
+    def seat_map(self, flight_number: str) -> Optional[SeatMap]:
+        """
+        Retourne le plan de cabine d'un vol (capacité de son avion) avec
+        les sièges des réservations non annulées.
+        
+        Le plan est construit une fois, à partir des seules réservations du
+        vol (index), puis chaque réservation ajoutée, modifiée ou supprimée
+        y prend ou libère son siège ; il n'est reconstruit que si l'avion du
+        vol ou sa capacité change, ou si les collections sont rechargées.
+        
+        Returns:
+            SeatMap: Occupation des sièges, None si le vol, son avion ou sa capacité est inconnu
+        """
+        # Documents modifiés sur disque: rechargés (et plans oubliés)
+        for file_key in self.SEAT_MAP_SOURCES:
+            self.load_data(file_key)
+        return self._seat_maps.get(flight_number)
+    
+    def _build_seat_map(self, flight_number: str) -> Optional[SeatMap]:
+        """Plan de cabine d'un vol construit depuis ses réservations"""
+        flight = self.get_flight_by_id(flight_number)
+        aircraft = self.get_aircraft_by_id(flight.get('avion_utilise')) if flight else None
+        capacity = number_or_none(aircraft.get('capacite')) if aircraft else None
+        if not capacity:
+            return None
+        
+        seat_map = SeatMap(int(capacity))
+        # Les partitions non chargées ne contiennent que des réservations
+        # closes, dont seules celles des vols déjà partis gardent leur
+        # siège: elles ont été créées avant le départ du vol (et après sa
+        # création, sauf vol enregistré après coup)
+        departure = self._time_key(flight.get('heure_depart'))
+        if departure is not None and departure <= self._time_key(datetime.now()):
+            created = self._time_key(flight.get('created_at'))
+            self.load_partitions('reservations', created if created and created <= departure else None, departure)
+        for reservation in self.query('reservations', {'vol_numero': flight_number}):
+            seat = reservation.get('siege_assigne')
+            if seat and reservation.get('statut') not in self.SEAT_RELEASED_STATUSES and not seat_map.take(seat):
+                print(f"⚠️ Siège {seat} du vol {flight_number} inexistant ou attribué plusieurs fois")
+        return seat_map
+    
+    def _seat_error(self, reservation: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Motif de refus du siège d'une réservation (None s'il est libre ou déjà le sien)"""
+        seat = reservation.get('siege_assigne')
+        flight_number = reservation.get('vol_numero')
+        if not seat or reservation.get('statut') in self.SEAT_RELEASED_STATUSES:
+            return None
+        if (previous and previous.get('vol_numero') == flight_number and previous.get('siege_assigne') == seat
+                and previous.get('statut') not in self.SEAT_RELEASED_STATUSES):
+            return None
+        
+        seat_map = self.seat_map(flight_number)
+        if seat_map is None or seat_map.is_free(seat):
+            return None
+        if seat_map.index_of(seat) is None:
+            return f"Siège {seat} inexistant sur le vol {flight_number}"
+        return f"Siège {seat} déjà occupé sur le vol {flight_number}"
+    
+    def auto_assign_seats(self, flight_number: str, reservation_ids: Optional[List[str]] = None,
+                          together: bool = True) -> Dict[str, str]:
+        """
+        Attribue en une fois des sièges aux réservations d'un vol (une transaction).
+        
+        Args:
+            flight_number (str): Numéro du vol
+            reservation_ids (List): Réservations à placer (un groupe, dans
+                l'ordre) ; par défaut toutes les réservations actives sans siège
+            together (bool): Place les réservations sur des sièges voisins
+            
+        Returns:
+            Dict: {id_reservation: siège}, vide si le vol n'a pas assez de sièges libres
+        """
+        seat_map = self.seat_map(flight_number)
+        if seat_map is None:
+            print(f"❌ Plan de cabine du vol {flight_number} indisponible")
+            return {}
+        
+        if reservation_ids is None:
+            reservation_ids = [reservation['id_reservation'] for reservation in
+                               self.query('reservations', [('vol_numero', 'eq', flight_number),
+                                                           ('statut', 'eq', 'active')])
+                               if not reservation.get('siege_assigne')]
+        if not reservation_ids:
+            return {}
+        for reservation_id in reservation_ids:
+            reservation = self.get_reservation_by_id(reservation_id)
+            if reservation is None or reservation.get('vol_numero') != flight_number:
+                print(f"❌ Réservation {reservation_id} absente du vol {flight_number}")
+                return {}
+        
+        # Sièges pris dans le plan par update_reservation
+        seats = seat_map.find_seats(len(reservation_ids), together)
+        if not seats:
+            print(f"❌ Vol {flight_number}: {seat_map.free} sièges libres pour {len(reservation_ids)} réservations")
+            return {}
+        
+        assigned = dict(zip(reservation_ids, seats))
+        try:
+            with self.transaction():
+                for reservation_id, seat in assigned.items():
+                    if not self.update_reservation(reservation_id, {'siege_assigne': seat}):
+                        raise ValueError(f"Siège {seat} non attribué à la réservation {reservation_id}")
+        except ValueError as e:
+            print(f"❌ Attribution des sièges annulée: {e}")
+            return {}
+        print(f"✓ Vol {flight_number}: {len(assigned)} sièges attribués")
+        return assigned
+    
     def get_company_info(self) -> Dict[str, Any]:
         """Retourne les informations de la compagnie"""
         return self.load_data('company')
@@ -560,6 +2034,56 @@ class DataManager:
         data['statistics'].update(stats)
         return self.save_data('company', data)
     
+    def add_records(self, file_key: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ajoute plusieurs enregistrements en une transaction, avec les
+        contrôles des méthodes add_* : clé primaire unique (y compris dans
+        les partitions non chargées et dans le lot), siège libre pour une
+        réservation.
+        
+        Args:
+            file_key (str): Collection
+            records (List): Enregistrements complets (clé primaire renseignée)
+            
+        Returns:
+            Dict: {'added': [clés], 'duplicates': {rang: motif}, 'invalid': {rang: motif}}
+            
+        Raises:
+            IOError: Si l'écriture échoue (aucun enregistrement du lot n'est ajouté)
+        """
+        key_field = self.PRIMARY_KEYS[file_key]
+        result = {'added': [], 'duplicates': {}, 'invalid': {}}
+        try:
+            with self.transaction():
+                for position, record in enumerate(records):
+                    key = record.get(key_field)
+                    if key is None or self._get_by_id(file_key, key) is not None:
+                        result['duplicates'][position] = f"{key_field} {key} existe déjà"
+                        continue
+                    seat_error = self._seat_error(record) if file_key == 'reservations' else None
+                    if seat_error:
+                        result['invalid'][position] = seat_error
+                        continue
+                    self._add_record(file_key, record)
+                    if not self._write_change(file_key, 'insert', key, record):
+                        raise IOError(f"Écriture de {key_field} {key} refusée")
+                    result['added'].append(key)
+        except (ConcurrentModificationError, OSError) as e:
+            raise IOError(f"Ajout dans {self.storage.location(file_key)} annulé: {e}") from e
+        return result
+    
+    def bulk_add(self, file_key: str, records, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ajoute un grand nombre d'enregistrements (passagers, vols,
+        réservations) par lots validés et écrits chacun en une transaction
+        (voir data.importer.bulk_add).
+        
+        Returns:
+            Dict: Rapport {'added', 'duplicates', 'invalid', 'failed',
+            'errors', 'seconds', 'rate'}
+        """
+        return bulk_add(self, file_key, records, chunk_size)
+    
     def search_data(self, file_key: str, field: str, value: Any) -> List[Dict[str, Any]]:
         """
         Recherche des éléments dans une liste de données.
@@ -567,120 +2091,414 @@ class DataManager:
         Args:
             file_key (str): Fichier à rechercher
             field (str): Champ à chercher
-            value: Valeur à chercher
+            value: Valeur à chercher (sous-chaîne sans casse si chaîne, égalité sinon)
             
         Returns:
             List: Éléments trouvés
         """
-        data = self.load_data(file_key)
+        if file_key not in self.LIST_KEYS:
+            return []
+        op = 'contains' if isinstance(value, str) else 'eq'
+        return self.query(file_key, [(field, op, value)])
+    
+    def query(self, file_key: str, where=None, order_by=None, limit: Optional[int] = None,
+              offset: int = 0, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Interroge une collection (voir data.query pour la forme des prédicats).
         
-        # Détermine la clé de liste selon le fichier
-        list_keys = {
-            'aircraft': 'aircraft',
-            'personnel': 'personnel',
-            'flights': 'flights',
-            'passengers': 'passengers',
-            'reservations': 'reservations',
-            'airports': 'airports',
-            'aircraft_models': 'aircraft_models'
-        }
+        Les prédicats 'eq', 'in' et 'range' portant sur la clé primaire ou
+        sur un champ de SECONDARY_INDEXES sont résolus par l'index le plus
+        sélectif ; les autres sont compilés et appliqués aux seuls candidats.
+        Sans index utilisable, la collection est parcourue une fois.
         
-        list_key = list_keys.get(file_key)
-        if not list_key:
-            return []
+        Args:
+            file_key (str): Collection interrogée
+            where: Liste de prédicats (champ, opérateur, valeur) ou fonctions,
+                ou dictionnaire {champ: valeur}
+            order_by: Champ ou liste de champs, '-champ' pour un ordre décroissant
+            limit (int): Nombre maximal de résultats
+            offset (int): Nombre de résultats ignorés
+            fields (List): Champs retournés (copies restreintes), tous si None
+            
+        Returns:
+            List: Enregistrements correspondants ; sans order_by, dans l'ordre
+            de la collection ou de l'index utilisé
+            
+        Raises:
+            ValueError: Si un prédicat est invalide
+        """
+        candidates, remaining = self._plan_query(file_key, normalize_where(where))
+        return run_query(candidates, remaining, self._computed_fields(file_key),
+                         order_by, limit, offset, fields)
+    
+    def get_page(self, file_key: str, offset: int = 0, limit: Optional[int] = None,
+                 sort_key: Optional[str] = None, filters=None) -> Dict[str, Any]:
+        """
+        Retourne une page triée et filtrée d'une collection et le nombre
+        total d'enregistrements correspondants.
         
-        items = data.get(list_key, [])
+        Les champs de SORT_ORDERS ont un ordre maintenu à chaque écriture :
+        sans filtre, la page est lue directement à son rang ; avec filtres,
+        l'ordre est parcouru une fois, ou seuls les candidats d'un index
+        sélectif sont triés. Les autres champs sont triés à la demande.
         
-        # Recherche simple
-        if isinstance(value, str):
-            value = value.lower()
-            return [
-                item for item in items 
-                if field in item and value in str(item[field]).lower()
-            ]
-        else:
-            return [
-                item for item in items 
-                if field in item and item[field] == value
-            ]
+        Args:
+            file_key (str): Collection
+            offset (int): Rang du premier enregistrement retourné
+            limit (int): Taille de la page (PAGE_SIZE par défaut)
+            sort_key (str): Champ de tri, '-champ' pour un ordre décroissant ;
+                ordre de la collection si None
+            filters: Prédicats de la page (voir query)
+            
+        Returns:
+            Dict: {'items': enregistrements de la page, 'total': nombre de
+            correspondances, 'offset': rang, 'limit': taille de page}
+        """
+        limit = self.PAGE_SIZE if limit is None else limit
+        offset = max(offset, 0)
+        field = sort_key.lstrip('-') if sort_key else None
+        order = self._get_sort_order(file_key, field) if field else None
+        
+        candidates, predicates = None, normalize_where(filters)
+        if predicates or order is None:
+            candidates, predicates = self._plan_query(file_key, predicates)
+        items, total = run_page(candidates, predicates, self._computed_fields(file_key),
+                                offset, limit, sort_key, order)
+        return {'items': items, 'total': total, 'offset': offset, 'limit': limit}
+    
+    def _computed_fields(self, file_key: str) -> Dict[str, Any]:
+        """Champs calculés interrogeables d'une collection ('date_depart' des vols)"""
+        if 'date_depart' in self.SECONDARY_INDEXES.get(file_key, []):
+            return {'date_depart': lambda record: self._index_value(record, 'date_depart')}
+        return {}
+    
+    def _plan_query(self, file_key: str, predicates: List[Any]):
+        """
+        Choisit la source des candidats d'une requête.
+        
+        Returns:
+            Tuple: (candidats, prédicats restant à appliquer)
+        """
+        lookups = {field: partial(self._index_candidates, file_key, field)
+                   for field in self.SECONDARY_INDEXES.get(file_key, [])}
+        if file_key in self.PRIMARY_KEYS:
+            lookups[self.PRIMARY_KEYS[file_key]] = partial(self._primary_candidates, file_key)
+        candidates, remaining = plan_query(predicates, lookups)
+        return (self._get_items(file_key) if candidates is None else candidates), remaining
+    
+    def _primary_candidates(self, file_key: str, op: str, value: Any) -> Optional[List[Dict[str, Any]]]:
+        """Enregistrements de l'index primaire satisfaisant un prédicat 'eq' ou 'in'"""
+        if op not in ('eq', 'in'):
+            return None
+        # Au plus un enregistrement par valeur
+        values = [value] if op == 'eq' else list(dict.fromkeys(value))
+        return [record for record in (self._get_by_id(file_key, v) for v in values) if record is not None]
+    
+    def _index_candidates(self, file_key: str, field: str, op: str, value: Any) -> List[Dict[str, Any]]:
+        """Enregistrements d'un index secondaire satisfaisant un prédicat 'eq', 'in' ou 'range'"""
+        if op == 'eq':
+            return self.find_by(file_key, field, value)
+        if op == 'in':
+            candidates = []
+            for item in dict.fromkeys(value):
+                candidates.extend(self.find_by(file_key, field, item))
+            return candidates
+        
+        low, high = value
+        if field == 'date_depart':
+            # Jours éventuellement situés dans des partitions non chargées
+            self.load_partitions(file_key, low, high)
+        candidates = []
+        for key, bucket in self._get_secondary_indexes(file_key)[field].items():
+            try:
+                if (low is None or key >= low) and (high is None or key <= high):
+                    candidates.extend(bucket.values())
+            except TypeError:
+                continue
+        return candidates
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Calcule et retourne les statistiques générales"""
-        stats = {
-            'total_aircraft': len(self.get_aircraft()),
-            'total_personnel': len(self.get_personnel()),
-            'total_flights': len(self.get_flights()),
-            'total_passengers': len(self.get_passengers()),
-            'total_reservations': len(self.get_reservations()),
-            'total_airports': len(self.get_airports())
+        """
+        Retourne les statistiques générales.
+        
+        Les compteurs sont lus dans les documents en cache et dans les index
+        secondaires, maintenus à chaque ajout, modification ou suppression :
+        la lecture n'effectue aucun accès disque une fois les collections
+        chargées. Voir checkpoint_statistics() pour la persistance.
+        """
+        totals = {
+            'total_aircraft': 'aircraft',
+            'total_personnel': 'personnel',
+            'total_flights': 'flights',
+            'total_passengers': 'passengers',
+            'total_reservations': 'reservations',
+            'total_airports': 'airports'
         }
+        stats = {name: len(self._cached_items(file_key)) for name, file_key in totals.items()}
         
-        # Statistiques des vols par statut
-        flights = self.get_flights()
-        flight_statuses = {}
-        for flight in flights:
-            status = flight.get('statut', 'unknown')
-            flight_statuses[status] = flight_statuses.get(status, 0) + 1
+        # Vols par statut, avions par état
+        stats['flight_statuses'] = self._count_by('flights', 'statut')
+        stats['aircraft_states'] = self._count_by('aircraft', 'etat')
         
-        stats['flight_statuses'] = flight_statuses
+        # Réservations actives
+        stats['active_reservations'] = self._count_by('reservations', 'statut').get('active', 0)
         
-        # Statistiques des avions par état
-        aircraft = self.get_aircraft()
-        aircraft_states = {}
-        for plane in aircraft:
-            state = plane.get('etat', 'unknown')
-            aircraft_states[state] = aircraft_states.get(state, 0) + 1
+        # Historique archivé (taille de l'index de l'archive)
+        stats['archived_flights'] = self.archive.count('flights')
+        stats['archived_reservations'] = self.archive.count('reservations')
         
-        stats['aircraft_states'] = aircraft_states
+        return stats
+    
+    def _cached_items(self, file_key: str) -> List[Dict[str, Any]]:
+        """Enregistrements d'une collection, depuis le cache sans vérification du disque"""
+        data = self._cache.get(file_key)
+        if data is None:
+            data = self.load_data(file_key)
+        return data.get(self.LIST_KEYS[file_key], []) if isinstance(data, dict) else []
+    
+    def _count_by(self, file_key: str, field: str) -> Dict[Any, int]:
+        """Nombre d'enregistrements par valeur d'un champ indexé ('unknown' si absent)"""
+        index = self._get_secondary_indexes(file_key, refresh=False)[field]
+        counts = {value: len(bucket) for value, bucket in index.items()}
+        missing = len(self._cached_items(file_key)) - sum(counts.values())
+        if missing > 0:
+            counts['unknown'] = missing
+        return counts
+    
+    def checkpoint_statistics(self, force: bool = False) -> bool:
+        """
+        Écrit les statistiques courantes dans company.json.
         
-        # Mise à jour des stats de la compagnie
-        self.update_company_stats(stats)
+        Appelée périodiquement: l'écriture n'a lieu qu'une fois par
+        STATS_CHECKPOINT_INTERVAL secondes (sauf force=True) et seulement si
+        les statistiques ont changé depuis la dernière écriture.
         
-        return stats
+        Args:
+            force (bool): Ignorer le délai minimal (fermeture, sauvegarde)
+            
+        Returns:
+            bool: True si company.json a été écrit
+        """
+        now = time.monotonic()
+        if not force and now - self._last_stats_checkpoint < self.STATS_CHECKPOINT_INTERVAL:
+            return False
+        self._last_stats_checkpoint = now
+        
+        stats = self.get_statistics()
+        saved = self.load_data('company').get('statistics', {})
+        if all(saved.get(key) == value for key, value in stats.items()):
+            return False
+        return self.update_company_stats(stats)
+    
+    def archive_closed_records(self, max_age_days: Optional[int] = None,
+                               now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Déplace les vols et réservations clos anciens vers l'archive compressée.
+        
+        Sont archivés les vols 'termine' / 'annule' et les réservations
+        'terminee' / 'annulee' / 'expiree' dont la date (heure_depart,
+        date_creation) est antérieure de plus de max_age_days jours. Un vol
+        encore référencé par une réservation non archivée est conservé. Les
+        enregistrements sont écrits dans l'archive avant d'être retirés des
+        collections : une interruption ne perd aucun enregistrement.
+        
+        Args:
+            max_age_days (int): Âge minimal en jours (défaut: ARCHIVE_AFTER_DAYS)
+            now (datetime): Date de référence (défaut: maintenant)
+            
+        Returns:
+            Dict: Nombre d'enregistrements archivés par collection
+        """
+        if max_age_days is None:
+            max_age_days = self.ARCHIVE_AFTER_DAYS
+        cutoff = ((now or datetime.now()) - timedelta(days=max_age_days)).isoformat()
+        
+        counts = {}
+        # Réservations d'abord: leurs vols peuvent ensuite être libérés
+        for file_key in ('reservations', 'flights'):
+            date_field = self.ARCHIVE_DATE_FIELDS[file_key]
+            key_field = self.PRIMARY_KEYS[file_key]
+            # Partitions non chargées de la période concernée
+            self.load_partitions(file_key, end=cutoff)
+            # Un vol encore référencé par une réservation est conservé
+            referenced = self.index_values('reservations', 'vol_numero') if file_key == 'flights' else ()
+            selected = select_closed(self._get_items(file_key), self.CLOSED_STATUSES[file_key],
+                                     date_field, cutoff, key_field, referenced)
+            
+            counts[file_key] = len(selected)
+            if selected:
+                self.archive.add_records(file_key, selected, date_field, key_field)
+                self._remove_records(file_key, selected)
+                print(f"✓ {len(selected)} enregistrement(s) archivé(s) depuis {self.storage.location(file_key)}")
+        
+        return counts
+    
+    def _remove_records(self, file_key: str, records: List[Dict[str, Any]]):
+        """Retire des enregistrements d'une collection (une écriture du document)"""
+        removed = {id(record) for record in records}
+        data = self.load_data(file_key)
+        data[self.LIST_KEYS[file_key]] = [record for record in self._get_items(file_key)
+                                          if id(record) not in removed]
+        if not self.save_data(file_key, data):
+            # Les enregistrements déjà archivés seront retirés au prochain passage
+            raise IOError(f"Écriture de {self.storage.location(file_key)} impossible")
+    
+    def get_archived(self, file_key: str, record_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Retourne un vol ou une réservation archivé (recherche par l'index de l'archive).
+        
+        Args:
+            file_key (str): 'flights' ou 'reservations'
+            record_id: Clé primaire
+            
+        Returns:
+            Dict: Enregistrement archivé, None s'il n'est pas archivé
+        """
+        return self.archive.get(file_key, record_id, self.PRIMARY_KEYS[file_key])
+    
+    def iter_archived(self, file_key: str, start: Optional[str] = None,
+                      end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les enregistrements archivés d'une période (dates ISO incluses)"""
+        return self.archive.iter_records(file_key, start, end)
     
     def clear_cache(self):
-        """Vide le cache des données"""
+        """Vide le cache des données (après écriture des modifications en attente)"""
+        self.flush()
         self._cache.clear()
+        self._indexes.clear()
+        self._secondary_indexes.clear()
+        self._sort_orders.clear()
+        self._signatures.clear()
         print("✓ Cache vidé")
     
     def backup_all_data(self) -> bool:
-        """Crée une sauvegarde de toutes les données"""
-        backup_dir = self.data_dir / 'backups'
-        backup_dir.mkdir(exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_subdir = backup_dir / f'backup_{timestamp}'
-        backup_subdir.mkdir(exist_ok=True)
+        """
+        Crée une sauvegarde incrémentale de toutes les données.
         
+        Le moteur copie ses fichiers dans un répertoire temporaire (copie
+        cohérente, y compris pour SQLite) dont seuls les blocs nouveaux sont
+        ajoutés au magasin de sauvegardes ; l'archive est lue sur place. La
+        politique de rétention (BackupStore.RETENTION) est ensuite appliquée.
+        """
         try:
-            for file_key, file_path in self.files.items():
-                if file_path.exists():
-                    backup_file = backup_subdir / file_path.name
-                    with open(file_path, 'r', encoding='utf-8') as src:
-                        with open(backup_file, 'w', encoding='utf-8') as dst:
-                            dst.write(src.read())
-            
-            print(f"✓ Sauvegarde créée: {backup_subdir}")
+            self.checkpoint_statistics(force=True)
+            self.flush()
+            
+            self.backups.root.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=str(self.backups.root), prefix='.staging_') as staging:
+                # Copie cohérente: aucune autre instance n'écrit pendant la copie
+                with self._file_lock():
+                    self.storage.backup(Path(staging))
+                sources = {'': Path(staging)}
+                if self.archive.archive_dir.exists():
+                    sources[self.archive.archive_dir.name] = self.archive.archive_dir
+                name = self.backups.create(sources)
+            
+            self.backups.prune()
+            print(f"✓ Sauvegarde créée: {name}")
             return True
             
         except Exception as e:
             print(f"❌ Erreur lors de la sauvegarde: {e}")
             return False
     
+    def list_backups(self) -> List[str]:
+        """Noms des sauvegardes disponibles, de la plus ancienne à la plus récente"""
+        return self.backups.list_backups()
+    
+    def restore_backup(self, name: str) -> bool:
+        """
+        Remplace les données courantes par celles d'une sauvegarde.
+        
+        Les écritures en attente sont d'abord écrites, le moteur de stockage
+        est fermé puis rouvert (sauf s'il a été fourni en instance) et tous
+        les caches sont invalidés.
+        
+        Les données reviennent exactement à l'état de la sauvegarde : les
+        fichiers créés depuis dans les répertoires sauvegardés (partitions
+        de nouveaux mois, archives) et les journaux des collections sont
+        supprimés. Les autres fichiers du répertoire (sauvegardes, cache,
+        versions .bak) sont conservés.
+        
+        Args:
+            name (str): Nom de la sauvegarde (voir list_backups())
+            
+        Returns:
+            bool: True si la restauration a réussi
+        """
+        try:
+            with self._file_lock():
+                self.flush()
+                manifest = self.backups.load_manifest(name)
+                
+                reopen = not isinstance(self._storage_spec, StorageEngine)
+                if reopen:
+                    self.storage.close()
+                # Répertoires sauvegardés (partitions, archives): remis à l'identique
+                exact_dirs = {relative.split('/', 1)[0] for relative in manifest['files'] if '/' in relative}
+                exact_dirs.add(self.archive.archive_dir.name)
+                try:
+                    self.backups.restore(name, self.data_dir, exact_dirs)
+                    # Journaux écrits après la sauvegarde: ne pas les rejouer
+                    for file_path in self.files.values():
+                        journal_path = file_path.with_suffix('.jsonl')
+                        if journal_path.exists() and journal_path.name not in manifest['files']:
+                            journal_path.unlink()
+                finally:
+                    if reopen:
+                        self.storage = self._create_storage(self._storage_spec)
+                
+                self.archive = Archive(self.data_dir / 'archive', self.ARCHIVE_COMPRESSION)
+                self._cache.clear()
+                self._indexes.clear()
+                self._secondary_indexes.clear()
+                self._sort_orders.clear()
+                self._signatures.clear()
+                for file_key in self.files:
+                    self._versions[file_key] = self._versions.get(file_key, 0) + 1
+            self._dispatch([ChangeEvent(file_key, 'reload') for file_key in self.files])
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erreur lors de la restauration de {name}: {e}")
+            return False
+    
     def validate_data_integrity(self) -> Dict[str, Any]:
-        """Valide l'intégrité des données et retourne un rapport"""
+        """
+        Valide l'intégrité des données et retourne un rapport.
+        
+        Les modifications en attente sont d'abord écrites, puis chaque
+        collection est relue en flux depuis le stockage : une première passe
+        valide les documents et relève les clés primaires, une seconde
+        parcourt vols et réservations pour vérifier leurs références. Seuls
+        les ensembles de clés sont gardés en mémoire.
+        """
         report = {
             'valid': True,
             'errors': [],
             'warnings': [],
             'files_checked': 0
         }
+        self.flush()
         
+        keys = {}
         for file_key in self.files.keys():
             try:
+                if file_key in self.LIST_KEYS and self.storage.exists(file_key):
+                    # Relecture en flux: valide le document sans le charger en entier
+                    key_field = self.PRIMARY_KEYS.get(file_key)
+                    found = set()
+                    for record in self.storage.iter_records(file_key):
+                        if key_field is not None:
+                            found.add(record.get(key_field))
+                    keys[file_key] = found
+                    report['files_checked'] += 1
+                    continue
+                
                 data = self.load_data(file_key, use_cache=False)
                 if data:
                     report['files_checked'] += 1
+                    keys[file_key] = set()
                 else:
                     report['warnings'].append(f"Fichier {file_key} vide ou illisible")
                     
@@ -688,16 +2506,28 @@ class DataManager:
                 report['valid'] = False
                 report['errors'].append(f"Erreur dans {file_key}: {e}")
         
-        # Vérifications spécifiques
-        # Vérifier que les vols référencent des avions existants
-        flights = self.get_flights()
-        aircraft_ids = {a.get('num_id') for a in self.get_aircraft()}
-        
-        for flight in flights:
-            aircraft_id = flight.get('avion_utilise')
-            if aircraft_id and aircraft_id not in aircraft_ids:
-                report['warnings'].append(
-                    f"Vol {flight.get('numero_vol')} référence un avion inexistant: {aircraft_id}"
-                )
+        # Vérifications spécifiques: références des vols vers les avions, des
+        # réservations vers les vols et passagers (collections lisibles seulement)
+        references = {
+            'flights': [('avion_utilise', 'aircraft', 'Vol {} référence un avion inexistant: {}')],
+            'reservations': [
+                ('vol_numero', 'flights', 'Réservation {} référence un vol inexistant: {}'),
+                ('passager_id', 'passengers', 'Réservation {} référence un passager inexistant: {}')
+            ]
+        }
+        for file_key, checks in references.items():
+            checks = [check for check in checks if check[1] in keys]
+            if file_key not in keys or not self.storage.exists(file_key) or not checks:
+                continue
+            key_field = self.PRIMARY_KEYS[file_key]
+            try:
+                for record in self.storage.iter_records(file_key):
+                    for field, target, message in checks:
+                        value = record.get(field)
+                        if value and value not in keys[target]:
+                            report['warnings'].append(message.format(record.get(key_field), value))
+            except Exception as e:
+                report['valid'] = False
+                report['errors'].append(f"Erreur dans {file_key}: {e}")
         
         return report
\ No newline at end of file
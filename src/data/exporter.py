@@ -0,0 +1,207 @@
+"""
+Export en flux d'une collection vers un fichier CSV ou JSONL.
+
+Utilisation (depuis le répertoire src, sans interface graphique):
+    python -m data.exporter reservations reservations.csv
+    python -m data.exporter flights vols.jsonl.gz --include-archive
+
+Les enregistrements sont lus au fil de l'eau depuis le moteur de stockage
+et écrits ligne par ligne. Les colonnes jointes (nom du passager, trajet
+et date du vol d'une réservation) sont résolues par des tables de
+hachage construites en une passe sur la collection référencée et ne
+contenant que les colonnes utiles : la mémoire utilisée ne dépend pas de
+la taille de la collection exportée.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Callable
+
+
+def _passenger_name(passenger: Dict[str, Any]) -> str:
+    return f"{passenger.get('prenom', '')} {passenger.get('nom', '')}".strip()
+
+
+def _route(flight: Dict[str, Any]) -> str:
+    return f"{flight.get('aeroport_depart', '')} → {flight.get('aeroport_arrivee', '')}"
+
+
+def _flight_date(flight: Dict[str, Any]) -> str:
+    try:
+        return datetime.fromisoformat(flight['heure_depart']).strftime("%Y-%m-%d %H:%M")
+    except (KeyError, TypeError, ValueError):
+        return ''
+
+
+# Colonnes CSV par collection (les autres collections utilisent les champs
+# du premier enregistrement) ; les colonnes calculées ou jointes sont incluses
+EXPORT_COLUMNS = {
+    'passengers': ['id_passager', 'nom', 'prenom', 'sexe', 'adresse', 'numero_telephone', 'email',
+                   'numero_passeport', 'date_naissance', 'checkin_effectue', 'created_at', 'updated_at'],
+    'flights': ['numero_vol', 'aeroport_depart', 'aeroport_arrivee', 'trajet', 'heure_depart',
+                'heure_arrivee_prevue', 'statut', 'avion_utilise', 'pilote', 'copilote',
+                'distance_km', 'duree_estimee', 'created_at', 'updated_at'],
+    'reservations': ['id_reservation', 'passager_id', 'passager_nom', 'vol_numero', 'trajet',
+                     'date_vol', 'siege_assigne', 'checkin_effectue', 'statut', 'date_creation',
+                     'validite', 'updated_at']
+}
+
+# Colonnes calculées à partir de l'enregistrement lui-même
+COMPUTED_COLUMNS: Dict[str, Dict[str, Callable]] = {
+    'flights': {'trajet': _route}
+}
+
+# Jointures: [(champ de référence, collection référencée, {colonne: fonction})]
+JOINS: Dict[str, List[tuple]] = {
+    'reservations': [
+        ('passager_id', 'passengers', {'passager_nom': _passenger_name}),
+        ('vol_numero', 'flights', {'trajet': _route, 'date_vol': _flight_date})
+    ]
+}
+
+
+def _source_records(data_manager, file_key: str, include_archive: bool = False) -> Iterator[Dict[str, Any]]:
+    """Enregistrements d'une collection lus en flux depuis le stockage"""
+    # Le stockage doit contenir les dernières modifications
+    data_manager.flush()
+    records = data_manager.storage.iter_records(file_key) if data_manager.storage.exists(file_key) else iter(())
+    if include_archive and file_key in data_manager.ARCHIVE_DATE_FIELDS:
+        records = chain(records, data_manager.iter_archived(file_key))
+    return records
+
+
+def _build_lookup(data_manager, file_key: str, columns: Dict[str, Callable],
+                  include_archive: bool = False) -> Dict[Any, tuple]:
+    """Table de hachage {clé primaire: valeurs des colonnes jointes} en une passe"""
+    key_field = data_manager.PRIMARY_KEYS[file_key]
+    functions = list(columns.values())
+    return {record.get(key_field): tuple(function(record) for function in functions)
+            for record in _source_records(data_manager, file_key, include_archive)}
+
+
+def iter_export_rows(data_manager, file_key: str, include_archive: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt les enregistrements d'une collection enrichis des colonnes
+    calculées et jointes.
+
+    Args:
+        data_manager (DataManager): Source des données
+        file_key (str): Collection exportée
+        include_archive (bool): Ajouter les vols / réservations archivés
+
+    Yields:
+        Dict: Enregistrement complété (copie)
+    """
+    joins = []
+    for field, target, columns in JOINS.get(file_key, []):
+        lookup = _build_lookup(data_manager, target, columns, include_archive)
+        joins.append((field, list(columns), lookup, ('',) * len(columns)))
+    computed = COMPUTED_COLUMNS.get(file_key, {})
+
+    for record in _source_records(data_manager, file_key, include_archive):
+        row = dict(record)
+        for column, function in computed.items():
+            row[column] = function(record)
+        for field, columns, lookup, missing in joins:
+            row.update(zip(columns, lookup.get(record.get(field), missing)))
+        yield row
+
+
+def _open_output(path: Path, compress: bool):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _csv_cell(value: Any) -> Any:
+    """Valeur d'une cellule CSV: listes et objets encodés en JSON, None vide"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_collection(data_manager, file_key: str, path: Path, file_format: Optional[str] = None,
+                      compress: Optional[bool] = None, include_archive: bool = False) -> int:
+    """
+    Exporte une collection dans un fichier.
+
+    Args:
+        data_manager (DataManager): Source des données
+        file_key (str): Collection exportée
+        path (Path): Fichier de destination
+        file_format (str): 'csv' ou 'jsonl' (défaut: d'après l'extension)
+        compress (bool): Compression gzip (défaut: extension .gz)
+        include_archive (bool): Ajouter les vols / réservations archivés
+
+    Returns:
+        int: Nombre d'enregistrements exportés
+    """
+    path = Path(path)
+    if compress is None:
+        compress = path.suffix == '.gz'
+    if file_format is None:
+        suffixes = [suffix for suffix in path.suffixes if suffix != '.gz']
+        file_format = 'csv' if suffixes and suffixes[-1] == '.csv' else 'jsonl'
+    if file_format not in ('csv', 'jsonl'):
+        raise ValueError(f"Format d'export inconnu: {file_format}")
+
+    rows = iter_export_rows(data_manager, file_key, include_archive)
+    count = 0
+    with _open_output(path, compress) as f:
+        if file_format == 'jsonl':
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+                count += 1
+        else:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    columns = EXPORT_COLUMNS.get(file_key) or list(row)
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                writer.writerow([_csv_cell(row.get(column)) for column in columns])
+                count += 1
+            if writer is None and file_key in EXPORT_COLUMNS:
+                csv.writer(f).writerow(EXPORT_COLUMNS[file_key])
+
+    print(f"✓ {count} enregistrement(s) de {file_key} exporté(s) vers {path}")
+    return count
+
+
+def main(argv=None) -> int:
+    from data.data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Export d'une collection en CSV ou JSONL")
+    parser.add_argument('collection', choices=sorted(DataManager.LIST_KEYS))
+    parser.add_argument('path', type=Path, help="Fichier de destination (.csv, .jsonl, éventuellement .gz)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], dest='file_format')
+    parser.add_argument('--gzip', action='store_true', dest='compress', default=None)
+    parser.add_argument('--include-archive', action='store_true')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--storage', default='json')
+    args = parser.parse_args(argv)
+
+    data_manager = DataManager(args.data_dir, storage=args.storage)
+    try:
+        export_collection(data_manager, args.collection, args.path, args.file_format,
+                          args.compress, args.include_archive)
+    except (OSError, ValueError) as e:
+        print(f"❌ Erreur export {args.collection}: {e}")
+        return 1
+    finally:
+        data_manager.storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
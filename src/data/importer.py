@@ -0,0 +1,230 @@
+"""
+Import en masse de passagers, vols et réservations depuis un fichier CSV
+ou JSONL.
+
+Utilisation (depuis le répertoire src):
+    python -m data.importer passengers partenaires.csv
+    python -m data.importer reservations export.jsonl --chunk-size 10000
+
+Les fichiers sont lus ligne par ligne et ajoutés par lots (bulk_add,
+exposé par DataManager.bulk_add) : la mémoire utilisée dépend de la
+taille des lots, pas de celle du fichier.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+
+def _open_text(path: Path):
+    """Ouvre un fichier texte, éventuellement compressé (.gz)"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _csv_value(value: str) -> Any:
+    """
+    Convertit une cellule CSV: booléens et listes/objets JSON sont décodés,
+    les autres valeurs restent du texte (identifiants numériques compris).
+    """
+    if value in ('true', 'false'):
+        return value == 'true'
+    if value[:1] in ('[', '{'):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def iter_csv(path: Path, delimiter: str = ',') -> Iterator[Dict[str, Any]]:
+    """Parcourt les lignes d'un fichier CSV avec en-tête (cellules vides ignorées)"""
+    with _open_text(path) as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield {key: _csv_value(value) for key, value in row.items()
+                   if key and value not in (None, '')}
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """Parcourt les objets d'un fichier JSONL (une valeur JSON par ligne)"""
+    with _open_text(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # Transmis tel quel: bulk_add le comptera comme invalide
+                print(f"⚠️ Ligne {line_number} illisible: {e}")
+                yield None
+
+
+def iter_file(path: Path, file_format: Optional[str] = None) -> Iterator[Any]:
+    """
+    Parcourt un fichier d'import selon son format ('csv' ou 'jsonl',
+    déduit de l'extension par défaut).
+    """
+    if file_format is None:
+        suffixes = [suffix for suffix in path.suffixes if suffix != '.gz']
+        file_format = 'csv' if suffixes and suffixes[-1] == '.csv' else 'jsonl'
+    if file_format == 'csv':
+        return iter_csv(path)
+    if file_format == 'jsonl':
+        return iter_jsonl(path)
+    raise ValueError(f"Format d'import inconnu: {file_format}")
+
+
+def validate_record(data_manager, file_key: str, record: Any) -> Optional[str]:
+    """Retourne le motif de rejet d'un enregistrement importé (None s'il est valide)"""
+    if not isinstance(record, dict):
+        return "enregistrement non structuré"
+
+    missing = [field for field in data_manager.BULK_REQUIRED_FIELDS[file_key]
+               if record.get(field) in (None, '')]
+    if missing:
+        return f"champ(s) obligatoire(s) manquant(s): {', '.join(missing)}"
+
+    if file_key == 'flights':
+        try:
+            datetime.fromisoformat(str(record['heure_depart']))
+        except ValueError:
+            return f"heure_depart invalide: {record['heure_depart']}"
+        if record['aeroport_depart'] == record['aeroport_arrivee']:
+            return "aéroports de départ et d'arrivée identiques"
+
+    elif file_key == 'reservations':
+        if data_manager.get_flight_by_id(record['vol_numero']) is None:
+            return f"vol inexistant: {record['vol_numero']}"
+        if data_manager.get_passenger_by_id(record['passager_id']) is None:
+            return f"passager inexistant: {record['passager_id']}"
+
+    return None
+
+
+def bulk_add(data_manager, file_key: str, records: Iterable[Any],
+             chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Ajoute un grand nombre d'enregistrements à une collection.
+
+    Les enregistrements sont lus par lots de chunk_size ; chaque lot est
+    validé puis écrit en une seule transaction par DataManager.add_records
+    (une écriture du document par lot au lieu d'une par enregistrement).
+    Les enregistrements invalides (siège déjà occupé compris) ou dont la
+    clé primaire existe déjà sont ignorés et comptés dans le rapport ; un
+    lot dont l'écriture échoue est compté en entier dans 'failed'.
+
+    Args:
+        data_manager (DataManager): Destination des données
+        file_key (str): 'passengers', 'flights' ou 'reservations'
+        records: Itérable de dictionnaires (consommé au fil de l'eau)
+        chunk_size (int): Taille des lots (défaut: DataManager.BULK_CHUNK_SIZE)
+
+    Returns:
+        Dict: Rapport {'added', 'duplicates', 'invalid', 'failed', 'errors',
+        'seconds', 'rate'} ; 'errors' contient les premiers messages
+    """
+    if file_key not in data_manager.BULK_REQUIRED_FIELDS:
+        raise ValueError(f"Import en masse non supporté pour {file_key}")
+    chunk_size = chunk_size or data_manager.BULK_CHUNK_SIZE
+    key_field = data_manager.PRIMARY_KEYS[file_key]
+    defaults = data_manager.BULK_DEFAULTS.get(file_key, {})
+    report = {'added': 0, 'duplicates': 0, 'invalid': 0, 'failed': 0, 'errors': [],
+              'seconds': 0.0, 'rate': 0.0}
+
+    def reject(counter: str, row_number: int, message: str):
+        report[counter] += 1
+        if len(report['errors']) < 100:
+            report['errors'].append(f"Ligne {row_number}: {message}")
+
+    start = time.perf_counter()
+    rows = enumerate(records, 1)
+    chunk_number = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk_number += 1
+        chunk_start = time.perf_counter()
+
+        created_at = datetime.now().isoformat()
+        row_numbers, batch = [], []
+        for row_number, record in chunk:
+            error = validate_record(data_manager, file_key, record)
+            if error:
+                reject('invalid', row_number, error)
+                continue
+            record = dict(defaults, **record)
+            if not record.get(key_field):
+                # Identifiant généré comme dans les formulaires
+                record[key_field] = str(uuid.uuid4())
+            record.setdefault('created_at', created_at)
+            row_numbers.append(row_number)
+            batch.append(record)
+
+        try:
+            result = data_manager.add_records(file_key, batch)
+        except IOError as e:
+            report['failed'] += len(batch)
+            report['errors'].append(f"Lot {chunk_number}: {e}")
+            print(f"❌ Lot {chunk_number}: {e}")
+            continue
+        for counter in ('duplicates', 'invalid'):
+            for position, message in result[counter].items():
+                reject(counter, row_numbers[position], message)
+        added = len(result['added'])
+        report['added'] += added
+        elapsed = time.perf_counter() - chunk_start
+        print(f"✓ Lot {chunk_number}: {added}/{len(chunk)} enregistrement(s) ajouté(s) "
+              f"({added / elapsed if elapsed else 0:.0f} enr./s)")
+
+    report['seconds'] = time.perf_counter() - start
+    if report['seconds']:
+        report['rate'] = report['added'] / report['seconds']
+    print(f"✓ Import {file_key}: {report['added']} ajouté(s), {report['duplicates']} doublon(s), "
+          f"{report['invalid']} invalide(s), {report['failed']} non écrit(s) en {report['seconds']:.1f}s "
+          f"({report['rate']:.0f} enr./s)")
+    return report
+
+
+def main(argv=None) -> int:
+    from data.data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Import en masse dans les données de l'application")
+    parser.add_argument('collection', choices=sorted(DataManager.BULK_REQUIRED_FIELDS))
+    parser.add_argument('path', type=Path, help="Fichier CSV ou JSONL (éventuellement .gz)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], dest='file_format')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--storage', default='json')
+    parser.add_argument('--chunk-size', type=int, default=DataManager.BULK_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if not args.path.exists():
+        print(f"❌ Fichier introuvable: {args.path}")
+        return 1
+
+    data_manager = DataManager(args.data_dir, storage=args.storage)
+    try:
+        report = data_manager.bulk_add(args.collection, iter_file(args.path, args.file_format),
+                                       chunk_size=args.chunk_size)
+    finally:
+        data_manager.flush()
+        data_manager.storage.close()
+
+    for error in report['errors']:
+        print(f"⚠️ {error}")
+    if report['failed']:
+        return 1
+    return 0 if report['added'] or not (report['invalid'] or report['duplicates']) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Affectation des avions aux vols du programme (voir Core.assignment).
+
+Sont affectés les vols programmés de la période qui n'ont pas encore
+d'avion (tous les vols programmés de la période avec reassign). Les
+autres vols munis d'un avion — en vol, terminés, déjà affectés ou hors
+période — sont imposés à leur avion, relevés dans l'index des créneaux
+(DataManager.flight_schedule) : l'avion n'en reçoit aucun qui les
+chevauche et repart de l'aéroport d'arrivée du dernier d'entre eux.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from Core.assignment import FlightSlot, Tail, assign_fleet, number_or_none, range_sufficient
+from Core.enums import EtatAvion
+
+
+def plan_assignments(data_manager, start: Any = None, end: Any = None, apply: bool = False,
+                     reassign: bool = False) -> Dict[str, Any]:
+    """
+    Affecte un avion à chaque vol programmé de la période, en une passe.
+
+    Args:
+        data_manager (DataManager): Source des vols, avions et réservations
+        start: Début de la période (heure de départ), None pour sans limite
+        end: Fin de la période (incluse), None pour sans limite
+        apply (bool): Enregistre les avions choisis dans les vols (une transaction)
+        reassign (bool): Réaffecte aussi les vols programmés ayant déjà un avion
+
+    Returns:
+        Dict: {'assignments': {numero_vol: num_id}, 'unassigned': {numero_vol: motif}}
+    """
+    if start is None and end is None:
+        data_manager.load_partitions('flights')
+        flights = list(data_manager.get_flights())
+    else:
+        flights = data_manager.flights_between(start or '0001-01-01', end or '9999-12-31')
+    flights = [flight for flight in flights
+               if flight.get('statut') in data_manager.ASSIGNABLE_STATUSES
+               and (reassign or not flight.get('avion_utilise'))]
+
+    passengers = {}
+    for reservation in data_manager.query('reservations', {'statut': 'active'}, fields=['vol_numero']):
+        flight_number = reservation.get('vol_numero')
+        passengers[flight_number] = passengers.get(flight_number, 0) + 1
+
+    slots = []
+    unassigned = {}
+    for flight in flights:
+        number = flight.get('numero_vol')
+        window = data_manager.flight_window(flight)
+        if window is None:
+            unassigned[number] = "Horaires invalides"
+            continue
+        distance = flight.get('distance_km')
+        if not isinstance(distance, (int, float)):
+            distance = data_manager.distance(flight.get('aeroport_depart'), flight.get('aeroport_arrivee'))
+        if distance is None:
+            unassigned[number] = "Distance inconnue"
+            continue
+        slots.append(FlightSlot(number, flight.get('aeroport_depart'), flight.get('aeroport_arrivee'),
+                                window[0], window[1], float(distance), passengers.get(number, 0)))
+
+    fleet = _operational_fleet(data_manager)
+    committed = _committed_flights(data_manager, fleet, slots)
+    assignments, rejected = assign_fleet(slots, fleet, committed=committed)
+    unassigned.update(rejected)
+
+    if apply:
+        distances = {slot.key: slot.distance for slot in slots}
+        autonomies = {tail.key: tail.autonomy for tail in fleet}
+        with data_manager.transaction():
+            for number, aircraft_id in assignments.items():
+                flight = data_manager.get_flight_by_id(number)
+                if flight is not None and flight.get('avion_utilise') != aircraft_id:
+                    data_manager.update_flight(number, {
+                        'avion_utilise': aircraft_id,
+                        'autonomie_suffisante': range_sufficient(distances[number], autonomies[aircraft_id])
+                    })
+
+    print(f"✓ Affectation: {len(assignments)} vols affectés, {len(unassigned)} sans avion")
+    return {'assignments': assignments, 'unassigned': unassigned}
+
+
+def _operational_fleet(data_manager) -> List[Tail]:
+    """Avions opérationnels, à l'aéroport où ils sont stationnés (None si inconnu)"""
+    fleet = []
+    for aircraft in data_manager.get_aircraft():
+        try:
+            if not EtatAvion(aircraft.get('etat')).est_operationnel():
+                continue
+        except ValueError:
+            continue
+        airport = data_manager.nearest_airport(aircraft.get('localisation') or {}, data_manager.AIRPORT_MATCH_KM)
+        fleet.append(Tail(aircraft.get('num_id'), airport['code_iata'] if airport else None,
+                          number_or_none(aircraft.get('capacite')),
+                          number_or_none(aircraft.get('autonomie'))))
+    return fleet
+
+
+def _committed_flights(data_manager, fleet: List[Tail], slots: List[FlightSlot]) -> Dict[str, List[FlightSlot]]:
+    """
+    Vols imposés à chaque avion autour de la période affectée: le dernier
+    vol arrivé avant son début (position de l'avion), ceux qui la
+    chevauchent et le premier parti après sa fin.
+    """
+    if not slots or not fleet:
+        return {}
+    first = min(slot.departure for slot in slots)
+    last = max(slot.arrival for slot in slots)
+    planned = {slot.key for slot in slots}
+
+    schedule = data_manager.flight_schedule()
+    committed = {}
+    for tail in fleet:
+        kept = []
+        before, after = None, None
+        for departure, arrival, flight in schedule.slots(('avion', tail.key)):
+            if flight.get('numero_vol') in planned:
+                continue
+            if arrival <= first:
+                if before is None or arrival > before[1]:
+                    before = (departure, arrival, flight)
+            elif departure < last:
+                kept.append((departure, arrival, flight))
+            elif after is None:
+                after = (departure, arrival, flight)
+        kept.extend(entry for entry in (before, after) if entry is not None)
+        if kept:
+            committed[tail.key] = [_committed_slot(entry) for entry in kept]
+    return committed
+
+
+def _committed_slot(entry: Tuple[datetime, datetime, Dict[str, Any]]) -> FlightSlot:
+    departure, arrival, flight = entry
+    return FlightSlot(flight.get('numero_vol'), flight.get('aeroport_depart'),
+                      flight.get('aeroport_arrivee'), departure, arrival, 0.0, 0)
+
@@ -0,0 +1,367 @@
+"""
+Requêtes sur les collections du DataManager.
+
+Une requête est une liste de prédicats combinés par ET, chacun de la
+forme `(champ, opérateur, valeur)` :
+
+    eq        champ == valeur
+    in        champ dans une collection de valeurs
+    range     bornes (min, max) incluses, None pour une borne ouverte
+    prefix    chaîne commençant par la valeur
+    contains  sous-chaîne, sans tenir compte de la casse ; le champ peut
+              être un tuple de champs (au moins un doit contenir la valeur)
+
+Un prédicat peut aussi être une fonction `f(enregistrement) -> bool`
+(colonnes calculées ou jointes). Un dictionnaire `{champ: valeur}` est
+accepté comme raccourci pour des égalités.
+
+plan_query choisit, parmi les index primaire et secondaires fournis par
+le DataManager, le plus sélectif pour les prédicats 'eq', 'in' et
+'range' ; run_query compile les prédicats restants en une seule fonction
+appliquée aux candidats, puis trie, découpe et projette le résultat. Les ordres de
+tri fréquents sont maintenus (SortedIndex) pour servir des pages sans
+trier la collection.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Callable, Tuple, Union
+
+
+Predicate = Union[Tuple[str, str, Any], Callable[[Dict[str, Any]], bool]]
+
+# Opérateurs dont le résultat peut être lu dans un index
+INDEXABLE_OPERATORS = ('eq', 'in', 'range')
+
+_MISSING = object()
+
+
+def normalize_where(where: Union[None, Dict[str, Any], Iterable[Predicate]]) -> List[Predicate]:
+    """
+    Convertit une clause en liste de prédicats.
+
+    Raises:
+        ValueError: Si un prédicat est mal formé ou son opérateur inconnu
+    """
+    if not where:
+        return []
+    if isinstance(where, dict):
+        return [(field, 'eq', value) for field, value in where.items()]
+
+    predicates = []
+    for predicate in where:
+        if callable(predicate):
+            predicates.append(predicate)
+            continue
+        try:
+            field, op, value = predicate
+        except (TypeError, ValueError):
+            raise ValueError(f"Prédicat invalide: {predicate!r}")
+        if op not in _COMPILERS:
+            raise ValueError(f"Opérateur inconnu: {op}")
+        if op == 'range' and (not isinstance(value, (tuple, list)) or len(value) != 2):
+            raise ValueError(f"'range' attend un couple (min, max): {value!r}")
+        predicates.append((field, op, value))
+    return predicates
+
+
+def _compile_eq(get, value):
+    return lambda record: get(record) == value
+
+
+def _compile_in(get, values):
+    values = set(values)
+    return lambda record: get(record) in values
+
+
+def _compile_range(get, bounds):
+    low, high = bounds
+
+    def match(record):
+        value = get(record)
+        if value is None or value is _MISSING:
+            return False
+        try:
+            return (low is None or value >= low) and (high is None or value <= high)
+        except TypeError:
+            return False
+    return match
+
+
+def _compile_prefix(get, prefix):
+    def match(record):
+        value = get(record)
+        return isinstance(value, str) and value.startswith(prefix)
+    return match
+
+
+def _compile_contains(gets, text):
+    text = str(text).lower()
+
+    def match(record):
+        for get in gets:
+            value = get(record)
+            if value is not None and value is not _MISSING and text in str(value).lower():
+                return True
+        return False
+    return match
+
+
+_COMPILERS = {
+    'eq': _compile_eq,
+    'in': _compile_in,
+    'range': _compile_range,
+    'prefix': _compile_prefix,
+    'contains': _compile_contains
+}
+
+
+def compile_predicates(predicates: List[Predicate],
+                       computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None
+                       ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """
+    Compile des prédicats en une fonction unique (None si aucun).
+
+    Args:
+        predicates (List): Prédicats normalisés (voir normalize_where)
+        computed (Dict): Champs calculés {champ: fonction(enregistrement)}
+            (ex: 'date_depart' des vols), lus à la place du champ stocké
+    """
+    computed = computed or {}
+
+    def getter(field):
+        if field in computed:
+            return computed[field]
+        return lambda record: record.get(field, _MISSING)
+
+    tests = []
+    for predicate in predicates:
+        if callable(predicate):
+            tests.append(predicate)
+            continue
+        field, op, value = predicate
+        if op == 'contains':
+            fields = field if isinstance(field, (tuple, list)) else (field,)
+            tests.append(_compile_contains([getter(name) for name in fields], value))
+        else:
+            tests.append(_COMPILERS[op](getter(field), value))
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    return lambda record: all(test(record) for test in tests)
+
+
+def sort_key(field: str, descending: bool = False) -> Callable[[Dict[str, Any]], Tuple]:
+    """Clé de tri d'un champ ; les valeurs absentes sont placées en dernier"""
+    def key(record):
+        value = record.get(field)
+        missing = value is None
+        return (not missing if descending else missing, 0 if missing else value)
+    return key
+
+
+def sort_records(records: List[Dict[str, Any]], order_by: Union[None, str, Iterable[str]]) -> List[Dict[str, Any]]:
+    """
+    Trie des enregistrements selon un ou plusieurs champs.
+
+    Args:
+        records (List): Enregistrements (liste triée sur place)
+        order_by: Champ ou liste de champs, préfixés par '-' pour un ordre décroissant
+    """
+    if not order_by:
+        return records
+    fields = [order_by] if isinstance(order_by, str) else list(order_by)
+    # Tris stables successifs, du critère secondaire au critère principal
+    for field in reversed(fields):
+        descending = field.startswith('-')
+        name = field[1:] if descending else field
+        try:
+            records.sort(key=sort_key(name, descending), reverse=descending)
+        except TypeError:
+            # Types hétérogènes: comparaison de leur représentation textuelle
+            text_key = sort_key(name, descending)
+            records.sort(key=lambda record: tuple(map(str, text_key(record))), reverse=descending)
+    return records
+
+
+def project(record: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Copie restreinte aux champs demandés (l'enregistrement lui-même si fields est None)"""
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def plan_query(predicates: List[Predicate],
+               lookups: Dict[str, Callable[[str, Any], Optional[List[Dict[str, Any]]]]]
+               ) -> Tuple[Optional[List[Dict[str, Any]]], List[Predicate]]:
+    """
+    Choisit la source des candidats d'une requête: l'index donnant le
+    moins de candidats parmi les prédicats indexables.
+
+    Args:
+        predicates (List): Prédicats normalisés
+        lookups (Dict): Index utilisables {champ: lookup(op, valeur)} ;
+            lookup retourne les candidats, ou None s'il ne sert pas l'opérateur
+
+    Returns:
+        Tuple: (candidats, None pour un parcours complet ; prédicats
+        restant à appliquer)
+    """
+    best, best_position = None, None
+    for position, predicate in enumerate(predicates):
+        if callable(predicate):
+            continue
+        field, op, value = predicate
+        lookup = lookups.get(field) if isinstance(field, str) else None
+        if lookup is None or op not in INDEXABLE_OPERATORS:
+            continue
+        candidates = lookup(op, value)
+        if candidates is not None and (best is None or len(candidates) < len(best)):
+            best, best_position = candidates, position
+
+    if best is None:
+        return None, predicates
+    return best, predicates[:best_position] + predicates[best_position + 1:]
+
+
+def run_query(candidates: Iterable[Dict[str, Any]], predicates: List[Predicate],
+              computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+              order_by=None, limit: Optional[int] = None, offset: int = 0,
+              fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Filtre, trie, découpe et projette des candidats (voir DataManager.query).
+    """
+    test = compile_predicates(predicates, computed)
+    records = candidates if test is None else filter(test, candidates)
+
+    stop = offset + limit if limit is not None else None
+    if order_by:
+        records = sort_records(list(records), order_by)[offset:stop]
+    else:
+        records = islice(records, offset, stop)
+    return [project(record, fields) for record in records]
+
+
+def run_page(candidates: Optional[List[Dict[str, Any]]], predicates: List[Predicate],
+             computed: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]], offset: int,
+             limit: int, sort_key: Optional[str] = None,
+             order: Optional['SortedIndex'] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Page d'une requête et nombre total de correspondances (voir DataManager.get_page).
+
+    Args:
+        candidates (List): Candidats (voir plan_query), None pour lire
+            directement la page dans order (aucun filtre)
+        predicates (List): Prédicats restant à appliquer aux candidats
+        computed (Dict): Champs calculés (voir compile_predicates)
+        offset (int): Rang du premier enregistrement
+        limit (int): Taille de la page
+        sort_key (str): Champ de tri, '-champ' pour un ordre décroissant
+        order (SortedIndex): Ordre maintenu du champ de tri, s'il existe
+
+    Returns:
+        Tuple: (enregistrements de la page, nombre de correspondances)
+    """
+    descending = bool(sort_key) and sort_key.startswith('-')
+    if candidates is None:
+        return order.page(offset, limit, descending), len(order)
+
+    test = compile_predicates(predicates, computed)
+    if order is not None and len(candidates) >= len(order):
+        # Aucun index sélectif: parcours de l'ordre maintenu, sans tri
+        matches = order.iterate(descending)
+        if test is not None:
+            matches = filter(test, matches)
+        items, total = [], 0
+        for record in matches:
+            if offset <= total < offset + limit:
+                items.append(record)
+            total += 1
+        return items, total
+
+    matches = list(candidates if test is None else filter(test, candidates))
+    if sort_key:
+        sort_records(matches, sort_key)
+    return matches[offset:offset + limit], len(matches)
+
+
+class SortedIndex:
+    """
+    Ordre de tri maintenu d'une collection sur un champ.
+
+    Les enregistrements sont rangés par (valeur absente, valeur) dans deux
+    listes parallèles : ajout et retrait par dichotomie, lecture d'une page
+    ou d'un intervalle de valeurs sans tri ni parcours complet.
+
+    Args:
+        field: Nom de l'ordre (champ trié)
+        records: Enregistrements initiaux
+        value_of: Fonction value_of(enregistrement) -> valeur triée (valeur
+            normalisée ou composite) ; lecture du champ par défaut
+
+    Raises:
+        TypeError: Si les valeurs du champ ne sont pas comparables entre elles
+    """
+
+    def __init__(self, field: Any, records: Iterable[Dict[str, Any]] = (),
+                 value_of: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.field = field
+        self._value_of = value_of or (lambda record: record.get(field))
+        entries = sorted(((self._key(record), record) for record in records), key=lambda entry: entry[0])
+        self._keys = [key for key, _ in entries]
+        self._records = [record for _, record in entries]
+
+    def __len__(self):
+        return len(self._records)
+
+    def _key(self, record: Dict[str, Any]) -> Tuple:
+        value = self._value_of(record)
+        return (True, '') if value is None else (False, value)
+
+    def add(self, record: Dict[str, Any]):
+        """Insère un enregistrement à sa place"""
+        key = self._key(record)
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._records.insert(position, record)
+
+    def remove(self, record: Dict[str, Any]):
+        """Retire un enregistrement (avec sa valeur actuelle du champ)"""
+        key = self._key(record)
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position] == key:
+            if self._records[position] is record:
+                del self._keys[position]
+                del self._records[position]
+                return
+            position += 1
+
+    def _ranges(self, descending: bool) -> List[range]:
+        """Positions dans l'ordre demandé, valeurs absentes en dernier"""
+        if not descending:
+            return [range(len(self._records))]
+        present = bisect_left(self._keys, (True,))
+        return [range(present - 1, -1, -1), range(present, len(self._records))]
+
+    def iterate(self, descending: bool = False) -> Iterator[Dict[str, Any]]:
+        """Parcourt les enregistrements dans l'ordre"""
+        for positions in self._ranges(descending):
+            for position in positions:
+                yield self._records[position]
+
+    def page(self, offset: int, limit: Optional[int], descending: bool = False) -> List[Dict[str, Any]]:
+        """Enregistrements de rang offset à offset + limit (exclu)"""
+        stop = len(self._records) if limit is None else offset + limit
+        items = []
+        for positions in self._ranges(descending):
+            items.extend(self._records[position] for position in positions[max(offset, 0):max(stop, 0)])
+            offset -= len(positions)
+            stop -= len(positions)
+        return items
+
+    def between(self, low: Any, high: Any) -> List[Dict[str, Any]]:
+        """Enregistrements dont la valeur est comprise entre low et high (inclus), dans l'ordre"""
+        start = bisect_left(self._keys, (False, low))
+        stop = bisect_right(self._keys, (False, high))
+        return self._records[start:stop]
@@ -0,0 +1,64 @@
+"""
+Cache disque de la matrice des distances entre aéroports.
+
+La matrice est écrite dans `distances-<empreinte>.bin`, l'empreinte
+étant calculée sur les positions des aéroports : un cache d'une autre
+version des aéroports n'est jamais relu. Des aéroports seulement ajoutés
+n'entraînent que le calcul de leurs propres distances.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from Core.distances import RouteDistances
+from .storage import write_atomic
+
+
+def sync_route_distances(current: Optional[RouteDistances], points: Dict[str, Tuple[float, float]],
+                         cache_dir: Path) -> RouteDistances:
+    """
+    Met une matrice des distances en accord avec les positions des aéroports.
+
+    Args:
+        current (RouteDistances): Matrice en mémoire (None au premier appel)
+        points (Dict): Position de chaque aéroport
+        cache_dir (Path): Répertoire du cache disque
+
+    Returns:
+        RouteDistances: current complétée, relue depuis le cache ou recalculée
+    """
+    digest = hashlib.sha256(json.dumps(sorted(points.items())).encode('utf-8')).hexdigest()[:16]
+    cache_path = cache_dir / f'distances-{digest}.bin'
+
+    if current is not None and all(points.get(code) == point for code, point in current.points.items()):
+        # Aéroports seulement ajoutés: calcul de leurs lignes
+        if current.add_airports(points):
+            _save(current, cache_path)
+        return current
+
+    try:
+        distances = RouteDistances.from_bytes(cache_path.read_bytes())
+        if distances.points == points:
+            return distances
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Cache des distances illisible ({cache_path.name}): {e}")
+
+    distances = RouteDistances(points)
+    _save(distances, cache_path)
+    return distances
+
+
+def _save(distances: RouteDistances, cache_path: Path):
+    """Écrit la matrice des distances et supprime les caches périmés"""
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        write_atomic(cache_path, distances.to_bytes())
+        for stale in cache_path.parent.glob('distances-*.bin'):
+            if stale != cache_path:
+                stale.unlink()
+    except OSError as e:
+        print(f"⚠️ Cache des distances non écrit: {e}")
@@ -0,0 +1,1357 @@
+"""
+Moteurs de stockage du DataManager.
+
+Un moteur sait lire et écrire les documents des collections (aircraft,
+flights, passengers, ...). JsonStorage conserve le format historique (un
+fichier JSON par collection) ; JournaledJsonStorage y ajoute un journal
+append-only par collection ; PartitionedJsonStorage répartit les vols et
+les réservations en fichiers mensuels chargés à la demande ; SQLiteStorage range chaque collection dans
+une table et écrit ligne par ligne.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+
+class StorageEngine(ABC):
+    """Interface commune des moteurs de stockage"""
+
+    # Le moteur écrit les enregistrements individuellement (insert/update/delete)
+    row_writes = False
+
+    def __init__(self, list_keys: Dict[str, str], primary_keys: Dict[str, str]):
+        """
+        Initialise le moteur.
+
+        Args:
+            list_keys (Dict): Clé de liste de chaque collection
+            primary_keys (Dict): Clé primaire de chaque collection indexée
+        """
+        self.list_keys = list_keys
+        self.primary_keys = primary_keys
+
+    @abstractmethod
+    def exists(self, file_key: str) -> bool:
+        """Indique si le document existe dans le stockage"""
+        pass
+
+    @abstractmethod
+    def load(self, file_key: str) -> Any:
+        """Charge un document complet (lève une exception si illisible)"""
+        pass
+
+    @abstractmethod
+    def save(self, file_key: str, data: Dict[str, Any]):
+        """Remplace un document complet"""
+        pass
+
+    @abstractmethod
+    def location(self, file_key: str) -> str:
+        """Retourne une description lisible de l'emplacement du document"""
+        pass
+
+    @abstractmethod
+    def backup(self, target_dir: Path):
+        """Copie l'intégralité du stockage dans un répertoire"""
+        pass
+
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les enregistrements d'une collection un par un.
+
+        Par défaut le document est chargé entièrement ; les moteurs qui le
+        peuvent lisent les enregistrements au fil de l'eau.
+        """
+        data = self.load(file_key)
+        if isinstance(data, list):
+            yield from data
+        elif isinstance(data, dict):
+            yield from data.get(self.list_keys[file_key], [])
+
+    def signature(self, file_key: str) -> Any:
+        """
+        Retourne une valeur qui change quand le document est modifié sur
+        disque (par défaut: None, aucune détection des modifications externes)
+        """
+        return None
+
+    def insert(self, file_key: str, record: Dict[str, Any], data: Dict[str, Any]):
+        """Persiste l'ajout d'un enregistrement (par défaut: document complet)"""
+        self.save(file_key, data)
+
+    def update(self, file_key: str, record_id: Any, record: Dict[str, Any], data: Dict[str, Any]):
+        """Persiste la modification d'un enregistrement (par défaut: document complet)"""
+        self.save(file_key, data)
+
+    def delete(self, file_key: str, record_id: Any, data: Dict[str, Any]):
+        """Persiste la suppression d'un enregistrement (par défaut: document complet)"""
+        self.save(file_key, data)
+
+    def commit(self, changes: Dict[str, tuple]):
+        """
+        Persiste ensemble les modifications de plusieurs collections.
+
+        Par défaut les collections sont écrites l'une après l'autre ; les
+        moteurs qui le peuvent redéfinissent cette méthode pour que
+        l'ensemble soit appliqué en entier ou pas du tout.
+
+        Args:
+            changes (Dict): {collection: (document, opérations)} où opérations
+                vaut None (document complet) ou une liste (op, clé, enregistrement)
+        """
+        for file_key, (data, ops) in changes.items():
+            if ops is None:
+                self.save(file_key, data)
+                continue
+            for op, record_id, record in ops:
+                if op == 'insert':
+                    self.insert(file_key, record, data)
+                elif op == 'update':
+                    self.update(file_key, record_id, record, data)
+                else:
+                    self.delete(file_key, record_id, data)
+
+    def recover_transaction(self) -> bool:
+        """
+        Termine une validation multi-collections interrompue.
+
+        Returns:
+            bool: True si une validation a été rejouée
+        """
+        return False
+
+    def recover(self, file_key: str, deep: bool = False) -> bool:
+        """
+        Restaure un document endommagé depuis sa dernière version valide.
+
+        Args:
+            file_key (str): Collection à vérifier
+            deep (bool): Relire entièrement le document au lieu d'un contrôle rapide
+
+        Returns:
+            bool: True si une version antérieure a été restaurée
+        """
+        return False
+
+    def partition_of(self, file_key: str, record: Dict[str, Any]) -> Optional[str]:
+        """Partition d'un enregistrement (None si le moteur ne partitionne pas)"""
+        return None
+
+    def cold_partitions(self, file_key: str, start: Optional[str] = None,
+                        end: Optional[str] = None) -> List[str]:
+        """
+        Partitions non chargées d'une collection.
+
+        Args:
+            file_key (str): Collection
+            start (str): Date ISO de début de la période (incluse)
+            end (str): Date ISO de fin de la période (incluse)
+
+        Returns:
+            List: Partitions non encore chargées recouvrant la période
+        """
+        return []
+
+    def load_partitions(self, file_key: str, months: List[str]) -> List[Dict[str, Any]]:
+        """Charge des partitions et retourne leurs enregistrements"""
+        return []
+
+    def loaded_partitions(self, file_key: str) -> List[str]:
+        """Partitions présentes dans le dernier document chargé (avec celles chargées à la demande)"""
+        return []
+
+    def partition_of_key(self, file_key: str, key: Any) -> Optional[str]:
+        """Partition non chargée contenant une clé primaire (None si aucune)"""
+        return None
+
+    def close(self):
+        """Libère les ressources du moteur"""
+        pass
+
+
+class JsonStorage(StorageEngine):
+    """
+    Stockage historique: un fichier JSON indenté par collection.
+
+    Les écritures passent par un fichier temporaire du même répertoire,
+    synchronisé sur disque puis renommé atomiquement sur l'original : le
+    fichier principal est toujours soit l'ancienne, soit la nouvelle
+    version complète. Les `backup_depth` versions précédentes sont
+    conservées (`.json.bak`, `.json.bak.2`, ...).
+
+    Une validation multi-collections (commit) prépare tous les fichiers
+    temporaires puis écrit un fichier d'intention listant les renommages
+    à effectuer : après un arrêt brutal, recover_transaction() rejoue
+    l'intention en entier, sinon aucun fichier n'est modifié.
+    """
+
+    # Fichier d'intention des validations multi-collections
+    INTENT_FILENAME = '.transaction.json'
+
+    # Nombre de versions précédentes conservées par défaut
+    BACKUP_DEPTH = 3
+
+    def __init__(self, files: Dict[str, Path], list_keys: Dict[str, str],
+                 primary_keys: Dict[str, str], backup_depth: Optional[int] = None):
+        """
+        Args:
+            files (Dict): Chemin du fichier de chaque collection
+            backup_depth (int): Nombre de versions précédentes conservées
+        """
+        super().__init__(list_keys, primary_keys)
+        self.files = files
+        self.backup_depth = self.BACKUP_DEPTH if backup_depth is None else backup_depth
+
+    def exists(self, file_key: str) -> bool:
+        return self.files[file_key].exists()
+
+    def load(self, file_key: str) -> Any:
+        with open(self.files[file_key], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        # Analyse incrémentale: mémoire bornée par la taille d'un enregistrement
+        return iter_json_array(self.files[file_key], self.list_keys[file_key])
+
+    def save(self, file_key: str, data: Dict[str, Any]):
+        steps = self._prepare(file_key, data)
+        if len(steps) > 1:
+            # Plusieurs fichiers: passage par l'intention pour rester atomique
+            self._commit_steps(steps)
+            return
+        try:
+            for step in steps:
+                self._apply_step(*step)
+        except BaseException:
+            self._discard_steps(steps)
+            raise
+        _fsync_dir(self.files[file_key].parent)
+
+    def commit(self, changes: Dict[str, tuple]):
+        steps = []
+        try:
+            for file_key, (data, ops) in changes.items():
+                steps.extend(self._prepare(file_key, data))
+        except BaseException:
+            self._discard_steps(steps)
+            raise
+        self._commit_steps(steps)
+
+    def recover_transaction(self) -> bool:
+        intent_path = self.intent_path
+        if not intent_path.exists():
+            return False
+        try:
+            with open(intent_path, 'r', encoding='utf-8') as f:
+                intent = json.load(f)
+        except ValueError:
+            # Intention incomplète: la validation n'avait pas commencé
+            intent_path.unlink()
+            return False
+        self._redo(intent)
+        print("🔄 Validation interrompue rejouée")
+        return True
+
+    @property
+    def intent_path(self) -> Path:
+        return next(iter(self.files.values())).parent / self.INTENT_FILENAME
+
+    def _prepare(self, file_key: str, data: Dict[str, Any]) -> List[tuple]:
+        """
+        Prépare l'écriture d'un document.
+
+        Returns:
+            List: Étapes (collection, fichier temporaire, cible) ; un fichier
+            temporaire None signifie que la cible doit être supprimée
+        """
+        file_path = self.files[file_key]
+        return [(file_key, self._stage_file(file_path, data), str(file_path))]
+
+    def _stage_file(self, file_path: Path, data: Any) -> str:
+        """Écrit un document dans un fichier temporaire synchronisé sur disque"""
+        return _stage_temp(file_path, lambda f: json.dump(data, f, indent=2, ensure_ascii=False))
+
+    def _apply_step(self, file_key: str, temp_name: Optional[str], target: str):
+        """Installe un fichier temporaire sur sa cible (ou supprime la cible)"""
+        target_path = Path(target)
+        if temp_name is None:
+            if target_path.exists():
+                target_path.unlink()
+        elif os.path.exists(temp_name):
+            self._install(file_key, temp_name, target_path)
+        # Fichier temporaire absent: renommage déjà effectué
+
+    def _install(self, file_key: str, temp_name: str, target: Path):
+        """Rotation des versions précédentes puis remplacement atomique"""
+        if target.exists():
+            self._rotate_backups(target)
+        os.replace(temp_name, target)
+
+    @staticmethod
+    def _discard_steps(steps: List[tuple]):
+        """Supprime les fichiers temporaires d'étapes non appliquées"""
+        for _, temp_name, _ in steps:
+            if temp_name is not None and os.path.exists(temp_name):
+                os.unlink(temp_name)
+
+    def _commit_steps(self, steps: List[tuple], **extra):
+        """Écrit l'intention puis l'applique"""
+        intent = dict(extra, steps=steps)
+        try:
+            self._write_intent(intent)
+        except BaseException:
+            self._discard_steps(steps)
+            raise
+        self._redo(intent)
+
+    def _write_intent(self, intent: Dict[str, Any]):
+        """Écrit le fichier d'intention: à partir d'ici la validation est acquise"""
+        intent_path = self.intent_path
+        temp_path = intent_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(intent, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, intent_path)
+        _fsync_dir(intent_path.parent)
+
+    def _redo(self, intent: Dict[str, Any]):
+        """Applique une intention (idempotent) puis la supprime"""
+        directories = {self.intent_path.parent}
+        for file_key, temp_name, target in intent.get('steps', []):
+            self._apply_step(file_key, temp_name, target)
+            directories.add(Path(target).parent)
+        for directory in directories:
+            _fsync_dir(directory)
+        self.intent_path.unlink()
+
+    def backup_paths(self, file_key: str) -> List[Path]:
+        """Versions précédentes d'un document, de la plus récente à la plus ancienne"""
+        return self._backup_paths_of(self.files[file_key])
+
+    def _backup_paths_of(self, file_path: Path) -> List[Path]:
+        return [file_path.with_name(file_path.name + ('.bak' if generation == 1 else f'.bak.{generation}'))
+                for generation in range(1, self.backup_depth + 1)]
+
+    def recover(self, file_key: str, deep: bool = False) -> bool:
+        return self._recover_file(self.files[file_key], deep)
+
+    def _recover_file(self, file_path: Path, deep: bool = False) -> bool:
+        """Restaure un fichier absent ou tronqué depuis sa version précédente valide"""
+        # Fichiers temporaires laissés par une écriture interrompue
+        for temp_path in file_path.parent.glob(f'.{file_path.name}.*.tmp'):
+            temp_path.unlink()
+
+        if _is_valid_json(file_path, deep):
+            return False
+
+        for backup_path in self._backup_paths_of(file_path):
+            if _is_valid_json(backup_path, deep=True):
+                # Copie (et non renommage) pour conserver la version de secours
+                fd, temp_name = tempfile.mkstemp(dir=str(file_path.parent),
+                                                 prefix=f'.{file_path.name}.', suffix='.tmp')
+                os.close(fd)
+                shutil.copyfile(backup_path, temp_name)
+                os.replace(temp_name, file_path)
+                _fsync_dir(file_path.parent)
+                print(f"🔄 {file_path.name} restauré depuis {backup_path.name}")
+                return True
+        return False
+
+    def _rotate_backups(self, file_path: Path):
+        """Décale les versions précédentes et conserve la version courante"""
+        backups = self._backup_paths_of(file_path)
+        if not backups:
+            return
+        for older, newer in zip(reversed(backups[1:]), reversed(backups[:-1])):
+            if newer.exists():
+                os.replace(newer, older)
+        # Lien physique: la version courante reste en place jusqu'au renommage
+        if backups[0].exists():
+            backups[0].unlink()
+        try:
+            os.link(file_path, backups[0])
+        except OSError:
+            shutil.copy2(file_path, backups[0])
+
+    def signature(self, file_key: str) -> Any:
+        return _file_signature(self.files[file_key])
+
+    def location(self, file_key: str) -> str:
+        return self.files[file_key].name
+
+    def backup(self, target_dir: Path):
+        for file_path in self.files.values():
+            if file_path.exists():
+                backup_file = target_dir / file_path.name
+                with open(file_path, 'r', encoding='utf-8') as src:
+                    with open(backup_file, 'w', encoding='utf-8') as dst:
+                        dst.write(src.read())
+
+
+class JournaledJsonStorage(JsonStorage):
+    """
+    Stockage JSON journalisé.
+
+    Le fichier JSON de chaque collection sert d'instantané ; chaque ajout,
+    modification ou suppression est ajouté sous forme d'une ligne JSON
+    compacte au journal `<collection>.jsonl`. Le chargement rejoue le
+    journal sur l'instantané. Quand le journal dépasse `compact_threshold`
+    octets, il est replié dans un nouvel instantané puis vidé.
+
+    Les opérations du journal sont idempotentes ('put' remplace ou ajoute
+    l'enregistrement, 'del' le retire) : rejouer un journal déjà intégré
+    à l'instantané (arrêt entre l'écriture de l'instantané et la
+    suppression du journal) ne modifie pas le résultat.
+    """
+
+    row_writes = True
+
+    # Taille du journal déclenchant une compaction (octets)
+    COMPACT_THRESHOLD = 1024 * 1024
+
+    def __init__(self, files: Dict[str, Path], list_keys: Dict[str, str],
+                 primary_keys: Dict[str, str], compact_threshold: Optional[int] = None,
+                 sync: bool = True, backup_depth: Optional[int] = None):
+        """
+        Args:
+            compact_threshold (int): Taille du journal déclenchant une compaction
+            sync (bool): Forcer l'écriture sur disque (fsync) de chaque ligne
+        """
+        super().__init__(files, list_keys, primary_keys, backup_depth)
+        self.compact_threshold = compact_threshold or self.COMPACT_THRESHOLD
+        self.sync = sync
+
+    def journal_path(self, file_key: str) -> Path:
+        """Chemin du journal d'une collection"""
+        return self.files[file_key].with_suffix('.jsonl')
+
+    def exists(self, file_key: str) -> bool:
+        return super().exists(file_key) or self.journal_path(file_key).exists()
+
+    def signature(self, file_key: str) -> Any:
+        return (super().signature(file_key), _file_signature(self.journal_path(file_key)))
+
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        # Le rejeu du journal nécessite le document complet
+        if self.journal_path(file_key).exists() or not super().exists(file_key):
+            return StorageEngine.iter_records(self, file_key)
+        return super().iter_records(file_key)
+
+    def load(self, file_key: str) -> Any:
+        data = super().load(file_key) if super().exists(file_key) else {}
+        journal_path = self.journal_path(file_key)
+        if journal_path.exists():
+            self._replay(file_key, data, journal_path)
+        return data
+
+    def insert(self, file_key: str, record: Dict[str, Any], data: Dict[str, Any]):
+        self._append(file_key, [self._entry(file_key, 'insert', None, record, data)], data)
+
+    def update(self, file_key: str, record_id: Any, record: Dict[str, Any], data: Dict[str, Any]):
+        self._append(file_key, [self._entry(file_key, 'update', record_id, record, data)], data)
+
+    def delete(self, file_key: str, record_id: Any, data: Dict[str, Any]):
+        self._append(file_key, [self._entry(file_key, 'delete', record_id, None, data)], data)
+
+    def commit(self, changes: Dict[str, tuple]):
+        # Les opérations sur enregistrements sont recopiées dans l'intention
+        # pour pouvoir être rajoutées aux journaux après un arrêt brutal
+        steps, entries = [], {}
+        try:
+            for file_key, (data, ops) in changes.items():
+                if ops is None:
+                    steps.extend(self._prepare(file_key, data))
+                else:
+                    entries[file_key] = [
+                        self._entry(file_key, op, record_id, record, data)
+                        for op, record_id, record in ops
+                    ]
+        except BaseException:
+            self._discard_steps(steps)
+            raise
+        self._commit_steps(steps, entries=entries)
+
+        # Compaction des journaux devenus trop gros
+        for file_key in entries:
+            journal_path = self.journal_path(file_key)
+            if journal_path.exists() and journal_path.stat().st_size >= self.compact_threshold:
+                self.compact(file_key, changes[file_key][0])
+
+    def _install(self, file_key: str, temp_name: str, target: Path):
+        # Nouvel instantané puis journal vidé (dans cet ordre)
+        super()._install(file_key, temp_name, target)
+        journal_path = self.journal_path(file_key)
+        if target == self.files[file_key] and journal_path.exists():
+            journal_path.unlink()
+
+    def _redo(self, intent: Dict[str, Any]):
+        # Les opérations du journal étant idempotentes, les rajouter
+        # une seconde fois ne change pas le résultat du rejeu
+        for file_key, entries in intent.get('entries', {}).items():
+            self._write_entries(file_key, entries)
+        super()._redo(intent)
+
+    def _entry(self, file_key: str, op: str, record_id: Any,
+               record: Optional[Dict[str, Any]], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit la ligne de journal d'une opération"""
+        if op == 'delete':
+            entry = {'op': 'del', 'id': record_id}
+        else:
+            if op == 'insert':
+                record_id = record.get(self.primary_keys[file_key])
+            entry = {'op': 'put', 'id': record_id, 'rec': record}
+        entry['ts'] = data.get('last_modified')
+        return entry
+
+    def compact(self, file_key: str, data: Optional[Dict[str, Any]] = None):
+        """
+        Replie le journal d'une collection dans un nouvel instantané.
+
+        Args:
+            file_key (str): Collection à compacter
+            data (Dict): Document courant (rechargé depuis le disque si absent)
+        """
+        if data is None:
+            data = self.load(file_key)
+        self.save(file_key, data)
+        print(f"✓ Journal compacté: {self.location(file_key)}")
+
+    def backup(self, target_dir: Path):
+        super().backup(target_dir)
+        for file_key in self.files:
+            journal_path = self.journal_path(file_key)
+            if journal_path.exists():
+                shutil.copyfile(journal_path, target_dir / journal_path.name)
+
+    def _append(self, file_key: str, entries: List[Dict[str, Any]], data: Dict[str, Any]):
+        """Ajoute des lignes au journal et compacte si le seuil est dépassé"""
+        if self._write_entries(file_key, entries) >= self.compact_threshold:
+            self.compact(file_key, data)
+
+    def _write_entries(self, file_key: str, entries: List[Dict[str, Any]]) -> int:
+        """Écrit des lignes à la fin du journal et retourne sa nouvelle taille"""
+        lines = ''.join(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+                        for entry in entries)
+
+        with open(self.journal_path(file_key), 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def _replay(self, file_key: str, data: Dict[str, Any], journal_path: Path):
+        """Applique les opérations du journal au document chargé"""
+        list_key = self.list_keys[file_key]
+        key_field = self.primary_keys[file_key]
+        items = data.get(list_key, [])
+
+        # Position de chaque enregistrement par clé primaire (première occurrence)
+        positions = {}
+        for position, item in enumerate(items):
+            key = item.get(key_field)
+            if key is not None:
+                positions.setdefault(key, position)
+
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Ligne tronquée par un arrêt brutal pendant l'écriture
+                    print(f"⚠️ Ligne {line_number} ignorée dans {journal_path.name}")
+                    continue
+
+                record_id = entry.get('id')
+                position = positions.pop(record_id, None)
+
+                if entry.get('op') == 'put':
+                    record = entry['rec']
+                    key = record.get(key_field)
+                    if position is None:
+                        # Renommage déjà intégré à l'instantané
+                        position = positions.pop(key, None)
+                    if position is None:
+                        position = len(items)
+                        items.append(record)
+                    else:
+                        items[position] = record
+                    positions[key] = position
+                elif position is not None:
+                    items[position] = None
+
+                if entry.get('ts'):
+                    data['last_modified'] = entry['ts']
+
+        data[list_key] = [item for item in items if item is not None]
+
+
+class PartitionedJsonStorage(JsonStorage):
+    """
+    Stockage JSON partitionné par mois pour les collections datées.
+
+    Les vols (par `heure_depart`) et les réservations (par `date_creation`)
+    sont répartis dans un répertoire par collection contenant un fichier
+    par mois (`flights/2025-06.json`, ...) et un manifeste
+    (`flights/manifest.json`) décrivant chaque partition: nombre
+    d'enregistrements, nombre d'enregistrements encore ouverts (statut non
+    clos) et empreinte du contenu. Les enregistrements sans date valide
+    sont rangés dans la partition 'undated'.
+
+    Seules les partitions du mois courant et des mois suivants (ainsi que
+    les partitions plus anciennes contenant encore des enregistrements
+    ouverts) sont chargées par load() ; les autres sont chargées à la
+    demande par load_partitions(). Une sauvegarde ne réécrit que les
+    partitions dont le contenu a changé, puis le manifeste, le tout via le
+    fichier d'intention. Les autres collections gardent le format
+    historique (un fichier JSON par collection).
+
+    Chaque partition est accompagnée de la liste de ses clés primaires
+    (`flights/2025-06.keys.json`, avec l'empreinte de la partition) : la
+    recherche d'une clé absente du cache (partition_of_key) ne lit que ces
+    listes, puis seule la partition qui la contient est chargée.
+
+    Un fichier `<collection>.json` existant est migré à la première
+    ouverture puis renommé en `<collection>.json.migrated`.
+    """
+
+    # Champ date déterminant la partition de chaque collection partitionnée
+    PARTITION_FIELDS = {
+        'flights': 'heure_depart',
+        'reservations': 'date_creation'
+    }
+
+    # Statuts des enregistrements clos (les autres sont "ouverts")
+    CLOSED_STATUSES = {
+        'flights': {'termine', 'annule'},
+        'reservations': {'terminee', 'annulee', 'expiree'}
+    }
+
+    MANIFEST_FILENAME = 'manifest.json'
+
+    # Partition des enregistrements sans date exploitable
+    UNDATED = 'undated'
+
+    MONTH_PATTERN = re.compile(r'\d{4}-\d{2}$')
+
+    def __init__(self, files: Dict[str, Path], list_keys: Dict[str, str],
+                 primary_keys: Dict[str, str], backup_depth: Optional[int] = None):
+        super().__init__(files, list_keys, primary_keys, backup_depth)
+        # Partitions présentes dans le dernier document chargé, par collection
+        self._loaded = {}
+        # Manifestes lus: {collection: (signature du fichier, manifeste)}
+        self._manifests = {}
+        # Clés des partitions: {(collection, mois): (empreinte, clés)}
+        self._partition_keys = {}
+
+        for file_key in self.PARTITION_FIELDS:
+            if file_key in self.files:
+                self._migrate_legacy(file_key)
+
+    def is_partitioned(self, file_key: str) -> bool:
+        return file_key in self.PARTITION_FIELDS and file_key in self.files
+
+    def partition_dir(self, file_key: str) -> Path:
+        """Répertoire des partitions d'une collection"""
+        return self.files[file_key].with_suffix('')
+
+    def manifest_path(self, file_key: str) -> Path:
+        return self.partition_dir(file_key) / self.MANIFEST_FILENAME
+
+    def partition_path(self, file_key: str, month: str) -> Path:
+        return self.partition_dir(file_key) / f'{month}.json'
+
+    def keys_path(self, file_key: str, month: str) -> Path:
+        """Fichier des clés primaires d'une partition"""
+        return self.partition_dir(file_key) / f'{month}.keys.json'
+
+    def partition_of(self, file_key: str, record: Dict[str, Any]) -> Optional[str]:
+        if not self.is_partitioned(file_key):
+            return None
+        value = record.get(self.PARTITION_FIELDS[file_key])
+        if isinstance(value, str) and self.MONTH_PATTERN.match(value[:7]):
+            return value[:7]
+        return self.UNDATED
+
+    def cold_partitions(self, file_key: str, start: Optional[str] = None,
+                        end: Optional[str] = None) -> List[str]:
+        if not self.is_partitioned(file_key):
+            return []
+        loaded = self._loaded.get(file_key, set())
+        months = []
+        for month in self._read_manifest(file_key)['partitions']:
+            if month in loaded or month == self.UNDATED:
+                continue
+            if (start is None or month >= start[:7]) and (end is None or month <= end[:7]):
+                months.append(month)
+        return sorted(months)
+
+    def load_partitions(self, file_key: str, months: List[str]) -> List[Dict[str, Any]]:
+        records = []
+        loaded = self._loaded.setdefault(file_key, set())
+        for month in months:
+            records.extend(self._load_partition(file_key, month))
+            loaded.add(month)
+        return records
+
+    def loaded_partitions(self, file_key: str) -> List[str]:
+        return self._ordered(self._loaded.get(file_key, ()))
+
+    def partition_of_key(self, file_key: str, key: Any) -> Optional[str]:
+        for month in self.cold_partitions(file_key):
+            if key in self._keys_of(file_key, month):
+                return month
+        return None
+
+    def _keys_of(self, file_key: str, month: str) -> set:
+        """
+        Clés primaires d'une partition, lues dans son fichier de clés (ou,
+        s'il est absent ou ne correspond plus à la partition, dans la
+        partition elle-même, parcourue en flux).
+        """
+        digest = self._read_manifest(file_key)['partitions'].get(month, {}).get('hash')
+        cached = self._partition_keys.get((file_key, month))
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        keys = None
+        try:
+            with open(self.keys_path(file_key, month), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('hash') == digest:
+                keys = set(stored.get('keys', []))
+        except (OSError, ValueError, AttributeError):
+            pass
+        if keys is None:
+            key_field = self.primary_keys[file_key]
+            path = self.partition_path(file_key, month)
+            records = iter_json_array(path, self.list_keys[file_key]) if path.exists() else ()
+            keys = {record.get(key_field) for record in records if isinstance(record, dict)}
+        self._partition_keys[(file_key, month)] = (digest, keys)
+        return keys
+
+    def exists(self, file_key: str) -> bool:
+        if not self.is_partitioned(file_key):
+            return super().exists(file_key)
+        return self.manifest_path(file_key).exists()
+
+    def load(self, file_key: str) -> Any:
+        if not self.is_partitioned(file_key):
+            return super().load(file_key)
+
+        manifest = self._read_manifest(file_key)
+        current = datetime.now().strftime('%Y-%m')
+        eager = [month for month, info in manifest['partitions'].items()
+                 if month == self.UNDATED or month >= current or info.get('open', 0) > 0]
+
+        data = dict(manifest['meta'])
+        records = data[self.list_keys[file_key]] = []
+        for month in self._ordered(eager):
+            records.extend(self._load_partition(file_key, month))
+        self._loaded[file_key] = set(eager)
+        return data
+
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        if not self.is_partitioned(file_key):
+            return super().iter_records(file_key)
+        return self._iter_all_partitions(file_key)
+
+    def _iter_all_partitions(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        """Parcourt en flux toutes les partitions, chargées ou non"""
+        for month in self._ordered(self._read_manifest(file_key)['partitions']):
+            yield from iter_json_array(self.partition_path(file_key, month), self.list_keys[file_key])
+
+    def _prepare(self, file_key: str, data: Dict[str, Any]) -> List[tuple]:
+        if not self.is_partitioned(file_key):
+            return super()._prepare(file_key, data)
+
+        list_key = self.list_keys[file_key]
+        groups = {}
+        for record in data.get(list_key, []):
+            groups.setdefault(self.partition_of(file_key, record), []).append(record)
+
+        # Copie: le manifeste lu reste celui du disque si l'écriture échoue
+        partitions = dict(self._read_manifest(file_key)['partitions'])
+        loaded = self._loaded.setdefault(file_key, set())
+
+        # Une partition non chargée ne peut pas être réécrite sans perdre son contenu
+        cold = sorted(month for month in groups if month in partitions and month not in loaded)
+        if cold:
+            raise ValueError(f"Partition(s) non chargée(s) de {file_key}: {', '.join(cold)}")
+
+        directory = self.partition_dir(file_key)
+        directory.mkdir(exist_ok=True)
+        closed = self.CLOSED_STATUSES.get(file_key, set())
+        key_field = self.primary_keys[file_key]
+        steps = []
+        try:
+            for month in self._ordered(groups):
+                records = groups[month]
+                text = json.dumps({list_key: records}, indent=2, ensure_ascii=False)
+                digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+                path = self.partition_path(file_key, month)
+                info = partitions.get(month)
+                if info is None or info.get('hash') != digest or not path.exists():
+                    steps.append((file_key, self._stage_text(path, text), str(path)))
+                    keys = {'hash': digest, 'keys': [record.get(key_field) for record in records]}
+                    keys_path = self.keys_path(file_key, month)
+                    steps.append((file_key, self._stage_text(keys_path, json.dumps(keys, ensure_ascii=False)),
+                                  str(keys_path)))
+                partitions[month] = {
+                    'count': len(records),
+                    'open': sum(1 for record in records if record.get('statut') not in closed),
+                    'hash': digest
+                }
+
+            # Partitions chargées devenues vides
+            for month in sorted(loaded & set(partitions) - set(groups)):
+                steps.append((file_key, None, str(self.partition_path(file_key, month))))
+                steps.append((file_key, None, str(self.keys_path(file_key, month))))
+                del partitions[month]
+            loaded.update(groups)
+
+            # Manifeste en dernier: il décrit les partitions installées avant lui
+            manifest = {'meta': {k: v for k, v in data.items() if k != list_key},
+                        'partitions': partitions}
+            manifest_path = self.manifest_path(file_key)
+            steps.append((file_key, self._stage_file(manifest_path, manifest), str(manifest_path)))
+        except BaseException:
+            self._discard_steps(steps)
+            raise
+        return steps
+
+    def _stage_text(self, file_path: Path, text: str) -> str:
+        """Écrit un texte déjà sérialisé dans un fichier temporaire synchronisé"""
+        return _stage_temp(file_path, lambda f: f.write(text))
+
+    def signature(self, file_key: str) -> Any:
+        if not self.is_partitioned(file_key):
+            return super().signature(file_key)
+        # Toute sauvegarde réécrit le manifeste
+        return _file_signature(self.manifest_path(file_key))
+
+    def location(self, file_key: str) -> str:
+        if not self.is_partitioned(file_key):
+            return super().location(file_key)
+        return f"{self.partition_dir(file_key).name}/"
+
+    def recover(self, file_key: str, deep: bool = False) -> bool:
+        if not self.is_partitioned(file_key):
+            return super().recover(file_key, deep)
+        manifest_path = self.manifest_path(file_key)
+        if not manifest_path.parent.exists():
+            return False
+        restored = self._recover_file(manifest_path, deep)
+        if not _is_valid_json(manifest_path, deep=True):
+            return restored
+        for month in self._read_manifest(file_key)['partitions']:
+            restored = self._recover_file(self.partition_path(file_key, month), deep) or restored
+        return restored
+
+    def backup(self, target_dir: Path):
+        super().backup(target_dir)
+        for file_key in self.PARTITION_FIELDS:
+            directory = self.partition_dir(file_key)
+            if self.is_partitioned(file_key) and directory.exists():
+                shutil.copytree(directory, target_dir / directory.name,
+                                ignore=shutil.ignore_patterns('*.bak*', '*.tmp'))
+
+    def _read_manifest(self, file_key: str) -> Dict[str, Any]:
+        """Lit le manifeste d'une collection (vide s'il n'existe pas encore)"""
+        manifest_path = self.manifest_path(file_key)
+        signature = _file_signature(manifest_path)
+        if signature is None:
+            return {'meta': {}, 'partitions': {}}
+        cached = self._manifests.get(file_key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self._manifests[file_key] = (signature, manifest)
+        return manifest
+
+    def _load_partition(self, file_key: str, month: str) -> List[Dict[str, Any]]:
+        path = self.partition_path(file_key, month)
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(self.list_keys[file_key], [])
+
+    def _ordered(self, months) -> List[str]:
+        """Mois dans l'ordre chronologique, partition sans date en dernier"""
+        return sorted(months, key=lambda month: (month == self.UNDATED, month))
+
+    def _migrate_legacy(self, file_key: str):
+        """Répartit un ancien fichier `<collection>.json` en partitions mensuelles"""
+        legacy_path = self.files[file_key]
+        if not legacy_path.exists():
+            return
+        if not self.manifest_path(file_key).exists():
+            data = super().load(file_key)
+            if isinstance(data, list):
+                data = {self.list_keys[file_key]: data}
+            # Toutes les partitions sont écrites (aucune n'existe encore)
+            self._loaded[file_key] = set()
+            self.save(file_key, data)
+            count = len(data.get(self.list_keys[file_key], []))
+            print(f"✓ {legacy_path.name}: {count} enregistrement(s) répartis par mois")
+        # Manifeste installé: l'ancien fichier est conservé à titre de trace
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + '.migrated'))
+        self._loaded.pop(file_key, None)
+
+
+class SQLiteStorage(StorageEngine):
+    """
+    Stockage SQLite embarqué (mode WAL).
+
+    Chaque collection est une table (ordre d'insertion conservé par `seq`,
+    clé primaire métier dans `pk`, enregistrement JSON dans `doc`) ; les
+    clés étrangères utilisées pour les recherches sont extraites dans des
+    colonnes indexées. Les autres champs des documents (last_modified,
+    document company, ...) sont rangés dans la table `documents`, avec un
+    compteur de version incrémenté (par des déclencheurs, y compris pour
+    les écritures faites hors de l'application) à chaque modification de
+    la collection.
+    """
+
+    row_writes = True
+
+    # Colonnes extraites et indexées par collection
+    FOREIGN_KEYS = {
+        'flights': ['avion_utilise', 'aeroport_depart', 'aeroport_arrivee', 'heure_depart'],
+        'reservations': ['vol_numero', 'passager_id']
+    }
+
+    def __init__(self, db_path: Path, list_keys: Dict[str, str],
+                 primary_keys: Dict[str, str]):
+        """
+        Args:
+            db_path (Path): Fichier de base de données
+        """
+        super().__init__(list_keys, primary_keys)
+        self.db_path = Path(db_path)
+        # Écritures différées possibles depuis une minuterie (accès sérialisés par le DataManager)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        """Crée les tables et index manquants"""
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS documents '
+                '(file_key TEXT PRIMARY KEY, doc TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0)'
+            )
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(documents)')]
+            if 'version' not in columns:
+                # Base créée avant l'ajout du compteur de version
+                self.conn.execute('ALTER TABLE documents ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+            for file_key in self.list_keys:
+                extra = ''.join(f', {column} TEXT' for column in self.FOREIGN_KEYS.get(file_key, []))
+                self.conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {file_key} '
+                    f'(seq INTEGER PRIMARY KEY AUTOINCREMENT, pk TEXT UNIQUE, doc TEXT NOT NULL{extra})'
+                )
+                for column in self.FOREIGN_KEYS.get(file_key, []):
+                    self.conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{file_key}_{column} ON {file_key} ({column})'
+                    )
+                for event in ('INSERT', 'UPDATE', 'DELETE'):
+                    self.conn.execute(
+                        f'CREATE TRIGGER IF NOT EXISTS version_{file_key}_{event.lower()} '
+                        f'AFTER {event} ON {file_key} BEGIN '
+                        f"UPDATE documents SET version = version + 1 WHERE file_key = '{file_key}'; END"
+                    )
+
+    def is_empty(self) -> bool:
+        """Indique si la base ne contient encore aucun document"""
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0] == 0
+
+    def exists(self, file_key: str) -> bool:
+        row = self.conn.execute(
+            'SELECT 1 FROM documents WHERE file_key = ?', (file_key,)
+        ).fetchone()
+        return row is not None
+
+    def load(self, file_key: str) -> Any:
+        row = self.conn.execute(
+            'SELECT doc FROM documents WHERE file_key = ?', (file_key,)
+        ).fetchone()
+        data = json.loads(row[0]) if row else {}
+
+        list_key = self.list_keys.get(file_key)
+        if list_key:
+            cursor = self.conn.execute(f'SELECT doc FROM {file_key} ORDER BY seq')
+            data[list_key] = [json.loads(doc) for (doc,) in cursor]
+        return data
+
+    def iter_records(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        cursor = self.conn.execute(f'SELECT doc FROM {file_key} ORDER BY seq')
+        for (doc,) in cursor:
+            yield json.loads(doc)
+
+    def save(self, file_key: str, data: Dict[str, Any]):
+        with self.conn:
+            self._save_document(file_key, data)
+
+    def insert(self, file_key: str, record: Dict[str, Any], data: Dict[str, Any]):
+        with self.conn:
+            self._save_meta(file_key, data)
+            self._insert_row(file_key, record)
+
+    def update(self, file_key: str, record_id: Any, record: Dict[str, Any], data: Dict[str, Any]):
+        with self.conn:
+            self._save_meta(file_key, data)
+            self._update_row(file_key, record_id, record)
+
+    def delete(self, file_key: str, record_id: Any, data: Dict[str, Any]):
+        with self.conn:
+            self._save_meta(file_key, data)
+            self._delete_row(file_key, record_id)
+
+    def commit(self, changes: Dict[str, tuple]):
+        # Une seule transaction SQLite pour toutes les collections
+        with self.conn:
+            for file_key, (data, ops) in changes.items():
+                if ops is None:
+                    self._save_document(file_key, data)
+                    continue
+                self._save_meta(file_key, data)
+                for op, record_id, record in ops:
+                    if op == 'insert':
+                        self._insert_row(file_key, record)
+                    elif op == 'update':
+                        self._update_row(file_key, record_id, record)
+                    else:
+                        self._delete_row(file_key, record_id)
+
+    def _save_document(self, file_key: str, data: Dict[str, Any]):
+        list_key = self.list_keys.get(file_key)
+        self._save_meta(file_key, data)
+        if list_key:
+            self.conn.execute(f'DELETE FROM {file_key}')
+            self.conn.executemany(self._insert_sql(file_key), self._unique_rows(file_key, data.get(list_key, [])))
+
+    def _insert_row(self, file_key: str, record: Dict[str, Any]):
+        self.conn.execute(self._insert_sql(file_key), self._row(file_key, record))
+
+    def _update_row(self, file_key: str, record_id: Any, record: Dict[str, Any]):
+        columns = ['pk', 'doc'] + self.FOREIGN_KEYS.get(file_key, [])
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        self.conn.execute(
+            f'UPDATE {file_key} SET {assignments} WHERE pk = ?',
+            self._row(file_key, record) + (self._key(record_id),)
+        )
+
+    def _delete_row(self, file_key: str, record_id: Any):
+        self.conn.execute(f'DELETE FROM {file_key} WHERE pk = ?', (self._key(record_id),))
+
+    def signature(self, file_key: str) -> Any:
+        # Compteur propre à la collection: une écriture d'une autre collection
+        # (par cette connexion ou une autre) ne le modifie pas
+        row = self.conn.execute(
+            'SELECT version FROM documents WHERE file_key = ?', (file_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def location(self, file_key: str) -> str:
+        return f"{self.db_path.name}:{file_key}"
+
+    def backup(self, target_dir: Path):
+        target = sqlite3.connect(str(target_dir / self.db_path.name))
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _save_meta(self, file_key: str, data: Dict[str, Any]):
+        """Enregistre les champs du document hors liste d'enregistrements"""
+        list_key = self.list_keys.get(file_key)
+        meta = {k: v for k, v in data.items() if k != list_key}
+        self.conn.execute(
+            'INSERT INTO documents (file_key, doc, version) VALUES (?, ?, 1) '
+            'ON CONFLICT(file_key) DO UPDATE SET doc = excluded.doc, version = version + 1',
+            (file_key, json.dumps(meta, ensure_ascii=False))
+        )
+
+    def _insert_sql(self, file_key: str) -> str:
+        columns = ['pk', 'doc'] + self.FOREIGN_KEYS.get(file_key, [])
+        placeholders = ', '.join('?' for _ in columns)
+        return f'INSERT INTO {file_key} ({", ".join(columns)}) VALUES ({placeholders})'
+
+    def _unique_rows(self, file_key: str, records: List[Dict[str, Any]]):
+        """Génère les lignes d'une liste; les clés en double sont stockées sans pk"""
+        seen = set()
+        for record in records:
+            row = self._row(file_key, record)
+            if row[0] is not None:
+                if row[0] in seen:
+                    row = (None,) + row[1:]
+                seen.add(row[0])
+            yield row
+
+    def _row(self, file_key: str, record: Dict[str, Any]) -> tuple:
+        key_field = self.primary_keys.get(file_key)
+        row = [self._key(record.get(key_field)) if key_field else None,
+               json.dumps(record, ensure_ascii=False)]
+        row.extend(record.get(column) for column in self.FOREIGN_KEYS.get(file_key, []))
+        return tuple(row)
+
+    @staticmethod
+    def _key(value: Any) -> Optional[str]:
+        return None if value is None else str(value)
+
+
+class _JsonStreamReader:
+    """Lecteur JSON incrémental: décode une valeur à la fois depuis un tampon"""
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    # Caractères pouvant prolonger un nombre (-12 peut devenir -12.25)
+    NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Lit le bloc suivant (en abandonnant la partie déjà décodée)"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Retourne le prochain caractère significatif ('' en fin de fichier)"""
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def take(self, expected: str) -> str:
+        """Consomme un caractère de structure parmi ceux attendus"""
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"JSON invalide: '{expected}' attendu, '{char}' trouvé")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Décode la valeur suivante (objet, tableau, chaîne, nombre...)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # Un nombre suivi seulement de chiffres, '.', 'e'... en bout de
+                # tampon peut se poursuivre dans le bloc suivant
+                if self.eof or self.NUMBER_TAIL.match(self.buffer, end).end() < len(self.buffer):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_json_array(path: Path, list_key: str, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Parcourt les éléments du tableau `list_key` d'un document JSON sans
+    charger le document entier.
+
+    Les autres champs de l'objet racine sont décodés puis ignorés ; un
+    document qui est directement un tableau est également accepté.
+
+    Args:
+        path (Path): Fichier JSON
+        list_key (str): Clé du tableau dans l'objet racine
+        chunk_size (int): Taille des blocs lus
+
+    Raises:
+        ValueError: Si le document est invalide (json.JSONDecodeError inclus)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _JsonStreamReader(f, chunk_size)
+
+        if reader.peek() != '[':
+            reader.take('{')
+            if reader.peek() == '}':
+                return
+            while True:
+                key = reader.value()
+                reader.take(':')
+                if key == list_key and reader.peek() == '[':
+                    break
+                reader.value()
+                if reader.take(',}') == '}':
+                    return
+
+        reader.take('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.value()
+            if reader.take(',]') == ']':
+                return
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """
+    Signature (inode, mtime en ns, taille) d'un fichier, None s'il n'existe
+    pas ; le remplacement atomique d'un fichier change son inode.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _is_valid_json(path: Path, deep: bool = False) -> bool:
+    """
+    Indique si un fichier contient un document JSON complet.
+
+    Le contrôle rapide vérifie seulement que le fichier n'est pas vide et se
+    termine par une accolade ou un crochet fermant (une écriture tronquée
+    ne passe pas) ; le contrôle complet relit le document.
+    """
+    try:
+        if deep:
+            with open(path, 'r', encoding='utf-8') as f:
+                json.load(f)
+            return True
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 64))
+            tail = f.read().rstrip()
+        return tail[-1:] in (b'}', b']')
+    except (OSError, ValueError):
+        return False
+
+
+def _stage_temp(path: Path, write, mode: str = 'w') -> str:
+    """
+    Écrit un fichier temporaire synchronisé sur disque, à côté de path.
+
+    Args:
+        path (Path): Fichier cible (le temporaire est créé dans son répertoire)
+        write: Fonction écrivant le contenu dans le fichier ouvert
+        mode (str): 'w' (texte UTF-8) ou 'wb'
+
+    Returns:
+        str: Chemin du fichier temporaire, à renommer sur la cible
+    """
+    fd, temp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return temp_name
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Écrit un fichier de façon atomique: fichier temporaire synchronisé puis
+    renommé sur la cible. Un lecteur voit l'ancien ou le nouveau contenu,
+    jamais un fichier partiel.
+    """
+    temp_name = _stage_temp(path, lambda f: f.write(data), 'wb')
+    try:
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path):
+    """Synchronise un répertoire pour rendre durable un renommage (POSIX)"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def migrate_json_to_sqlite(json_storage: JsonStorage, sqlite_storage: SQLiteStorage) -> Dict[str, int]:
+    """
+    Importe en une fois les fichiers JSON existants dans la base SQLite.
+
+    Args:
+        json_storage (JsonStorage): Source
+        sqlite_storage (SQLiteStorage): Destination
+
+    Returns:
+        Dict: Nombre d'enregistrements importés par collection
+    """
+    counts = {}
+    for file_key in json_storage.files:
+        if not json_storage.exists(file_key):
+            continue
+        try:
+            data = json_storage.load(file_key)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Migration de {file_key} ignorée: {e}")
+            continue
+
+        list_key = sqlite_storage.list_keys.get(file_key)
+        if isinstance(data, list):
+            data = {list_key or file_key: data}
+
+        sqlite_storage.save(file_key, data)
+        counts[file_key] = len(data.get(list_key, [])) if list_key else 1
+        print(f"✓ {file_key}: {counts[file_key]} enregistrement(s) importé(s)")
+
+    return counts
+
+
+if __name__ == "__main__":
+    # Migration manuelle: python -m data.storage [data_dir] [db_path]
+    from data.data_manager import DataManager
+
+    data_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path('data')
+    db_path = Path(sys.argv[2]) if len(sys.argv) > 2 else data_dir / DataManager.SQLITE_FILENAME
+
+    files = {key: data_dir / f'{key}.json' for key in DataManager.FILE_KEYS}
+    source = JsonStorage(files, DataManager.LIST_KEYS, DataManager.PRIMARY_KEYS)
+    target = SQLiteStorage(db_path, DataManager.LIST_KEYS, DataManager.PRIMARY_KEYS)
+    try:
+        counts = migrate_json_to_sqlite(source, target)
+        print(f"✓ Migration terminée: {sum(counts.values())} enregistrement(s) vers {db_path}")
+    finally:
+        target.close()
@@ -2,13 +2,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 
 # Ajouter le chemin du module Core
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from data.data_manager import DataManager
+from interfaces.tabs.tree_sync import row_iid, apply_row_change, bind_tree_to_changes
 
 # Importer les modules des onglets
 try:
@@ -173,6 +174,9 @@ class BaseTab(ABC):
 class DashboardTab(BaseTab):
     """Onglet tableau de bord avec statistiques en temps réel"""
     
+    # Fenêtre (heures) des prochains départs affichés
+    UPCOMING_HOURS = 6
+    
     def setup_ui(self):
         """Configure l'interface du dashboard"""
         # Titre principal
@@ -244,6 +248,12 @@ class DashboardTab(BaseTab):
         # Configuration responsive
         for i in range(4):
             stats_frame.grid_columnconfigure(i, weight=1)
+        
+        # Compteurs recalculés à chaque modification (une fois par cycle Tk),
+        # abonnement lié à la durée de vie de la section
+        bind_tree_to_changes(stats_frame, self.data_manager,
+                             ['flights', 'passengers', 'personnel', 'reservations'],
+                             lambda event: False, self.update_counters)
     
     def create_activity_section(self):
         """Crée la section d'activité récente"""
@@ -290,17 +300,7 @@ class DashboardTab(BaseTab):
     def refresh_data(self):
         """Rafraîchit les données du dashboard"""
         try:
-            # Charger les statistiques
-            flights = self.data_manager.get_flights()
-            passengers = self.data_manager.get_passengers()
-            personnel = self.data_manager.get_personnel()
-            reservations = self.data_manager.get_reservations()
-            
-            # Mettre à jour les variables
-            self.stat_vars["Vols"].set(str(len(flights)))
-            self.stat_vars["Passagers"].set(str(len(passengers)))
-            self.stat_vars["Personnel"].set(str(len(personnel)))
-            self.stat_vars["Réservations"].set(str(len(reservations)))
+            self.update_counters()
             
             # Mettre à jour l'activité récente
             self.update_activity_log()
@@ -310,6 +310,14 @@ class DashboardTab(BaseTab):
         except Exception as e:
             self.notification_center.show_error(f"Erreur mise à jour dashboard: {e}")
     
+    def update_counters(self):
+        """Met à jour les compteurs depuis les statistiques en mémoire"""
+        stats = self.data_manager.get_statistics()
+        self.stat_vars["Vols"].set(str(stats['total_flights']))
+        self.stat_vars["Passagers"].set(str(stats['total_passengers']))
+        self.stat_vars["Personnel"].set(str(stats['total_personnel']))
+        self.stat_vars["Réservations"].set(str(stats['total_reservations']))
+    
     def update_activity_log(self):
         """Met à jour le journal d'activité"""
         try:
@@ -317,10 +325,24 @@ class DashboardTab(BaseTab):
             self.activity_text.delete(1.0, tk.END)
             
             # Générer des informations d'activité
-            current_time = datetime.now().strftime("%H:%M:%S")
+            now = datetime.now()
+            current_time = now.strftime("%H:%M:%S")
+            
+            # Prochains départs (index horaire des vols)
+            upcoming = self.data_manager.flights_between(now, now + timedelta(hours=self.UPCOMING_HOURS))
+            departures = "\n".join(
+                f"• {flight.get('heure_depart', '')[11:16]} {flight.get('numero_vol', '')} "
+                f"{flight.get('aeroport_depart', '')} → {flight.get('aeroport_arrivee', '')}"
+                for flight in upcoming[:5]
+            ) or "• Aucun départ prévu"
+            if len(upcoming) > 5:
+                departures += f"\n• ... et {len(upcoming) - 5} autre(s)"
             
             activity_log = f"""🕐 Dernière mise à jour: {current_time}
 
+🛫 DÉPARTS DES {self.UPCOMING_HOURS} PROCHAINES HEURES:
+{departures}
+
 📊 RÉSUMÉ SYSTÈME:
 • Système opérationnel
 • Toutes les données chargées
@@ -480,6 +502,11 @@ class AircraftTab(BaseTab):
         self.frame.grid_rowconfigure(1, weight=1)
         self.frame.grid_columnconfigure(0, weight=1)
         
+        # Mise à jour ligne à ligne à chaque modification des avions ;
+        # la localisation dépend des aéroports (rafraîchissement complet)
+        bind_tree_to_changes(self.aircraft_tree, self.data_manager, ['aircraft', 'airports'],
+                             self.on_aircraft_changed, self.filter_aircraft)
+        
         # Double-clic pour modifier
         self.aircraft_tree.bind('<Double-1>', lambda e: self.edit_aircraft())
     
@@ -495,36 +522,43 @@ class AircraftTab(BaseTab):
                 self.aircraft_tree.delete(item)
             
             aircraft_list = self.data_manager.get_aircraft()
-            airports = {a['code_iata']: a['ville'] for a in self.data_manager.get_airports()}
             
             for aircraft in aircraft_list:
-                # Obtenir le nom de la ville depuis les coordonnées
-                location = "Inconnu"
-                if 'localisation' in aircraft:
-                    loc_coords = aircraft['localisation']
-                    for airport in self.data_manager.get_airports():
-                        if (abs(airport['coordonnees']['latitude'] - loc_coords.get('latitude', 0)) < 0.1 and
-                            abs(airport['coordonnees']['longitude'] - loc_coords.get('longitude', 0)) < 0.1):
-                            location = f"{airport['ville']} ({airport['code_iata']})"
-                            break
-                
-                values = (
-                    aircraft.get('num_id', ''),
-                    aircraft.get('modele', ''),
-                    aircraft.get('compagnie_aerienne', ''),
-                    aircraft.get('capacite', ''),
-                    aircraft.get('etat', 'au_sol').replace('_', ' ').title(),
-                    location,
-                    f"{aircraft.get('autonomie', 0)} km",
-                    aircraft.get('derniere_maintenance', 'Jamais')
-                )
-                
-                self.aircraft_tree.insert('', 'end', values=values)
+                self.aircraft_tree.insert('', 'end', iid=row_iid(self.aircraft_tree, aircraft.get('num_id')),
+                                          values=self.aircraft_row_values(aircraft))
             
             self.notification_center.show_info(f"Avions rafraîchis: {len(aircraft_list)} avions")
         except Exception as e:
             self.notification_center.show_error(f"Erreur refresh avions: {e}")
     
+    def aircraft_row_values(self, aircraft):
+        """Valeurs affichées pour un avion"""
+        # Obtenir le nom de la ville depuis les coordonnées
+        location = "Inconnu"
+        if 'localisation' in aircraft:
+            airport = self.data_manager.nearest_airport(aircraft['localisation'],
+                                                        self.data_manager.AIRPORT_MATCH_KM)
+            if airport:
+                location = f"{airport['ville']} ({airport['code_iata']})"
+        
+        return (
+            aircraft.get('num_id', ''),
+            aircraft.get('modele', ''),
+            aircraft.get('compagnie_aerienne', ''),
+            aircraft.get('capacite', ''),
+            aircraft.get('etat', 'au_sol').replace('_', ' ').title(),
+            location,
+            f"{aircraft.get('autonomie', 0)} km",
+            aircraft.get('derniere_maintenance', 'Jamais')
+        )
+    
+    def on_aircraft_changed(self, event):
+        """Répercute une modification sur la ligne de l'avion concerné"""
+        if event.collection != 'aircraft' or self.search_var.get() or self.filter_var.get() != "Tous":
+            # Aéroports modifiés ou vue filtrée: le filtre est réappliqué
+            return False
+        return apply_row_change(self.aircraft_tree, event, 'num_id', self.aircraft_row_values)
+    
     def new_aircraft(self):
         """Crée un nouvel avion"""
         if not AIRCRAFT_MODULE_AVAILABLE:
@@ -535,7 +569,6 @@ class AircraftTab(BaseTab):
             dialog = ModernAircraftDialog(self.frame.winfo_toplevel(), self.data_manager, 
                                         notification_center=self.notification_center)
             if dialog.result:
-                self.refresh_data()
                 self.notification_center.show_success("Nouvel avion créé")
         except Exception as e:
             self.notification_center.show_error(f"Erreur création avion: {e}")
@@ -555,13 +588,7 @@ class AircraftTab(BaseTab):
             item = self.aircraft_tree.item(selection[0])
             aircraft_id = item['values'][0]
             
-            all_aircraft = self.data_manager.get_aircraft()
-            aircraft_data = None
-            
-            for aircraft in all_aircraft:
-                if aircraft.get('num_id') == aircraft_id:
-                    aircraft_data = aircraft
-                    break
+            aircraft_data = self.data_manager.get_aircraft_by_id(str(aircraft_id))
             
             if not aircraft_data:
                 self.notification_center.show_error(f"Avion {aircraft_id} non trouvé")
@@ -570,7 +597,6 @@ class AircraftTab(BaseTab):
             dialog = ModernAircraftDialog(self.frame.winfo_toplevel(), self.data_manager, 
                                         aircraft_data, self.notification_center)
             if dialog.result:
-                self.refresh_data()
                 self.notification_center.show_success(f"Avion {aircraft_id} modifié")
         except Exception as e:
             self.notification_center.show_error(f"Erreur modification avion: {e}")
@@ -591,17 +617,13 @@ class AircraftTab(BaseTab):
                 if "Maintenance" in current_state:
                     if messagebox.askyesno("Terminer maintenance", 
                                          f"Terminer la maintenance de l'avion {aircraft_id} ?"):
-                        success, message = self.safe_manager.safe_change_aircraft_state(
+                        self.safe_manager.safe_change_aircraft_state(
                             aircraft_id, 'operationnel', "Maintenance terminée")
-                        if success:
-                            self.refresh_data()
                 else:
                     if messagebox.askyesno("Programmer maintenance", 
                                          f"Programmer une maintenance pour l'avion {aircraft_id} ?"):
-                        success, message = self.safe_manager.safe_change_aircraft_state(
+                        self.safe_manager.safe_change_aircraft_state(
                             aircraft_id, 'en_maintenance', "Maintenance programmée")
-                        if success:
-                            self.refresh_data()
             else:
                 self.notification_center.show_warning("Gestionnaire de maintenance non disponible")
                 
@@ -632,9 +654,7 @@ class AircraftTab(BaseTab):
                                       f"Supprimer l'avion {aircraft_id} ({aircraft_model}) ?\n\n"
                                       "Cette action est irréversible."):
                     
-                    success, message = self.safe_manager.safe_delete_aircraft(aircraft_id)
-                    if success:
-                        self.refresh_data()
+                    self.safe_manager.safe_delete_aircraft(aircraft_id)
             else:
                 self.notification_center.show_error("Gestionnaire sécurisé non disponible")
                 
@@ -667,28 +687,8 @@ class AircraftTab(BaseTab):
             if search_text and search_text not in searchable_text:
                 continue
             
-            # Obtenir la localisation
-            location = "Inconnu"
-            if 'localisation' in aircraft:
-                loc_coords = aircraft['localisation']
-                for airport in self.data_manager.get_airports():
-                    if (abs(airport['coordonnees']['latitude'] - loc_coords.get('latitude', 0)) < 0.1 and
-                        abs(airport['coordonnees']['longitude'] - loc_coords.get('longitude', 0)) < 0.1):
-                        location = f"{airport['ville']} ({airport['code_iata']})"
-                        break
-            
-            values = (
-                aircraft.get('num_id', ''),
-                aircraft.get('modele', ''),
-                aircraft.get('compagnie_aerienne', ''),
-                aircraft.get('capacite', ''),
-                state_display,
-                location,
-                f"{aircraft.get('autonomie', 0)} km",
-                aircraft.get('derniere_maintenance', 'Jamais')
-            )
-            
-            self.aircraft_tree.insert('', 'end', values=values)
+            self.aircraft_tree.insert('', 'end', iid=row_iid(self.aircraft_tree, aircraft.get('num_id')),
+                                      values=self.aircraft_row_values(aircraft))
             filtered_count += 1
         
         if search_text or filter_state != "Tous":
@@ -840,8 +840,10 @@ class TabManager:
         else:
             return
         
-        # Supprimer l'onglet actuel
+        # Supprimer l'onglet actuel (sa destruction met fin à ses abonnements)
+        current_frame = self.notebook.tabs()[tab_index]
         self.notebook.forget(tab_index)
+        self.notebook.nametowidget(current_frame).destroy()
         
         # Recréer l'onglet
         config_id, config_title, tab_class_or_function, available = self.tab_configs[tab_index]
@@ -1073,11 +1075,15 @@ class MainWindow:
         except:
             pass
         
-        # Gestionnaire de données
-        self.data_manager = DataManager()
+        # Gestionnaire de données (écritures regroupées, planifiées dans la boucle Tk)
+        self.data_manager = DataManager(
+            write_delay=0.5,
+            scheduler=lambda delay, callback: self.root.after(int(delay * 1000), callback)
+        )
         
         # Variables d'interface
         self.status_var = tk.StringVar(value="Application prête")
+        self._status_job = None
         
         # Gestionnaires
         self.notification_center = NotificationCenter(self.status_var, self.root)
@@ -1184,7 +1190,6 @@ class MainWindow:
         
         # Démarrer l'horloge
         self.update_clock()
-        self.update_system_status()
     
     def create_enhanced_status_bar(self, parent):
         """Crée la barre de statut améliorée"""
@@ -1224,11 +1229,20 @@ class MainWindow:
         try:
             self.notification_center.show_progress("Initialisation de l'interface...")
             
+            # Archiver l'historique clos avant le premier affichage
+            try:
+                self.data_manager.archive_closed_records()
+            except Exception as e:
+                print(f"⚠️ Archivage impossible: {e}")
+
             # Créer tous les onglets
             self.tab_manager.create_all_tabs()
-            
-            # Chargement initial des données
-            self.refresh_all_data()
+
+            # Indicateurs tenus à jour par les événements du DataManager ;
+            # seules les modifications d'autres processus sont vérifiées
+            self.data_manager.subscribe(self.on_data_changed)
+            self.update_system_status()
+            self.check_external_changes()
             
             self.notification_center.show_success("Interface initialisée avec succès")
             
@@ -1241,15 +1255,38 @@ class MainWindow:
         self.clock_var.set(current_time)
         self.root.after(1000, self.update_clock)
     
+    def on_data_changed(self, event):
+        """Planifie la mise à jour des indicateurs (une fois par cycle Tk)"""
+        if self._status_job is None:
+            self._status_job = self.root.after_idle(self.update_system_status)
+    
+    def check_external_changes(self):
+        """Vérifie périodiquement les modifications faites par un autre processus"""
+        try:
+            # Simple comparaison des dates de modification: les collections
+            # relues émettent leurs événements, les onglets abonnés suivent
+            changed = self.data_manager.poll_changes()
+            if changed:
+                self.notification_center.show_info(f"🔄 Données mises à jour: {', '.join(changed)}")
+            
+            # Écriture périodique des statistiques dans company.json
+            self.data_manager.checkpoint_statistics()
+        except Exception as e:
+            print(f"❌ Erreur vérification des données: {e}")
+        
+        self.root.after(5000, self.check_external_changes)
+    
     def update_system_status(self):
         """Met à jour les indicateurs système"""
+        self._status_job = None
         try:
-            # Vérifier l'état des données
-            aircraft_count = len(self.data_manager.get_aircraft())
-            personnel_count = len(self.data_manager.get_personnel())
-            flights_count = len(self.data_manager.get_flights())
-            passengers_count = len(self.data_manager.get_passengers())
-            reservations_count = len(self.data_manager.get_reservations())
+            # Vérifier l'état des données (compteurs en mémoire)
+            stats = self.data_manager.get_statistics()
+            aircraft_count = stats['total_aircraft']
+            personnel_count = stats['total_personnel']
+            flights_count = stats['total_flights']
+            passengers_count = stats['total_passengers']
+            reservations_count = stats['total_reservations']
             
             total_elements = aircraft_count + personnel_count + flights_count + passengers_count + reservations_count
             
@@ -1270,9 +1307,6 @@ class MainWindow:
             self.data_status_var.set("❌ Erreur données")
             self.load_var.set("🔴 Erreur système")
             print(f"❌ Erreur statut système: {e}")
-        
-        # Programmer la prochaine mise à jour
-        self.root.after(5000, self.update_system_status)
     
     def toggle_theme(self):
         """Bascule entre les thèmes"""
@@ -1287,16 +1321,18 @@ class MainWindow:
     def show_enhanced_statistics(self):
         """Affiche les statistiques améliorées"""
         try:
-            aircraft_count = len(self.data_manager.get_aircraft())
-            personnel_count = len(self.data_manager.get_personnel())
-            flights_count = len(self.data_manager.get_flights())
-            passengers_count = len(self.data_manager.get_passengers())
-            reservations_count = len(self.data_manager.get_reservations())
+            stats = self.data_manager.get_statistics()
+            aircraft_count = stats['total_aircraft']
+            personnel_count = stats['total_personnel']
+            flights_count = stats['total_flights']
+            passengers_count = stats['total_passengers']
+            reservations_count = stats['total_reservations']
             
             # Statistiques avancées
             aircraft_list = self.data_manager.get_aircraft()
-            operational_aircraft = sum(1 for a in aircraft_list if a.get('etat') in ['operationnel', 'au_sol'])
-            maintenance_aircraft = sum(1 for a in aircraft_list if a.get('etat') == 'en_maintenance')
+            aircraft_states = stats['aircraft_states']
+            operational_aircraft = aircraft_states.get('operationnel', 0) + aircraft_states.get('au_sol', 0)
+            maintenance_aircraft = aircraft_states.get('en_maintenance', 0)
             
             # Calcul capacité totale
             total_capacity = sum(a.get('capacite', 0) for a in aircraft_list)
@@ -1425,6 +1461,8 @@ class MainWindow:
                 
                 # Sauvegarder une dernière fois
                 print("💾 Sauvegarde finale...")
+                self.data_manager.checkpoint_statistics(force=True)
+                self.data_manager.flush()
                 
                 # Nettoyer les ressources
                 if hasattr(self, 'tab_manager'):
@@ -1438,6 +1476,7 @@ class MainWindow:
                 
         except Exception as e:
             print(f"❌ Erreur lors de la fermeture: {e}")
+            self.data_manager.flush()
             self.root.destroy()
 
 
@@ -702,15 +702,12 @@ class ModernAircraftDialog:
         
         # Localisation (trouver l'aéroport correspondant)
         if 'localisation' in self.aircraft_data:
-            coords = self.aircraft_data['localisation']
-            for airport in self.airports:
-                airport_coords = airport['coordonnees']
-                if (abs(airport_coords['latitude'] - coords.get('latitude', 0)) < 0.1 and
-                    abs(airport_coords['longitude'] - coords.get('longitude', 0)) < 0.1):
-                    airport_choice = f"{airport['code_iata']} - {airport['nom']} ({airport['ville']})"
-                    self.airport_var.set(airport_choice)
-                    self.update_coordinates()
-                    break
+            airport = self.data_manager.nearest_airport(self.aircraft_data['localisation'],
+                                                        self.data_manager.AIRPORT_MATCH_KM)
+            if airport:
+                airport_choice = f"{airport['code_iata']} - {airport['nom']} ({airport['ville']})"
+                self.airport_var.set(airport_choice)
+                self.update_coordinates()
     
     def get_coordinates_for_airport(self, airport_selection):
         """Récupère les coordonnées pour un aéroport sélectionné"""
@@ -820,20 +817,11 @@ class ModernAircraftDialog:
             if any(a.get('num_id') == aircraft_data['num_id'] for a in existing_aircraft):
                 raise ValueError(f"Un avion avec l'ID '{aircraft_data['num_id']}' existe déjà")
             
-            # Charger les données existantes
-            data = self.data_manager.load_data('aircraft')
-            if 'aircraft' not in data:
-                data['aircraft'] = []
-            
             # Ajouter les métadonnées
-            aircraft_data['created_at'] = datetime.now().isoformat()
             aircraft_data['updated_at'] = datetime.now().isoformat()
             
-            # Ajouter l'avion
-            data['aircraft'].append(aircraft_data)
-            
-            # Sauvegarder
-            success = self.data_manager.save_data('aircraft', data)
+            # Ajout ligne à ligne (index et abonnés mis à jour)
+            success = self.data_manager.add_aircraft(aircraft_data)
             
             if success:
                 print(f"✅ Avion {aircraft_data['num_id']} ajouté avec succès")
@@ -847,41 +835,23 @@ class ModernAircraftDialog:
     def safe_update_aircraft(self, aircraft_data):
         """CORRECTION BUG: Mise à jour sécurisée d'avion"""
         try:
-            # Charger les données existantes
-            data = self.data_manager.load_data('aircraft')
-            if 'aircraft' not in data:
-                print("❌ Aucune donnée d'avion trouvée")
-                return False
-            
             # Trouver l'avion à modifier
-            aircraft_index = -1
             original_id = self.aircraft_data.get('num_id')
-            
-            for i, aircraft in enumerate(data['aircraft']):
-                if aircraft.get('num_id') == original_id:
-                    aircraft_index = i
-                    break
-            
-            if aircraft_index == -1:
+            original_aircraft = self.data_manager.get_aircraft_by_id(original_id)
+            if original_aircraft is None:
                 print(f"❌ Avion {original_id} non trouvé pour modification")
                 return False
             
             # Vérifier l'unicité du nouvel ID (si changé)
             new_id = aircraft_data['num_id']
-            if new_id != original_id:
-                if any(a.get('num_id') == new_id for a in data['aircraft']):
-                    raise ValueError(f"Un avion avec l'ID '{new_id}' existe déjà")
+            if new_id != original_id and self.data_manager.get_aircraft_by_id(new_id) is not None:
+                raise ValueError(f"Un avion avec l'ID '{new_id}' existe déjà")
             
             # Conserver certaines données existantes
-            original_aircraft = data['aircraft'][aircraft_index]
             aircraft_data['created_at'] = original_aircraft.get('created_at', datetime.now().isoformat())
-            aircraft_data['updated_at'] = datetime.now().isoformat()
-            
-            # Mettre à jour
-            data['aircraft'][aircraft_index] = aircraft_data
             
-            # Sauvegarder
-            success = self.data_manager.save_data('aircraft', data)
+            # Mettre à jour (ligne à ligne)
+            success = self.data_manager.update_aircraft(original_id, aircraft_data)
             
             if success:
                 print(f"✅ Avion {aircraft_data['num_id']} modifié avec succès")
@@ -942,14 +912,10 @@ class SafeAircraftManager:
     def can_delete_aircraft(self, aircraft_id):
         """Vérifie si un avion peut être supprimé (pas de vols actifs, etc.)"""
         try:
-            # Vérifier les vols en cours ou futurs
-            flights = self.data_manager.get_flights()
-            active_flights = []
-            
-            for flight in flights:
-                if (flight.get('avion_utilise') == aircraft_id and 
-                    flight.get('statut') in ['programme', 'en_attente', 'en_vol']):
-                    active_flights.append(flight.get('numero_vol', 'Vol inconnu'))
+            # Vérifier les vols en cours ou futurs (index par avion)
+            flights = self.data_manager.find_by('flights', 'avion_utilise', aircraft_id)
+            active_flights = [flight.get('numero_vol', 'Vol inconnu') for flight in flights
+                              if flight.get('statut') in ['programme', 'en_attente', 'en_vol']]
             
             if active_flights:
                 return False, f"Avion assigné aux vols actifs: {', '.join(active_flights)}"
@@ -970,20 +936,11 @@ class SafeAircraftManager:
             if not can_delete:
                 return False, reason
             
-            # Charger les données
-            data = self.data_manager.load_data('aircraft')
-            if 'aircraft' not in data:
-                return False, "Aucune donnée d'avion trouvée"
-            
-            # Trouver et supprimer l'avion
-            original_count = len(data['aircraft'])
-            data['aircraft'] = [a for a in data['aircraft'] if a.get('num_id') != aircraft_id]
-            
-            if len(data['aircraft']) == original_count:
+            if self.data_manager.get_aircraft_by_id(aircraft_id) is None:
                 return False, f"Avion {aircraft_id} non trouvé"
             
-            # Sauvegarder
-            success = self.data_manager.save_data('aircraft', data)
+            # Suppression ligne à ligne (index et abonnés mis à jour)
+            success = self.data_manager.delete_aircraft(aircraft_id)
             
             if success:
                 message = f"Avion {aircraft_id} supprimé avec succès"
@@ -1004,23 +961,13 @@ class SafeAircraftManager:
     def safe_change_aircraft_state(self, aircraft_id, new_state, reason=""):
         """Change l'état d'un avion de manière sécurisée"""
         try:
-            # Charger les données
-            data = self.data_manager.load_data('aircraft')
-            if 'aircraft' not in data:
-                return False, "Aucune donnée d'avion trouvée"
-            
             # Trouver l'avion
-            aircraft_index = -1
-            for i, aircraft in enumerate(data['aircraft']):
-                if aircraft.get('num_id') == aircraft_id:
-                    aircraft_index = i
-                    break
-            
-            if aircraft_index == -1:
+            aircraft = self.data_manager.get_aircraft_by_id(aircraft_id)
+            if aircraft is None:
                 return False, f"Avion {aircraft_id} non trouvé"
             
-            aircraft = data['aircraft'][aircraft_index]
             old_state = aircraft.get('etat', 'au_sol')
+            changes = {'etat': new_state}
             
             # Vérifications selon le changement d'état
             if new_state == 'en_maintenance':
@@ -1029,28 +976,23 @@ class SafeAircraftManager:
                     return False, "Impossible de mettre en maintenance un avion en vol"
                 
                 # Marquer la date de maintenance
-                aircraft['derniere_maintenance'] = datetime.now().isoformat()
+                changes['derniere_maintenance'] = datetime.now().isoformat()
             
             elif new_state == 'operationnel':
                 # Si on sort de maintenance, mettre à jour la date
                 if old_state == 'en_maintenance':
-                    aircraft['derniere_maintenance'] = datetime.now().isoformat()
-            
-            # Appliquer le changement
-            aircraft['etat'] = new_state
-            aircraft['updated_at'] = datetime.now().isoformat()
+                    changes['derniere_maintenance'] = datetime.now().isoformat()
             
             if reason:
-                if 'maintenance_log' not in aircraft:
-                    aircraft['maintenance_log'] = []
-                aircraft['maintenance_log'].append({
+                # Nouvelle liste: l'état précédent notifié aux abonnés reste intact
+                changes['maintenance_log'] = aircraft.get('maintenance_log', []) + [{
                     'date': datetime.now().isoformat(),
                     'action': f"État changé: {old_state} → {new_state}",
                     'reason': reason
-                })
+                }]
             
-            # Sauvegarder
-            success = self.data_manager.save_data('aircraft', data)
+            # Appliquer le changement (ligne à ligne)
+            success = self.data_manager.update_aircraft(aircraft_id, changes)
             
             if success:
                 message = f"État de l'avion {aircraft_id} changé: {old_state} → {new_state}"
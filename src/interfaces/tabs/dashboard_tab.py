@@ -515,20 +515,16 @@ Pour voir les mises à jour, utilisez les boutons de rafraîchissement disponibl
                 self.fleet_tree.delete(item)
             
             aircraft_list = self.data_manager.get_aircraft()
-            airports = self.data_manager.get_airports()
             
             # Limiter l'affichage aux 10 premiers avions pour le dashboard
             for aircraft in aircraft_list[:10]:
                 # Obtenir la localisation
                 location = "Base principale"
                 if 'localisation' in aircraft:
-                    loc_coords = aircraft['localisation']
-                    for airport in airports:
-                        airport_coords = airport['coordonnees']
-                        if (abs(airport_coords['latitude'] - loc_coords.get('latitude', 0)) < 0.1 and
-                            abs(airport_coords['longitude'] - loc_coords.get('longitude', 0)) < 0.1):
-                            location = f"{airport['ville']} ({airport['code_iata']})"
-                            break
+                    airport = self.data_manager.nearest_airport(aircraft['localisation'],
+                                                                self.data_manager.AIRPORT_MATCH_KM)
+                    if airport:
+                        location = f"{airport['ville']} ({airport['code_iata']})"
                 
                 values = (
                     aircraft.get('num_id', ''),
@@ -4,7 +4,6 @@ import uuid
 import sys
 import os
 from datetime import datetime, timedelta
-import math
 import tkinter as tk
 
 # Ajouter le chemin du module Core
@@ -13,6 +12,26 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 from Core.vol import Vol
 from Core.aviation import Coordonnees, Aeroport, Avion
 from Core.enums import StatutVol
+from interfaces.tabs.tree_sync import row_iid, apply_row_change, bind_tree_to_changes
+
+
+# Libellés des statuts de vol et libellés décorés affichés dans le tableau
+FLIGHT_STATUS_LABELS = {
+    'programme': 'Programmé',
+    'en_attente': 'En attente',
+    'en_vol': 'En vol',
+    'atterri': 'Atterri',
+    'retarde': 'Retardé',
+    'annule': 'Annulé',
+    'termine': 'Terminé'
+}
+FLIGHT_STATUS_DISPLAY = {
+    'Annulé': '❌ Annulé',
+    'Retardé': '⏰ Retardé',
+    'En vol': '✈️ En vol',
+    'Atterri': '🛬 Atterri',
+    'Terminé': '✅ Terminé'
+}
 
 
 class SafeFlightManager:
@@ -25,14 +44,9 @@ class SafeFlightManager:
     def can_delete_flight(self, flight_number):
         """Vérifie si un vol peut être supprimé"""
         try:
-            # Vérifier les réservations actives
-            reservations = self.data_manager.get_reservations()
-            active_reservations = []
-            
-            for reservation in reservations:
-                if (reservation.get('vol_numero') == flight_number and 
-                    reservation.get('statut') == 'active'):
-                    active_reservations.append(reservation)
+            # Vérifier les réservations actives (index par vol)
+            reservations = self.data_manager.find_by('reservations', 'vol_numero', flight_number)
+            active_reservations = [r for r in reservations if r.get('statut') == 'active']
             
             if active_reservations:
                 return False, f"Vol a {len(active_reservations)} réservation(s) active(s)"
@@ -50,20 +64,11 @@ class SafeFlightManager:
             if not can_delete:
                 return False, reason
             
-            # Charger les données
-            data = self.data_manager.load_data('flights')
-            if 'flights' not in data:
-                return False, "Aucune donnée de vol trouvée"
-            
-            # Trouver et supprimer le vol
-            original_count = len(data['flights'])
-            data['flights'] = [f for f in data['flights'] if f.get('numero_vol') != flight_number]
-            
-            if len(data['flights']) == original_count:
+            if self.data_manager.get_flight_by_id(flight_number) is None:
                 return False, f"Vol {flight_number} non trouvé"
             
-            # Sauvegarder
-            success = self.data_manager.save_data('flights', data)
+            # Suppression ligne à ligne (index et abonnés mis à jour)
+            success = self.data_manager.delete_flight(flight_number)
             
             if success:
                 message = f"Vol {flight_number} supprimé avec succès"
@@ -82,32 +87,18 @@ class SafeFlightManager:
     def safe_cancel_flight(self, flight_number):
         """CORRECTION BUG: Annulation sécurisée d'un vol"""
         try:
-            # Charger les données
-            data = self.data_manager.load_data('flights')
-            if 'flights' not in data:
-                return False, "Aucune donnée de vol trouvée"
-            
-            # Trouver et modifier le vol
-            flight_index = -1
-            for i, flight in enumerate(data['flights']):
-                if flight.get('numero_vol') == flight_number:
-                    flight_index = i
-                    break
-            
-            if flight_index == -1:
-                return False, f"Vol {flight_number} non trouvé"
-            
-            # Annuler le vol
-            data['flights'][flight_index]['statut'] = 'annule'
-            data['flights'][flight_index]['updated_at'] = datetime.now().isoformat()
-            
-            # Sauvegarder
-            success = self.data_manager.save_data('flights', data)
+            # Vol et réservations validés ensemble (tout ou rien)
+            with self.data_manager.transaction():
+                if self.data_manager.get_flight_by_id(flight_number) is None:
+                    return False, f"Vol {flight_number} non trouvé"
+                
+                # Annuler le vol
+                success = self.data_manager.update_flight(flight_number, {'statut': 'annule'})
+                if success:
+                    # Annuler les réservations associées
+                    self._cancel_reservations(flight_number)
             
             if success:
-                # Annuler les réservations associées
-                self._cancel_reservations(flight_number)
-                
                 message = f"Vol {flight_number} annulé"
                 if self.notification_center:
                     self.notification_center.show_success(message)
@@ -124,24 +115,22 @@ class SafeFlightManager:
     def _cancel_reservations(self, flight_number):
         """Annule les réservations associées à un vol"""
         try:
-            data = self.data_manager.load_data('reservations')
-            if 'reservations' not in data:
-                return
-            
+            # Mise à jour ligne à ligne: les index restent à jour sans reconstruction
             cancelled_count = 0
-            for i, reservation in enumerate(data['reservations']):
-                if (reservation.get('vol_numero') == flight_number and 
-                    reservation.get('statut') == 'active'):
-                    data['reservations'][i]['statut'] = 'annulee'
-                    data['reservations'][i]['updated_at'] = datetime.now().isoformat()
+            for reservation in self.data_manager.find_by('reservations', 'vol_numero', flight_number):
+                if reservation.get('statut') == 'active':
+                    reservation_id = reservation.get('id_reservation')
+                    if not self.data_manager.update_reservation(reservation_id, {'statut': 'annulee'}):
+                        raise RuntimeError(f"Réservation {reservation_id} non mise à jour")
                     cancelled_count += 1
             
             if cancelled_count > 0:
-                self.data_manager.save_data('reservations', data)
                 print(f"✅ {cancelled_count} réservations annulées pour vol {flight_number}")
                 
         except Exception as e:
             print(f"❌ Erreur annulation réservations: {e}")
+            # Propager pour annuler la transaction de l'annulation du vol
+            raise
 
 
 class FlightDialog:
@@ -504,25 +493,11 @@ class FlightDialog:
                 self.duree_var.set("0h00")
                 return
             
-            # Trouver les aéroports correspondants
-            depart_airport = None
-            arrivee_airport = None
-            
-            for airport in self.airports:
-                if airport['code_iata'] == depart_code:
-                    depart_airport = airport
-                elif airport['code_iata'] == arrivee_code:
-                    arrivee_airport = airport
-            
-            if not depart_airport or not arrivee_airport:
+            # Distance lue dans la matrice des distances entre aéroports
+            distance = self.data_manager.distance(depart_code, arrivee_code)
+            if distance is None:
                 return
             
-            # Calculer la distance avec la formule de Haversine
-            distance = self.calculate_distance(
-                depart_airport['coordonnees'],
-                arrivee_airport['coordonnees']
-            )
-            
             self.distance_var.set(f"{distance:.0f} km")
             
             # Calculer la durée estimée (vitesse moyenne 800 km/h)
@@ -542,21 +517,6 @@ class FlightDialog:
         except Exception as e:
             print(f"Erreur calcul vol: {e}")
     
-    def calculate_distance(self, coord1, coord2):
-        """Calcule la distance entre deux coordonnées avec la formule de Haversine"""
-        R = 6371  # Rayon de la Terre en km
-        
-        lat1, lon1 = math.radians(coord1['latitude']), math.radians(coord1['longitude'])
-        lat2, lon2 = math.radians(coord2['latitude']), math.radians(coord2['longitude'])
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        distance = R * 2 * math.asin(math.sqrt(a))
-        
-        return distance
-    
     def calculate_arrival_time(self, event=None):
         """Calcule l'heure d'arrivée basée sur l'heure de départ et la durée"""
         try:
@@ -771,10 +731,47 @@ class FlightDialog:
         # Vérification unicité du numéro de vol (sauf en modification)
         if not self.is_editing:
             vol_numero = self.numero_vol_var.get().strip()
-            existing_flights = self.data_manager.get_flights()
-            if any(f.get('numero_vol') == vol_numero for f in existing_flights):
+            if self.data_manager.get_flight_by_id(vol_numero) is not None:
                 errors.append(f"Un vol avec le numéro '{vol_numero}' existe déjà")
         
+        # Vérification des doubles affectations (avion, équipage)
+        if not errors:
+            errors.extend(self.check_conflicts())
+        
+        return errors
+    
+    def flight_times(self):
+        """Départ et arrivée saisis (arrivée le lendemain si antérieure au départ)"""
+        date_str = self.date_depart_var.get()
+        depart_datetime = datetime.strptime(f"{date_str} {self.heure_depart_var.get()}", "%Y-%m-%d %H:%M")
+        arrivee_datetime = datetime.strptime(f"{date_str} {self.heure_arrivee_var.get()}", "%Y-%m-%d %H:%M")
+        if arrivee_datetime <= depart_datetime:
+            arrivee_datetime += timedelta(days=1)
+        return depart_datetime, arrivee_datetime
+    
+    def check_conflicts(self):
+        """Vols qui mobilisent déjà l'avion ou l'équipage saisis sur ce créneau"""
+        if self.statut_var.get() == 'Annulé':
+            return []
+        depart_datetime, arrivee_datetime = self.flight_times()
+        flight = {
+            'numero_vol': self.numero_vol_var.get().strip(),
+            'avion_utilise': self.avion_var.get().split(' - ')[0],
+            'heure_depart': depart_datetime.isoformat(),
+            'heure_arrivee_prevue': arrivee_datetime.isoformat(),
+            'pilote': self.pilote_var.get(),
+            'copilote': self.copilote_var.get() if self.copilote_var.get().strip() else None,
+            'personnel_navigant': [var.get() for var in self.personnel_navigant_vars if var.get().strip()]
+        }
+        original_number = self.flight_data.get('numero_vol') if self.is_editing else None
+        
+        errors = []
+        for conflict in self.data_manager.conflicts_for(flight, ignore=original_number):
+            other = conflict['flight']
+            kind, identifier = conflict['resource']
+            resource = f"L'avion {identifier}" if kind == 'avion' else f"Le membre d'équipage (ID: {identifier})"
+            period = f"{str(other.get('heure_depart', ''))[:16].replace('T', ' ')} → {str(other.get('heure_arrivee_prevue', ''))[11:16]}"
+            errors.append(f"{resource} est déjà affecté au vol {other.get('numero_vol')} ({period})")
         return errors
     
     def save_flight(self):
@@ -788,18 +785,8 @@ class FlightDialog:
             return
         
         try:
-            # Construction de la date/heure de départ complète
-            date_str = self.date_depart_var.get()
-            heure_depart_str = self.heure_depart_var.get()
-            heure_arrivee_str = self.heure_arrivee_var.get()
-            
-            # Créer les objets datetime
-            depart_datetime = datetime.strptime(f"{date_str} {heure_depart_str}", "%Y-%m-%d %H:%M")
-            
-            # Pour l'arrivée, gérer le cas où c'est le lendemain
-            arrivee_datetime = datetime.strptime(f"{date_str} {heure_arrivee_str}", "%Y-%m-%d %H:%M")
-            if arrivee_datetime <= depart_datetime:
-                arrivee_datetime += timedelta(days=1)
+            # Dates/heures de départ et d'arrivée complètes
+            depart_datetime, arrivee_datetime = self.flight_times()
             
             # Mapping des statuts
             status_mapping = {
@@ -854,25 +841,11 @@ class FlightDialog:
     def safe_add_flight(self, flight_data):
         """CORRECTION BUG: Ajout sécurisé de vol"""
         try:
-            # Charger les données existantes
-            data = self.data_manager.load_data('flights')
-            if 'flights' not in data:
-                data['flights'] = []
-            
-            # Vérifier une dernière fois l'unicité
-            if any(f.get('numero_vol') == flight_data['numero_vol'] for f in data['flights']):
-                print(f"❌ Vol {flight_data['numero_vol']} existe déjà")
-                return False
-            
             # Ajouter les métadonnées
-            flight_data['created_at'] = datetime.now().isoformat()
             flight_data['updated_at'] = datetime.now().isoformat()
             
-            # Ajouter le vol
-            data['flights'].append(flight_data)
-            
-            # Sauvegarder
-            success = self.data_manager.save_data('flights', data)
+            # Ajout ligne à ligne (unicité vérifiée par l'index primaire)
+            success = self.data_manager.add_flight(flight_data)
             print(f"✅ Vol {flight_data['numero_vol']} ajouté" if success else f"❌ Erreur sauvegarde vol {flight_data['numero_vol']}")
             return success
             
@@ -883,34 +856,18 @@ class FlightDialog:
     def safe_update_flight(self, flight_data):
         """CORRECTION BUG: Mise à jour sécurisée de vol"""
         try:
-            # Charger les données existantes
-            data = self.data_manager.load_data('flights')
-            if 'flights' not in data:
-                return False
-            
             # Trouver le vol à modifier
-            flight_index = -1
             original_number = self.flight_data.get('numero_vol')
-            
-            for i, flight in enumerate(data['flights']):
-                if flight.get('numero_vol') == original_number:
-                    flight_index = i
-                    break
-            
-            if flight_index == -1:
+            original_flight = self.data_manager.get_flight_by_id(original_number)
+            if original_flight is None:
                 print(f"❌ Vol {original_number} non trouvé")
                 return False
             
             # Conserver certaines données
-            original_flight = data['flights'][flight_index]
             flight_data['created_at'] = original_flight.get('created_at', datetime.now().isoformat())
-            flight_data['updated_at'] = datetime.now().isoformat()
-            
-            # Mettre à jour
-            data['flights'][flight_index] = flight_data
             
-            # Sauvegarder
-            success = self.data_manager.save_data('flights', data)
+            # Mettre à jour (ligne à ligne)
+            success = self.data_manager.update_flight(original_number, flight_data)
             print(f"✅ Vol {flight_data['numero_vol']} modifié" if success else f"❌ Erreur modification vol {flight_data['numero_vol']}")
             return success
             
@@ -1010,6 +967,16 @@ def create_flights_tab_content(parent_frame, data_manager):
     # Charger les données initiales
     refresh_flights_data(flights_tree, data_manager)
     
+    # Mises à jour ligne à ligne à chaque modification des vols
+    def on_flights_changed(event):
+        if flights_search_var.get() or flights_filter_var.get() != "Tous":
+            # Vue filtrée: le filtre est réappliqué
+            return False
+        return apply_flight_change(flights_tree, event)
+    
+    bind_tree_to_changes(flights_tree, data_manager, ['flights'],
+                         on_flights_changed, filter_flights_callback)
+    
     # Double-clic pour modifier
     flights_tree.bind('<Double-1>', lambda e: edit_flight(parent_frame, data_manager, flights_tree))
     
@@ -1017,10 +984,8 @@ def create_flights_tab_content(parent_frame, data_manager):
 
 
 def new_flight_dialog(parent, data_manager, flights_tree):
-    """Ouvre le dialogue de création de vol"""
-    dialog = FlightDialog(parent, data_manager)
-    if dialog.result:
-        refresh_flights_data(flights_tree, data_manager)
+    """Ouvre le dialogue de création de vol (le tableau suit les modifications)"""
+    FlightDialog(parent, data_manager)
 
 
 def edit_flight(parent, data_manager, flights_tree):
@@ -1036,14 +1001,8 @@ def edit_flight(parent, data_manager, flights_tree):
         
         print(f"🔧 Recherche vol pour modification: {flight_number}")
         
-        # CORRECTION BUG: Recherche robuste du vol
-        all_flights = data_manager.get_flights()
-        flight_data = None
-        
-        for flight in all_flights:
-            if flight.get('numero_vol') == flight_number:
-                flight_data = flight
-                break
+        # CORRECTION BUG: Recherche indexée du vol (Tk convertit les numéros en int)
+        flight_data = data_manager.get_flight_by_id(str(flight_number))
         
         if not flight_data:
             messagebox.showerror("Erreur", f"Vol '{flight_number}' non trouvé.")
@@ -1059,7 +1018,6 @@ def edit_flight(parent, data_manager, flights_tree):
         # Ouvrir le dialogue de modification
         dialog = FlightDialog(parent, data_manager, flight_data)
         if dialog.result:
-            refresh_flights_data(flights_tree, data_manager)
             messagebox.showinfo("Succès", f"Vol {flight_number} modifié avec succès!")
             
     except Exception as e:
@@ -1075,7 +1033,7 @@ def delete_flight(safe_manager, flights_tree):
     
     try:
         item = flights_tree.item(selection[0])
-        flight_number = item['values'][0]
+        flight_number = str(item['values'][0])  # Tk convertit les numéros en int
         current_status = item['values'][7]
         
         # Vérifier les dépendances
@@ -1087,7 +1045,6 @@ def delete_flight(safe_manager, flights_tree):
             if messagebox.askyesno("Annuler le vol", message):
                 success, result_msg = safe_manager.safe_cancel_flight(flight_number)
                 if success:
-                    refresh_flights_data(flights_tree, safe_manager.data_manager)
                     messagebox.showinfo("Succès", result_msg)
                 else:
                     messagebox.showerror("Erreur", result_msg)
@@ -1098,7 +1055,6 @@ def delete_flight(safe_manager, flights_tree):
             if messagebox.askyesno("Supprimer le vol", message):
                 success, result_msg = safe_manager.safe_delete_flight(flight_number)
                 if success:
-                    refresh_flights_data(flights_tree, safe_manager.data_manager)
                     messagebox.showinfo("Succès", result_msg)
                 else:
                     messagebox.showerror("Erreur", result_msg)
@@ -1120,13 +1076,7 @@ def view_flight_details(flights_tree, data_manager):
     flight_number = item['values'][0]
     
     # Trouver les données complètes
-    all_flights = data_manager.get_flights()
-    flight_data = None
-    
-    for flight in all_flights:
-        if flight.get('numero_vol') == flight_number:
-            flight_data = flight
-            break
+    flight_data = data_manager.get_flight_by_id(str(flight_number))
     
     if not flight_data:
         messagebox.showerror("Erreur", "Vol non trouvé.")
@@ -1158,78 +1108,68 @@ def filter_flights(flights_tree, data_manager, search_var, filter_var):
     for item in flights_tree.get_children():
         flights_tree.delete(item)
     
-    # Recharger avec filtres
-    all_flights = data_manager.get_flights()
-    
-    for flight in all_flights:
-        # Mapping du statut pour l'affichage
-        status_mapping = {
-            'programme': 'Programmé',
-            'en_attente': 'En attente',
-            'en_vol': 'En vol',
-            'atterri': 'Atterri',
-            'retarde': 'Retardé',
-            'annule': 'Annulé',
-            'termine': 'Terminé'
-        }
-        
-        flight_status = status_mapping.get(flight.get('statut', ''), 'Inconnu')
-        
-        # Filtrage par statut
-        if filter_status != "Tous" and flight_status != filter_status:
-            continue
-        
-        # Filtrage par recherche
-        searchable_text = f"{flight.get('numero_vol', '')} {flight.get('aeroport_depart', '')} {flight.get('aeroport_arrivee', '')} {flight.get('avion_utilise', '')}".lower()
-        if search_text and search_text not in searchable_text:
-            continue
-        
-        # Ajouter à l'affichage avec parsing robuste des dates
-        try:
-            if flight.get('heure_depart'):
-                depart_time = parse_datetime_robust(flight['heure_depart'])
-                if depart_time:
-                    date_str = depart_time.strftime("%Y-%m-%d")
-                    heure_depart_str = depart_time.strftime("%H:%M")
-                else:
-                    date_str = "N/A"
-                    heure_depart_str = "N/A"
+    # Filtre par statut (index secondaire) et recherche sur les colonnes affichées
+    where = []
+    if filter_status != "Tous":
+        where.append(('statut', 'in', [code for code, label in FLIGHT_STATUS_LABELS.items()
+                                       if label == filter_status]))
+    if search_text:
+        where.append((('numero_vol', 'aeroport_depart', 'aeroport_arrivee', 'avion_utilise'),
+                      'contains', search_text))
+    
+    for flight in data_manager.query('flights', where):
+        flights_tree.insert('', 'end', iid=row_iid(flights_tree, flight.get('numero_vol')),
+                            values=flight_row_values(flight))
+
+
+def flight_row_values(flight):
+    """Valeurs de la ligne d'un vol dans le tableau (statut décoré selon sa valeur)"""
+    flight_status = FLIGHT_STATUS_LABELS.get(flight.get('statut', ''), 'Inconnu')
+    
+    # CORRECTION BUG: Gestion robuste des dates
+    try:
+        if flight.get('heure_depart'):
+            depart_time = parse_datetime_robust(flight['heure_depart'])
+            if depart_time:
+                date_str = depart_time.strftime("%Y-%m-%d")
+                heure_depart_str = depart_time.strftime("%H:%M")
             else:
                 date_str = "N/A"
                 heure_depart_str = "N/A"
-            
-            if flight.get('heure_arrivee_prevue'):
-                arrivee_time = parse_datetime_robust(flight['heure_arrivee_prevue'])
-                if arrivee_time:
-                    heure_arrivee_str = arrivee_time.strftime("%H:%M")
-                else:
-                    heure_arrivee_str = "N/A"
+        else:
+            date_str = "N/A"
+            heure_depart_str = "N/A"
+        
+        if flight.get('heure_arrivee_prevue'):
+            arrivee_time = parse_datetime_robust(flight['heure_arrivee_prevue'])
+            if arrivee_time:
+                heure_arrivee_str = arrivee_time.strftime("%H:%M")
             else:
                 heure_arrivee_str = "N/A"
-        except:
-            date_str = "Erreur"
-            heure_depart_str = "Erreur"
-            heure_arrivee_str = "Erreur"
-        
-        values = (
-            flight.get('numero_vol', ''),
-            flight.get('aeroport_depart', ''),
-            flight.get('aeroport_arrivee', ''),
-            date_str,
-            heure_depart_str,
-            heure_arrivee_str,
-            flight.get('avion_utilise', ''),
-            flight_status
-        )
-        
-        # Coloration selon le statut
-        item_id = flights_tree.insert('', 'end', values=values)
-        if flight_status == 'Annulé':
-            flights_tree.set(item_id, 'Statut', '❌ Annulé')
-        elif flight_status == 'Retardé':
-            flights_tree.set(item_id, 'Statut', '⏰ Retardé')
-        elif flight_status == 'En vol':
-            flights_tree.set(item_id, 'Statut', '✈️ En vol')
+        else:
+            heure_arrivee_str = "N/A"
+            
+    except Exception as e:
+        print(f"  ⚠️ Erreur parsing dates vol {flight.get('numero_vol', 'Inconnu')}: {e}")
+        date_str = "Erreur"
+        heure_depart_str = "Erreur"
+        heure_arrivee_str = "Erreur"
+    
+    return (
+        flight.get('numero_vol', ''),
+        flight.get('aeroport_depart', ''),
+        flight.get('aeroport_arrivee', ''),
+        date_str,
+        heure_depart_str,
+        heure_arrivee_str,
+        flight.get('avion_utilise', ''),
+        FLIGHT_STATUS_DISPLAY.get(flight_status, flight_status)
+    )
+
+
+def apply_flight_change(flights_tree, event):
+    """Met à jour la seule ligne du vol ajouté, modifié ou supprimé (False: rafraîchir)"""
+    return apply_row_change(flights_tree, event, 'numero_vol', flight_row_values)
 
 
 def refresh_flights_data(flights_tree, data_manager):
@@ -1245,74 +1185,10 @@ def refresh_flights_data(flights_tree, data_manager):
         
         print(f"  📊 {len(all_flights)} vols chargés")
         
-        # Mapping des statuts pour l'affichage
-        status_mapping = {
-            'programme': 'Programmé',
-            'en_attente': 'En attente',
-            'en_vol': 'En vol',
-            'atterri': 'Atterri',
-            'retarde': 'Retardé',
-            'annule': 'Annulé',
-            'termine': 'Terminé'
-        }
-        
         for flight in all_flights:
             try:
-                flight_status = status_mapping.get(flight.get('statut', ''), 'Inconnu')
-                
-                # CORRECTION BUG: Gestion robuste des dates
-                try:
-                    if flight.get('heure_depart'):
-                        depart_time = parse_datetime_robust(flight['heure_depart'])
-                        if depart_time:
-                            date_str = depart_time.strftime("%Y-%m-%d")
-                            heure_depart_str = depart_time.strftime("%H:%M")
-                        else:
-                            date_str = "N/A"
-                            heure_depart_str = "N/A"
-                    else:
-                        date_str = "N/A"
-                        heure_depart_str = "N/A"
-                    
-                    if flight.get('heure_arrivee_prevue'):
-                        arrivee_time = parse_datetime_robust(flight['heure_arrivee_prevue'])
-                        if arrivee_time:
-                            heure_arrivee_str = arrivee_time.strftime("%H:%M")
-                        else:
-                            heure_arrivee_str = "N/A"
-                    else:
-                        heure_arrivee_str = "N/A"
-                        
-                except Exception as e:
-                    print(f"  ⚠️ Erreur parsing dates vol {flight.get('numero_vol', 'Inconnu')}: {e}")
-                    date_str = "Erreur"
-                    heure_depart_str = "Erreur"
-                    heure_arrivee_str = "Erreur"
-                
-                values = (
-                    flight.get('numero_vol', ''),
-                    flight.get('aeroport_depart', ''),
-                    flight.get('aeroport_arrivee', ''),
-                    date_str,
-                    heure_depart_str,
-                    heure_arrivee_str,
-                    flight.get('avion_utilise', ''),
-                    flight_status
-                )
-                
-                # Coloration selon le statut
-                item_id = flights_tree.insert('', 'end', values=values)
-                if flight_status == 'Annulé':
-                    flights_tree.set(item_id, 'Statut', '❌ Annulé')
-                elif flight_status == 'Retardé':
-                    flights_tree.set(item_id, 'Statut', '⏰ Retardé')
-                elif flight_status == 'En vol':
-                    flights_tree.set(item_id, 'Statut', '✈️ En vol')
-                elif flight_status == 'Atterri':
-                    flights_tree.set(item_id, 'Statut', '🛬 Atterri')
-                elif flight_status == 'Terminé':
-                    flights_tree.set(item_id, 'Statut', '✅ Terminé')
-                    
+                flights_tree.insert('', 'end', iid=row_iid(flights_tree, flight.get('numero_vol')),
+                                    values=flight_row_values(flight))
             except Exception as e:
                 print(f"  ⚠️ Erreur traitement vol: {e}")
                 continue
@@ -10,6 +10,15 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from Core.personnes import Passager
 from Core.enums import TypeSexe
+from interfaces.tabs.tree_sync import row_iid, apply_row_change, bind_tree_to_changes
+
+
+# Libellés des sexes affichés dans le tableau
+PASSENGER_SEXE_LABELS = {
+    'masculin': 'Masculin',
+    'feminin': 'Féminin',
+    'autre': 'Autre'
+}
 
 class PassengerDialog:
     """Dialogue pour créer ou modifier un passager"""
@@ -303,12 +312,8 @@ class PassengerDialog:
     def safe_add_passenger(self, passenger_data):
         """Ajout sécurisé de passager"""
         try:
-            data = self.data_manager.load_data('passengers')
-            if 'passengers' not in data:
-                data['passengers'] = []
-            
-            data['passengers'].append(passenger_data)
-            return self.data_manager.save_data('passengers', data)
+            # Ajout ligne à ligne (index et abonnés mis à jour)
+            return self.data_manager.add_passenger(passenger_data)
         except Exception as e:
             print(f"❌ Erreur ajout passager: {e}")
             return False
@@ -316,26 +321,8 @@ class PassengerDialog:
     def safe_update_passenger(self, passenger_data):
         """Mise à jour sécurisée de passager"""
         try:
-            data = self.data_manager.load_data('passengers')
-            if 'passengers' not in data:
-                return False
-            
-            # Trouver le passager à modifier
-            passenger_index = -1
-            original_id = self.passenger_data.get('id_passager')
-            
-            for i, passenger in enumerate(data['passengers']):
-                if passenger.get('id_passager') == original_id:
-                    passenger_index = i
-                    break
-            
-            if passenger_index == -1:
-                print(f"❌ Passager {original_id} non trouvé")
-                return False
-            
-            # Mettre à jour
-            data['passengers'][passenger_index] = passenger_data
-            return self.data_manager.save_data('passengers', data)
+            # Mettre à jour (ligne à ligne)
+            return self.data_manager.update_passenger(self.passenger_data.get('id_passager'), passenger_data)
         except Exception as e:
             print(f"❌ Erreur modification passager: {e}")
             return False
@@ -429,6 +416,16 @@ def create_passengers_tab_content(parent_frame, data_manager):
     # Charger les données initiales
     refresh_passengers_data(passengers_tree, data_manager)
     
+    # Mises à jour ligne à ligne à chaque modification des passagers
+    def on_passengers_changed(event):
+        if passengers_search_var.get() or passengers_filter_var.get() != "Tous":
+            # Vue filtrée: le filtre est réappliqué
+            return False
+        return apply_passenger_change(passengers_tree, event)
+    
+    bind_tree_to_changes(passengers_tree, data_manager, ['passengers'],
+                         on_passengers_changed, filter_passengers_callback)
+    
     # Double-clic pour modifier
     passengers_tree.bind('<Double-1>', lambda e: edit_passenger(parent_frame, data_manager, passengers_tree))
     
@@ -436,10 +433,8 @@ def create_passengers_tab_content(parent_frame, data_manager):
 
 
 def new_passenger_dialog(parent, data_manager, passengers_tree):
-    """Ouvre le dialogue de création de passager"""
-    dialog = PassengerDialog(parent, data_manager)
-    if dialog.result:
-        refresh_passengers_data(passengers_tree, data_manager)
+    """Ouvre le dialogue de création de passager (le tableau suit les modifications)"""
+    PassengerDialog(parent, data_manager)
 
 
 def edit_passenger(parent, data_manager, passengers_tree):
@@ -469,7 +464,6 @@ def edit_passenger(parent, data_manager, passengers_tree):
         # Ouvrir le dialogue de modification
         dialog = PassengerDialog(parent, data_manager, passenger_data)
         if dialog.result:
-            refresh_passengers_data(passengers_tree, data_manager)
             messagebox.showinfo("Succès", "Passager modifié avec succès!")
             
     except Exception as e:
@@ -547,21 +541,15 @@ def delete_passenger(data_manager, passengers_tree):
         if messagebox.askyesno("Confirmation", 
                               f"Voulez-vous vraiment supprimer {passenger_name} ?"):
             
-            # Supprimer de la liste
-            data = data_manager.load_data('passengers')
-            if 'passengers' not in data:
-                return
-            
-            original_count = len(data['passengers'])
-            data['passengers'] = [p for p in data['passengers'] 
-                                 if not p.get('id_passager', '').startswith(passenger_id.replace('...', ''))]
+            # Identifiant complet (tronqué dans le tableau)
+            matches = [p.get('id_passager') for p in data_manager.get_passengers()
+                       if p.get('id_passager', '').startswith(passenger_id.replace('...', ''))]
             
-            if len(data['passengers']) == original_count:
+            if not matches:
                 messagebox.showerror("Erreur", "Passager non trouvé.")
                 return
             
-            if data_manager.save_data('passengers', data):
-                refresh_passengers_data(passengers_tree, data_manager)
+            if all(data_manager.delete_passenger(match) for match in matches):
                 messagebox.showinfo("Succès", "Passager supprimé avec succès.")
             else:
                 messagebox.showerror("Erreur", "Erreur lors de la suppression.")
@@ -579,46 +567,44 @@ def filter_passengers(passengers_tree, data_manager, search_var, filter_var):
     for item in passengers_tree.get_children():
         passengers_tree.delete(item)
     
-    # Recharger avec filtres
-    all_passengers = data_manager.get_passengers()
-    
-    for passenger in all_passengers:
-        # Mapping du sexe pour l'affichage
-        sexe_mapping = {
-            'masculin': 'Masculin',
-            'feminin': 'Féminin',
-            'autre': 'Autre'
-        }
-        
-        passenger_sexe = sexe_mapping.get(passenger.get('sexe', ''), 'Inconnu')
-        
-        # Filtrage par sexe
-        if filter_sexe != "Tous" and passenger_sexe != filter_sexe:
-            continue
-        
-        # Filtrage par recherche
-        searchable_text = f"{passenger.get('nom', '')} {passenger.get('prenom', '')} {passenger.get('email', '')} {passenger.get('numero_passeport', '')}".lower()
-        if search_text and search_text not in searchable_text:
-            continue
-        
-        # Contact (priorité email puis téléphone)
-        contact = ""
-        if passenger.get('email'):
-            contact = passenger.get('email')
-        elif passenger.get('numero_telephone'):
-            contact = passenger.get('numero_telephone')
-        
-        values = (
-            passenger.get('id_passager', '')[:8] + '...' if len(passenger.get('id_passager', '')) > 8 else passenger.get('id_passager', ''),
-            passenger.get('nom', ''),
-            passenger.get('prenom', ''),
-            passenger_sexe,
-            contact,
-            passenger.get('numero_passeport', 'N/A'),
-            "✓" if passenger.get('checkin_effectue', False) else "✗"
-        )
-        
-        passengers_tree.insert('', 'end', values=values)
+    # Filtre par sexe et recherche sur les colonnes affichées
+    where = []
+    if filter_sexe != "Tous":
+        where.append(('sexe', 'in', [code for code, label in PASSENGER_SEXE_LABELS.items()
+                                     if label == filter_sexe]))
+    if search_text:
+        where.append((('nom', 'prenom', 'email', 'numero_passeport'), 'contains', search_text))
+    
+    for passenger in data_manager.query('passengers', where):
+        passengers_tree.insert('', 'end', iid=row_iid(passengers_tree, passenger.get('id_passager')),
+                               values=passenger_row_values(passenger))
+
+
+def passenger_row_values(passenger):
+    """Valeurs de la ligne d'un passager dans le tableau"""
+    passenger_sexe = PASSENGER_SEXE_LABELS.get(passenger.get('sexe', ''), 'Inconnu')
+    
+    # Contact (priorité email puis téléphone)
+    contact = ""
+    if passenger.get('email'):
+        contact = passenger.get('email')
+    elif passenger.get('numero_telephone'):
+        contact = passenger.get('numero_telephone')
+    
+    return (
+        passenger.get('id_passager', '')[:8] + '...' if len(passenger.get('id_passager', '')) > 8 else passenger.get('id_passager', ''),
+        passenger.get('nom', ''),
+        passenger.get('prenom', ''),
+        passenger_sexe,
+        contact,
+        passenger.get('numero_passeport', 'N/A'),
+        "✓" if passenger.get('checkin_effectue', False) else "✗"
+    )
+
+
+def apply_passenger_change(passengers_tree, event):
+    """Met à jour la seule ligne du passager ajouté, modifié ou supprimé (False: rafraîchir)"""
+    return apply_row_change(passengers_tree, event, 'id_passager', passenger_row_values)
 
 
 def refresh_passengers_data(passengers_tree, data_manager):
@@ -630,44 +616,19 @@ def refresh_passengers_data(passengers_tree, data_manager):
         for item in passengers_tree.get_children():
             passengers_tree.delete(item)
         
-        all_passengers = data_manager.get_passengers()
-        print(f"  📊 {len(all_passengers)} passagers chargés")
-        
-        # Mapping des sexes pour l'affichage
-        sexe_mapping = {
-            'masculin': 'Masculin',
-            'feminin': 'Féminin',
-            'autre': 'Autre'
-        }
+        # Lecture au fil de l'eau (mémoire bornée pour les gros fichiers)
+        passenger_count = 0
         
-        for passenger in all_passengers:
+        for passenger in data_manager.iter_passengers():
+            passenger_count += 1
             try:
-                passenger_sexe = sexe_mapping.get(passenger.get('sexe', ''), 'Inconnu')
-                
-                # Contact (priorité email puis téléphone)
-                contact = ""
-                if passenger.get('email'):
-                    contact = passenger.get('email')
-                elif passenger.get('numero_telephone'):
-                    contact = passenger.get('numero_telephone')
-                
-                values = (
-                    passenger.get('id_passager', '')[:8] + '...' if len(passenger.get('id_passager', '')) > 8 else passenger.get('id_passager', ''),
-                    passenger.get('nom', ''),
-                    passenger.get('prenom', ''),
-                    passenger_sexe,
-                    contact,
-                    passenger.get('numero_passeport', 'N/A'),
-                    "✓" if passenger.get('checkin_effectue', False) else "✗"
-                )
-                
-                passengers_tree.insert('', 'end', values=values)
-                
+                passengers_tree.insert('', 'end', iid=row_iid(passengers_tree, passenger.get('id_passager')),
+                                       values=passenger_row_values(passenger))
             except Exception as e:
                 print(f"  ⚠️ Erreur traitement passager: {e}")
                 continue
         
-        print(f"✅ Passagers rafraîchis: {len(all_passengers)} passagers affichés")
+        print(f"✅ Passagers rafraîchis: {passenger_count} passagers affichés")
         
     except Exception as e:
         print(f"❌ Erreur refresh passagers: {e}")
@@ -10,6 +10,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from Core.personnes import Personnel
 from Core.enums import TypePersonnel, TypeSexe
+from data.query import compile_predicates
+from interfaces.tabs.tree_sync import row_iid, apply_row_change, bind_tree_to_changes
+
+
+# Libellés des types de personnel affichés dans le tableau
+PERSONNEL_TYPE_LABELS = {
+    'pilote': 'Pilote',
+    'copilote': 'Copilote',
+    'hotesse': 'Hôtesse de l\'air',
+    'steward': 'Steward',
+    'mecanicien': 'Mécanicien',
+    'controleur': 'Contrôleur aérien',
+    'gestionnaire': 'Gestionnaire'
+}
 
 class PersonnelDialog:
     """Dialogue pour créer ou modifier un membre du personnel"""
@@ -434,12 +448,8 @@ class PersonnelDialog:
     def safe_add_personnel(self, personnel_data):
         """Ajout sécurisé de personnel"""
         try:
-            data = self.data_manager.load_data('personnel')
-            if 'personnel' not in data:
-                data['personnel'] = []
-            
-            data['personnel'].append(personnel_data)
-            return self.data_manager.save_data('personnel', data)
+            # Ajout ligne à ligne (index et abonnés mis à jour)
+            return self.data_manager.add_personnel(personnel_data)
         except Exception as e:
             print(f"❌ Erreur ajout personnel: {e}")
             return False
@@ -447,26 +457,8 @@ class PersonnelDialog:
     def safe_update_personnel(self, personnel_data):
         """Mise à jour sécurisée de personnel"""
         try:
-            data = self.data_manager.load_data('personnel')
-            if 'personnel' not in data:
-                return False
-            
-            # Trouver le personnel à modifier
-            personnel_index = -1
-            original_id = self.personnel_data.get('id_employe')
-            
-            for i, person in enumerate(data['personnel']):
-                if person.get('id_employe') == original_id:
-                    personnel_index = i
-                    break
-            
-            if personnel_index == -1:
-                print(f"❌ Personnel {original_id} non trouvé")
-                return False
-            
-            # Mettre à jour
-            data['personnel'][personnel_index] = personnel_data
-            return self.data_manager.save_data('personnel', data)
+            # Mettre à jour (ligne à ligne)
+            return self.data_manager.update_personnel(self.personnel_data.get('id_employe'), personnel_data)
         except Exception as e:
             print(f"❌ Erreur modification personnel: {e}")
             return False
@@ -560,6 +552,16 @@ def create_personnel_tab_content(parent_frame, data_manager):
     # Charger les données initiales
     refresh_personnel_data(personnel_tree, data_manager)
     
+    # Mises à jour ligne à ligne à chaque modification du personnel
+    def on_personnel_changed(event):
+        if personnel_search_var.get() or personnel_filter_var.get() != "Tous":
+            # Vue filtrée: le filtre est réappliqué
+            return False
+        return apply_personnel_change(personnel_tree, event)
+    
+    bind_tree_to_changes(personnel_tree, data_manager, ['personnel'],
+                         on_personnel_changed, filter_personnel_callback)
+    
     # Double-clic pour modifier
     personnel_tree.bind('<Double-1>', lambda e: edit_personnel(parent_frame, data_manager, personnel_tree))
     
@@ -567,10 +569,8 @@ def create_personnel_tab_content(parent_frame, data_manager):
 
 
 def new_personnel_dialog(parent, data_manager, personnel_tree):
-    """Ouvre le dialogue de création de personnel"""
-    dialog = PersonnelDialog(parent, data_manager)
-    if dialog.result:
-        refresh_personnel_data(personnel_tree, data_manager)
+    """Ouvre le dialogue de création de personnel (le tableau suit les modifications)"""
+    PersonnelDialog(parent, data_manager)
 
 
 def edit_personnel(parent, data_manager, personnel_tree):
@@ -599,7 +599,6 @@ def edit_personnel(parent, data_manager, personnel_tree):
         
         dialog = PersonnelDialog(parent, data_manager, personnel_data)
         if dialog.result:
-            refresh_personnel_data(personnel_tree, data_manager)
             messagebox.showinfo("Succès", "Personnel modifié avec succès!")
             
     except Exception as e:
@@ -645,21 +644,15 @@ def delete_personnel(data_manager, personnel_tree):
         if messagebox.askyesno("Confirmation", 
                               f"Voulez-vous vraiment supprimer {personnel_name} ?"):
             
-            # Supprimer de la liste
-            data = data_manager.load_data('personnel')
-            if 'personnel' not in data:
-                return
-            
-            original_count = len(data['personnel'])
-            data['personnel'] = [p for p in data['personnel'] 
-                               if not p.get('id_employe', '').startswith(personnel_id.replace('...', ''))]
+            # Identifiant complet (tronqué dans le tableau)
+            matches = [p.get('id_employe') for p in data_manager.get_personnel()
+                       if p.get('id_employe', '').startswith(personnel_id.replace('...', ''))]
             
-            if len(data['personnel']) == original_count:
+            if not matches:
                 messagebox.showerror("Erreur", "Personnel non trouvé.")
                 return
             
-            if data_manager.save_data('personnel', data):
-                refresh_personnel_data(personnel_tree, data_manager)
+            if all(data_manager.delete_personnel(match) for match in matches):
                 messagebox.showinfo("Succès", "Personnel supprimé avec succès.")
             else:
                 messagebox.showerror("Erreur", "Erreur lors de la suppression.")
@@ -677,51 +670,48 @@ def filter_personnel(personnel_tree, data_manager, search_var, filter_var):
     for item in personnel_tree.get_children():
         personnel_tree.delete(item)
     
-    # Recharger avec filtres
-    all_personnel = data_manager.get_personnel()
-    
-    for person in all_personnel:
-        # Mapping du type pour l'affichage
-        type_mapping = {
-            'pilote': 'Pilote',
-            'copilote': 'Copilote',
-            'hotesse': 'Hôtesse de l\'air',
-            'steward': 'Steward',
-            'mecanicien': 'Mécanicien',
-            'controleur': 'Contrôleur aérien',
-            'gestionnaire': 'Gestionnaire'
-        }
-        
-        person_type = type_mapping.get(person.get('type_personnel', ''), 'Inconnu')
-        
-        # Filtrage par type
-        if filter_type != "Tous" and person_type != filter_type:
-            continue
-        
-        # Filtrage par recherche
-        searchable_text = f"{person.get('nom', '')} {person.get('prenom', '')} {person_type} {person.get('specialisation', '')}".lower()
-        if search_text and search_text not in searchable_text:
-            continue
-        
-        # Ajouter à l'affichage
-        contact = ""
-        if person.get('email'):
-            contact = person.get('email')
-        elif person.get('numero_telephone'):
-            contact = person.get('numero_telephone')
-        
-        values = (
-            person.get('id_employe', '')[:8] + '...' if len(person.get('id_employe', '')) > 8 else person.get('id_employe', ''),
-            person.get('nom', ''),
-            person.get('prenom', ''),
-            person_type,
-            person.get('specialisation', ''),
-            person.get('horaire', ''),
-            "✓" if person.get('disponible', True) else "✗",
-            contact
-        )
-        
-        personnel_tree.insert('', 'end', values=values)
+    # Filtre par type et recherche sur les colonnes affichées
+    where = []
+    if filter_type != "Tous":
+        where.append(('type_personnel', 'in', [code for code, label in PERSONNEL_TYPE_LABELS.items()
+                                               if label == filter_type]))
+    if search_text:
+        # Le type est recherché dans son libellé affiché
+        matches_text = compile_predicates([(('nom', 'prenom', 'specialisation'), 'contains', search_text)])
+        where.append(lambda person: matches_text(person) or search_text in
+                     PERSONNEL_TYPE_LABELS.get(person.get('type_personnel', ''), 'Inconnu').lower())
+    
+    for person in data_manager.query('personnel', where):
+        personnel_tree.insert('', 'end', iid=row_iid(personnel_tree, person.get('id_employe')),
+                              values=personnel_row_values(person))
+
+
+def personnel_row_values(person):
+    """Valeurs de la ligne d'un membre du personnel dans le tableau"""
+    person_type = PERSONNEL_TYPE_LABELS.get(person.get('type_personnel', ''), 'Inconnu')
+    
+    # Contact (priorité email puis téléphone)
+    contact = ""
+    if person.get('email'):
+        contact = person.get('email')
+    elif person.get('numero_telephone'):
+        contact = person.get('numero_telephone')
+    
+    return (
+        person.get('id_employe', '')[:8] + '...' if len(person.get('id_employe', '')) > 8 else person.get('id_employe', ''),
+        person.get('nom', ''),
+        person.get('prenom', ''),
+        person_type,
+        person.get('specialisation', ''),
+        person.get('horaire', ''),
+        "✓" if person.get('disponible', True) else "✗",
+        contact
+    )
+
+
+def apply_personnel_change(personnel_tree, event):
+    """Met à jour la seule ligne du membre du personnel ajouté, modifié ou supprimé (False: rafraîchir)"""
+    return apply_row_change(personnel_tree, event, 'id_employe', personnel_row_values)
 
 
 def refresh_personnel_data(personnel_tree, data_manager):
@@ -736,41 +726,10 @@ def refresh_personnel_data(personnel_tree, data_manager):
         all_personnel = data_manager.get_personnel()
         print(f"  📊 {len(all_personnel)} membres du personnel chargés")
         
-        # Mapping des types pour l'affichage
-        type_mapping = {
-            'pilote': 'Pilote',
-            'copilote': 'Copilote',
-            'hotesse': 'Hôtesse de l\'air',
-            'steward': 'Steward',
-            'mecanicien': 'Mécanicien',
-            'controleur': 'Contrôleur aérien',
-            'gestionnaire': 'Gestionnaire'
-        }
-        
         for person in all_personnel:
             try:
-                person_type = type_mapping.get(person.get('type_personnel', ''), 'Inconnu')
-                
-                # Contact (priorité email puis téléphone)
-                contact = ""
-                if person.get('email'):
-                    contact = person.get('email')
-                elif person.get('numero_telephone'):
-                    contact = person.get('numero_telephone')
-                
-                values = (
-                    person.get('id_employe', '')[:8] + '...' if len(person.get('id_employe', '')) > 8 else person.get('id_employe', ''),
-                    person.get('nom', ''),
-                    person.get('prenom', ''),
-                    person_type,
-                    person.get('specialisation', ''),
-                    person.get('horaire', ''),
-                    "✓" if person.get('disponible', True) else "✗",
-                    contact
-                )
-                
-                personnel_tree.insert('', 'end', values=values)
-                
+                personnel_tree.insert('', 'end', iid=row_iid(personnel_tree, person.get('id_employe')),
+                                      values=personnel_row_values(person))
             except Exception as e:
                 print(f"  ⚠️ Erreur traitement personnel: {e}")
                 continue
@@ -10,6 +10,26 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from Core.reservation import Reservation
 from Core.enums import StatutReservation
+from interfaces.tabs.tree_sync import row_iid, apply_row_change, bind_tree_to_changes
+
+
+# Libellés des statuts de réservation et libellés décorés affichés dans le tableau
+RESERVATION_STATUS_LABELS = {
+    'active': 'Active',
+    'annulee': 'Annulée',
+    'terminee': 'Terminée',
+    'expiree': 'Expirée'
+}
+RESERVATION_STATUS_DISPLAY = {
+    'Annulée': '❌ Annulée',
+    'Terminée': '✅ Terminée'
+}
+
+# Champ des réservations référençant chaque collection affichée (jointures)
+RESERVATION_REFERENCES = {
+    'passengers': ('passager_id', 'id_passager'),
+    'flights': ('vol_numero', 'numero_vol')
+}
 
 class ReservationDialog:
     """Dialogue pour créer ou modifier une réservation"""
@@ -367,8 +387,26 @@ class ReservationDialog:
             if not re.match(r'^\d{1,3}[A-Z]$', seat):
                 errors.append("Format de siège invalide (ex: 12A, 3B)")
         
+        # Disponibilité du siège sur le plan de cabine du vol
+        if seat and not errors:
+            errors.extend(self.check_seat(seat.upper()))
+        
         return errors
     
+    def check_seat(self, seat):
+        """Vérifie qu'un siège existe et n'est pas occupé par une autre réservation"""
+        flight_number = self.vol_var.get().split(' - ')[0]
+        if (self.is_editing and self.reservation_data.get('vol_numero') == flight_number
+                and self.reservation_data.get('siege_assigne') == seat):
+            return []
+        
+        seat_map = self.data_manager.seat_map(flight_number)
+        if seat_map is None or seat_map.is_free(seat):
+            return []
+        if seat_map.index_of(seat) is None:
+            return [f"Le siège {seat} n'existe pas sur le vol {flight_number}"]
+        return [f"Le siège {seat} est déjà occupé sur le vol {flight_number}"]
+    
     def save_reservation(self):
         """Sauvegarde la réservation"""
         errors = self.validate_fields()
@@ -440,12 +478,8 @@ class ReservationDialog:
     def safe_add_reservation(self, reservation_data):
         """Ajout sécurisé de réservation"""
         try:
-            data = self.data_manager.load_data('reservations')
-            if 'reservations' not in data:
-                data['reservations'] = []
-            
-            data['reservations'].append(reservation_data)
-            return self.data_manager.save_data('reservations', data)
+            # Ajout ligne à ligne (index et abonnés mis à jour)
+            return self.data_manager.add_reservation(reservation_data)
         except Exception as e:
             print(f"❌ Erreur ajout réservation: {e}")
             return False
@@ -453,26 +487,9 @@ class ReservationDialog:
     def safe_update_reservation(self, reservation_data):
         """Mise à jour sécurisée de réservation"""
         try:
-            data = self.data_manager.load_data('reservations')
-            if 'reservations' not in data:
-                return False
-            
-            # Trouver la réservation à modifier
-            reservation_index = -1
-            original_id = self.reservation_data.get('id_reservation')
-            
-            for i, reservation in enumerate(data['reservations']):
-                if reservation.get('id_reservation') == original_id:
-                    reservation_index = i
-                    break
-            
-            if reservation_index == -1:
-                print(f"❌ Réservation {original_id} non trouvée")
-                return False
-            
-            # Mettre à jour
-            data['reservations'][reservation_index] = reservation_data
-            return self.data_manager.save_data('reservations', data)
+            # Mettre à jour (ligne à ligne)
+            return self.data_manager.update_reservation(self.reservation_data.get('id_reservation'),
+                                                        reservation_data)
         except Exception as e:
             print(f"❌ Erreur modification réservation: {e}")
             return False
@@ -571,6 +588,17 @@ def create_reservations_tab_content(parent_frame, data_manager):
     # Charger les données initiales
     refresh_reservations_data(reservations_tree, data_manager)
     
+    # Mises à jour ligne à ligne: réservations modifiées, et réservations
+    # d'un passager ou d'un vol modifié (colonnes jointes)
+    def on_reservations_changed(event):
+        if reservations_search_var.get() or reservations_filter_var.get() != "Tous":
+            # Vue filtrée: le filtre est réappliqué
+            return False
+        return apply_reservation_change(reservations_tree, data_manager, event)
+    
+    bind_tree_to_changes(reservations_tree, data_manager, ['reservations', 'passengers', 'flights'],
+                         on_reservations_changed, filter_reservations_callback)
+    
     # Double-clic pour modifier
     reservations_tree.bind('<Double-1>', lambda e: edit_reservation(parent_frame, data_manager, reservations_tree))
     
@@ -578,10 +606,8 @@ def create_reservations_tab_content(parent_frame, data_manager):
 
 
 def new_reservation_dialog(parent, data_manager, reservations_tree):
-    """Ouvre le dialogue de création de réservation"""
-    dialog = ReservationDialog(parent, data_manager)
-    if dialog.result:
-        refresh_reservations_data(reservations_tree, data_manager)
+    """Ouvre le dialogue de création de réservation (le tableau suit les modifications)"""
+    ReservationDialog(parent, data_manager)
 
 
 def edit_reservation(parent, data_manager, reservations_tree):
@@ -610,7 +636,6 @@ def edit_reservation(parent, data_manager, reservations_tree):
         
         dialog = ReservationDialog(parent, data_manager, reservation_data)
         if dialog.result:
-            refresh_reservations_data(reservations_tree, data_manager)
             messagebox.showinfo("Succès", "Réservation modifiée avec succès!")
             
     except Exception as e:
@@ -707,21 +732,13 @@ def cancel_reservation(data_manager, reservations_tree):
                               f"Passager: {passenger_name}\n"
                               f"Vol: {flight_number}"):
             
-            # Annuler la réservation
-            data = data_manager.load_data('reservations')
-            if 'reservations' not in data:
+            # Trouver et annuler la réservation (ligne à ligne)
+            full_id = find_reservation_id(data_manager, reservation_id)
+            if full_id is None:
+                messagebox.showerror("Erreur", "Réservation non trouvée.")
                 return
             
-            # Trouver et modifier la réservation
-            for i, reservation in enumerate(data['reservations']):
-                if reservation.get('id_reservation', '').startswith(reservation_id.replace('...', '')):
-                    data['reservations'][i]['statut'] = 'annulee'
-                    data['reservations'][i]['checkin_effectue'] = False
-                    data['reservations'][i]['updated_at'] = datetime.now().isoformat()
-                    break
-            
-            if data_manager.save_data('reservations', data):
-                refresh_reservations_data(reservations_tree, data_manager)
+            if data_manager.update_reservation(full_id, {'statut': 'annulee', 'checkin_effectue': False}):
                 messagebox.showinfo("Succès", "Réservation annulée avec succès.")
             else:
                 messagebox.showerror("Erreur", "Erreur lors de l'annulation.")
@@ -730,6 +747,15 @@ def cancel_reservation(data_manager, reservations_tree):
         messagebox.showerror("Erreur", f"Erreur lors de l'annulation: {e}")
 
 
+def find_reservation_id(data_manager, displayed_id):
+    """Identifiant complet d'une réservation à partir de l'identifiant tronqué du tableau"""
+    prefix = str(displayed_id).replace('...', '')
+    for reservation in data_manager.get_reservations():
+        if reservation.get('id_reservation', '').startswith(prefix):
+            return reservation.get('id_reservation')
+    return None
+
+
 def toggle_checkin(data_manager, reservations_tree):
     """Effectue ou annule le check-in"""
     selection = reservations_tree.selection()
@@ -753,20 +779,13 @@ def toggle_checkin(data_manager, reservations_tree):
         
         if messagebox.askyesno("Confirmation", f"Check-in {action} ?"):
             
-            # Modifier le check-in
-            data = data_manager.load_data('reservations')
-            if 'reservations' not in data:
+            # Trouver et modifier la réservation (ligne à ligne)
+            full_id = find_reservation_id(data_manager, reservation_id)
+            if full_id is None:
+                messagebox.showerror("Erreur", "Réservation non trouvée.")
                 return
             
-            # Trouver et modifier la réservation
-            for i, reservation in enumerate(data['reservations']):
-                if reservation.get('id_reservation', '').startswith(reservation_id.replace('...', '')):
-                    data['reservations'][i]['checkin_effectue'] = new_checkin_status
-                    data['reservations'][i]['updated_at'] = datetime.now().isoformat()
-                    break
-            
-            if data_manager.save_data('reservations', data):
-                refresh_reservations_data(reservations_tree, data_manager)
+            if data_manager.update_reservation(full_id, {'checkin_effectue': new_checkin_status}):
                 messagebox.showinfo("Succès", f"Check-in {action} avec succès.")
             else:
                 messagebox.showerror("Erreur", f"Erreur lors du check-in.")
@@ -784,71 +803,90 @@ def filter_reservations(reservations_tree, data_manager, search_var, filter_var)
     for item in reservations_tree.get_children():
         reservations_tree.delete(item)
     
-    # Recharger avec filtres
-    all_reservations = data_manager.get_reservations()
-    passengers = data_manager.get_passengers()
-    flights = data_manager.get_flights()
+    # Filtre par statut (index secondaire)
+    where = []
+    if filter_status != "Tous":
+        where.append(('statut', 'in', [code for code, label in RESERVATION_STATUS_LABELS.items()
+                                       if label == filter_status]))
+    
+    # Recherche sur les colonnes jointes (passager, trajet): lignes calculées une seule fois
+    rows = {}
+    if search_text:
+        def matches_search(reservation):
+            values = rows[id(reservation)] = reservation_row_values(reservation, data_manager)
+            searchable_text = f"{values[1]} {reservation.get('vol_numero', '')} {values[3]} {reservation.get('siege_assigne', '')}".lower()
+            return search_text in searchable_text
+        where.append(matches_search)
+    
+    for reservation in data_manager.query('reservations', where):
+        values = rows.get(id(reservation)) or reservation_row_values(reservation, data_manager)
+        reservations_tree.insert('', 'end', iid=row_iid(reservations_tree, reservation.get('id_reservation')),
+                                 values=values)
+
+
+def reservation_row_values(reservation, data_manager):
+    """Valeurs de la ligne d'une réservation (passager et vol joints par index primaire)"""
+    reservation_status = RESERVATION_STATUS_LABELS.get(reservation.get('statut', ''), 'Inconnu')
+    
+    # Trouver les informations du passager (index primaire)
+    passenger_name = "Inconnu"
+    passenger = data_manager.get_passenger_by_id(reservation.get('passager_id'))
+    if passenger:
+        passenger_name = f"{passenger.get('prenom', '')} {passenger.get('nom', '')}"
+    
+    # Trouver les informations du vol (index primaire)
+    flight_route = "N/A"
+    flight_date = "N/A"
+    flight = data_manager.get_flight_by_id(reservation.get('vol_numero'))
+    if flight:
+        flight_route = f"{flight.get('aeroport_depart', '')} → {flight.get('aeroport_arrivee', '')}"
+        try:
+            if flight.get('heure_depart'):
+                if isinstance(flight['heure_depart'], str):
+                    depart_time = datetime.fromisoformat(flight['heure_depart'])
+                else:
+                    depart_time = flight['heure_depart']
+                flight_date = depart_time.strftime("%Y-%m-%d %H:%M")
+        except:
+            pass
     
-    for reservation in all_reservations:
-        # Mapping du statut pour l'affichage
-        status_mapping = {
-            'active': 'Active',
-            'annulee': 'Annulée',
-            'terminee': 'Terminée',
-            'expiree': 'Expirée'
-        }
-        
-        reservation_status = status_mapping.get(reservation.get('statut', ''), 'Inconnu')
-        
-        # Filtrage par statut
-        if filter_status != "Tous" and reservation_status != filter_status:
-            continue
-        
-        # Trouver les informations du passager et du vol pour la recherche
-        passenger_name = "Inconnu"
-        for passenger in passengers:
-            if passenger.get('id_passager') == reservation.get('passager_id'):
-                passenger_name = f"{passenger.get('prenom', '')} {passenger.get('nom', '')}"
-                break
-        
-        flight_route = "N/A"
-        flight_date = "N/A"
-        for flight in flights:
-            if flight.get('numero_vol') == reservation.get('vol_numero'):
-                flight_route = f"{flight.get('aeroport_depart', '')} → {flight.get('aeroport_arrivee', '')}"
-                try:
-                    if flight.get('heure_depart'):
-                        if isinstance(flight['heure_depart'], str):
-                            depart_time = datetime.fromisoformat(flight['heure_depart'])
-                        else:
-                            depart_time = flight['heure_depart']
-                        flight_date = depart_time.strftime("%Y-%m-%d %H:%M")
-                except:
-                    pass
-                break
-        
-        # Filtrage par recherche
-        searchable_text = f"{passenger_name} {reservation.get('vol_numero', '')} {flight_route} {reservation.get('siege_assigne', '')}".lower()
-        if search_text and search_text not in searchable_text:
-            continue
-        
-        # Ajouter à l'affichage
-        values = (
-            reservation.get('id_reservation', '')[:8] + '...' if len(reservation.get('id_reservation', '')) > 8 else reservation.get('id_reservation', ''),
-            passenger_name,
-            reservation.get('vol_numero', ''),
-            flight_route,
-            flight_date,
-            reservation.get('siege_assigne', 'N/A'),
-            "✓" if reservation.get('checkin_effectue', False) else "✗",
-            reservation_status
-        )
-        
-        item_id = reservations_tree.insert('', 'end', values=values)
-        if reservation_status == 'Annulée':
-            reservations_tree.set(item_id, 'Statut', '❌ Annulée')
-        elif reservation_status == 'Terminée':
-            reservations_tree.set(item_id, 'Statut', '✅ Terminée')
+    return (
+        reservation.get('id_reservation', '')[:8] + '...' if len(reservation.get('id_reservation', '')) > 8 else reservation.get('id_reservation', ''),
+        passenger_name,
+        reservation.get('vol_numero', ''),
+        flight_route,
+        flight_date,
+        reservation.get('siege_assigne', 'N/A'),
+        "✓" if reservation.get('checkin_effectue', False) else "✗",
+        RESERVATION_STATUS_DISPLAY.get(reservation_status, reservation_status)
+    )
+
+
+def apply_reservation_change(reservations_tree, data_manager, event):
+    """
+    Met à jour les seules lignes concernées par une modification: la
+    réservation elle-même, ou les réservations d'un passager / d'un vol
+    ajouté, modifié ou supprimé.
+    
+    Returns:
+        bool: False si le tableau doit être entièrement rafraîchi
+    """
+    def row_values(reservation):
+        return reservation_row_values(reservation, data_manager)
+    
+    if event.collection == 'reservations':
+        return apply_row_change(reservations_tree, event, 'id_reservation', row_values)
+    
+    field, key_field = RESERVATION_REFERENCES[event.collection]
+    keys = {event.key}
+    if event.new is not None:
+        keys.add(event.new.get(key_field))
+    for key in keys:
+        for reservation in data_manager.find_by('reservations', field, key):
+            iid = str(reservation.get('id_reservation'))
+            if reservations_tree.exists(iid):
+                reservations_tree.item(iid, values=row_values(reservation))
+    return True
 
 
 def refresh_reservations_data(reservations_tree, data_manager):
@@ -860,70 +898,19 @@ def refresh_reservations_data(reservations_tree, data_manager):
         for item in reservations_tree.get_children():
             reservations_tree.delete(item)
         
-        all_reservations = data_manager.get_reservations()
-        passengers = data_manager.get_passengers()
-        flights = data_manager.get_flights()
+        # Lecture au fil de l'eau (mémoire bornée pour les gros fichiers)
+        reservation_count = 0
         
-        print(f"  📊 {len(all_reservations)} réservations chargées")
-        
-        # Mapping des statuts pour l'affichage
-        status_mapping = {
-            'active': 'Active',
-            'annulee': 'Annulée',
-            'terminee': 'Terminée',
-            'expiree': 'Expirée'
-        }
-        
-        for reservation in all_reservations:
+        for reservation in data_manager.iter_reservations():
+            reservation_count += 1
             try:
-                reservation_status = status_mapping.get(reservation.get('statut', ''), 'Inconnu')
-                
-                # Trouver les informations du passager
-                passenger_name = "Inconnu"
-                for passenger in passengers:
-                    if passenger.get('id_passager') == reservation.get('passager_id'):
-                        passenger_name = f"{passenger.get('prenom', '')} {passenger.get('nom', '')}"
-                        break
-                
-                # Trouver les informations du vol
-                flight_route = "N/A"
-                flight_date = "N/A"
-                for flight in flights:
-                    if flight.get('numero_vol') == reservation.get('vol_numero'):
-                        flight_route = f"{flight.get('aeroport_depart', '')} → {flight.get('aeroport_arrivee', '')}"
-                        try:
-                            if flight.get('heure_depart'):
-                                if isinstance(flight['heure_depart'], str):
-                                    depart_time = datetime.fromisoformat(flight['heure_depart'])
-                                else:
-                                    depart_time = flight['heure_depart']
-                                flight_date = depart_time.strftime("%Y-%m-%d %H:%M")
-                        except:
-                            pass
-                        break
-                
-                values = (
-                    reservation.get('id_reservation', '')[:8] + '...' if len(reservation.get('id_reservation', '')) > 8 else reservation.get('id_reservation', ''),
-                    passenger_name,
-                    reservation.get('vol_numero', ''),
-                    flight_route,
-                    flight_date,
-                    reservation.get('siege_assigne', 'N/A'),
-                    "✓" if reservation.get('checkin_effectue', False) else "✗",
-                    reservation_status
-                )
-                
-                item_id = reservations_tree.insert('', 'end', values=values)
-                if reservation_status == 'Annulée':
-                    reservations_tree.set(item_id, 'Statut', '❌ Annulée')
-                elif reservation_status == 'Terminée':
-                    reservations_tree.set(item_id, 'Statut', '✅ Terminée')
-                    
+                reservations_tree.insert('', 'end', iid=row_iid(reservations_tree, reservation.get('id_reservation')),
+                                         values=reservation_row_values(reservation, data_manager))
             except Exception as e:
                 print(f"  ⚠️ Erreur traitement réservation: {e}")
                 continue
         
-        print(f"✅ Réservations rafraîchies: {len(all_reservations)} réservations affichées")
+        print(f"✅ Réservations rafraîchies: {reservation_count} réservations affichées")
         
     except Exception as e:
         print(f"❌ Erreur refresh réservations: {e}")
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Synchronisation des tableaux (Treeview) avec les modifications du
+DataManager.
+
+Chaque ligne a pour identifiant la clé primaire de son enregistrement :
+un ajout, une modification ou une suppression ne touche que la ligne
+concernée. Les événements 'reload' (collection relue ou remplacée)
+provoquent un rafraîchissement complet, regroupé en un seul quand la
+boucle Tk est inactive.
+"""
+
+
+def row_iid(tree, key):
+    """Identifiant de ligne d'un enregistrement (None si absent ou déjà utilisé)"""
+    if key is None or key == '':
+        return None
+    iid = str(key)
+    return None if tree.exists(iid) else iid
+
+
+def apply_row_change(tree, event, key_field, row_values):
+    """
+    Répercute l'ajout, la modification ou la suppression d'un enregistrement
+    sur sa seule ligne du tableau.
+
+    Args:
+        tree (ttk.Treeview): Tableau dont les lignes sont identifiées par clé primaire
+        event (ChangeEvent): Modification ('insert', 'update' ou 'delete')
+        key_field (str): Champ clé primaire de la collection
+        row_values: Fonction row_values(enregistrement) -> valeurs de la ligne
+
+    Returns:
+        bool: False si la ligne ne peut pas être identifiée par sa clé
+        (clé absente ou déjà utilisée) : le tableau doit être entièrement
+        rafraîchi
+    """
+    iid = str(event.key)
+    if event.op == 'delete':
+        if tree.exists(iid):
+            tree.delete(iid)
+        return True
+
+    record = event.new
+    key = record.get(key_field)
+    if event.op == 'update' and tree.exists(iid):
+        if key is not None and str(key) == iid:
+            tree.item(iid, values=row_values(record))
+            return True
+        # Clé primaire modifiée: ligne recréée à la même position
+        new_iid = row_iid(tree, key)
+        if new_iid is None:
+            return False
+        position = tree.index(iid)
+        tree.delete(iid)
+        tree.insert('', position, iid=new_iid, values=row_values(record))
+        return True
+
+    if key is not None and key != '' and tree.exists(str(key)):
+        tree.item(str(key), values=row_values(record))
+        return True
+    new_iid = row_iid(tree, key)
+    if new_iid is None:
+        return False
+    tree.insert('', 'end', iid=new_iid, values=row_values(record))
+    return True
+
+
+def bind_tree_to_changes(tree, data_manager, collections, apply_change, refresh):
+    """
+    Abonne un tableau aux modifications de collections.
+
+    L'abonnement prend fin à la destruction du tableau.
+
+    Args:
+        tree (ttk.Treeview): Tableau mis à jour
+        data_manager (DataManager): Source des événements
+        collections (List): Collections affichées par le tableau
+        apply_change: Fonction apply_change(event) mettant à jour les lignes
+            concernées ; elle retourne False si le tableau doit être
+            entièrement rafraîchi (vue filtrée par exemple)
+        refresh: Fonction sans argument rafraîchissant tout le tableau
+
+    Returns:
+        La fonction abonnée
+    """
+    pending = []
+
+    def refresh_once():
+        pending.clear()
+        refresh()
+
+    def on_change(event):
+        if event.op != 'reload' and apply_change(event) is not False:
+            return
+        if not pending:
+            pending.append(tree.after_idle(refresh_once))
+
+    def on_destroy(event):
+        if event.widget is tree:
+            data_manager.unsubscribe(on_change)
+            if pending:
+                tree.after_cancel(pending.pop())
+
+    data_manager.subscribe(on_change, collections)
+    tree.bind('<Destroy>', on_destroy, add='+')
+    return on_change